@@ -0,0 +1,320 @@
+# backend/AuditIndex.py
+import bisect
+import datetime
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from Journal import atomic_write_json
+
+BUCKET_SECONDS = 3600       # Her segment bir saatlik kayıt tutar
+OPEN_SEGMENTS = 2           # Geç gelen kayıtlar için açık tutulan en yeni segment sayısı
+POSTINGS_CACHE_SIZE = 256   # Bellekte tutulan kapalı segment indeksi sayısı
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+TEXT_LINE_RE = re.compile(r'^\[(.+?)\] USER: (.*?) \| ACTION: (.*?) \| ?(.*)$')
+TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+def parse_time(value):
+    """'YYYY-MM-DD[ HH:MM[:SS]]', ISO ya da epoch saniyesini epoch'a çevirir."""
+    if value is None or value == "": return None
+    if isinstance(value, (int, float)): return float(value)
+    try: return float(value)
+    except ValueError: pass
+    for fmt in TIME_FORMATS:
+        try: return datetime.datetime.strptime(value, fmt).timestamp()
+        except ValueError: continue
+    raise ValueError(f"Geçersiz zaman: {value}")
+
+
+def _contains(sorted_list, value):
+    i = bisect.bisect_left(sorted_list, value)
+    return i < len(sorted_list) and sorted_list[i] == value
+
+
+class _Segment:
+    """Bir zaman dilimine ait kayıtlar (.jsonl) ve kullanıcı/işlem postings listeleri (.idx)."""
+
+    def __init__(self, directory, bucket):
+        self.bucket = bucket
+        self.data_path = os.path.join(directory, f"{bucket}.jsonl")
+        self.index_path = os.path.join(directory, f"{bucket}.idx")
+        self.postings = {'all': [], 'u': {}, 'a': {}}
+        self.writer = None
+
+    def add(self, offset, entry):
+        """Kaydı postings'e ekler; bu segmentte ilk kez görülen anahtarları döndürür."""
+        new_keys = []
+        self.postings['all'].append(offset)
+        for kind, key in (('u', entry['user']), ('a', entry['action'])):
+            offsets = self.postings[kind].get(key)
+            if offsets is None:
+                offsets = self.postings[kind][key] = []
+                new_keys.append(f"{kind}:{key}")
+            offsets.append(offset)
+        return new_keys
+
+    def keys(self):
+        return [f"{kind}:{key}" for kind in ('u', 'a') for key in self.postings[kind]]
+
+    def rebuild(self):
+        """Postings listelerini veri dosyasından yeniden kurar; yarım kalmış son satırı kırpar."""
+        self.postings = {'all': [], 'u': {}, 'a': {}}
+        offset = 0
+        with open(self.data_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'): break
+                try: entry = json.loads(line)
+                except ValueError: break
+                self.add(offset, entry)
+                offset += len(line)
+        if offset != os.path.getsize(self.data_path):
+            with open(self.data_path, 'r+b') as f:
+                f.truncate(offset)
+
+    def seal(self, catalog):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+        atomic_write_json(self.index_path, self.postings, fsync=False, separators=(',', ':'))
+        catalog.write(json.dumps({'b': self.bucket, 'k': self.keys()}, ensure_ascii=False) + "\n")
+        catalog.flush()
+
+
+class AuditIndex:
+    """Denetim kayıtları için disk üzerinde, zaman dilimli ve indeksli depo.
+
+    Kayıtlar saatlik segmentlere yazılır; her segment için kullanıcı ve işlem
+    bazında kayıt offset'leri (postings) tutulur. Katalog (catalog.log) her
+    anahtarın hangi segmentlerde geçtiğini bellekte tutar; sorgular yalnızca
+    zaman aralığına düşen ve anahtarı içeren segmentlerin postings'ini okur.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._open = {}                 # bucket -> _Segment (yazılabilir, postings bellekte)
+        self._cache = OrderedDict()     # bucket -> postings (kapalı segmentler, LRU)
+        self._key_buckets = {}          # "u:<user>" / "a:<action>" -> sıralı bucket listesi
+        self.created = not os.path.isdir(directory)
+        os.makedirs(directory, exist_ok=True)
+        self._buckets = self._recover()
+
+    def _recover(self):
+        """Kataloğu yükler; indeksi ya da katalog kaydı eksik segmentleri onarır."""
+        catalog_path = os.path.join(self.directory, "catalog.log")
+        cataloged = set()
+        if os.path.exists(catalog_path):
+            with open(catalog_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try: record = json.loads(line)
+                    except ValueError: break
+                    cataloged.add(record['b'])
+                    for key in record['k']:
+                        self._note_key(key, record['b'])
+        self._catalog = open(catalog_path, 'a', encoding='utf-8')
+
+        buckets = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".jsonl"): continue
+            bucket = int(name[:-len(".jsonl")])
+            buckets.append(bucket)
+            segment = _Segment(self.directory, bucket)
+            if not os.path.exists(segment.index_path):
+                segment.rebuild()
+            elif bucket not in cataloged:
+                segment.postings = self._load_postings(bucket)
+            else:
+                continue
+            for key in segment.keys():
+                self._note_key(key, bucket)
+            segment.seal(self._catalog)
+        return sorted(buckets)
+
+    def _note_key(self, key, bucket):
+        buckets = self._key_buckets.get(key)
+        if buckets is None:
+            self._key_buckets[key] = [bucket]
+        elif buckets[-1] < bucket:
+            buckets.append(bucket)
+        else:
+            i = bisect.bisect_left(buckets, bucket)
+            if i == len(buckets) or buckets[i] != bucket:
+                buckets.insert(i, bucket)
+
+    # --- EKLEME ---
+    def add_batch(self, entries):
+        """AuditLogger dinleyicisi: yazılan kayıt grubunu indekse ekler."""
+        if not entries: return
+        with self._lock:
+            touched = set()
+            for entry in entries:
+                bucket = int(entry['ts'] // BUCKET_SECONDS)
+                segment = self._open_segment(bucket)
+                line = (json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+                offset = segment.writer.tell()
+                segment.writer.write(line)
+                for key in segment.add(offset, entry):
+                    self._note_key(key, bucket)
+                touched.add(segment)
+            for segment in touched:
+                segment.writer.flush()
+            for bucket in sorted(self._open)[:-OPEN_SEGMENTS]:
+                self._open.pop(bucket).seal(self._catalog)
+
+    def _open_segment(self, bucket):
+        segment = self._open.get(bucket)
+        if segment is not None: return segment
+        segment = _Segment(self.directory, bucket)
+        if os.path.exists(segment.data_path):
+            # Kapatılmış bir segmente geç gelen kayıt: postings'i yükleyip yeniden aç
+            segment.postings = self._load_postings(bucket)
+            self._cache.pop(bucket, None)
+            if os.path.exists(segment.index_path): os.remove(segment.index_path)
+        else:
+            bisect.insort(self._buckets, bucket)
+        segment.writer = open(segment.data_path, 'ab')
+        self._open[bucket] = segment
+        return segment
+
+    def close(self):
+        with self._lock:
+            for segment in self._open.values():
+                segment.seal(self._catalog)
+            self._open.clear()
+            self._catalog.flush()
+
+    def import_log(self, path, batch_size=10000):
+        """Mevcut bir system.log dosyasını (metin ya da JSON satırları) akış halinde içe aktarır."""
+        count, batch = 0, []
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                entry = self._parse_line(line.rstrip('\n'))
+                if entry is None: continue
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    self.add_batch(batch)
+                    count += len(batch)
+                    batch = []
+        self.add_batch(batch)
+        return count + len(batch)
+
+    @staticmethod
+    def _parse_line(line):
+        if line.startswith('{'):
+            try:
+                entry = json.loads(line)
+                entry['ts'] = parse_time(entry['ts'])
+                return entry
+            except (ValueError, KeyError):
+                return None
+        match = TEXT_LINE_RE.match(line)
+        if not match: return None
+        timestamp, user_id, action, details = match.groups()
+        try: ts = parse_time(timestamp)
+        except ValueError: return None
+        return {'ts': ts, 'user': user_id, 'action': action, 'details': details}
+
+    # --- SORGU ---
+    def _load_postings(self, bucket):
+        postings = self._cache.get(bucket)
+        if postings is not None:
+            self._cache.move_to_end(bucket)
+            return postings
+        segment = _Segment(self.directory, bucket)
+        try:
+            with open(segment.index_path, 'r', encoding='utf-8') as f:
+                postings = json.load(f)
+        except FileNotFoundError:
+            segment.rebuild()
+            postings = segment.postings
+        self._cache[bucket] = postings
+        if len(self._cache) > POSTINGS_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return postings
+
+    def _matching_offsets(self, bucket, user_id, action):
+        with self._lock:
+            segment = self._open.get(bucket)
+            postings = segment.postings if segment else self._load_postings(bucket)
+            if user_id is None and action is None:
+                return list(postings['all'])
+            lists = []
+            if user_id is not None: lists.append(postings['u'].get(user_id, []))
+            if action is not None: lists.append(postings['a'].get(action, []))
+            if len(lists) == 1: return list(lists[0])
+            other = set(lists[1])
+            return [o for o in lists[0] if o in other]
+
+    def _candidate_buckets(self, user_id, action, low_bucket, high_bucket):
+        """Zaman aralığında olup filtredeki tüm anahtarları içeren segmentler (artan sırada)."""
+        with self._lock:
+            lists = [self._key_buckets.get(f"{kind}:{key}", [])
+                     for kind, key in (('u', user_id), ('a', action)) if key is not None]
+            if not lists: lists = [self._buckets]
+            lists.sort(key=len)
+            base = lists[0]
+            lo = 0 if low_bucket is None else bisect.bisect_left(base, low_bucket)
+            hi = len(base) if high_bucket is None else bisect.bisect_right(base, high_bucket)
+            candidates = base[lo:hi]
+            for other in lists[1:]:
+                candidates = [b for b in candidates if _contains(other, b)]
+            return candidates
+
+    def query(self, user_id=None, action=None, since=None, until=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """Filtreye uyan kayıtları yeniden eskiye sıralı sayfalar halinde döndürür.
+
+        cursor bir önceki sayfanın döndürdüğü 'next_cursor' değeridir.
+        Dönüş: {'entries': [...], 'next_cursor': str | None}
+        """
+        since, until = parse_time(since), parse_time(until)
+        limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+        high_bucket = None if until is None else int(until // BUCKET_SECONDS)
+        before = -1
+        if cursor:
+            cursor_bucket, before = (int(part) for part in cursor.split(':'))
+            high_bucket = cursor_bucket if high_bucket is None else min(high_bucket, cursor_bucket)
+        low_bucket = None if since is None else int(since // BUCKET_SECONDS)
+        candidates = self._candidate_buckets(user_id, action, low_bucket, high_bucket)
+
+        entries = []
+        for n in range(len(candidates) - 1, -1, -1):
+            bucket = candidates[n]
+            offsets = self._matching_offsets(bucket, user_id, action)
+            if cursor and bucket == high_bucket and before >= 0:
+                # Offset'ler artan sırada; imlecin gösterdiği kayıttan eskiler kalır
+                offsets = offsets[:bisect.bisect_left(offsets, before)]
+            with open(os.path.join(self.directory, f"{bucket}.jsonl"), 'rb') as f:
+                for i in range(len(offsets) - 1, -1, -1):
+                    f.seek(offsets[i])
+                    entry = json.loads(f.readline())
+                    if since is not None and entry['ts'] < since: continue
+                    if until is not None and entry['ts'] > until: continue
+                    entries.append(self._present(entry))
+                    if len(entries) >= limit:
+                        if i > 0: next_cursor = f"{bucket}:{offsets[i]}"
+                        elif n > 0: next_cursor = f"{candidates[n - 1]}:-1"
+                        else: next_cursor = None
+                        return {'entries': entries, 'next_cursor': next_cursor}
+        return {'entries': entries, 'next_cursor': None}
+
+    @staticmethod
+    def _present(entry):
+        return {
+            'time': datetime.datetime.fromtimestamp(entry['ts']).strftime("%Y-%m-%d %H:%M:%S"),
+            'user': entry['user'],
+            'action': entry['action'],
+            'details': entry['details'],
+        }
+
+
+if __name__ == '__main__':
+    # Kullanım: python AuditIndex.py <indeks_dizini> <system.log> [...]
+    import sys
+    index = AuditIndex(sys.argv[1])
+    for log_path in sys.argv[2:]:
+        print(f"{log_path}: {index.import_log(log_path)} kayıt içe aktarıldı.")
+    index.close()
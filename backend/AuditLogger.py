@@ -0,0 +1,162 @@
+# backend/AuditLogger.py
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from Metrics import metrics
+
+AUDIT_QUEUE_SIZE = 10000        # Kuyruk dolarsa çağıran bekler (backpressure)
+AUDIT_BATCH_SIZE = 256          # Bu kadar satır birikince yazılır
+AUDIT_FLUSH_INTERVAL = 0.5      # ... ya da en geç bu kadar saniyede bir
+AUDIT_MAX_BYTES = 10 * 1024 * 1024  # Dosya bu boyutu geçince döndürülür (rotation)
+AUDIT_BACKUP_COUNT = 5          # system.log.1 ... system.log.5
+AUDIT_FORMAT = os.environ.get("KOTA_AUDIT_FORMAT", "text")  # "text" | "json"
+# "async": yalnızca güvenlik olayları fsync'i bekler, "sync": hepsi bekler, "none": hiçbiri beklemez
+AUDIT_DURABILITY = os.environ.get("KOTA_AUDIT_DURABILITY", "async")
+SECURITY_ACTIONS = {"LOGIN_FAILED", "REGISTER", "DELETE_USER", "SET_QUOTA"}
+DURABLE_WAIT_TIMEOUT = 5.0
+
+
+class AuditLogger:
+    """Arka planda çalışan, tamponlu denetim (audit) günlüğü yazıcısı.
+
+    log() kaydı sınırlı bir kuyruğa ekleyip hemen döner; yazıcı thread kayıtları
+    toplu halde dosyaya yazar. Güvenlik olaylarında (ya da "sync" modunda)
+    çağıran, kaydı fsync edilene kadar bekler.
+
+    Aynı dosyaya birden çok süreç yazıyorsa (KOTA_STATE=sqlite) rotate_lock süreçler
+    arası bir kilit olmalıdır: döndürme bu kilit altında yapılır ve her süreç,
+    başka bir sürecin döndürdüğü dosyayı fark edip yenisine geçer.
+    """
+
+    def __init__(self, path, fmt=AUDIT_FORMAT, durability=AUDIT_DURABILITY,
+                 max_bytes=AUDIT_MAX_BYTES, backup_count=AUDIT_BACKUP_COUNT, rotate_lock=None):
+        self.path = path
+        self.rotate_lock = rotate_lock
+        self.fmt = fmt
+        self.durability = durability
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue = queue.Queue(maxsize=AUDIT_QUEUE_SIZE)
+        self._file = None
+        self._closed = False
+        self.listeners = []  # Yazılan her kayıt grubuyla çağrılır (ör. AuditIndex.add_batch)
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    # --- ÜRETİCİ TARAFI ---
+    def log(self, user_id, action, details):
+        entry = {'ts': time.time(), 'user': user_id, 'action': action, 'details': details}
+        if self._closed:
+            self._write_batch([entry])
+            return
+        durable = self.durability == "sync" or (self.durability == "async" and action in SECURITY_ACTIONS)
+        done = threading.Event() if durable else None
+        self._queue.put((entry, done))
+        if done is not None:
+            done.wait(DURABLE_WAIT_TIMEOUT)
+
+    def flush(self):
+        """Kuyruktaki her şey diske yazılana (fsync) kadar bekler."""
+        if self._closed: return
+        done = threading.Event()
+        self._queue.put((None, done))
+        done.wait(DURABLE_WAIT_TIMEOUT)
+
+    def close(self):
+        if self._closed: return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(DURABLE_WAIT_TIMEOUT)
+
+    # --- YAZICI THREAD ---
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=AUDIT_FLUSH_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is None: break
+            batch, waiters = [], []
+            deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+            stop = False
+            while True:
+                entry, done = item
+                if entry is not None: batch.append(entry)
+                if done is not None: waiters.append(done)
+                # Bekleyen (durable) bir çağıran varsa zaman eşiğini beklemeden yaz
+                if len(batch) >= AUDIT_BATCH_SIZE or waiters: break
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+            try:
+                self._write_batch(batch, fsync=bool(waiters))
+            except Exception as e:
+                print(f"Log yazma hatası: {e}")
+            for listener in self.listeners:
+                try: listener(batch)
+                except Exception as e: print(f"Log dinleyici hatası: {e}")
+            for done in waiters:
+                done.set()
+            if stop: break
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _format(self, entry):
+        if self.fmt == "json":
+            record = dict(entry)
+            record['ts'] = datetime.datetime.fromtimestamp(entry['ts']).isoformat(timespec='seconds')
+            return json.dumps(record, ensure_ascii=False) + "\n"
+        timestamp = datetime.datetime.fromtimestamp(entry['ts']).strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{timestamp}] USER: {entry['user']} | ACTION: {entry['action']} | {entry['details']}\n"
+
+    def _write_batch(self, batch, fsync=False):
+        if not batch and not fsync: return
+        data = "".join(self._format(entry) for entry in batch)
+        if self._file is None or (self.rotate_lock is not None and self._rotated_elsewhere()):
+            self._reopen()
+        if data and 0 < self._file.tell() and self._file.tell() + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+        metrics.inc('kota_audit_lines_total', len(batch))
+
+    def _reopen(self):
+        if self._file: self._file.close()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _rotated_elsewhere(self):
+        """Açık dosya artık self.path değilse (başka bir süreç döndürdüyse) True."""
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _rotate(self):
+        with self.rotate_lock or nullcontext():
+            if self.rotate_lock is not None and self._rotated_elsewhere():
+                # Başka bir süreç az önce döndürdü; yalnızca yeni dosyaya geçilir.
+                self._reopen()
+                return
+            self._file.close()
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            if self.backup_count > 0:
+                os.replace(self.path, f"{self.path}.1")
+                # 'a': arada başka bir süreç dosyayı yeniden oluşturup yazdıysa kayıtları silinmez
+                self._file = open(self.path, 'a', encoding='utf-8')
+            else:
+                self._file = open(self.path, 'w', encoding='utf-8')
@@ -0,0 +1,68 @@
+# backend/FileIndex.py
+
+
+class FileIndex:
+    """Kullanıcı bazlı (sharded) dosya indeksi.
+
+    Her kullanıcının dosyaları kendi sıralı sözlüğünde (path -> metadata) tutulur;
+    path -> owner eşlemesi sayesinde tekil aramalar O(1)'dir. ls ve kullanıcı
+    silme gibi işlemler yalnızca o kullanıcının dosya sayısıyla ölçeklenir.
+    """
+
+    def __init__(self):
+        self._by_owner = {}  # owner -> {logical_path: info}
+        self._owner_of = {}  # logical_path -> owner
+
+    def __contains__(self, path):
+        return path in self._owner_of
+
+    def __getitem__(self, path):
+        return self._by_owner[self._owner_of[path]][path]
+
+    def __setitem__(self, path, info):
+        owner = info['owner']
+        previous = self._owner_of.get(path)
+        if previous is not None and previous != owner:
+            del self._by_owner[previous][path]
+        self._by_owner.setdefault(owner, {})[path] = info
+        self._owner_of[path] = owner
+
+    def __delitem__(self, path):
+        owner = self._owner_of.pop(path)
+        del self._by_owner[owner][path]
+
+    def __len__(self):
+        return len(self._owner_of)
+
+    def get(self, path, default=None):
+        owner = self._owner_of.get(path)
+        if owner is None: return default
+        return self._by_owner[owner].get(path, default)
+
+    def files_of(self, owner):
+        """Kullanıcının dosyalarını (ekleme sırasıyla) döndürür. Salt okunur kullanılmalıdır."""
+        return self._by_owner.get(owner, {})
+
+    def set_size(self, path, size):
+        self[path]['size'] = size
+
+    def load(self, entries):
+        """İndeksi (path, info) çiftleriyle baştan kurar."""
+        self._by_owner, self._owner_of = {}, {}
+        for path, info in entries:
+            self[path] = info
+
+    def drop_owner(self, owner):
+        """Kullanıcının tüm kayıtlarını siler ve silinen sözlüğü döndürür."""
+        removed = self._by_owner.pop(owner, {})
+        for path in removed:
+            if self._owner_of.get(path) == owner:
+                del self._owner_of[path]
+        return removed
+
+    def owners(self):
+        return list(self._by_owner)
+
+    def items(self):
+        for owner_files in list(self._by_owner.values()):
+            yield from list(owner_files.items())
@@ -1,26 +1,156 @@
 # backend/FileSystem.py
+import io
 import os
-import shutil 
-import datetime
-from QuotaManager import QuotaManager, DEFAULT_QUOTA_MB 
+import json
+import math
+import atexit
+import functools
+import threading
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from QuotaManager import QuotaManager, DEFAULT_QUOTA_MB, CHARGE_MODES
+from FileIndex import FileIndex
+from Journal import atomic_write_json
+from AuditLogger import AuditLogger
+from AuditIndex import AuditIndex
+from Metrics import metrics
+from Storage import make_storage, PREALLOC_MODE
+from UsageIndex import ORDERS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from Snapshots import SnapshotStore
+from Reclaimer import Reclaimer
+from SharedState import SharedFileIndex, SharedAuditIndex, SharedHomeDirs, ProcessLocks
+
+SYNC_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # Açılış taramasındaki thread sayısı
+READ_CHUNK_SIZE = 64 * 1024  # Akış halinde okumada parça boyutu
+DEFAULT_LINE_COUNT = 10      # head/tail için varsayılan satır sayısı
+MAX_BATCH_OPS = 1000         # Tek /batch isteğindeki en fazla işlem
+BATCH_WRITE_OPS = ('create', 'write', 'overwrite', 'truncate', 'delete')  # Dosyayı değiştiren toplu işlemler
+COMPACT_INTERVAL = float(os.environ.get("KOTA_COMPACT_INTERVAL", "0"))  # Arka plan sıkıştırma aralığı (sn); 0 = kapalı
+RECLAIM_DEFER_BYTES = float(os.environ.get("KOTA_RECLAIM_DEFER_MB", "8")) * 1024 * 1024  # delete_file: daha büyük dosyalar arka planda silinir
+
+def parse_size_mb(value):
+    """İstemciden gelen dosya boyutunu (MB) doğrular; NaN, sonsuz ya da negatifse ValueError."""
+    size_mb = float(value)
+    if not math.isfinite(size_mb) or size_mb < 0:
+        raise ValueError(f"Boyut negatif olmayan sonlu bir sayı olmalı: {value!r}")
+    return size_mb
+
+def _locked_by_caller(method):
+    """Metodu çağıran kullanıcının kilidi altında çalıştırır (kullanıcılar arası paralellik korunur)."""
+    @functools.wraps(method)
+    def wrapper(self, caller, *args, **kwargs):
+        if caller is None: return method(self, caller, *args, **kwargs)
+        with self._user_lock(caller):
+            return method(self, caller, *args, **kwargs)
+    return wrapper
 
 class FileSystem:
-    def __init__(self, quota_manager):
+    def __init__(self, quota_manager, project_root=None, storage=None):
         self.qm = quota_manager
-        self.files = {} 
-        self.home_dirs = {} 
-        self.current_user = None 
-        self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) 
-        
+        self._locks = {}  # user_id -> RLock
+        self._locks_guard = threading.Lock()  # _locks ve home_dirs kayıtlarını korur
+        self.project_root = (project_root or os.environ.get("KOTA_PROJECT_ROOT")
+                             or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) 
+        backend_dir = os.path.join(self.project_root, "backend")
+        self.manifest_path = os.path.join(backend_dir, "files_manifest.json")
         self.qm.load_and_sync_data(self.project_root)
-        self.sync_on_startup() 
+
+        # Ortak veritabanı varsa (KOTA_STATE=sqlite) indeksler ve kilitler süreçler arasında paylaşılır.
+        self.shared = getattr(self.qm, 'db', None)
+        if self.shared:
+            self.files = SharedFileIndex(self.shared)
+            self.home_dirs = SharedHomeDirs(self.shared)
+            self._process_locks = ProcessLocks(os.path.join(backend_dir, ".kota_locks"))
+            self.audit_index = SharedAuditIndex(self.shared)
+            # system.log'u tüm worker'lar paylaşır; döndürme ayrı bir kilit dosyasıyla sıralanır
+            # (kullanıcı dilimleri değil: kullanıcı kilidini tutan thread log yazıcısını bekleyebilir).
+            audit_lock = ProcessLocks(os.path.join(backend_dir, ".kota_audit_lock"), slots=1).get("system.log")
+        else:
+            self.files = FileIndex() 
+            self.home_dirs = {} 
+            self._process_locks = None
+            self.audit_index = AuditIndex(os.path.join(backend_dir, "audit_index"))
+            audit_lock = None
+        self.audit = AuditLogger(os.path.join(backend_dir, "system.log"), rotate_lock=audit_lock)
+        if self.audit_index.created:
+            self._import_existing_logs()
+        self.audit.listeners.append(self.audit_index.add_batch)
+        # Ekleme tanıtıcısı önbelleği tamponladığı veriyi diğer süreçlerden saklayacağı için yalnızca tek süreçte.
+        self.storage = storage or make_storage(backend_dir, handle_cache=not self.shared)
+        self.snapshots = SnapshotStore(os.path.join(backend_dir, "snapshots"))
+        self.reclaimer = Reclaimer(os.path.join(backend_dir, "trash"), self.storage)
+        if self.shared and self.storage.name == "dedup":
+            raise RuntimeError("KOTA_STORAGE=dedup çok süreçli modda (KOTA_STATE=sqlite) desteklenmez.")
+
+        self._manifest_lock = threading.RLock()  # Manifesti aynı anda tek yazıcı yazar (ortak .tmp dosyası)
+        if not self.shared:
+            self.sync_on_startup() 
+            self.reclaimer.resume()
+        elif self.shared.attach_worker(os.path.join(backend_dir, ".kota_startup.lock")):
+            # İlk worker diski tarar ve yarım kalan silmeleri üstlenir; diğerleri bu bitene kadar attach_worker'da bekler.
+            try:
+                self.sync_on_startup()
+                self.reclaimer.resume()
+            finally: self.shared.startup_done()
+        self._closed = False
+        self._compactor_stop = threading.Event()
+        if COMPACT_INTERVAL > 0:
+            threading.Thread(target=self._compact_loop, name="kota-compactor", daemon=True).start()
+        # Günlük katlandıktan sonra manifest arka planda yenilenir; böylece snapshot'a taşınan dosya
+        # boyutları (son manifestten beri değişenler) küçük kalır ve katlama diski taramaz.
+        self._manifest_wanted = threading.Event()
+        self._manifest_thread = None
+        if not self.shared:
+            self._manifest_thread = threading.Thread(target=self._manifest_loop, name="kota-manifest", daemon=True)
+            self._manifest_thread.start()
+            self.qm.checkpoint_hooks.append(self._manifest_wanted.set)
+        atexit.register(self.close)
+
+    def close(self):
+        """Manifesti yazar, log kuyruğunu boşaltır ve açık dosyaları kapatır."""
+        if self._closed: return
+        self._closed = True
+        self._compactor_stop.set()
+        self._manifest_wanted.set()
+        if self._manifest_thread: self._manifest_thread.join()
+        self.reclaimer.close()  # Yarım kalan silme bir sonraki açılışta sürer
+        self.storage.flush()  # Manifestteki mtime'lar tamponlar yazıldıktan sonraki hali yansıtsın
+        # Çok süreçli modda manifesti yalnızca son kapanan worker yazar.
+        if not self.shared or self.shared.detach_worker():
+            self.save_manifest()
+        # Önce logger boşaltılır ki son kayıtlar indekse de ulaşsın.
+        self.audit.close()
+        self.audit_index.close()
+        if self.qm.journal: self.qm.journal.close()
+        self.qm.kdf.close()
+        self.storage.close()
 
     # --- YARDIMCI METOTLAR ---
-    def _get_active_user(self):
-        if self.current_user is None:
+    def _get_active_user(self, caller):
+        if caller is None or caller not in self.qm.user_quotas:
             raise PermissionError("HATA: Lütfen önce bir kullanıcı ile oturum açın (login).")
-        return self.current_user
+        return caller
+
+    def _user_lock(self, user_id):
+        """Kullanıcıya ait kilidi döndürür; aynı kullanıcının işlemleri sıralanır, farklı kullanıcılarınki paralel çalışır."""
+        if self._process_locks: return self._process_locks.get(user_id)
+        lock = self._locks.get(user_id)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(user_id, threading.RLock())
+        return lock
     
+    def _lock_all_users(self, stack):
+        """Tüm kullanıcı kilitlerini (her çağrıda aynı sırada) stack'e alır."""
+        locks = self._process_locks.all() if self._process_locks else map(self._user_lock, self._user_ids())
+        for lock in locks:
+            stack.enter_context(lock)
+
+    def _user_ids(self):
+        """Kayıtlı kullanıcıların sıralı kopyası; home_dirs eşzamanlı kayıt/silmeyle değişebileceği için kilit altında alınır."""
+        with self._locks_guard:
+            return sorted(self.home_dirs)
+
     def _get_physical_dir_path(self, user_id):
         home_dir_name = user_id + "_home" 
         return os.path.join(self.project_root, home_dir_name)
@@ -30,43 +160,205 @@ class FileSystem:
         physical_dir_path = self._get_physical_dir_path(user_id)
         return os.path.join(physical_dir_path, file_name)
 
+    def _charged(self, logical, stored):
+        """Kotaya yansıyan boyut: yöneticinin seçtiği moda göre mantıksal ya da saklanan bayt."""
+        return stored if self.qm.settings.get('charge') == 'stored' else logical
+
+    def _discard(self, physical_path, kind, owner, files, size, path=None):
+        """Dosyayı/dizini çöp kutusuna taşır (arka planda silinir); taşınamazsa hemen siler. Ertelendiyse True."""
+        try:
+            self.reclaimer.move(physical_path, kind, owner, files, size, path)
+            return True
+        except FileNotFoundError:
+            raise
+        except OSError as e:
+            print(f"[UYARI] Çöp kutusuna taşınamadı ({e}); hemen siliniyor.")
+        if kind == 'user': self.storage.remove_tree(physical_path)
+        else: self.storage.remove(physical_path)
+        return False
+
     def is_in_user_directory(self, user_id, file_path):
         home_path = self.home_dirs.get(user_id, '')
         return file_path.startswith(home_path)
     
     def log_action(self, user_id, action, details):
-        """Sistemi izlemek için log kaydı tutar."""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] USER: {user_id} | ACTION: {action} | {details}\n"
-        
-        try:
-            with open("system.log", "a", encoding="utf-8") as f:
-                f.write(log_entry)
-        except Exception as e:
-            print(f"Log yazma hatası: {e}")
+        """Sistemi izlemek için log kaydı tutar (arka plan yazıcısına devredilir)."""
+        with metrics.timer('kota_audit_log_duration_seconds', (('action', action),)):
+            self.audit.log(user_id, action, details)
+
+    def _import_existing_logs(self):
+        """İndeks ilk kez oluşturulurken mevcut system.log (ve döndürülmüş yedekleri) içe aktarılır."""
+        log_path = self.audit.path
+        paths = [f"{log_path}.{i}" for i in range(self.audit.backup_count, 0, -1)] + [log_path]
+        for path in paths:
+            if os.path.exists(path):
+                count = self.audit_index.import_log(path)
+                print(f"[Sistem] {os.path.basename(path)}: {count} denetim kaydı indekslendi.")
 
     def sync_on_startup(self):
+        """Dosya indeksini manifest + fiziksel dizinlerden kurar ve kota kullanımını uzlaştırır.
+
+        Manifest temiz bir kapanışta yazılmışsa, mtime'ı değişmeyen dizinler hiç
+        taranmaz. Diğer dizinler thread havuzunda os.scandir ile taranır; mtime'ı
+        manifestteki ile aynı olan dosyaların mantıksal boyutu korunur. Çökmeden sonra
+        manifestten yeni dosyaların boyutu kalıcı kayıttan (kota günlüğü ya da ortak
+        veritabanı) alınır; diskteki boyut ücreti yansıtmayabilir (ör. simülasyon).
+        """
         print("[Sistem] Fiziksel dizinler taranıyor...")
-        for user_id in self.qm.user_quotas.keys():
-            if user_id == "admin": continue 
-            
+        with metrics.timer('kota_startup_sync_duration_seconds'):
+            self._sync_on_startup()
+
+    def _sync_on_startup(self):
+        manifest_homes, clean = self._load_manifest()
+        # Bu oturum düzgün kapanmazsa bir sonraki açılış manifeste güvenmesin.
+        open(self.manifest_path + ".dirty", 'w').close()
+
+        user_ids = [u for u in self.qm.user_quotas.keys() if u != "admin"]
+        known = self._durable_sizes()
+        def scan(chunk):
+            return [self._scan_home(u, manifest_homes.get(u), clean, known) for u in chunk]
+        # Her dizin için ayrı iş göndermek yerine dizinler gruplanır (daha az kuyruk yükü).
+        chunk_size = max(1, min(256, len(user_ids) // (SYNC_WORKERS * 4) or 1))
+        chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+        with ThreadPoolExecutor(max_workers=SYNC_WORKERS) as pool:
+            results = [r for chunk_result in pool.map(scan, chunks) for r in chunk_result]
+
+        usages = {}
+        rescanned = 0
+        index = []
+        for user_id, (entries, was_scanned) in zip(user_ids, results):
             home_path_logical = f"/home/{user_id}/"
             self.home_dirs[user_id] = home_path_logical 
-            
+            rescanned += was_scanned
+            total = 0
+            for file_name, meta in entries.items():
+                index.append((home_path_logical + file_name, {'owner': user_id, 'size': meta['size']}))
+                total += meta['size']
+            if self.qm.user_quotas[user_id]['usage'] != total:
+                usages[user_id] = total
+        self.files.load(index)
+        if usages:
+            self.qm.reconcile_usage(usages)
+        if self.qm.journaled_files:
+            # Günlükteki dosya kayıtları artık indekste; yeni manifest yazılır ve günlük katlanır.
+            self._persist_manifest()
+            self.qm.save_data()
+        print(f"[Sistem] Dosya sistemi senkronizasyonu tamamlandı. "
+              f"({len(user_ids)} dizin, {rescanned} tarandı, {len(usages)} kota düzeltildi)")
+
+    def _durable_sizes(self):
+        """Son manifestten sonra kalıcı olarak kaydedilmiş dosya boyutları (yol -> bayt ya da None)."""
+        if self.shared: return {path: info['size'] for path, info in self.files.items()}
+        return self.qm.journaled_files
+
+    def _scan_home(self, user_id, cached, clean, known=None):
+        """Tek bir ev dizinini okur: (dosya_adı -> {size, mtime}, tarandı_mı) döndürür."""
+        physical_dir_path = self._get_physical_dir_path(user_id)
+        try:
+            dir_mtime = os.stat(physical_dir_path).st_mtime_ns
+        except OSError:
+            return {}, False
+        cached_files = (cached or {}).get('files', {})
+        if clean and cached and cached.get('mtime') == dir_mtime:
+            return cached_files, False
+
+        entries = {}
+        known = known or {}
+        home_path_logical = f"/home/{user_id}/"
+        with os.scandir(physical_dir_path) as it:
+            for entry in it:
+                if entry.name.startswith('.') or not entry.is_file(): continue
+                st = entry.stat()
+                old = cached_files.get(entry.name)
+                # Kalıcı kayıttaki boyut en günceli; dosya değişmediyse boyut manifestten alınır.
+                if known.get(home_path_logical + entry.name) is not None: size = known[home_path_logical + entry.name]
+                elif old and old.get('mtime') == st.st_mtime_ns: size = old['size']
+                else: size = self._charged(*self.storage.sizes(entry.path, st))
+                entries[entry.name] = {'size': size, 'mtime': st.st_mtime_ns}
+        return entries, True
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path): return {}, False
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[UYARI] Manifest okunamadı, tam tarama yapılacak: {e}")
+            return {}, False
+        # Boyutlar başka bir ücretlendirme modunda kaydedildiyse önbellek kullanılamaz.
+        if data.get('charge', 'logical') != self.qm.settings.get('charge'): return {}, False
+        homes = data.get('homes', {})
+        return homes, not os.path.exists(self.manifest_path + ".dirty")
+
+    def save_manifest(self, clean=True):
+        """Dosya metadata önbelleğini (sahip, ücretlendirilen boyut, mtime) diske yazar.
+
+        clean=False: çalışırken yazılır; manifest temiz kapanış sayılmaz. Yazıldıysa True döner.
+        """
+        with self._manifest_lock:
+            return self._save_manifest(clean)
+
+    def _save_manifest(self, clean):
+        homes = {}
+        for user_id in self._user_ids():
             physical_dir_path = self._get_physical_dir_path(user_id)
-            if os.path.isdir(physical_dir_path):
-                for file_name in os.listdir(physical_dir_path):
-                    if file_name.startswith('.'): continue
-                    logical_path = os.path.join(home_path_logical, file_name).replace('\\', '/')
-                    self.files[logical_path] = {'owner': user_id, 'size': 0}
-        print("[Sistem] Dosya sistemi senkronizasyonu tamamlandı.")
+            try:
+                dir_mtime = os.stat(physical_dir_path).st_mtime_ns
+            except OSError:
+                continue
+            files = {}
+            for path, info in list(self.files.files_of(user_id).items()):
+                file_name = os.path.basename(path)
+                try: file_mtime = os.stat(os.path.join(physical_dir_path, file_name)).st_mtime_ns
+                except OSError: continue
+                files[file_name] = {'size': info['size'], 'mtime': file_mtime}
+            homes[user_id] = {'mtime': dir_mtime, 'files': files}
+        try:
+            with metrics.timer('kota_persist_duration_seconds', (('op', 'manifest'),)):
+                atomic_write_json(self.manifest_path, {'homes': homes, 'charge': self.qm.settings.get('charge')},
+                                  separators=(',', ':'))
+            if clean and os.path.exists(self.manifest_path + ".dirty"):
+                os.remove(self.manifest_path + ".dirty")
+        except Exception as e:
+            print(f"[UYARI] Manifest yazılamadı: {e}")
+            return False
+        return True
+
+    def _persist_manifest(self, discard=False):
+        """Çalışırken manifest yazar; o ana kadar günlüğe yazılan dosya boyutları artık manifestte kalıcıdır.
+
+        discard=True: kapsanan boyutlar manifest yazılamasa da düşülür (ör. ücretlendirme modu değişti).
+        """
+        with self._manifest_lock:
+            self.qm.begin_manifest()
+            self.storage.flush()  # Manifestteki mtime'lar tamponlar yazıldıktan sonraki hali yansıtsın
+            self.qm.end_manifest(self.save_manifest(clean=False) or discard)
+
+    def _manifest_loop(self):
+        while True:
+            self._manifest_wanted.wait()
+            if self._closed: return
+            self._manifest_wanted.clear()
+            self._persist_manifest()
+
+    def _reserve_quota(self, user_id, delta_bytes, details):
+        """Yazma işlemi için kota ayırır; aşımda QUOTA_EXCEEDED loglar. Dönüş: (rezervasyon, hata_mesajı)."""
+        success, message, reservation = self.qm.reserve(user_id, delta_bytes)
+        if not success:
+            metrics.inc('kota_quota_rejections_total')
+            self.log_action(user_id, "QUOTA_EXCEEDED", details)
+            return None, message
+        return reservation, None
 
     # --- KULLANICI YÖNETİMİ ---
-    def register_user(self, user_id, password, quota_mb=None):
+    def register_user(self, caller, user_id, password, quota_mb=None):
         # 1. Admin Kontrolü
-        if self.current_user != 'admin':
+        if caller != 'admin':
             return "HATA: Yeni kullanıcı oluşturma yetkisi sadece 'admin' hesabına aittir."
-            
+        with self._user_lock(user_id):
+            return self._register_user_locked(user_id, password, quota_mb)
+
+    def _register_user_locked(self, user_id, password, quota_mb):
         if user_id in self.qm.user_quotas: return f"HATA: Kullanıcı {user_id} zaten kayıtlı."
         if user_id == "admin": return "HATA: 'admin' ismi kullanılamaz."
 
@@ -75,7 +367,8 @@ class FileSystem:
             assigned_quota = self.qm.add_user(user_id, password, quota_mb)
         except Exception as e: return f"HATA: Kullanıcı eklenemedi: {e}"
         
-        self.home_dirs[user_id] = f"/home/{user_id}/"
+        with self._locks_guard:
+            self.home_dirs[user_id] = f"/home/{user_id}/"
         physical_dir_path = self._get_physical_dir_path(user_id)
         try:
             os.makedirs(physical_dir_path, exist_ok=True)
@@ -89,8 +382,6 @@ class FileSystem:
     def login(self, user_id, password):
         if user_id not in self.qm.user_quotas: return "HATA: Geçersiz kullanıcı ID."
         if self.qm.check_password(user_id, password):
-            self.current_user = user_id
-            
             # LOG EKLEME
             self.log_action(user_id, "LOGIN", "Successful login")
             
@@ -100,44 +391,55 @@ class FileSystem:
             self.log_action(user_id, "LOGIN_FAILED", "Wrong password attempt")
             return "HATA: Şifre yanlış."
 
-    def logout(self):
-        logged_out_user = self.current_user
+    def logout(self, caller):
+        logged_out_user = caller
         if logged_out_user:
             # LOG EKLEME
             self.log_action(logged_out_user, "LOGOUT", "Session ended")
             
-        self.current_user = None
         return f"[{logged_out_user}] Oturum kapatıldı."
         
-    def delete_user(self, user_id):
-        if self.current_user != 'admin':
+    def delete_user(self, caller, user_id):
+        if caller != 'admin':
             return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
         if user_id == 'admin': return "HATA: Yönetici hesabı silinemez."
+        with self._user_lock(user_id):
+            return self._delete_user_locked(user_id)
+
+    def _delete_user_locked(self, user_id):
         if user_id not in self.qm.user_quotas: return f"HATA: Kullanıcı '{user_id}' kayıtlı değil."
             
+        # Dizin çöp kutusuna taşınır; dosyalar arka planda silinir, kota ve indeks hemen güncellenir.
         physical_dir_path = self._get_physical_dir_path(user_id)
+        files = self.files.files_of(user_id)
+        deferred = False
         try:
             if os.path.isdir(physical_dir_path):
-                shutil.rmtree(physical_dir_path)
-                print(f"[Sistem] Fiziksel dizin '{os.path.basename(physical_dir_path)}' silindi.")
+                deferred = self._discard(physical_dir_path, 'user', user_id, len(files),
+                                         sum(info['size'] for info in files.values()))
+                print(f"[Sistem] Fiziksel dizin '{os.path.basename(physical_dir_path)}' "
+                      f"{'silinmek üzere çöp kutusuna taşındı' if deferred else 'silindi'}.")
         except Exception as e:
             print(f"[UYARI] Fiziksel silme hatası: {e}. Mantıksal silmeye devam ediliyor.")
         
         self.qm.delete_user_data(user_id) 
-        if user_id in self.home_dirs: del self.home_dirs[user_id]
-        self.files = {path: info for path, info in self.files.items() if info['owner'] != user_id}
+        with self._locks_guard:
+            self.home_dirs.pop(user_id, None)
+        self.files.drop_owner(user_id)
 
         # LOG EKLEME
         self.log_action("admin", "DELETE_USER", f"Deleted User: {user_id}")
 
+        if deferred: return f"BAŞARILI: Kullanıcı '{user_id}' silindi. Disk alanı arka planda geri kazanılıyor (reclaim)."
         return f"BAŞARILI: Kullanıcı '{user_id}' silindi."
 
-    def set_user_quota(self, target_user_id, new_quota_mb): 
-        if self.current_user != 'admin':
+    def set_user_quota(self, caller, target_user_id, new_quota_mb): 
+        if caller != 'admin':
             return f"HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
         if target_user_id == 'admin': return "HATA: Admin kotası güncellenemez."
         
-        success, message = self.qm.set_quota(target_user_id, new_quota_mb)
+        with self._user_lock(target_user_id):
+            success, message = self.qm.set_quota(target_user_id, new_quota_mb)
         
         if success:
             # LOG EKLEME
@@ -145,78 +447,558 @@ class FileSystem:
             
         return message
 
-    def list_users(self):
-        if self.current_user != 'admin':
+    def list_users(self, caller, sort='name', order=None, limit=None, cursor=None, prefix=None, min_percent=None):
+        """Kullanıcıları kota durumlarıyla sayfa sayfa listeler (sadece admin).
+
+        sort: 'name' | 'usage' | 'limit' | 'percent'; order: 'asc' | 'desc' (ad için artan,
+        diğerleri için azalan varsayılır). prefix kullanıcı adı önekine, min_percent kota
+        doluluk yüzdesine göre süzer. Dönüş: {'users', 'next_cursor', 'total_users'} ya da hata mesajı.
+        """
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        sort = sort or 'name'
+        if sort not in ORDERS: return f"HATA: Geçersiz sıralama: {sort} ({', '.join(ORDERS)})."
+        order = order or ('asc' if sort == 'name' else 'desc')
+        if order not in ('asc', 'desc'): return "HATA: Sıralama yönü 'asc' ya da 'desc' olmalıdır."
+        try:
+            limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+            min_percent = None if min_percent in (None, '') else float(min_percent)
+        except ValueError:
+            return "HATA: limit ve min_percent sayı olmalıdır."
+        try:
+            rows, next_cursor = self.qm.usage_page(sort, order == 'desc', limit, cursor, prefix or None, min_percent)
+        except (ValueError, TypeError):
+            return "HATA: Geçersiz imleç."
+        users = []
+        for user_id, usage, quota in rows:
+            limited = quota != float('inf')  # admin limitsizdir
+            users.append({'user_id': user_id, 'usage_mb': round(usage / self.qm.MB, 2),
+                          'limit_mb': round(quota / self.qm.MB, 2) if limited else None,
+                          'percent': round(usage / quota * 100, 1) if limited and quota > 0 else None})
+        return {'users': users, 'next_cursor': next_cursor, 'total_users': len(self.qm.user_quotas)}
+
+    def disk_usage_report(self, caller, target_user_id=None):
+        """du benzeri uzlaştırma: ücretlendirilen kota, mantıksal boyut ve ayrılmış bloklar (st_blocks)."""
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        if target_user_id and target_user_id not in self.home_dirs:
+            return f"HATA: Kullanıcı '{target_user_id}' kayıtlı değil."
+        user_ids = [target_user_id] if target_user_id else self._user_ids()
+        MB = self.qm.MB
+        lines = []
+        for user_id in user_ids:
+            logical = apparent = allocated = 0
+            missing = 0
+            physical_dir_path = self._get_physical_dir_path(user_id)
+            self.storage.flush(physical_dir_path)
+            for path, info in list(self.files.files_of(user_id).items()):
+                logical += info['size']
+                try: st = os.stat(os.path.join(physical_dir_path, os.path.basename(path)))
+                except OSError:
+                    missing += 1
+                    continue
+                apparent += st.st_size
+                allocated += getattr(st, 'st_blocks', 0) * 512
+            charged, _ = self.qm.get_status(user_id)
+            flag = "" if abs(charged * MB - logical) < 1 else " [UYUMSUZ: kota != mantıksal]"
+            if missing: flag += f" [{missing} fiziksel dosya yok]"
+            lines.append(f"-> {user_id}: Ücretlendirilen: {charged:.2f} MB, Mantıksal: {logical / MB:.2f} MB, "
+                         f"Görünen: {apparent / MB:.2f} MB, Ayrılmış (blok): {allocated / MB:.2f} MB{flag}")
+        if not lines: return "Sistemde kayıtlı kullanıcı bulunmamaktadır."
+        return f"--- Disk Kullanım Uzlaştırması (ön ayırma: {PREALLOC_MODE}) ---\n" + "\n".join(lines)
+
+    def storage_report(self, caller, run_gc=False):
+        """Tekilleştirme tasarrufu: kullanıcılara ücretlendirilen mantıksal boyut vs depodaki fiziksel boyut."""
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        if self.storage.report() is None:
+            return f"HATA: Depolama motoru '{self.storage.name}': tekilleştirme etkin değil (KOTA_STORAGE=dedup)."
+        MB = self.qm.MB
+        lines = []
+        if run_gc:
+            # Tam çöp toplama sırasında hiçbir kullanıcı dosya değiştiremez.
+            with ExitStack() as stack:
+                self._lock_all_users(stack)
+                paths = [self._get_physical_path(info['owner'], path) for path, info in self.files.items()]
+                removed = self.storage.gc(p for p in paths if os.path.exists(p))
+            lines.append(f"Çöp toplama: {removed} sahipsiz parça silindi.")
+            self.log_action("admin", "STORAGE_GC", f"Removed chunks: {removed}")
+
+        stats = self.storage.report()
+        logical = sum(info['size'] for _, info in self.files.items())
+        physical = stats['physical_bytes']
+        ratio = logical / physical if physical else 0.0
+        lines.append(f"Dosyalar (mantıksal, ücretlendirilen): {logical / MB:.2f} MB")
+        lines.append(f"Parça içeriği (tekilleştirme öncesi): {stats['referenced_bytes'] / MB:.2f} MB")
+        lines.append(f"Depo (fiziksel): {physical / MB:.2f} MB, {stats['chunks']} parça, "
+                     f"{stats['pending_gc']} parça silinmeyi bekliyor")
+        lines.append(f"Tasarruf: {(logical - physical) / MB:.2f} MB (oran {ratio:.2f}x)")
+        return "--- Depolama Tasarruf Raporu (dedup) ---\n" + "\n".join(lines)
+
+    def reclaim_report(self, caller):
+        """Silinmeyi bekleyen (çöp kutusundaki) kullanıcı dizinleri ve dosyalar: ilerleme ve bekleyen bayt."""
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        entries = self.reclaimer.entries()
+        if not entries: return "Silinmeyi bekleyen veri yok."
+        MB = self.qm.MB
+        lines = []
+        pending_files = pending_bytes = 0
+        for entry in entries:
+            files_left = max(0, entry['files'] - entry['freed_files'])
+            bytes_left = max(0, entry['bytes'] - entry['freed_bytes'])
+            pending_files += files_left
+            pending_bytes += bytes_left
+            target = f"kullanıcı {entry['owner']}" if entry['kind'] == 'user' else f"dosya {entry['path']}"
+            flag = f" [HATA: {entry['error']}]" if 'error' in entry else ""
+            lines.append(f"-> {target} [{entry['created']}]: {entry['freed_files']}/{entry['files']} dosya, "
+                         f"{entry['freed_bytes'] / MB:.2f}/{entry['bytes'] / MB:.2f} MB silindi{flag}")
+        rate = self.reclaimer
+        limits = (f"{rate.files_per_sec:.0f} dosya/sn" if rate.files_per_sec > 0 else "sınırsız dosya/sn",
+                  f"{rate.bytes_per_sec / MB:.0f} MB/sn" if rate.bytes_per_sec > 0 else "sınırsız MB/sn")
+        return (f"--- Arka Plan Geri Kazanımı ({len(entries)} girdi, hız sınırı: {limits[0]}, {limits[1]}) ---\n"
+                + "\n".join(lines)
+                + f"\nBekleyen: {pending_files} dosya, {pending_bytes / MB:.2f} MB")
+
+    def set_charge_mode(self, caller, mode):
+        """Kotanın mantıksal ('logical') ya da diskte saklanan ('stored') bayt üzerinden alınmasını seçer.
+
+        Mod değişince tüm dosyaların ücretlendirilen boyutu yeniden hesaplanır ve
+        kullanımlar tek seferde uzlaştırılır; bu sırada hiçbir kullanıcı dosya değiştiremez.
+        """
+        if caller != 'admin':
             return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
-        user_list = []
-        if not self.qm.user_quotas: return "Sistemde kayıtlı kullanıcı bulunmamaktadır."
-        for user_id in self.qm.user_quotas:
-            usage_mb, limit_mb = self.qm.get_status(user_id)
-            user_list.append(f"-> Kullanıcı ID: {user_id}, Kota: {limit_mb:.2f} MB, Kullanım: {usage_mb:.2f} MB")
-        header = "--- Kayıtlı Kullanıcılar ve Kota Durumları ---\n"
-        return header + "\n".join(user_list)
+        if mode not in CHARGE_MODES:
+            return f"HATA: Geçersiz mod '{mode}'. Seçenekler: {', '.join(CHARGE_MODES)}."
+        if self.qm.settings.get('charge') == mode:
+            return f"BAŞARILI: Kota zaten '{mode}' moduna göre hesaplanıyor."
+        with ExitStack() as stack:
+            self._lock_all_users(stack)
+            self.qm.set_setting('charge', mode)
+            usages = {user_id: 0 for user_id in self._user_ids()}
+            for path, info in list(self.files.items()):
+                try: sizes = self.storage.sizes(self._get_physical_path(info['owner'], path))
+                except OSError: continue
+                size = self._charged(*sizes)
+                self.files.set_size(path, size)
+                usages[info['owner']] = usages.get(info['owner'], 0) + size
+            self.qm.reconcile_usage(usages)
+            if not self.shared:
+                # Günlükteki dosya boyutları eski moda göre: yeni boyutlar manifestle kalıcı olur, günlük katlanır.
+                self._persist_manifest(discard=True)
+                self.qm.save_data()
+        self.log_action("admin", "SET_CHARGE_MODE", f"Mode: {mode}")
+        return f"BAŞARILI: Kota artık '{mode}' moduna göre hesaplanıyor ({len(usages)} kullanıcı uzlaştırıldı)."
+
+    def compact_files(self, caller, target_user_id=None):
+        """Eklemelerle biriken küçük sıkıştırma çerçevelerini birleştirir (sadece admin)."""
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        if target_user_id and target_user_id not in self.home_dirs:
+            return f"HATA: Kullanıcı '{target_user_id}' kayıtlı değil."
+        user_ids = [target_user_id] if target_user_id else self._user_ids()
+        compacted, saved = self._compact_users(user_ids)
+        self.log_action("admin", "COMPACT", f"Users: {len(user_ids)}, Files: {compacted}, Saved: {saved} bytes")
+        return f"BAŞARILI: {compacted} dosya birleştirildi, {saved / self.qm.MB:.2f} MB disk alanı kazanıldı."
+
+    def _compact_users(self, user_ids):
+        """Kullanıcı kilidi dosya başına alınır; uzun süren birleştirme diğer kullanıcıları bekletmez."""
+        compacted = saved = 0
+        for user_id in user_ids:
+            for path in list(self.files.files_of(user_id)):
+                with self._user_lock(user_id):
+                    info = self.files.get(path)
+                    if info is None or info['owner'] != user_id: continue
+                    physical_path = self._get_physical_path(user_id, path)
+                    try:
+                        before = os.path.getsize(physical_path)
+                        stored = self.storage.compact(physical_path)
+                    except OSError:
+                        continue
+                    if stored is None: continue
+                    compacted += 1
+                    saved += before - stored
+                    if self.qm.settings.get('charge') == 'stored':
+                        _, _, reservation = self.qm.reserve(user_id, 0)
+                        self.files.set_size(path, stored)
+                        self.qm.commit(reservation, stored - info['size'], (path, stored))
+        return compacted, saved
+
+    def _compact_loop(self):
+        """KOTA_COMPACT_INTERVAL saniyede bir tüm kullanıcıların dosyalarını birleştirir."""
+        while not self._compactor_stop.wait(COMPACT_INTERVAL):
+            try:
+                compacted, saved = self._compact_users(self._user_ids())
+                if compacted:
+                    self.log_action("admin", "COMPACT", f"Background, Files: {compacted}, Saved: {saved} bytes")
+            except Exception as e:
+                print(f"[UYARI] Arka plan birleştirme başarısız: {e}")
+
+    # --- ANLIK GÖRÜNTÜLER (SNAPSHOT) ---
+    def create_snapshot(self, caller, target_user_id=None):
+        """Ev dizininin ve kota durumunun anlık görüntüsünü alır (kullanıcı verilmezse herkes için).
+
+        Kullanıcı kilidi görüntü süresince tutulur; dosyalar ve kaydedilen kota aynı ana aittir.
+        Dosyalar sabit bağlantıyla paylaşıldığı için süre dosya sayısıyla, kopyalanan veri
+        yalnızca değişen dosyalarla (ve yalnızca bağlantı kurulamıyorsa) ölçeklenir.
+        """
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        if self.storage.name == "dedup":
+            return "HATA: Anlık görüntüler KOTA_STORAGE=dedup ile desteklenmez."
+        if target_user_id and target_user_id not in self.home_dirs:
+            return f"HATA: Kullanıcı '{target_user_id}' kayıtlı değil."
+        user_ids = [target_user_id] if target_user_id else self._user_ids()
+        lines, files, changed, changed_bytes = [], 0, 0, 0
+        for user_id in user_ids:
+            with self._user_lock(user_id):
+                if user_id not in self.qm.user_quotas: continue
+                sizes = {os.path.basename(path): info['size'] for path, info in self.files.files_of(user_id).items()}
+                meta = {'charge': self.qm.settings.get('charge'), 'storage': self.storage.name}
+                try:
+                    # Tamponlar yazılıp açık tanıtıcılar kapatılır: görüntü güncel içeriği alır,
+                    # sonraki eklemeler bağlantıyı koparıp yeni dosyaya yazar.
+                    self.storage.flush(self._get_physical_dir_path(user_id))
+                    manifest = self.snapshots.create(user_id, self._get_physical_dir_path(user_id), sizes,
+                                                     dict(self.qm.user_quotas[user_id]), meta)
+                except OSError as e:
+                    return f"HATA: '{user_id}' için anlık görüntü alınamadı: {e}"
+            stats = manifest['stats']
+            files += len(manifest['files'])
+            changed += stats['changed']
+            changed_bytes += stats['changed_bytes']
+            lines.append(f"-> {user_id}: {manifest['id']} ({len(manifest['files'])} dosya, {stats['changed']} değişen, "
+                         f"{stats['unchanged']} önceki görüntüyle paylaşılan, kopyalanan {stats['copied_bytes'] / self.qm.MB:.2f} MB)")
+        self.log_action("admin", "SNAPSHOT", f"Users: {len(user_ids)}, Files: {files}, Changed: {changed} ({changed_bytes} bytes)")
+        if len(lines) > 1:
+            lines = [f"{len(lines)} kullanıcı, {files} dosya, {changed} değişen dosya ({changed_bytes / self.qm.MB:.2f} MB)"]
+        return "BAŞARILI: Anlık görüntü alındı.\n" + "\n".join(lines)
+
+    def list_snapshots(self, caller, target_user_id):
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        lines = []
+        for snapshot_id in self.snapshots.ids(target_user_id):
+            manifest = self.snapshots.load(target_user_id, snapshot_id)
+            if manifest is None: continue
+            quota = manifest['quota']
+            limit = "Sınırsız" if quota['limit'] == float('inf') else f"{quota['limit'] / self.qm.MB:.2f} MB"
+            unique = self.snapshots.unique_bytes(target_user_id, snapshot_id, manifest)
+            lines.append(f"-> {snapshot_id} [{manifest['created']}] {len(manifest['files'])} dosya, "
+                         f"Kullanım: {quota['usage'] / self.qm.MB:.2f} MB / {limit}, "
+                         f"yalnızca bu görüntüde: {unique / self.qm.MB:.2f} MB")
+        if not lines: return f"'{target_user_id}' için anlık görüntü bulunmamaktadır."
+        return f"--- {target_user_id} Anlık Görüntüleri ---\n" + "\n".join(lines)
+
+    def restore_snapshot(self, caller, target_user_id, snapshot_id):
+        """Ev dizinini, dosya indeksini ve kotayı görüntüdeki haline döndürür (sonradan eklenen dosyalar silinir)."""
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        if target_user_id not in self.home_dirs:
+            return f"HATA: Kullanıcı '{target_user_id}' kayıtlı değil."
+        with self._user_lock(target_user_id):
+            manifest = self.snapshots.load(target_user_id, snapshot_id)
+            if manifest is None: return f"HATA: Anlık görüntü '{snapshot_id}' bulunamadı."
+            if manifest.get('storage') != self.storage.name:
+                return f"HATA: Görüntü '{manifest.get('storage')}' depolama motoruyla alınmış; şu an '{self.storage.name}' kullanılıyor."
+            home_dir = self._get_physical_dir_path(target_user_id)
+            error = None
+            try:
+                self.storage.flush(home_dir)  # Açık tanıtıcılar yerine konacak eski dosyalara yazmasın
+                self.snapshots.restore_files(target_user_id, snapshot_id, home_dir, manifest['files'])
+                for path in list(self.files.files_of(target_user_id)):
+                    if os.path.basename(path) in manifest['files']: continue
+                    try: self.storage.remove(self._get_physical_path(target_user_id, path))
+                    except FileNotFoundError: pass
+            except OSError as e:
+                error = e
+            if error is None and manifest.get('charge') == self.qm.settings.get('charge'):
+                sizes = {name: meta['size'] for name, meta in manifest['files'].items()}
+            else:
+                # Yarıda kaldıysa ya da ücretlendirme modu değiştiyse indeks diskten kurulur.
+                sizes = {name: meta['size'] for name, meta in self._scan_home(target_user_id, None, False)[0].items()}
+            removed = list(self.files.files_of(target_user_id))
+            self.files.drop_owner(target_user_id)
+            home_path_logical = self.home_dirs[target_user_id]
+            for name, size in sizes.items():
+                self.files[home_path_logical + name] = {'owner': target_user_id, 'size': size}
+            self.qm.reconcile_usage({target_user_id: sum(sizes.values())})
+            if not self.shared:
+                # Geri yüklenen boyutlar kalıcı kayda eklenir (silinen dosyalar None); günlük katlanır.
+                self.qm.record_files({**{path: None for path in removed},
+                                      **{home_path_logical + name: size for name, size in sizes.items()}})
+                self.qm.save_data()
+            limit = manifest['quota']['limit']
+            if error is None and limit != self.qm.user_quotas[target_user_id]['limit']:
+                self.qm.set_quota(target_user_id, limit / self.qm.MB)
+        if error is not None:
+            return f"HATA: Geri yükleme yarıda kaldı: {error}. Dizin ve kota diskteki duruma göre uzlaştırıldı."
+        self.log_action("admin", "RESTORE_SNAPSHOT", f"User: {target_user_id}, Snapshot: {snapshot_id}, Files: {len(sizes)}")
+        return (f"BAŞARILI: '{target_user_id}' kullanıcısı '{snapshot_id}' görüntüsüne döndürüldü "
+                f"({len(sizes)} dosya, Kullanım: {sum(sizes.values()) / self.qm.MB:.2f} MB).")
+
+    def delete_snapshot(self, caller, target_user_id, snapshot_id):
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        try:
+            if not self.snapshots.delete(target_user_id, snapshot_id):
+                return f"HATA: Anlık görüntü '{snapshot_id}' bulunamadı."
+        except OSError as e:
+            return f"HATA: Anlık görüntü silinemedi: {e}"
+        self.log_action("admin", "DELETE_SNAPSHOT", f"User: {target_user_id}, Snapshot: {snapshot_id}")
+        return f"BAŞARILI: '{target_user_id}' kullanıcısının '{snapshot_id}' görüntüsü silindi."
+
+    def query_audit(self, caller, user_id=None, action=None, since=None, until=None, limit=None, cursor=None):
+        """Denetim geçmişini indeks üzerinden sorgular (sadece admin)."""
+        if caller != 'admin':
+            return "HATA: Bu işlem sadece yönetici (admin) tarafından gerçekleştirilebilir."
+        try:
+            return self.audit_index.query(user_id or None, action or None, since, until, limit, cursor)
+        except ValueError as e:
+            return f"HATA: {e}"
+
+    # --- TOPLU İŞLEMLER (BATCH) ---
+    def run_batch(self, caller, ops, atomic_quota=False):
+        """Sıralı işlem listesini tek kilit altında çalıştırır; günlük sonda tek seferde kalıcı olur.
+
+        ops: [{'op': 'create'|'write'|'overwrite'|'truncate'|'read'|'delete'|'execute'|'ls'|'status', ...}]
+        atomic_quota: True ise toplu işlemin kota ihtiyacı önceden hesaplanır; sığmıyorsa
+        hiçbir işlem yapılmaz. Bir işlem yarıda başarısız olursa öncekiler de geri alınır
+        (ya hep ya hiç).
+        Dönüş: [{'op', 'message', 'success'}, ...] ya da hata mesajı.
+        """
+        try: user_id = self._get_active_user(caller)
+        except PermissionError as e: return str(e)
+        if not isinstance(ops, list) or not ops: return "HATA: İşlem listesi boş."
+        if len(ops) > MAX_BATCH_OPS: return f"HATA: Tek seferde en fazla {MAX_BATCH_OPS} işlem gönderilebilir."
+
+        with self._user_lock(user_id), self.qm.deferred_commits():
+            if atomic_quota:
+                try: required = self._batch_peak_usage(user_id, ops)
+                except (TypeError, ValueError) as e: return f"HATA: Geçersiz işlem: {e}"
+                remaining = self.qm.remaining(user_id)
+                if user_id != "admin" and required > remaining:
+                    metrics.inc('kota_quota_rejections_total')
+                    self.log_action(user_id, "QUOTA_EXCEEDED", f"Batch: {len(ops)} ops, Required: {required} bytes")
+                    return (f"HATA: Kota aşıldı! Toplu işlem uygulanmadı. Kalan: {remaining / self.qm.MB:.2f} MB. "
+                            f"(Gerekli: {required / self.qm.MB:.2f} MB)")
+                return self._run_atomic_batch(user_id, ops)
+            return [self._run_batch_op(user_id, op) for op in ops]
+
+    def _run_atomic_batch(self, user_id, ops):
+        """İşlemleri sırayla uygular; biri başarısız olursa değiştirilen dosyalar, indeks ve kota geri alınır.
+
+        Değiştirilecek her dosya ilk dokunuştan önce sabit bağlantıyla yedeklenir (Storage.backup);
+        geri almanın günlük kayıtları da deferred_commits çıkışında işlemlerinkiyle birlikte yazılır.
+        """
+        usage_before = self.qm.user_quotas[user_id]['usage']
+        undo = {}  # mantıksal yol -> (önceki indeks kaydı ya da None, yedek fiziksel yol ya da None)
+        results = []
+        try:
+            for n, op in enumerate(ops, 1):
+                try:
+                    if isinstance(op, dict) and op.get('op') in BATCH_WRITE_OPS:
+                        self._batch_backup(user_id, op.get('file_path'), undo)
+                    result = self._run_batch_op(user_id, op)
+                except Exception as e:
+                    result = {'op': op.get('op') if isinstance(op, dict) else None, 'message': f"HATA: {e}", 'success': False}
+                if not result['success']:
+                    self._batch_rollback(user_id, undo, usage_before)
+                    self.log_action(user_id, "BATCH_ROLLBACK", f"Failed: {n}/{len(ops)} ({result['op']}), Files: {len(undo)}")
+                    return f"HATA: {n}. işlem ({result['op']}) başarısız oldu, toplu işlem geri alındı: {result['message']}"
+                results.append(result)
+        finally:
+            for _, backup_path in undo.values():
+                if backup_path is None: continue
+                try: self.storage.remove(backup_path)
+                except FileNotFoundError: pass  # Geri alma yedeği yerine koydu
+                except OSError as e: print(f"[UYARI] Geri alma yedeği silinemedi: {e}")
+        return results
+
+    def _batch_backup(self, user_id, file_path, undo):
+        """Toplu işlemde dosyaya ilk kez dokunulmadan önce önceki halini kaydeder."""
+        if not isinstance(file_path, str) or file_path in undo: return
+        if not self.is_in_user_directory(user_id, file_path): return  # İşlem zaten reddedilecek
+        info = self.files.get(file_path)
+        if info is None:
+            undo[file_path] = (None, None)
+            return
+        if info['owner'] != user_id: return
+        physical_path = self._get_physical_path(user_id, file_path)
+        backup_path = os.path.join(os.path.dirname(physical_path), f".{os.path.basename(physical_path)}.undo{len(undo)}")
+        try:
+            self.storage.backup(physical_path, backup_path)
+        except FileNotFoundError:
+            backup_path = None  # Fiziksel dosya zaten yok: yalnızca indeks kaydı geri konur
+        undo[file_path] = (dict(info), backup_path)
+
+    def _batch_rollback(self, user_id, undo, usage_before):
+        """Yedekleri yerine koyar, indeksi ve kullanımı toplu işlem öncesine döndürür."""
+        restored, drift = {}, 0
+        for file_path, (info, backup_path) in reversed(list(undo.items())):
+            physical_path = self._get_physical_path(user_id, file_path)
+            current = self.files.get(file_path)
+            try:
+                if backup_path is not None:
+                    self.storage.restore_backup(backup_path, physical_path)
+                else:
+                    try: self.storage.remove(physical_path)
+                    except FileNotFoundError: pass
+            except OSError as e:
+                # Geri konamayan dosya şu anki haliyle kalır; kullanım da ona göre uzlaştırılır.
+                print(f"[UYARI] '{file_path}' geri alınamadı: {e}")
+                drift += (current['size'] if current else 0) - (info['size'] if info else 0)
+                continue
+            if info is not None:
+                self.files[file_path] = info
+            elif current is not None:
+                del self.files[file_path]
+            restored[file_path] = info['size'] if info else None
+        self.qm.reconcile_usage({user_id: usage_before + drift})
+        if not self.shared:
+            # Geri alınan boyutlar kalıcı kayda eklenir (işlemlerin günlük kayıtlarını geçersiz kılar).
+            self.qm.record_files(restored)
+            self.qm.save_data()
+
+    def _run_batch_op(self, user_id, op):
+        if not isinstance(op, dict): return {'op': None, 'message': "HATA: Geçersiz işlem.", 'success': False}
+        name, path = op.get('op'), op.get('file_path')
+        try:
+            if name == 'create': message = self.create_file(user_id, path, parse_size_mb(op.get('size_mb')))
+            elif name == 'write': message = self.write_to_file(user_id, path, op.get('content', ''), bool(op.get('durable')))
+            elif name == 'overwrite': message = self.overwrite_file(user_id, path, op.get('content', ''))
+            elif name == 'truncate': message = self.truncate_file(user_id, path)
+            elif name == 'delete': message = self.delete_file(user_id, path)
+            elif name == 'execute': message = self.execute_file(user_id, path)
+            elif name == 'read':
+                message = self.read_file(user_id, path)
+                return {'op': name, 'message': message,
+                        'success': not (message.startswith("HATA") or message.startswith("Erişim"))}
+            elif name == 'ls': return {'op': name, 'message': self.list_files(user_id), 'success': True}
+            elif name == 'status': return {'op': name, 'message': self.get_user_status(user_id), 'success': True}
+            else: return {'op': name, 'message': f"HATA: Bilinmeyen işlem: {name}", 'success': False}
+        except (TypeError, ValueError) as e:
+            return {'op': name, 'message': f"HATA: Geçersiz argüman: {e}", 'success': False}
+        return {'op': name, 'message': message, 'success': 'BAŞARILI' in message}
+
+    def _batch_peak_usage(self, user_id, ops):
+        """İşlemler sırayla uygulanırsa kullanımın ulaşacağı en yüksek artışı (bayt) hesaplar."""
+        sizes = {}
+        def size_of(path):
+            if path not in sizes:
+                info = self.files.get(path)
+                sizes[path] = info['size'] if info and info['owner'] == user_id else None
+            return sizes[path]
+
+        usage = peak = 0
+        for op in ops:
+            if not isinstance(op, dict): continue
+            name, path = op.get('op'), op.get('file_path')
+            current = size_of(path)
+            if name == 'create':
+                new_size = parse_size_mb(op.get('size_mb')) * self.qm.MB
+                usage += new_size - (current or 0)
+                sizes[path] = new_size
+            elif current is None:
+                continue  # Dosya yok: işlem başarısız olacak, kotaya etkisi yok
+            elif name == 'write':
+                added = len(f"\n{op.get('content', '')}".encode('utf-8'))
+                usage += added
+                sizes[path] = current + added
+            elif name == 'overwrite':
+                new_size = len(str(op.get('content', '')).encode('utf-8'))
+                usage += new_size - current
+                sizes[path] = new_size
+            elif name == 'truncate':
+                usage -= current
+                sizes[path] = 0
+            elif name == 'delete':
+                usage -= current
+                sizes[path] = None
+            peak = max(peak, usage)
+        return peak
 
     # --- DOSYA İŞLEMLERİ (RWX) ---
-    def create_file(self, file_path, size_mb):
-        try: user_id = self._get_active_user()
+    @_locked_by_caller
+    def create_file(self, caller, file_path, size_mb):
+        try: user_id = self._get_active_user(caller)
         except PermissionError as e: return str(e)
         if user_id == "admin": return "HATA: Admin hesabı dosya oluşturamaz." 
+        try: size_mb = parse_size_mb(size_mb)
+        except (TypeError, ValueError) as e: return f"HATA: {e}"
 
         size_bytes = size_mb * self.qm.MB 
         if not self.is_in_user_directory(user_id, file_path):
             return f"Erişim Reddedildi: Yalnızca kendi dizininde işlem yapabilirsin."
 
-        success, message = self.qm.check_and_update_usage(user_id, size_bytes)
-        if success:
-            physical_dir_path = self._get_physical_dir_path(user_id)
-            if not os.path.isdir(physical_dir_path):
-                 try: os.makedirs(physical_dir_path)
-                 except Exception as e:
-                    self.qm.decrease_usage(user_id, size_bytes)
-                    return f"HATA: Fiziksel dizin onarılamadı: {e}."
+        # Aynı yolda dosya varsa eski boyutu iade edilir; yalnızca fark ücretlendirilir.
+        old_size = self.files[file_path]['size'] if file_path in self.files else 0
+        reservation, message = self._reserve_quota(user_id, size_bytes - old_size, f"Attempted Size: {size_mb}MB")
+        if reservation is None: return message
 
-            physical_path = self._get_physical_path(user_id, file_path)
-            try:
-                # GÜNCELLEME: create işleminde utf-8 zorunlu
-                with open(physical_path, 'w', encoding='utf-8') as f:
-                    f.write(f"Bu dosya {size_mb} MB (simülasyon).")
-                self.files[file_path] = {'owner': user_id, 'size': size_bytes}
-                
-                # LOG EKLEME
-                self.log_action(user_id, "CREATE_FILE", f"Path: {file_path}, Size: {size_mb}MB")
-                
-                return f"BAŞARILI: '{file_path}' oluşturuldu. {message}"
-            except Exception as e:
-                self.qm.decrease_usage(user_id, size_bytes)
-                return f"HATA: Yazma sorunu: {e}."
-        else: 
-            # Kota aşımını da loglayabiliriz
-            self.log_action(user_id, "QUOTA_EXCEEDED", f"Attempted Size: {size_mb}MB")
-            return message
+        physical_dir_path = self._get_physical_dir_path(user_id)
+        if not os.path.isdir(physical_dir_path):
+             try: os.makedirs(physical_dir_path)
+             except Exception as e:
+                self.qm.release(reservation)
+                return f"HATA: Fiziksel dizin onarılamadı: {e}."
+
+        physical_path = self._get_physical_path(user_id, file_path)
+        try:
+            stored = self.storage.create(physical_path, size_mb, size_bytes)
+        except Exception as e:
+            self.qm.release(reservation)
+            return f"HATA: Yazma sorunu: {e}."
+        # Ayırma mantıksal boyut için yapıldı (üst sınır); saklanan boyut ücretlendiriliyorsa fark iade edilir.
+        charged = self._charged(size_bytes, stored)
+        # İndeks günlük kaydından önce güncellenir: günlük katlanırken yazılan manifest kaydı kapsar.
+        self.files[file_path] = {'owner': user_id, 'size': charged}
+        self.qm.commit(reservation, charged - old_size, (file_path, charged))
+        
+        # LOG EKLEME
+        self.log_action(user_id, "CREATE_FILE", f"Path: {file_path}, Size: {size_mb}MB")
+        
+        return f"BAŞARILI: '{file_path}' oluşturuldu."
 
-    def write_to_file(self, file_path, content):
-        """Dosyaya metin yazar (Append)."""
-        try: user_id = self._get_active_user()
+    @_locked_by_caller
+    def write_to_file(self, caller, file_path, content, durable=False):
+        """Dosyaya metin yazar (Append).
+
+        Düz motorda ekleme tamponlanabilir; okuma ve diğer değişiklikler tamponu önce
+        yazdığı için tutarlı görünür. durable=True ise dönmeden önce diske yazılır (fsync).
+        """
+        try: user_id = self._get_active_user(caller)
         except PermissionError as e: return str(e)
         if user_id == "admin": return "HATA: Admin hesabı dosya içeriği değiştiremez."
         if file_path not in self.files: return "HATA: Yazılacak dosya bulunamadı."
         if self.files[file_path]['owner'] != user_id: return "Erişim Reddedildi."
 
+        # Bayt farkı içerikten hesaplanır; dosya yeniden okunmaz ya da stat edilmez.
+        data = f"\n{content}".encode('utf-8')
+        reservation, message = self._reserve_quota(user_id, len(data), f"Path: {file_path}, Attempted Append: {len(data)} bytes")
+        if reservation is None: return message
+
         physical_path = self._get_physical_path(user_id, file_path)
         try:
-            # GÜNCELLEME: write işleminde utf-8 zorunlu
-            with open(physical_path, 'a', encoding='utf-8') as f:
-                f.write(f"\n{content}")
-            
-            # LOG EKLEME
-            self.log_action(user_id, "WRITE_FILE", f"Path: {file_path} (Append)")
-            
-            return f"BAŞARILI: '{file_path}' dosyasına metin eklendi."
-        except Exception as e: return f"HATA: {e}"
+            added = self.storage.append(physical_path, data, durable)
+        except Exception as e:
+            self.qm.release(reservation)
+            return f"HATA: {e}"
+        charged = self._charged(len(data), added)
+        new_size = self.files[file_path]['size'] + charged
+        self.files.set_size(file_path, new_size)
+        self.qm.commit(reservation, charged, (file_path, new_size))
+        metrics.inc('kota_bytes_written_total', len(data), (('op', 'write'),))
+        
+        # LOG EKLEME
+        self.log_action(user_id, "WRITE_FILE", f"Path: {file_path} (Append)")
+        
+        return f"BAŞARILI: '{file_path}' dosyasına metin eklendi."
 
-    def read_file(self, file_path):
+    @_locked_by_caller
+    def read_file(self, caller, file_path):
         """Dosyanın içeriğini okur (cat)."""
-        try: user_id = self._get_active_user()
+        try: user_id = self._get_active_user(caller)
         except PermissionError as e: return str(e)
         if user_id == "admin": return "HATA: Admin hesabı dosya içeriğini okuyamaz."
         if file_path not in self.files: return "HATA: Okunacak dosya bulunamadı."
@@ -227,8 +1009,9 @@ class FileSystem:
             if not os.path.exists(physical_path): return "HATA: Fiziksel dosya yok."
             
             # GÜNCELLEME: Okurken hata verirse (errors='replace') karakteri  ile değiştir, çökmesin.
-            with open(physical_path, 'r', encoding='utf-8', errors='replace') as f:
+            with io.TextIOWrapper(self.storage.open_binary(physical_path), encoding='utf-8', errors='replace') as f:
                 content = f.read()
+            metrics.inc('kota_bytes_read_total', self.files[file_path]['size'], (('op', 'read'),))
             
             # LOG EKLEME (Opsiyonel: Okuma işlemleri çok log yaratabilir ama denetim için iyidir)
             self.log_action(user_id, "READ_FILE", f"Path: {file_path}")
@@ -236,8 +1019,110 @@ class FileSystem:
             return content if content else "[Dosya Boş]"
         except Exception as e: return f"HATA: {e}"
 
-    def execute_file(self, file_path):
-        try: user_id = self._get_active_user()
+    @_locked_by_caller
+    def open_read_stream(self, caller, file_path, offset=0, length=None):
+        """Dosyanın bir aralığını belleğe almadan parça parça okuyan bir üreteç açar.
+
+        offset negatifse dosya sonundan sayılır (HTTP 'bytes=-N'); None ise aralık hiçbir
+        dosya için karşılanamaz (ör. 'bytes=-0', 'bytes=50-10').
+        Dönüş: (üreteç, başlangıç, bitiş, toplam_boyut) ya da hata mesajı. Aralık dosyanın
+        dışındaysa üreteç None'dır (HTTP 416 yanıtı toplam boyutu bildirir).
+        """
+        try: user_id = self._get_active_user(caller)
+        except PermissionError as e: return str(e)
+        if user_id == "admin": return "HATA: Admin hesabı dosya içeriğini okuyamaz."
+        if file_path not in self.files: return "HATA: Okunacak dosya bulunamadı."
+        if self.files[file_path]['owner'] != user_id: return "Erişim Reddedildi."
+
+        physical_path = self._get_physical_path(user_id, file_path)
+        try:
+            f = self.storage.open_binary(physical_path)
+            total = f.seek(0, os.SEEK_END)
+        except FileNotFoundError: return "HATA: Fiziksel dosya yok."
+        except Exception as e: return f"HATA: {e}"
+
+        if offset is not None and offset < 0: offset = max(0, total + offset)
+        if offset is None or offset > total or (offset == total and total > 0):
+            f.close()
+            return None, 0, 0, total
+        end = total if length is None else min(total, offset + max(0, length))
+
+        self.log_action(user_id, "READ_FILE", f"Path: {file_path}, Range: {offset}-{end}")
+        return self._iter_file(f, offset, end), offset, end, total
+
+    @staticmethod
+    def _iter_file(f, start, end):
+        try:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk: break
+                remaining -= len(chunk)
+                metrics.inc('kota_bytes_read_total', len(chunk), (('op', 'stream'),))
+                yield chunk
+        finally:
+            f.close()
+
+    @_locked_by_caller
+    def read_lines(self, caller, file_path, mode="head", count=DEFAULT_LINE_COUNT):
+        """Dosyanın ilk (head) ya da son (tail) N satırını, dosyanın tamamını okumadan döndürür."""
+        try: user_id = self._get_active_user(caller)
+        except PermissionError as e: return str(e)
+        if user_id == "admin": return "HATA: Admin hesabı dosya içeriğini okuyamaz."
+        if file_path not in self.files: return "HATA: Okunacak dosya bulunamadı."
+        if self.files[file_path]['owner'] != user_id: return "Erişim Reddedildi."
+        if mode not in ("head", "tail"): return "HATA: Geçersiz okuma kipi."
+        if count <= 0: return "HATA: Satır sayısı pozitif olmalı."
+
+        physical_path = self._get_physical_path(user_id, file_path)
+        try:
+            with self.storage.open_binary(physical_path) as f:
+                data = self._head_bytes(f, count) if mode == "head" else self._tail_bytes(f, count)
+        except FileNotFoundError: return "HATA: Fiziksel dosya yok."
+        except Exception as e: return f"HATA: {e}"
+
+        metrics.inc('kota_bytes_read_total', len(data), (('op', mode),))
+        self.log_action(user_id, "READ_FILE", f"Path: {file_path} ({mode} {count})")
+        content = data.decode('utf-8', errors='replace')
+        return content if content else "[Dosya Boş]"
+
+    @staticmethod
+    def _head_bytes(f, count):
+        parts, newlines = [], 0
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk: break
+            parts.append(chunk)
+            newlines += chunk.count(b'\n')
+            if newlines >= count: break
+        data = b''.join(parts)
+        # count. satır sonundan sonrasını at
+        cut = -1
+        for _ in range(count):
+            cut = data.find(b'\n', cut + 1)
+            if cut < 0: return data
+        return data[:cut]
+
+    @staticmethod
+    def _tail_bytes(f, count):
+        position = f.seek(0, os.SEEK_END)
+        parts, newlines = [], 0
+        # Dosya sonundaki satır sonu yeni bir satır sayılmaz
+        while position > 0 and newlines <= count:
+            step = min(READ_CHUNK_SIZE, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            parts.append(chunk)
+            newlines += chunk.count(b'\n')
+        data = b''.join(reversed(parts))
+        if data.endswith(b'\n'): data = data[:-1]
+        return b'\n'.join(data.split(b'\n')[-count:])
+
+    @_locked_by_caller
+    def execute_file(self, caller, file_path):
+        try: user_id = self._get_active_user(caller)
         except PermissionError as e: return str(e)
         if file_path not in self.files: return "HATA: Çalıştırılacak dosya bulunamadı."
         
@@ -246,8 +1131,9 @@ class FileSystem:
         
         return f"HATA: [{user_id}] '{file_path}' dosyasında çalıştırma (Execute) izni yoktur."
 
-    def delete_file(self, file_path):
-        try: user_id = self._get_active_user()
+    @_locked_by_caller
+    def delete_file(self, caller, file_path):
+        try: user_id = self._get_active_user(caller)
         except PermissionError as e: return str(e)
         if user_id == "admin": return "HATA: Admin hesabı dosya silemez."
         if file_path not in self.files: return "HATA: Dosya bulunamadı."
@@ -257,78 +1143,107 @@ class FileSystem:
         deleted_size = self.files[file_path]['size'] 
 
         physical_path = self._get_physical_path(user_id, file_path)
+        # Yalnızca yer boşaltan ayırma kota yüzünden reddedilemez (eski kayıtlardaki negatif boyutlar iade edilmez).
+        success, message, reservation = self.qm.reserve(user_id, -max(0, deleted_size))
+        if not success: return message
         
-        # 2. Fiziksel silme
-        try: os.remove(physical_path)
+        # 2. Fiziksel silme (büyük dosyalar çöp kutusuna taşınır, arka planda silinir)
+        try:
+            if deleted_size >= RECLAIM_DEFER_BYTES:
+                self._discard(physical_path, 'file', user_id, 1, deleted_size, file_path)
+            else:
+                self.storage.remove(physical_path)
         except FileNotFoundError: pass 
-        except Exception as e: return f"HATA: {e}"
+        except Exception as e:
+            self.qm.release(reservation)
+            return f"HATA: {e}"
 
-        # 3. Kota kullanımını DÜŞ
-        self.qm.decrease_usage(user_id, deleted_size)
-        
-        # 4. Mantıksal kaydı sil
+        # 3. Mantıksal kaydı sil
         del self.files[file_path]
+
+        # 4. Kota kullanımını DÜŞ
+        self.qm.commit(reservation, file=(file_path, None))
         
         # LOG EKLEME
         self.log_action(user_id, "DELETE_FILE", f"Path: {file_path}, Size: {deleted_size} bytes")
 
         return f"BAŞARILI: '{file_path}' silindi."
 
-    def list_files(self):
-        try: user_id = self._get_active_user()
+    @_locked_by_caller
+    def list_files(self, caller):
+        try: user_id = self._get_active_user(caller)
         except PermissionError as e: return str(e)
         if user_id == "admin": return "HATA: Admin hesabı dosya listeleyemez." 
             
         home_path = self.home_dirs.get(user_id, '')
         file_list = []
-        for path, info in self.files.items():
-            if path.startswith(home_path):
-                size_mb = info['size'] / self.qm.MB
-                file_name = os.path.basename(path)
-                file_list.append(f"-> {file_name} ({size_mb:.2f} MB)")
+        for path, info in self.files.files_of(user_id).items():
+            size_mb = info['size'] / self.qm.MB
+            file_name = os.path.basename(path)
+            file_list.append(f"-> {file_name} ({size_mb:.2f} MB)")
         
         if not file_list: return f"[{user_id}] Dizin boş: {home_path}"
         usage_mb, _ = self.qm.get_status(user_id)
         return f"[{user_id}] Dizin İçeriği ({usage_mb:.2f} MB Kullanım):\n" + "\n".join(file_list)
     
-    def get_user_status(self):
-        try: user_id = self._get_active_user()
+    @_locked_by_caller
+    def get_user_status(self, caller):
+        try: user_id = self._get_active_user(caller)
         except PermissionError as e: return str(e)
         if user_id == "admin": return "[admin] Yönetici Hesabı: Kota takibi yoktur." 
         usage, limit = self.qm.get_status(user_id)
         return f"[{user_id}] Kota Durumu: {usage:.2f} MB / {limit:.2f} MB"
-    def overwrite_file(self, file_path, content):
+    @_locked_by_caller
+    def overwrite_file(self, caller, file_path, content):
         """Dosyanın içeriğini silip yenisini yazar (Overwrite)."""
-        try: user_id = self._get_active_user()
+        try: user_id = self._get_active_user(caller)
         except PermissionError as e: return str(e)
         if user_id == "admin": return "HATA: Admin dosya içeriği değiştiremez."
         if file_path not in self.files: return "HATA: Dosya bulunamadı."
         if self.files[file_path]['owner'] != user_id: return "Erişim Reddedildi."
 
+        data = content.encode('utf-8')
+        old_size = self.files[file_path]['size']
+        delta = len(data) - old_size
+        reservation, message = self._reserve_quota(user_id, delta, f"Path: {file_path}, Attempted Overwrite: {len(data)} bytes")
+        if reservation is None: return message
+
         physical_path = self._get_physical_path(user_id, file_path)
         try:
-            # 'w' kipi dosyayı açarken içeriğini siler!
-            with open(physical_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            self.log_action(user_id, "OVERWRITE_FILE", f"Path: {file_path}")
-            return f"BAŞARILI: '{file_path}' içeriği değiştirildi."
-        except Exception as e: return f"HATA: {e}"
+            # Hata olursa eski içerik bozulmaz (geçici dosya + os.replace).
+            stored = self.storage.replace(physical_path, data)
+        except Exception as e:
+            self.qm.release(reservation)
+            return f"HATA: {e}"
+        charged = self._charged(len(data), stored)
+        self.files.set_size(file_path, charged)
+        self.qm.commit(reservation, charged - old_size, (file_path, charged))
+        metrics.inc('kota_bytes_written_total', len(data), (('op', 'overwrite'),))
+        
+        self.log_action(user_id, "OVERWRITE_FILE", f"Path: {file_path}")
+        return f"BAŞARILI: '{file_path}' içeriği değiştirildi."
 
-    def truncate_file(self, file_path):
+    @_locked_by_caller
+    def truncate_file(self, caller, file_path):
         """Dosyanın içeriğini tamamen temizler."""
-        try: user_id = self._get_active_user()
+        try: user_id = self._get_active_user(caller)
         except PermissionError as e: return str(e)
         if user_id == "admin": return "HATA: Admin dosya değiştiremez."
         if file_path not in self.files: return "HATA: Dosya bulunamadı."
         if self.files[file_path]['owner'] != user_id: return "Erişim Reddedildi."
 
+        old_size = max(0, self.files[file_path]['size'])
+        success, message, reservation = self.qm.reserve(user_id, -old_size)
+        if not success: return message
         physical_path = self._get_physical_path(user_id, file_path)
         try:
-            # İçine hiçbir şey yazmadan 'w' ile açıp kapatmak içini temizler.
-            with open(physical_path, 'w', encoding='utf-8') as f:
-                pass 
-            
-            self.log_action(user_id, "TRUNCATE_FILE", f"Path: {file_path} (Cleared)")
-            return f"BAŞARILI: '{file_path}' içi temizlendi."
-        except Exception as e: return f"HATA: {e}"
\ No newline at end of file
+            stored = self.storage.truncate(physical_path)
+        except Exception as e:
+            self.qm.release(reservation)
+            return f"HATA: {e}"
+        charged = self._charged(0, stored)
+        self.files.set_size(file_path, charged)
+        self.qm.commit(reservation, charged - old_size, (file_path, charged))
+        
+        self.log_action(user_id, "TRUNCATE_FILE", f"Path: {file_path} (Cleared)")
+        return f"BAŞARILI: '{file_path}' içi temizlendi."
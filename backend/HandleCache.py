@@ -0,0 +1,217 @@
+# backend/HandleCache.py
+"""Ekleme (append) için açık dosya tanıtıcısı önbelleği ve ekleme tamponu.
+
+Her eklemede dosyayı açıp kapatmak yerine fiziksel yol başına açık bir
+O_APPEND tanıtıcısı ve küçük eklemeleri biriktiren bir tampon tutulur:
+  * En fazla `capacity` tanıtıcı açık kalır; yer gerekince en uzun süredir
+    kullanılmayanın tamponu yazılıp kapatılır (LRU). `idle_timeout` saniye
+    kullanılmayan tanıtıcılar da kapatılır.
+  * Tampon `buffer_bytes`'ı geçince, en geç `flush_interval` saniye sonra
+    (arka plan thread'i) ya da dosya okunmadan/değiştirilmeden önce
+    (flush/drop) yazılır. durable=True ile tampon hemen yazılır ve fsync edilir.
+  * Tampon yazılamazsa (ör. disk dolu) veri atılmaz, tamponda kalır ve sonraki
+    boşaltmada yeniden denenir. Yarım kalan yazma dosyadan geri alınır.
+  * Tampon yazılırken tanıtıcının dosyası başka bir yola sabit bağlanmışsa
+    (anlık görüntü) önce `prepare(yol)` çağrılıp yeni tanıtıcı açılır. Dosya
+    önbelleğe haber verilmeden silinmiş, taşınmış ya da yerine başka dosya
+    konmuşsa tampon atılır ve tanıtıcı kapatılır: silinen dosya yeniden
+    oluşturulmaz, taşınan dosyaya yazılmaz. Dosyayı değiştiren, taşıyan ya da
+    silen her yol önce drop/drop_dir çağırır; bu denetimler dışarıdan yapılan
+    değişikliklere karşı bir güvencedir.
+
+Tüm işlemler tek bir kilit altındadır; aynı dosyaya yapılan çağrılar zaten
+kullanıcı kilidiyle sıralandığından kilit yalnızca kısa süre tutulur.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+HANDLE_CACHE_SIZE = int(os.environ.get("KOTA_HANDLE_CACHE", "128"))  # Açık tanıtıcı sayısı; 0 = kapalı
+HANDLE_IDLE_TIMEOUT = 30.0             # Bu kadar saniye kullanılmayan tanıtıcı kapanır
+APPEND_BUFFER_BYTES = 64 * 1024        # Tampon bu boyuta ulaşınca hemen yazılır
+APPEND_FLUSH_INTERVAL = float(os.environ.get("KOTA_APPEND_FLUSH_INTERVAL", "0.2"))  # Tamponun en uzun bekleme süresi (sn)
+OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+
+
+class _Handle:
+    __slots__ = ('fd', 'path', 'buffer', 'pending_since', 'last_used')
+
+    def __init__(self, fd, now, path):
+        self.fd = fd
+        self.path = path
+        self.buffer = bytearray()
+        self.pending_since = None   # Tampondaki en eski verinin eklendiği an
+        self.last_used = now
+
+
+class AppendCache:
+    def __init__(self, prepare=None, capacity=HANDLE_CACHE_SIZE, buffer_bytes=APPEND_BUFFER_BYTES,
+                 flush_interval=APPEND_FLUSH_INTERVAL, idle_timeout=HANDLE_IDLE_TIMEOUT, clock=time.monotonic):
+        self.prepare = prepare or (lambda path: None)
+        self.capacity = max(1, capacity)
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._handles = OrderedDict()   # yol -> _Handle (en son kullanılan sonda)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats = {'opens': 0, 'evictions': 0, 'writes': 0}
+        self._thread = threading.Thread(target=self._run, name="append-flusher", daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._handles)
+
+    # --- EKLEME ---
+    def append(self, path, data, durable=False):
+        now = self._clock()
+        with self._lock:
+            handle = self._handles.get(path)
+            if handle is None:
+                handle = self._open(path, now)
+            else:
+                self._handles.move_to_end(path)
+            handle.buffer += data
+            handle.last_used = now
+            if handle.pending_since is None: handle.pending_since = now
+            if durable or len(handle.buffer) >= self.buffer_bytes:
+                try:
+                    if not self._write(handle, durable):
+                        raise FileNotFoundError(f"Dosya önbellek dışından silinmiş ya da taşınmış: {path}")
+                except Exception:
+                    # Bu ekleme geri alınır (çağıran kotayı iade eder); öncekiler tamponda kalır.
+                    del handle.buffer[len(handle.buffer) - len(data):]
+                    if not handle.buffer: handle.pending_since = None
+                    raise
+
+    def _open(self, path, now):
+        while len(self._handles) >= self.capacity:
+            old_path, old = self._handles.popitem(last=False)
+            try:
+                self._close(old)
+                self.stats['evictions'] += 1
+            except OSError as e:
+                # Tampon yazılamadı: veri kaybolmasın diye tanıtıcı önbellekte kalır (sınır geçici olarak aşılır).
+                self._handles[old_path] = old
+                print(f"[UYARI] Ekleme tamponu yazılamadı ({old_path}): {e}")
+                break
+        self.prepare(path)
+        handle = self._handles[path] = _Handle(os.open(path, OPEN_FLAGS, 0o666), now, path)
+        self.stats['opens'] += 1
+        return handle
+
+    def _write(self, handle, durable=False):
+        """Tamponu yazar; tanıtıcı eskimişse (dosya yolundan silinmiş/taşınmış) tamponu atıp False döndürür."""
+        if handle.buffer:
+            st = os.fstat(handle.fd)
+            try: current = os.stat(handle.path)
+            except FileNotFoundError: current = None
+            if current is None or (current.st_dev, current.st_ino) != (st.st_dev, st.st_ino):
+                self._discard_stale(handle)
+                return False
+            if st.st_nlink != 1:
+                # Dosya bu arada başka bir yola bağlandı (anlık görüntü): tampon dosyanın özel kopyasına yazılır.
+                os.close(handle.fd)
+                self.prepare(handle.path)
+                handle.fd = os.open(handle.path, OPEN_FLAGS, 0o666)
+                self.stats['opens'] += 1
+            written = 0
+            with memoryview(handle.buffer) as view:
+                try:
+                    while written < len(view):
+                        written += os.write(handle.fd, view[written:])
+                except OSError:
+                    if written:
+                        os.ftruncate(handle.fd, os.fstat(handle.fd).st_size - written)
+                    raise
+            handle.buffer.clear()
+            handle.pending_since = None
+            self.stats['writes'] += 1
+        if durable:
+            os.fsync(handle.fd)
+        return True
+
+    def _discard_stale(self, handle):
+        print(f"[UYARI] '{handle.path}' önbellek dışından silinmiş ya da taşınmış; "
+              f"{len(handle.buffer)} baytlık ekleme tamponu atıldı.")
+        handle.buffer.clear()
+        handle.pending_since = None
+        os.close(handle.fd)
+        handle.fd = None
+        if self._handles.get(handle.path) is handle:
+            del self._handles[handle.path]
+
+    def _close(self, handle):
+        if self._write(handle):
+            os.close(handle.fd)
+
+    # --- TUTARLILIK ---
+    def flush(self, path):
+        """Dosyanın tamponunu yazar; tanıtıcı açık kalır (okumadan önce)."""
+        with self._lock:
+            handle = self._handles.get(path)
+            if handle is not None and handle.buffer:
+                self._write(handle)
+
+    def drop(self, path, discard=False):
+        """Tamponu yazar ve tanıtıcıyı kapatır (dosya değiştirilmeden, taşınmadan ya da silinmeden önce).
+
+        discard=True ise tampon yazılmaz (dosya silinecek).
+        """
+        with self._lock:
+            handle = self._handles.pop(path, None)
+            if handle is None: return
+            if discard:
+                os.close(handle.fd)
+                return
+            try:
+                self._close(handle)
+            except Exception:
+                self._handles[path] = handle
+                raise
+
+    def drop_dir(self, directory, discard=False):
+        """Dizindeki tüm tanıtıcıları kapatır; discard=True ise tampon yazılmaz (dizin silinecek)."""
+        with self._lock:
+            for path in [p for p in self._handles if os.path.dirname(p) == directory]:
+                handle = self._handles.pop(path)
+                if discard:
+                    os.close(handle.fd)
+                    continue
+                try:
+                    self._close(handle)
+                except Exception:
+                    self._handles[path] = handle
+                    raise
+
+    def drop_all(self):
+        """Tüm tamponları yazar ve tanıtıcıları kapatır; yazılamayan tampon uyarıyla atılır."""
+        with self._lock:
+            while self._handles:
+                path, handle = self._handles.popitem(last=False)
+                try:
+                    self._close(handle)
+                except OSError as e:
+                    print(f"[UYARI] Ekleme tamponu yazılamadı, {len(handle.buffer)} bayt kayboldu ({path}): {e}")
+
+    def close(self):
+        """Arka plan thread'ini durdurur ve tüm tanıtıcıları kapatır."""
+        self._stop.set()
+        self.drop_all()
+
+    # --- ARKA PLAN ---
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            now = self._clock()
+            with self._lock:
+                for path, handle in list(self._handles.items()):
+                    try:
+                        if handle.pending_since is not None and now - handle.pending_since >= self.flush_interval:
+                            if not self._write(handle): continue
+                        if not handle.buffer and now - handle.last_used >= self.idle_timeout:
+                            del self._handles[path]
+                            os.close(handle.fd)
+                    except OSError as e:
+                        print(f"[UYARI] Ekleme tamponu yazılamadı ({path}): {e}")
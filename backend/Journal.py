@@ -0,0 +1,157 @@
+# backend/Journal.py
+import json
+import os
+import threading
+
+
+class Journal:
+    """Append-only değişiklik günlüğü (write-ahead journal).
+
+    Her kayıt tek satırlık bir JSON nesnesidir. commit() çağrıları grup halinde
+    diske yazılır: aynı anda bekleyen tüm istekler tek bir write + fsync ile
+    kalıcı hale gelir (group commit).
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._pending = []        # Henüz diske yazılmamış satırlar
+        self._last_seq = 0        # Son eklenen kaydın sıra numarası
+        self._durable_seq = 0     # Diske yazılıp fsync edilmiş son kayıt
+        self._flushing = False    # Şu an bir lider yazma yapıyor mu?
+        self._file = None
+        self.record_count = 0     # Son checkpoint'ten beri kayıt sayısı
+
+    # --- YÜKLEME ---
+    def replay(self):
+        """Günlükteki geçerli kayıtları sırayla döndürür.
+
+        Çökme sırasında yarım kalmış (bozuk) son satır ve sonrası atılır,
+        dosya son sağlam kayda kadar kırpılır.
+        """
+        records = []
+        good_offset = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+                    good_offset += len(line)
+            if good_offset != os.path.getsize(self.path):
+                print(f"[UYARI] Günlük {good_offset}. bayttan sonra bozuk, kırpılıyor.")
+                with open(self.path, 'r+b') as f:
+                    f.truncate(good_offset)
+        self.record_count = len(records)
+        return records
+
+    def open(self):
+        self._file = open(self.path, 'ab')
+
+    def close(self):
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self._write_pending()
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    # --- YAZMA ---
+    def append(self, record):
+        """Kaydı bekleyen kuyruğa ekler ve sıra numarasını döndürür (henüz kalıcı değil)."""
+        line = (json.dumps(record, separators=(',', ':')) + "\n").encode('utf-8')
+        with self._lock:
+            self._pending.append(line)
+            self._last_seq += 1
+            self.record_count += 1
+            return self._last_seq
+
+    def commit(self, seq):
+        """seq numaralı kayıt (ve öncekiler) diske yazılana kadar bekler.
+
+        Bekleyenlerden biri lider olur ve o ana kadar biriken tüm kayıtları
+        tek seferde yazar; diğerleri liderin fsync'ini bekler.
+        """
+        with self._cond:
+            while self._durable_seq < seq:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                self._flushing = True
+                batch, self._pending = self._pending, []
+                last = self._last_seq
+                self._lock.release()
+                try:
+                    self._file.write(b''.join(batch))
+                    self._file.flush()
+                    if self.fsync:
+                        os.fsync(self._file.fileno())
+                except Exception:
+                    self._lock.acquire()
+                    self._pending = batch + self._pending
+                    self._flushing = False
+                    self._cond.notify_all()
+                    raise
+                self._lock.acquire()
+                self._flushing = False
+                self._durable_seq = last
+                self._cond.notify_all()
+
+    def write(self, record):
+        self.commit(self.append(record))
+
+    def checkpoint(self, write_snapshot):
+        """Anlık görüntü (snapshot) yazar ve günlüğü sıfırlar (compaction).
+
+        write_snapshot, günlük kilidi tutulurken çağrılır; bu sırada yeni kayıt
+        eklenemez, böylece snapshot günlükteki her kaydı kapsamış olur.
+        """
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self._flushing = True
+            try:
+                write_snapshot()
+                self._pending = []
+                if self._file:
+                    self._file.truncate(0)
+                    self._file.flush()
+                    if self.fsync:
+                        os.fsync(self._file.fileno())
+                else:
+                    open(self.path, 'wb').close()
+                self.record_count = 0
+                self._durable_seq = self._last_seq
+            finally:
+                self._flushing = False
+                self._cond.notify_all()
+
+    def _write_pending(self):
+        if self._pending and self._file:
+            self._file.write(b''.join(self._pending))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._pending = []
+            self._durable_seq = self._last_seq
+
+
+def atomic_write_json(path, data, fsync=True, **dump_kwargs):
+    """JSON dosyasını geçici dosyaya yazıp os.replace ile atomik olarak değiştirir."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(os.path.dirname(path) or '.', os.O_DIRECTORY)
+        try: os.fsync(dir_fd)
+        finally: os.close(dir_fd)
@@ -0,0 +1,156 @@
+# backend/Metrics.py
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# KOTA_METRICS=0 ile tüm ölçümler kapanır (kayıt çağrıları hiçbir şey yapmaz, /metrics yok)
+METRICS_ENABLED = os.environ.get("KOTA_METRICS", "1") != "0"
+# Gecikme histogramlarının üst sınırları (saniye); son kova +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metrik adı -> (tür, açıklama). Yalnızca burada tanımlı metrikler kaydedilir.
+METRICS = {
+    'kota_http_request_duration_seconds': ('histogram', "HTTP isteklerinin süresi (route bazında)."),
+    'kota_persist_duration_seconds': ('histogram', "Kalıcılık işlemlerinin süresi (snapshot, günlük commit, manifest)."),
+    'kota_audit_log_duration_seconds': ('histogram', "log_action çağrısının süresi (kuyruğa ekleme ya da fsync bekleme)."),
+    'kota_startup_sync_duration_seconds': ('histogram', "Açılış senkronizasyonunun süresi."),
+    'kota_quota_rejections_total': ('counter', "Kota aşımı nedeniyle reddedilen işlemler."),
+    'kota_rate_limited_total': ('counter', "Hız sınırı ya da giriş beklemesi nedeniyle 429 ile reddedilen istekler."),
+    'kota_bytes_written_total': ('counter', "Kullanıcı dosyalarına yazılan baytlar."),
+    'kota_bytes_read_total': ('counter', "Kullanıcı dosyalarından okunan baytlar."),
+    'kota_audit_lines_total': ('counter', "Denetim günlüğüne yazılan satırlar."),
+    'kota_reclaimed_bytes_total': ('counter', "Arka plan geri kazanımıyla silinen baytlar (silinen kullanıcı ve dosyalar)."),
+}
+
+
+class _Shard:
+    """Tek bir thread'in biriktirdiği değerler; yalnızca sahibi yazar, kazıma (scrape) okur."""
+    __slots__ = ('thread', 'counters', 'histograms')
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.counters = {}     # (ad, etiketler) -> değer
+        self.histograms = {}   # (ad, etiketler) -> [kova sayıları..., toplam, adet]
+
+
+class Metrics:
+    """Kilit gerektirmeyen, thread bazında biriktirilen sayaç ve histogramlar.
+
+    Kayıt çağrıları yalnızca çağıran thread'in kendi sözlüğünü günceller; render()
+    tüm thread'lerin değerlerini birleştirir. Sonlanmış thread'lerin değerleri
+    kazıma sırasında ortak bir toplama katlanır (istek başına thread açan
+    sunucularda liste büyümez).
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED, buckets=LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard()
+        self._lock = threading.Lock()  # Yalnızca yeni thread kaydında ve kazımada
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name, value=1, labels=()):
+        """Sayacı artırır. labels: (('ad', 'değer'), ...) biçiminde demet."""
+        if not self.enabled: return
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, seconds, labels=()):
+        if not self.enabled: return
+        histograms = self._shard().histograms
+        key = (name, labels)
+        values = histograms.get(key)
+        if values is None:
+            values = histograms[key] = [0] * (len(self.buckets) + 3)
+        values[bisect_left(self.buckets, seconds)] += 1
+        values[-2] += seconds
+        values[-1] += 1
+
+    @contextmanager
+    def timer(self, name, labels=()):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+
+    # --- KAZIMA (SCRAPE) ---
+    @staticmethod
+    def _merge_into(target, shard):
+        for key, value in dict(shard.counters).items():
+            target.counters[key] = target.counters.get(key, 0) + value
+        for key, values in dict(shard.histograms).items():
+            merged = target.histograms.get(key)
+            if merged is None:
+                target.histograms[key] = list(values)
+            else:
+                for i, v in enumerate(values): merged[i] += v
+
+    def snapshot(self):
+        """Tüm thread'lerin değerlerini birleştirilmiş tek bir _Shard olarak döndürür."""
+        with self._lock:
+            alive = []
+            for shard in self._shards:
+                if shard.thread.is_alive(): alive.append(shard)
+                else: self._merge_into(self._retired, shard)
+            self._shards = alive
+            total = _Shard()
+            self._merge_into(total, self._retired)
+            for shard in alive:
+                self._merge_into(total, shard)
+        return total
+
+    def render(self):
+        """Prometheus metin biçimi (text exposition format 0.0.4)."""
+        total = self.snapshot()
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'counter':
+                for (metric, labels), value in sorted(total.counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            for (metric, labels), values in sorted(total.histograms.items()):
+                if metric != name: continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), values):
+                    cumulative += count
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(values[-2])}")
+                lines.append(f"{name}_count{_labels(labels)} {values[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels: return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Süreç genelinde tek kayıt defteri
+metrics = Metrics()
@@ -0,0 +1,100 @@
+# backend/PasswordHasher.py
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# scrypt maliyet parametreleri (N=2^14 yaklaşık 16 MB bellek, tek çekirdekte onlarca ms)
+KDF_N = int(os.environ.get("KOTA_KDF_N", 2 ** 14))
+KDF_R = 8
+KDF_P = 1
+KDF_SALT_BYTES = 16
+KDF_KEY_BYTES = 32
+PBKDF2_ITERATIONS = 600000   # hashlib.scrypt yoksa (OpenSSL < 1.1) kullanılır
+# KDF işlemlerini yürüten süreç sayısı; 0 ise istek thread'inde çalışır
+KDF_WORKERS = int(os.environ.get("KOTA_KDF_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+def hash_password(password):
+    """Şifreyi rastgele tuzla (salt) scrypt/PBKDF2 ile hashler; parametreler sonuçla birlikte saklanır."""
+    salt = os.urandom(KDF_SALT_BYTES)
+    if hasattr(hashlib, 'scrypt'):
+        key = hashlib.scrypt(password.encode(), salt=salt, n=KDF_N, r=KDF_R, p=KDF_P,
+                             maxmem=256 * KDF_N * KDF_R, dklen=KDF_KEY_BYTES)
+        return f"scrypt${KDF_N}${KDF_R}${KDF_P}${salt.hex()}${key.hex()}"
+    key = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, PBKDF2_ITERATIONS, KDF_KEY_BYTES)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt.hex()}${key.hex()}"
+
+
+def verify_password(stored, password):
+    """Kayıtlı hash ile şifreyi karşılaştırır. Dönüş: (doğru mu, yeniden hashlenmeli mi).
+
+    Eski sürümlerin tuzsuz SHA-256 kayıtları da doğrulanır; bunlar ve parametreleri
+    güncel olmayan kayıtlar için ikinci değer True döner (girişte yeniden hashlenir).
+    """
+    if not stored: return False, False
+    fields = stored.split('$')
+    if fields[0] == 'scrypt' and len(fields) == 6:
+        n, r, p = int(fields[1]), int(fields[2]), int(fields[3])
+        key = hashlib.scrypt(password.encode(), salt=bytes.fromhex(fields[4]), n=n, r=r, p=p,
+                             maxmem=256 * n * r, dklen=len(fields[5]) // 2)
+        ok = hmac.compare_digest(key.hex(), fields[5])
+        return ok, ok and (n, r, p) != (KDF_N, KDF_R, KDF_P)
+    if fields[0] == 'pbkdf2_sha256' and len(fields) == 4:
+        key = hashlib.pbkdf2_hmac('sha256', password.encode(), bytes.fromhex(fields[2]),
+                                  int(fields[1]), len(fields[3]) // 2)
+        ok = hmac.compare_digest(key.hex(), fields[3])
+        return ok, ok and hasattr(hashlib, 'scrypt')
+    # Eski biçim: tuzsuz SHA-256 (64 hex karakter)
+    ok = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    return ok, ok
+
+
+class KdfPool:
+    """KDF hesaplarını ayrı süreçlerde çalıştırır; giriş yoğunluğu dosya işlemlerini (GIL) bekletmez.
+
+    Havuz ilk kullanımda açılır. Süreç başlatılamazsa (ör. kısıtlı ortam) hesap
+    çağıran thread'de yapılır.
+    """
+
+    def __init__(self, workers=KDF_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self.workers <= 0: return None
+        with self._lock:
+            if self._executor is None:
+                try:
+                    # fork, thread'li bir süreçte (denetim yazıcısı vb.) güvenli değildir
+                    self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+                except (OSError, ValueError) as e:
+                    print(f"[UYARI] KDF süreç havuzu açılamadı, thread içinde çalışılacak: {e}")
+                    self.workers = 0
+            return self._executor
+
+    def _run(self, fn, *args):
+        executor = self._get_executor()
+        if executor is None: return fn(*args)
+        try:
+            return executor.submit(fn, *args).result()
+        except (BrokenProcessPool, OSError):
+            with self._lock:
+                self._executor = None
+            return fn(*args)
+
+    def hash(self, password):
+        return self._run(hash_password, password)
+
+    def verify(self, stored, password):
+        return self._run(verify_password, stored, password)
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
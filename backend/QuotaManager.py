@@ -1,50 +1,228 @@
 import json
+import math
 import os
 import hashlib # Hashing kütüphanesi
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from Journal import Journal, atomic_write_json
+from PasswordHasher import KdfPool, hash_password
+from Metrics import metrics
+from UsageIndex import UsageIndex
 
 DEFAULT_QUOTA_MB = 100
+JOURNAL_COMPACT_EVERY = 10000  # Bu kadar kayıttan sonra users.json yeniden yazılır
+JOURNAL_FSYNC = True
+# Doğrulanmış şifrenin KDF tekrarlanmadan kabul edileceği süre (saniye); 0 kapatır
+LOGIN_CACHE_TTL = float(os.environ.get("KOTA_LOGIN_CACHE_TTL", 300))
+# Sistem ayarlarının varsayılanları (admin tarafından değiştirilir, users.json'da saklanır)
+#   charge: "logical" (dosyanın mantıksal boyutu) | "stored" (diskte saklanan, ör. sıkıştırılmış boyut)
+DEFAULT_SETTINGS = {'charge': 'logical'}
+CHARGE_MODES = ('logical', 'stored')
+
+class QuotaReservation:
+    """QuotaManager.reserve() tarafından döndürülen, henüz kalıcı olmayan kota değişikliği."""
+    __slots__ = ('user_id', 'delta')
+
+    def __init__(self, user_id, delta):
+        self.user_id = user_id
+        self.delta = delta
+
+def _decode_cursor(cursor):
+    if not cursor: return None
+    key = json.loads(cursor)
+    if not isinstance(key, list) or not key: raise ValueError("Geçersiz imleç.")
+    return key
 
 class QuotaManager:
     def __init__(self):
         self.user_quotas = {}
         self.passwords = {}
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.token_epochs = {}           # user_id -> oturum kuşağı; silinen kullanıcılarınki de tutulur
         self.file_path = "users.json"
+        self.journal = None
+        self._lock = threading.RLock()   # Kullanıcı ekleme/silme (sözlük yapısı) için
+        self._quota_locks = {}           # user_id -> RLock (kullanıcı bazlı kota kilidi)
+        self._deferred = threading.local()  # deferred_commits() içindeyken bekletilen commit
+        self.kdf = KdfPool()
+        self._login_cache = {}           # user_id -> (kayıtlı hash, şifre özeti, geçerlilik sonu)
+        self._login_cache_key = os.urandom(32)
+        self.usage_index = UsageIndex()  # Kullanım/limit/yüzde sıralı indeks (list_users)
+        # Son manifestten sonra günlüğe yazılan dosya boyutları (yol -> ücretlendirilen bayt, silinmişse
+        # None). Günlük katlanırken snapshot'a taşınır; çökme sonrası açılış taraması diskteki boyutun
+        # ücreti yansıtmadığı dosyalarda (ör. simülasyon) bunları kullanır. Manifest yazılınca düşülür.
+        self.journaled_files = {}
+        self._manifest_files = {}        # Yazılmakta olan manifestin kapsayacağı boyutlar (begin/end_manifest)
+        self.checkpoint_hooks = []       # Günlük katlandıktan sonra, günlük kilidi dışında çağrılır
         self.MB = 1024 * 1024  # 1 MB in Bytes
 
     def _hash_password(self, password):
-        """Şifreyi SHA-256 ile hashler."""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Şifreyi tuzlu KDF (scrypt) ile hashler; süreç havuzunda çalışır."""
+        return self.kdf.hash(password)
 
     def load_and_sync_data(self, project_root):
-        """Verileri JSON dosyasından yükler, yoksa default admin oluşturur."""
+        """Snapshot'ı (users.json) yükler, günlüğü üzerine uygular; yoksa default admin oluşturur."""
         # JSON dosyasını backend klasöründe (app.py ile aynı yerde) arayalım
         self.file_path = os.path.join(project_root, "backend", "users.json")
-        
+        journal = Journal(self.file_path + ".journal", fsync=JOURNAL_FSYNC)
+
+        quotas, passwords, settings, epochs, files = {}, {}, dict(DEFAULT_SETTINGS), {}, {}
         if os.path.exists(self.file_path):
             try:
                 with open(self.file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self.user_quotas = data.get('quotas', {})
-                    self.passwords = data.get('passwords', {})
+                    quotas = data.get('quotas', {})
+                    passwords = data.get('passwords', {})
+                    settings.update(data.get('settings', {}))
+                    epochs = data.get('epochs', {})
+                    files = data.get('files', {})
             except Exception as e:
                 print(f"[HATA] Veritabanı okunamadı: {e}")
-        else:
+
+        # Günlük kayıtları mutlak değer taşır; tekrar uygulanmaları güvenlidir.
+        records = journal.replay()
+        for record in records:
+            self._apply(record, quotas, passwords, settings, epochs)
+            if 'f' in record: files[record['f']] = record['s']
+            elif record.get('op') == 'set' and record.get('k') == 'charge':
+                files = {}  # Önceki boyutlar eski ücretlendirme moduna göre
+            elif record.get('op') == 'del':
+                prefix = f"/home/{record['u']}/"
+                files = {path: size for path, size in files.items() if not path.startswith(prefix)}
+
+        # Yükleme yarıda kalırsa eski durum bozulmasın diye en sonda atanır.
+        self.user_quotas, self.passwords, self.settings = quotas, passwords, settings
+        self.token_epochs = epochs
+        self.journaled_files = files
+        self.journal = journal
+        self.journal.open()
+
+        if 'admin' not in self.user_quotas:
             print("[Sistem] Veritabanı bulunamadı, yeni oluşturuluyor...")
             # İŞTE BURASI DÜZELDİ: Admin şifresini hashleyerek kaydediyoruz
             self.user_quotas['admin'] = {'limit': float('inf'), 'usage': 0}
-            self.passwords['admin'] = self._hash_password('admin') 
+            self.passwords['admin'] = hash_password('admin')
+            self.save_data()
+        elif records and not files:
+            # Açılışta günlüğü snapshot'a katla (dosya kayıtları varsa FileSystem taramadan sonra katlar)
+            self.save_data()
+        self.usage_index.rebuild(self.user_quotas)
+
+    @staticmethod
+    def _apply(record, quotas, passwords, settings, epochs=None):
+        """Tek bir günlük kaydını verilen sözlüklere uygular."""
+        op, user_id = record.get('op'), record.get('u')
+        if op == 'user':
+            quotas[user_id] = {'limit': record['limit'], 'usage': record['usage']}
+            passwords[user_id] = record['pw']
+        elif op == 'usage' and user_id in quotas:
+            quotas[user_id]['usage'] = record['v']
+        elif op == 'limit' and user_id in quotas:
+            quotas[user_id]['limit'] = record['v']
+        elif op == 'pw':
+            passwords[user_id] = record['v']
+        elif op == 'del':
+            quotas.pop(user_id, None)
+            passwords.pop(user_id, None)
+            if epochs is not None and 'e' in record: epochs[user_id] = record['e']
+        elif op == 'set':
+            settings[record['k']] = record['v']
+
+    def _quota_lock(self, user_id):
+        lock = self._quota_locks.get(user_id)
+        if lock is None:
+            with self._lock:
+                lock = self._quota_locks.setdefault(user_id, threading.RLock())
+        return lock
+
+    def _touch(self, user_id):
+        """Kullanıcının güncel kullanım/limit değerini sıralı indekse yansıtır (kota kilidi altında)."""
+        quota_data = self.user_quotas.get(user_id)
+        if quota_data is not None:
+            self.usage_index.update(user_id, quota_data['usage'], quota_data['limit'])
+
+    def _log(self, record):
+        """Değişikliği günlüğe ekler; kilit dışında commit() ile kalıcı hale getirilmelidir."""
+        if self.journal is None: return 0
+        return self.journal.append(record)
+
+    @contextmanager
+    def deferred_commits(self):
+        """Bu blok içindeki (aynı thread'deki) commit'ler bekletilir ve çıkışta tek seferde yapılır."""
+        if getattr(self._deferred, 'active', False):
+            yield
+            return
+        self._deferred.active, self._deferred.seq = True, 0
+        try:
+            yield
+        finally:
+            self._deferred.active = False
+            self._commit(self._deferred.seq)
+
+    def _commit(self, seq):
+        if self.journal is None or not seq: return
+        if getattr(self._deferred, 'active', False):
+            self._deferred.seq = max(self._deferred.seq, seq)
+            return
+        try:
+            with metrics.timer('kota_persist_duration_seconds', (('op', 'journal_commit'),)):
+                self.journal.commit(seq)
+        except Exception as e:
+            print(f"Kaydetme Hatası: {e}")
+            return
+        if self.journal.record_count >= JOURNAL_COMPACT_EVERY:
             self.save_data()
 
     def save_data(self):
-        data = {
-            'quotas': self.user_quotas,
-            'passwords': self.passwords
-        }
+        """Tam snapshot yazar (atomik) ve günlüğü sıfırlar."""
+        def write_snapshot():
+            data = {
+                'quotas': {u: dict(q) for u, q in dict(self.user_quotas).items()},
+                'passwords': dict(self.passwords),
+                'settings': dict(self.settings),
+                'epochs': dict(self.token_epochs)
+            }
+            # Silinecek günlük kayıtlarındaki (henüz manifestte olmayan) dosya boyutları snapshot'ta kalır;
+            # diske dokunulmaz, kilit yalnızca son manifestten beri değişen dosyalar kadar tutulur.
+            files = {**self._manifest_files, **self.journaled_files}
+            if files: data['files'] = files
+            atomic_write_json(self.file_path, data, fsync=JOURNAL_FSYNC, indent=4)
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
+            with metrics.timer('kota_persist_duration_seconds', (('op', 'snapshot'),)):
+                if self.journal is None:
+                    write_snapshot()
+                else:
+                    self.journal.checkpoint(write_snapshot)
         except Exception as e:
             print(f"Kaydetme Hatası: {e}")
+            return
+        for hook in self.checkpoint_hooks: hook()
+
+    def record_files(self, sizes):
+        """Günlük kaydı olmadan değişen dosya boyutlarını (yol -> bayt ya da None) kalıcı kayda ekler.
+
+        Değerler bir sonraki save_data() snapshot'ıyla kalıcı olur.
+        """
+        with self._lock:
+            self.journaled_files.update(sizes)
+
+    def begin_manifest(self):
+        """Manifest yazımı başlarken çağrılır: o ana kadarki dosya boyutlarını yazılacak manifest kapsar.
+
+        Çağıran, dosya indeksini bundan sonra okumalıdır (indeks commit'ten önce güncellenir).
+        """
+        with self._lock:
+            self._manifest_files, self.journaled_files = self.journaled_files, {}
+
+    def end_manifest(self, written):
+        """Manifest kalıcı olarak yazıldıysa kapsanan boyutlar düşülür; yazılamadıysa geri alınır."""
+        with self._lock:
+            if not written:
+                for path, size in self._manifest_files.items():
+                    self.journaled_files.setdefault(path, size)
+            self._manifest_files = {}
 
     def add_user(self, user_id, password, quota_mb=None):
         if quota_mb is None or quota_mb == "":
@@ -53,50 +231,145 @@ class QuotaManager:
             final_quota_mb = float(quota_mb)
 
         quota_bytes = final_quota_mb * self.MB
-        
-        self.user_quotas[user_id] = {
-            'limit': quota_bytes,
-            'usage': 0
-        }
-        # Şifreyi hashleyerek kaydet
-        self.passwords[user_id] = self._hash_password(password)
-        self.save_data()
+        # Şifre kilit dışında hashlenir: yavaş KDF diğer kullanıcıların kota işlemlerini bekletmez.
+        pw_hash = self._hash_password(password)
+
+        with self._lock:
+            self.user_quotas[user_id] = {
+                'limit': quota_bytes,
+                'usage': 0
+            }
+            self.passwords[user_id] = pw_hash
+            seq = self._log({'op': 'user', 'u': user_id, 'limit': quota_bytes, 'usage': 0, 'pw': pw_hash})
+            self._touch(user_id)
+        self._commit(seq)
         return final_quota_mb
 
     def check_password(self, user_id, password):
         stored_hash = self.passwords.get(user_id)
-        # Girilen şifreyi hashleyip, kayıtlı hash ile kıyasla
-        return stored_hash == self._hash_password(password)
+        if stored_hash is None: return False
+        digest = hmac.new(self._login_cache_key, password.encode(), hashlib.sha256).digest()
+        cached = self._login_cache.get(user_id)
+        if cached and cached[0] == stored_hash and cached[2] > time.monotonic():
+            return hmac.compare_digest(cached[1], digest)
 
-    def check_and_update_usage(self, user_id, required_size_bytes):
-        if user_id not in self.user_quotas:
-            return False, "Kullanıcı bulunamadı."
-            
-        quota_data = self.user_quotas[user_id]
-        current_usage = quota_data['usage']
-        limit = quota_data['limit']
+        # Girilen şifreyi (süreç havuzunda) KDF ile doğrula
+        ok, needs_rehash = self.kdf.verify(stored_hash, password)
+        if not ok: return False
+        if needs_rehash:
+            # Eski SHA-256 kaydı: doğru şifre elimizdeyken yeni biçime geçir
+            new_hash = self.kdf.hash(password)
+            with self._lock:
+                if self.passwords.get(user_id) != stored_hash: return True
+                self.passwords[user_id] = stored_hash = new_hash
+                seq = self._log({'op': 'pw', 'u': user_id, 'v': new_hash})
+            self._commit(seq)
+        if LOGIN_CACHE_TTL > 0:
+            self._login_cache[user_id] = (stored_hash, digest, time.monotonic() + LOGIN_CACHE_TTL)
+        return True
 
-        # Admin için sınır yok
-        if user_id == "admin": 
-            # Admin de olsa istatistik için usage arttırılabilir ama limit kontrolü yok
-            return True, ""
+    # --- KOTA AYIRMA (reserve / commit / release) ---
+    def reserve(self, user_id, delta_bytes):
+        """Bir yazma işleminin bayt farkı (delta) için kotadan yer ayırır.
 
-        if current_usage + required_size_bytes > limit:
-            remaining_mb = (limit - current_usage) / self.MB
-            return False, f"HATA: Kota aşıldı! Kalan: {remaining_mb:.2f} MB. (Gerekli: {required_size_bytes/self.MB:.2f} MB)"
+        Pozitif delta hemen kullanıma eklenir, böylece eşzamanlı istekler limiti
+        birlikte aşamaz. Negatif delta (iade) ancak commit() ile uygulanır.
+        Dönüş: (başarılı, mesaj, rezervasyon). Rezervasyon, işlem başarılıysa
+        commit(), G/Ç hatasında release() ile kapatılmalıdır.
+        """
+        # NaN her karşılaştırmada False döner; kota kontrolünü atlamasın.
+        if not math.isfinite(delta_bytes): return False, "HATA: Geçersiz boyut.", None
+        with self._quota_lock(user_id):
+            if user_id not in self.user_quotas:
+                return False, "Kullanıcı bulunamadı.", None
+                
+            quota_data = self.user_quotas[user_id]
+            current_usage = quota_data['usage']
+            limit = quota_data['limit']
 
-        self.user_quotas[user_id]['usage'] += required_size_bytes
-        self.save_data()
-        return True, ""
+            # Admin için sınır yok
+            if user_id == "admin": 
+                # Admin de olsa istatistik için usage arttırılabilir ama limit kontrolü yok
+                return True, "", QuotaReservation(user_id, 0)
+
+            if delta_bytes > 0:
+                if current_usage + delta_bytes > limit:
+                    remaining_mb = (limit - current_usage) / self.MB
+                    return False, f"HATA: Kota aşıldı! Kalan: {remaining_mb:.2f} MB. (Gerekli: {delta_bytes/self.MB:.2f} MB)", None
+                quota_data['usage'] += delta_bytes
+                self._touch(user_id)
+        return True, "", QuotaReservation(user_id, delta_bytes)
+
+    def commit(self, reservation, actual_delta=None, file=None):
+        """Rezervasyonu kalıcı hale getirir (iadeleri uygular ve günlüğe yazar).
+
+        actual_delta verilirse ayrılan miktar yerine gerçekleşen fark ücretlendirilir
+        (ör. sıkıştırma sonrası saklanan bayt); fazlası iade edilir, eksiği eklenir.
+        file=(yol, yeni_boyut) verilirse dosyanın ücretlendirilen boyutu aynı günlük
+        kaydına yazılır (silinen dosya için boyut None); çökme sonrası tarama bunu kullanır.
+        """
+        user_id = reservation.user_id
+        final = reservation.delta if actual_delta is None else actual_delta
+        with self._quota_lock(user_id):
+            if user_id not in self.user_quotas or user_id == "admin": return
+            # Pozitif rezervasyon reserve() sırasında kullanıma eklenmişti.
+            change = final - max(reservation.delta, 0)
+            if change == 0 and final == 0 and file is None: return
+            quota_data = self.user_quotas[user_id]
+            quota_data['usage'] = max(0, quota_data['usage'] + change)
+            record = {'op': 'usage', 'u': user_id, 'v': quota_data['usage']}
+            if file is not None:
+                record['f'], record['s'] = file
+                self.journaled_files[file[0]] = file[1]
+            seq = self._log(record)
+            self._touch(user_id)
+        self._commit(seq)
+
+    def release(self, reservation):
+        """Başarısız işlemin ayırdığı yeri geri verir (günlüğe hiçbir şey yazılmamıştır)."""
+        user_id = reservation.user_id
+        with self._quota_lock(user_id):
+            if user_id in self.user_quotas and reservation.delta > 0:
+                quota_data = self.user_quotas[user_id]
+                quota_data['usage'] = max(0, quota_data['usage'] - reservation.delta)
+                self._touch(user_id)
+
+    def check_and_update_usage(self, user_id, required_size_bytes):
+        success, message, reservation = self.reserve(user_id, required_size_bytes)
+        if success: self.commit(reservation)
+        return success, message
 
     def decrease_usage(self, user_id, deleted_size_bytes):
-        if user_id in self.user_quotas:
-            self.user_quotas[user_id]['usage'] -= deleted_size_bytes
-            if self.user_quotas[user_id]['usage'] < 0:
-                self.user_quotas[user_id]['usage'] = 0
-            self.save_data()
-            return True
-        return False
+        success, _, reservation = self.reserve(user_id, -deleted_size_bytes)
+        if success: self.commit(reservation)
+        return success
+
+    def reconcile_usage(self, usages):
+        """Kullanımı diskten bulunan gerçek değerlere eşitler ({user_id: bytes}), tek commit ile."""
+        seq = 0
+        with self._lock:
+            for user_id, usage in usages.items():
+                with self._quota_lock(user_id):
+                    if user_id not in self.user_quotas: continue
+                    usage = max(0, usage)  # Eski sürümlerin indekse yazdığı negatif boyutlar ek kota vermesin
+                    self.user_quotas[user_id]['usage'] = usage
+                    seq = self._log({'op': 'usage', 'u': user_id, 'v': usage})
+                    self._touch(user_id)
+        self._commit(seq)
+
+    def remaining(self, user_id):
+        """Kullanıcının kalan kotası (bayt)."""
+        quota_data = self.user_quotas.get(user_id)
+        if quota_data is None: return 0
+        return quota_data['limit'] - quota_data['usage']
+
+    def usage_page(self, order='usage', descending=True, limit=50, cursor=None, prefix=None, min_percent=None):
+        """Sıralı indeksten bir sayfa: ([(user_id, usage, limit), ...], sonraki_imleç ya da None).
+
+        İmleç opak bir metindir (son satırın sıralama anahtarı); geçersizse ValueError.
+        """
+        rows, last = self.usage_index.page(order, descending, limit, _decode_cursor(cursor), prefix, min_percent)
+        return rows, None if last is None else json.dumps(last, separators=(',', ':'))
 
     def get_status(self, user_id):
         if user_id in self.user_quotas:
@@ -111,13 +384,36 @@ class QuotaManager:
             
         try:
             limit_bytes = float(new_quota_mb) * self.MB
-            self.user_quotas[target_user_id]['limit'] = limit_bytes
-            self.save_data()
+            with self._quota_lock(target_user_id):
+                self.user_quotas[target_user_id]['limit'] = limit_bytes
+                seq = self._log({'op': 'limit', 'u': target_user_id, 'v': limit_bytes})
+                self._touch(target_user_id)
+            self._commit(seq)
             return True, f"BAŞARILI: {target_user_id} kotası {new_quota_mb} MB yapıldı."
         except ValueError:
             return False, "HATA: Geçersiz kota değeri."
             
+    def set_setting(self, key, value):
+        with self._lock:
+            self.settings[key] = value
+            seq = self._log({'op': 'set', 'k': key, 'v': value})
+        self._commit(seq)
+
     def delete_user_data(self, user_id):
-        if user_id in self.user_quotas: del self.user_quotas[user_id]
-        if user_id in self.passwords: del self.passwords[user_id]
-        self.save_data()
\ No newline at end of file
+        with self._lock, self._quota_lock(user_id):
+            if user_id in self.user_quotas: del self.user_quotas[user_id]
+            if user_id in self.passwords: del self.passwords[user_id]
+            self._login_cache.pop(user_id, None)
+            self.usage_index.remove(user_id)
+            # Kuşak artar: silinen (ya da aynı adla yeniden oluşturulan) hesabın eski token'ları geçersizleşir.
+            epoch = self.token_epochs[user_id] = self.token_epochs.get(user_id, 0) + 1
+            prefix = f"/home/{user_id}/"
+            for files in (self.journaled_files, self._manifest_files):
+                for path in [path for path in files if path.startswith(prefix)]: files.pop(path, None)
+            seq = self._log({'op': 'del', 'u': user_id, 'e': epoch})
+        self._commit(seq)
+
+    def token_epoch(self, user_id):
+        """Kullanıcının oturum kuşağı; kullanıcı yoksa None."""
+        if user_id not in self.user_quotas: return None
+        return self.token_epochs.get(user_id, 0)
@@ -0,0 +1,159 @@
+# backend/RateLimiter.py
+import os
+import threading
+import time
+
+# KOTA_RATE_LIMIT=0 ile hız sınırlaması tamamen kapanır
+RATE_LIMIT_ENABLED = os.environ.get("KOTA_RATE_LIMIT", "1") != "0"
+
+
+def _limit(op_class, default):
+    """KOTA_RATE_<SINIF>="hız/kapasite" (ör. "50/200"): saniyede eklenen ve en fazla biriken jeton."""
+    rate, burst = os.environ.get(f"KOTA_RATE_{op_class.upper()}", default).split('/')
+    return float(rate), float(burst)
+
+
+# İşlem sınıfı -> (jeton/sn, kapasite); kullanıcı başına uygulanır
+RATE_LIMITS = {op_class: _limit(op_class, default) for op_class, default in
+               (('read', '50/200'), ('write', '20/100'), ('admin', '5/20'), ('auth', '2/10'))}
+IP_RATE_FACTOR = float(os.environ.get("KOTA_RATE_IP_FACTOR", "4"))  # IP kovaları kullanıcı limitinin bu katıdır
+SWEEP_INTERVAL = 60            # Boşta kalan kovaların temizlenme aralığı (sn)
+MIN_SWEEP_SIZE = 10000         # Kova sayısı bunun (ve son temizlikteki sayının 2 katının) üstüne çıkınca erken temizlik
+LOGIN_FREE_FAILURES = int(os.environ.get("KOTA_LOGIN_FREE_FAILURES", "3"))  # Beklemesiz hatalı giriş sayısı
+LOGIN_BACKOFF_BASE = 1.0       # İlk bekleme (sn); her yeni hatada iki katına çıkar
+LOGIN_BACKOFF_MAX = 300.0      # En uzun bekleme (sn)
+LOGIN_FAILURE_TTL = 15 * 60    # Son hatadan bu kadar sonra hata sayacı unutulur (sn)
+
+
+class TokenBuckets:
+    """Anahtar başına jeton kovası; her kova yalnızca (jeton, son_zaman) çiftidir.
+
+    Kova tamamen dolduğunda (yeni bir kovadan farkı kalmadığında) sözlükten
+    silinir; böylece bellek yalnızca yakın zamanda istek yapan istemci sayısıyla
+    orantılı kalır. Temizlik ayrı bir thread yerine take() içinde aralıklı yapılır.
+    Kapasiteden pahalı bir istek (ör. büyük /batch) kova dolunca kabul edilir ama
+    bedelinin tamamı düşülür; kova eksiye (borca) iner ve borç ödenene kadar
+    sonraki istekler bekler.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate, self.burst = rate, burst
+        self._clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + SWEEP_INTERVAL
+        self._sweep_size = MIN_SWEEP_SIZE
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, key, cost=1):
+        """Yeterli jeton varsa düşer ve 0 döndürür; yoksa tekrar denemeden önce beklenecek saniyeyi."""
+        need = min(cost, self.burst)  # Kapasiteden pahalı istek için dolu kova yeterli
+        now = self._clock()
+        with self._lock:
+            tokens, stamp = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+            if tokens < need:
+                self._buckets[key] = (tokens, now)
+                return (need - tokens) / self.rate
+            self._buckets[key] = (tokens - cost, now)
+            if now >= self._next_sweep or len(self._buckets) > self._sweep_size:
+                self._sweep(now)
+        return 0.0
+
+    def refund(self, key, cost=1):
+        """take() ile düşülen jetonları geri verir (istek başka bir kovada reddedildi)."""
+        now = self._clock()
+        with self._lock:
+            entry = self._buckets.get(key)
+            if entry is None: return  # Kova zaten dolu olduğu için temizlenmiş
+            tokens, stamp = entry
+            self._buckets[key] = (min(self.burst, tokens + (now - stamp) * self.rate + cost), now)
+
+    def _sweep(self, now):
+        rate, burst = self.rate, self.burst
+        self._buckets = {key: (tokens, stamp) for key, (tokens, stamp) in self._buckets.items()
+                         if tokens + (now - stamp) * rate < burst}
+        self._next_sweep = now + SWEEP_INTERVAL
+        self._sweep_size = max(MIN_SWEEP_SIZE, 2 * len(self._buckets))
+
+
+class LoginThrottle:
+    """Art arda başarısız girişlerde üstel bekleme.
+
+    Her anahtar için ilk `free` hata serbesttir; sonraki her hata bekleme süresini
+    ikiye katlar (LOGIN_BACKOFF_MAX ile sınırlı). Bekleme sürerken giriş denemesi
+    parola özeti hesaplanmadan ve LOGIN_FAILED yazılmadan reddedilir.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._failures = {}  # anahtar -> (hata sayısı, bekleme bitişi, son hata zamanı)
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + SWEEP_INTERVAL
+
+    def __len__(self):
+        return len(self._failures)
+
+    def retry_after(self, *keys):
+        """Anahtarlardan biri beklemedeyse kalan saniye, değilse 0."""
+        now = self._clock()
+        with self._lock:
+            return max([0.0] + [self._failures[k][1] - now for k in keys if k in self._failures])
+
+    def failure(self, key, free=LOGIN_FREE_FAILURES):
+        now = self._clock()
+        with self._lock:
+            count = self._failures.get(key, (0, 0, 0))[0] + 1
+            delay = 0 if count <= free else min(LOGIN_BACKOFF_MAX, LOGIN_BACKOFF_BASE * 2 ** (count - free - 1))
+            self._failures[key] = (count, now + delay, now)
+            if now >= self._next_sweep:
+                self._failures = {k: v for k, v in self._failures.items() if now - v[2] < LOGIN_FAILURE_TTL}
+                self._next_sweep = now + SWEEP_INTERVAL
+
+    def success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+class RateLimiter:
+    """İşlem sınıfı başına kullanıcı ve IP kovaları ile giriş hatası beklemesi (süreç içi, bellekte)."""
+
+    def __init__(self, limits=None, ip_factor=IP_RATE_FACTOR, enabled=RATE_LIMIT_ENABLED, clock=time.monotonic):
+        limits = RATE_LIMITS if limits is None else limits
+        self.enabled = enabled
+        self.ip_factor = ip_factor
+        self._users = {op_class: TokenBuckets(rate, burst, clock) for op_class, (rate, burst) in limits.items()}
+        self._ips = {op_class: TokenBuckets(rate * ip_factor, burst * ip_factor, clock)
+                     for op_class, (rate, burst) in limits.items()}
+        self.logins = LoginThrottle(clock)
+
+    def check(self, op_class, ip, user_id=None, cost=1):
+        """İstek kabul edilecekse 0, aksi halde Retry-After saniyesi."""
+        if not self.enabled or op_class not in self._ips: return 0.0
+        wait = self._ips[op_class].take(ip, cost)
+        if not wait and user_id:
+            wait = self._users[op_class].take(user_id, cost)
+            # Kullanıcı kovasında reddedilen istek IP kovasını tüketmez (aynı IP'deki diğer kullanıcılar etkilenmez).
+            if wait: self._ips[op_class].refund(ip, cost)
+        return wait
+
+    def login_retry_after(self, user_id, ip):
+        if not self.enabled: return 0.0
+        return self.logins.retry_after(('user', user_id, ip), ('ip', ip))
+
+    def login_failed(self, user_id, ip):
+        # Kullanıcı anahtarı IP ile birlikte tutulur: başka bir IP'den yapılan denemeler
+        # gerçek kullanıcıyı kilitleyemez; tek IP'den çok kullanıcıya deneme ise IP anahtarına takılır.
+        if not self.enabled: return
+        self.logins.failure(('user', user_id, ip))
+        self.logins.failure(('ip', ip), LOGIN_FREE_FAILURES * int(self.ip_factor))
+
+    def login_succeeded(self, user_id, ip):
+        if self.enabled: self.logins.success(('user', user_id, ip))
+
+    def size(self):
+        """Bellekteki kova ve giriş kaydı sayısı."""
+        return (sum(len(b) for b in self._users.values()) + sum(len(b) for b in self._ips.values())
+                + len(self.logins))
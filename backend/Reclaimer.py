@@ -0,0 +1,242 @@
+# backend/Reclaimer.py
+"""Silinen ev dizinleri ve büyük dosyalar için ertelenmiş (arka plan) geri kazanım.
+
+delete_user / delete_file veriyi istek içinde silmez: ev dizini ya da dosya
+backend/trash/ altına yeniden adlandırılır (aynı dosya sisteminde sabit zamanlı);
+indeksler ve kota hemen güncellenir. Disk alanını arka plandaki thread geri kazanır:
+  * Her girdinin yanında <id>.json kaydı durur (tür, sahip, dosya sayısı, bayt,
+    şimdiye kadar silinen). Kayıt taşımadan önce yazılır ve veri tamamen
+    silindikten sonra kaldırılır; çökmeden sonra kalan girdiler açılışta
+    (resume) kaldığı yerden silinmeye devam eder.
+  * Dosyalar partiler halinde depolama motorunun reclaim() metoduyla silinir
+    (dedup parça referanslarını bırakır). Büyük dosyalar önce adım adım kırpılır;
+    tek bir unlink diski uzun süre meşgul etmez.
+  * Hız RECLAIM_FILES_PER_SEC ve RECLAIM_MB_PER_SEC ile sınırlanır; kullanıcı
+    istekleri diski geri kazanımla paylaşır.
+
+İlerleme diskteki kayıtlardan okunur; çok süreçli modda her worker aynı görünümü verir.
+"""
+import datetime
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import deque
+
+from Journal import atomic_write_json
+from Metrics import metrics
+
+RECLAIM_FILES_PER_SEC = float(os.environ.get("KOTA_RECLAIM_FILES_PER_SEC", "2000"))  # 0 = sınırsız
+RECLAIM_MB_PER_SEC = float(os.environ.get("KOTA_RECLAIM_MB_PER_SEC", "64"))          # 0 = sınırsız
+RECLAIM_BATCH = 256                      # Bir partide silinen en fazla dosya
+RECLAIM_TRUNCATE_STEP = 64 * 1024 * 1024  # Büyük dosyalar bu kadar baytlık adımlarla kırpılır
+RECLAIM_SAVE_INTERVAL = 1.0              # İlerleme kaydı en sık bu kadar saniyede bir yazılır
+META_SUFFIX = ".json"
+
+
+class Reclaimer:
+    def __init__(self, directory, storage, files_per_sec=RECLAIM_FILES_PER_SEC, mb_per_sec=RECLAIM_MB_PER_SEC,
+                 clock=time.monotonic):
+        self.directory = directory
+        self.storage = storage
+        self.files_per_sec = files_per_sec
+        self.bytes_per_sec = mb_per_sec * 1024 * 1024
+        self._clock = clock
+        os.makedirs(directory, exist_ok=True)
+        self._queue = deque()       # Silinmeyi bekleyen girdi kimlikleri (eskiden yeniye)
+        self._failed = {}           # id -> hata mesajı (bir sonraki açılışta yeniden denenir)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="kota-reclaimer", daemon=True)
+        self._thread.start()
+
+    def _data_path(self, entry_id):
+        return os.path.join(self.directory, entry_id)
+
+    def _meta_path(self, entry_id):
+        return os.path.join(self.directory, entry_id + META_SUFFIX)
+
+    # --- ÇÖP KUTUSUNA TAŞIMA ---
+    def move(self, physical_path, kind, owner, files, size, path=None):
+        """Dosyayı ya da dizini çöp kutusuna taşır ve silinmek üzere kuyruğa alır.
+
+        kind: 'user' | 'file'; files/size: indeksteki dosya sayısı ve ücretlendirilen bayt.
+        Taşınamazsa (ör. farklı dosya sistemi) OSError yükselir ve hiçbir şey değişmez.
+        """
+        entry_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        meta = {'kind': kind, 'owner': owner, 'path': path, 'files': files, 'bytes': size,
+                'freed_files': 0, 'freed_bytes': 0,
+                'created': datetime.datetime.now().isoformat(timespec='seconds')}
+        # Kayıt önce yazılır: taşımadan sonra çökülse de girdi açılışta bulunur.
+        atomic_write_json(self._meta_path(entry_id), meta)
+        try:
+            self.storage.detach(physical_path, self._data_path(entry_id))
+        except OSError:
+            os.remove(self._meta_path(entry_id))
+            raise
+        with self._cond:
+            self._queue.append(entry_id)
+            self._cond.notify()
+        return entry_id
+
+    def resume(self):
+        """Önceki çalışmadan kalan girdileri kuyruğa alır (açılışta, tek bir süreçte çağrılır)."""
+        names = set(os.listdir(self.directory))
+        resumed = []
+        for name in sorted(names):
+            if name.startswith('.') or name.endswith(".tmp"): continue
+            if name.endswith(META_SUFFIX):
+                entry_id = name[:-len(META_SUFFIX)]
+                if entry_id not in names:
+                    os.remove(self._meta_path(entry_id))  # Taşıma gerçekleşmemiş ya da silme bitmiş
+                    continue
+            else:
+                entry_id = name
+                if entry_id + META_SUFFIX not in names:
+                    # Kaydı olmayan girdi (elle bırakılmış): sayılar bilinmeden silinir.
+                    kind = 'user' if os.path.isdir(self._data_path(entry_id)) else 'file'
+                    atomic_write_json(self._meta_path(entry_id), {'kind': kind, 'owner': None, 'path': None,
+                                                                  'files': 0, 'bytes': 0,
+                                                                  'freed_files': 0, 'freed_bytes': 0, 'created': None})
+            resumed.append(entry_id)
+        with self._cond:
+            self._queue.extend(entry_id for entry_id in resumed if entry_id not in self._queue)
+            self._cond.notify()
+        if resumed:
+            print(f"[Sistem] Yarım kalan {len(resumed)} silme işlemi arka planda sürdürülüyor.")
+        return len(resumed)
+
+    # --- DURUM ---
+    def entries(self):
+        """Diskteki tüm bekleyen girdilerin kayıtları (eskiden yeniye); başarısız olanlarda 'error' alanı."""
+        result = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(META_SUFFIX): continue
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue  # Tam o sırada tamamlanıp silindi
+            meta['id'] = name[:-len(META_SUFFIX)]
+            if meta['id'] in self._failed: meta['error'] = self._failed[meta['id']]
+            result.append(meta)
+        return result
+
+    def close(self):
+        """Thread'i durdurur; yarım kalan girdinin ilerlemesi kaydedilir, kalanı bir sonraki açılışta silinir."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    # --- ARKA PLAN ---
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._queue and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set(): return
+                entry_id = self._queue[0]
+            try:
+                self._reclaim(entry_id)
+            except Exception as e:
+                self._failed[entry_id] = str(e)
+                print(f"[UYARI] '{entry_id}' silinemedi, bir sonraki açılışta yeniden denenecek: {e}")
+            with self._cond:
+                self._queue.popleft()
+
+    def _reclaim(self, entry_id):
+        try:
+            with open(self._meta_path(entry_id), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return  # Başka bir süreç zaten tamamladı
+        data_path = self._data_path(entry_id)
+        progress = _Progress(self, entry_id, meta)
+        if os.path.isdir(data_path):
+            done = self._reclaim_dir(data_path, progress)
+        else:
+            done = self._reclaim_files([data_path], progress)
+        if done: os.remove(self._meta_path(entry_id))
+        else: progress.save(force=True)
+
+    def _reclaim_dir(self, data_path, progress):
+        """Dizindeki dosyaları partiler halinde siler; bitince dizini kaldırır. Durdurulursa False."""
+        while True:
+            removed = 0
+            batch = []
+            with os.scandir(data_path) as it:
+                for item in it:
+                    if item.is_dir(follow_symlinks=False):
+                        shutil.rmtree(item.path)
+                        continue
+                    batch.append(item.path)
+                    if len(batch) < RECLAIM_BATCH: continue
+                    if not self._reclaim_files(batch, progress): return False
+                    removed += len(batch)
+                    batch = []
+            if batch:
+                if not self._reclaim_files(batch, progress): return False
+                removed += len(batch)
+            if not removed:
+                try: os.rmdir(data_path)
+                except FileNotFoundError: pass
+                return True
+
+    def _reclaim_files(self, paths, progress):
+        if self._stop.is_set(): return False
+        started = self._clock()
+        for path in paths:
+            self._shrink(path, progress)
+            if self._stop.is_set(): return False
+        freed = self.storage.reclaim(paths)
+        progress.add(len(paths), freed)
+        self._pace(started, len(paths), freed)
+        return True
+
+    def _shrink(self, path, progress):
+        """Büyük dosyayı sondan adım adım kırpar; anlık görüntüyle paylaşılan inode'lara dokunulmaz."""
+        try: st = os.lstat(path)
+        except FileNotFoundError: return
+        if st.st_size <= RECLAIM_TRUNCATE_STEP or st.st_nlink != 1: return
+        size = st.st_size
+        with open(path, 'r+b') as f:
+            while size > RECLAIM_TRUNCATE_STEP and not self._stop.is_set():
+                started = self._clock()
+                size -= RECLAIM_TRUNCATE_STEP
+                f.truncate(size)
+                progress.add(0, RECLAIM_TRUNCATE_STEP)
+                self._pace(started, 0, RECLAIM_TRUNCATE_STEP)
+
+    def _pace(self, started, files, nbytes):
+        """Son adımın süresi hız sınırlarının gerektirdiğinden kısaysa aradaki fark kadar bekler."""
+        delay = 0.0
+        if self.files_per_sec > 0: delay = max(delay, files / self.files_per_sec)
+        if self.bytes_per_sec > 0: delay = max(delay, nbytes / self.bytes_per_sec)
+        remaining = delay - (self._clock() - started)
+        if remaining > 0: self._stop.wait(remaining)
+
+
+class _Progress:
+    """Bir girdinin silinen dosya/bayt sayaçları; kayıt en sık RECLAIM_SAVE_INTERVAL'da bir yazılır."""
+
+    def __init__(self, reclaimer, entry_id, meta):
+        self.reclaimer = reclaimer
+        self.entry_id = entry_id
+        self.meta = meta
+        self._saved = reclaimer._clock()
+
+    def add(self, files, nbytes):
+        self.meta['freed_files'] += files
+        self.meta['freed_bytes'] += nbytes
+        metrics.inc('kota_reclaimed_bytes_total', nbytes)
+        self.save()
+
+    def save(self, force=False):
+        now = self.reclaimer._clock()
+        if not force and now - self._saved < RECLAIM_SAVE_INTERVAL: return
+        self._saved = now
+        # İlerleme yalnızca rapor içindir; fsync gerekmez (çökmede en fazla birkaç parti eksik görünür).
+        atomic_write_json(self.reclaimer._meta_path(self.entry_id), self.meta, fsync=False)
@@ -0,0 +1,89 @@
+# backend/SessionManager.py
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+
+SESSION_TTL_SECONDS = 8 * 60 * 60  # Oturum süresi (8 saat)
+SESSION_HEADER = "X-Session-Token"
+
+
+class SessionManager:
+    """HMAC ile imzalanmış oturum anahtarları (token) üretir ve doğrular.
+
+    Token yapısı: <user_id (base64)>.<kuşak>.<bitiş zamanı>.<nonce>.<imza>
+    İmza sunucu sırrıyla üretildiği için token sunucu tarafında saklanmaz;
+    yalnızca logout ile iptal edilen nonce'lar süreleri dolana kadar tutulur.
+    Kuşak (epoch), kullanıcının QuotaManager'daki token kuşağıdır; kullanıcı
+    silinince artar ve aynı adla yeniden oluşturulan hesap eski token'ları kabul etmez.
+    """
+
+    def __init__(self, secret_dir, ttl=SESSION_TTL_SECONDS, revoked=None):
+        self.ttl = ttl
+        self.secret = self._load_secret(os.path.join(secret_dir, ".session_secret"))
+        # nonce -> bitiş zamanı; çok süreçli modda ortak veritabanındaki tablo verilir
+        self._revoked = {} if revoked is None else revoked
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load_secret(path):
+        """Sırrı ortam değişkeninden ya da dosyadan okur; yoksa üretip dosyaya yazar."""
+        env_secret = os.environ.get("KOTA_SESSION_SECRET")
+        if env_secret: return env_secret.encode()
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            secret = secrets.token_bytes(32)
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(secret)
+            except FileExistsError:
+                # Başka bir süreç aynı anda oluşturduysa onunkini kullan
+                with open(path, 'rb') as f:
+                    return f.read()
+            return secret
+
+    def _sign(self, payload):
+        return hmac.new(self.secret, payload.encode(), hashlib.sha256).hexdigest()
+
+    def create(self, user_id, epoch=0):
+        user_part = base64.urlsafe_b64encode(user_id.encode()).decode().rstrip('=')
+        expires = int(time.time()) + self.ttl
+        payload = f"{user_part}.{int(epoch)}.{expires}.{secrets.token_hex(8)}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def claims(self, token):
+        """Geçerli bir token'ın (sahip, kuşak) çiftini, aksi halde None döndürür."""
+        if not token: return None
+        try:
+            user_part, epoch, expires, nonce, signature = token.split('.')
+            if not hmac.compare_digest(signature, self._sign(f"{user_part}.{epoch}.{expires}.{nonce}")):
+                return None
+            if int(expires) < time.time() or nonce in self._revoked:
+                return None
+            return base64.urlsafe_b64decode(user_part + '=' * (-len(user_part) % 4)).decode(), int(epoch)
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    def resolve(self, token):
+        """Geçerli bir token'ın sahibini, aksi halde None döndürür (kuşak kontrolü çağırana aittir)."""
+        claims = self.claims(token)
+        return claims[0] if claims else None
+
+    def revoke(self, token):
+        try:
+            _, _, expires, nonce, _ = token.split('.')
+            expires = int(expires)
+        except (AttributeError, ValueError):
+            return
+        now = time.time()
+        with self._lock:
+            self._revoked[nonce] = expires
+            # Süresi dolmuş iptal kayıtlarını temizle
+            for old_nonce in [n for n, exp in list(self._revoked.items()) if exp < now]:
+                del self._revoked[old_nonce]
@@ -0,0 +1,548 @@
+# backend/SharedState.py
+"""Çok süreçli (ör. gunicorn -w N) çalışma için ortak durum deposu.
+
+KOTA_STATE=sqlite iken kota/şifre/ayarlar, dosya indeksi, denetim kayıtları ve
+iptal edilen oturumlar tek bir SQLite veritabanında (WAL kipinde) tutulur; her
+worker süreci aynı veriyi görür. Kota ayırma tek bir koşullu UPDATE ile yapılır:
+kontrol ve ekleme SQLite'ın yazma kilidi altında atomik olduğundan iki süreç
+birlikte bir kullanıcının limitini aşamaz.
+
+Aynı kullanıcının dosya işlemleri süreçler arasında da sıralanır: kullanıcılar
+LOCK_SLOTS adet bayt aralığı kilidine (fcntl.lockf) dağıtılır. Açılış taraması
+yalnızca ilk worker tarafından yapılır; son worker kapanırken manifest yazılır.
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Mapping, MutableMapping
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:  # Windows: çok süreçli mod desteklenmez
+    fcntl = None
+from Journal import Journal
+from PasswordHasher import hash_password
+from QuotaManager import (QuotaManager, QuotaReservation, DEFAULT_QUOTA_MB, DEFAULT_SETTINGS, JOURNAL_FSYNC,
+                          _decode_cursor)
+from AuditIndex import parse_time, AuditIndex, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+STATE_BACKEND = os.environ.get("KOTA_STATE", "journal")  # "journal" (tek süreç) | "sqlite" (çok süreç)
+SHARED_DB_NAME = "kota.db"
+LOCK_SLOTS = 1024          # Süreçler arası kullanıcı kilidi sayısı (aynı dilime düşen kullanıcılar sıralanır)
+DB_TIMEOUT = 30.0          # Yazma kilidi için en fazla bekleme (saniye)
+# WAL senkronizasyonu: FULL her işlemde fsync yapar (günlükteki JOURNAL_FSYNC gibi); NORMAL daha hızlıdır
+DB_SYNC = os.environ.get("KOTA_SQLITE_SYNC", "FULL" if JOURNAL_FSYNC else "NORMAL")
+
+# Doluluk yüzdesi (UsageIndex.percent_of ile aynı); 9e999 SQLite'ta sonsuzdur (limitsiz admin)
+PERCENT_SQL = ("(CASE WHEN quota >= 9e999 THEN 0.0 WHEN quota <= 0 THEN (CASE WHEN usage > 0 THEN 9e999 ELSE 0.0 END) "
+               "ELSE usage * 100.0 / quota END)")
+ORDER_SQL = {'usage': "usage", 'limit': "quota", 'percent': PERCENT_SQL}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, quota REAL NOT NULL, usage REAL NOT NULL, pw TEXT);
+CREATE INDEX IF NOT EXISTS users_usage ON users (usage, id);
+CREATE INDEX IF NOT EXISTS users_quota ON users (quota, id);
+CREATE INDEX IF NOT EXISTS users_percent ON users ({PERCENT_SQL}, id);
+CREATE TABLE IF NOT EXISTS settings (k TEXT PRIMARY KEY, v TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, owner TEXT NOT NULL, size REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS files_owner ON files (owner);
+CREATE TABLE IF NOT EXISTS revoked (nonce TEXT PRIMARY KEY, expires INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS epochs (id TEXT PRIMARY KEY, epoch INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS workers (pid INTEGER PRIMARY KEY, started REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS audit (id INTEGER PRIMARY KEY, ts REAL NOT NULL, user TEXT, action TEXT, details TEXT);
+CREATE INDEX IF NOT EXISTS audit_user ON audit (user, id);
+CREATE INDEX IF NOT EXISTS audit_action ON audit (action, id);
+"""
+
+
+class SharedDatabase:
+    """Thread başına bir bağlantı açan ince SQLite sarmalayıcısı (autocommit + açık işlemler)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self.transaction() as db:
+            # audit tablosu yoksa mevcut system.log bir kez içe aktarılacak
+            self.audit_created = db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit'").fetchone() is None
+            for statement in SCHEMA.strip().split(';'):
+                if statement.strip(): db.execute(statement)
+        self.revoked = _Revoked(self)
+        self._startup_lock = None
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=DB_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(f"PRAGMA synchronous = {DB_SYNC}")
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE: yazma kilidi baştan alınır, okuma-sonra-yazma yarışları olmaz."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # --- WORKER KAYDI ---
+    def attach_worker(self, lock_path):
+        """Süreci worker olarak kaydeder; canlı başka worker yoksa True döner (açılış taraması gerekir).
+
+        True dönerse açılış kilidi tutulmaya devam eder ve tarama bitince
+        startup_done() çağrılmalıdır; böylece sonraki worker'lar eksik indeksle başlamaz.
+        """
+        self._startup_lock = open(lock_path, 'a+')
+        fcntl.flock(self._startup_lock, fcntl.LOCK_EX)
+        with self.transaction() as db:
+            alive = [pid for (pid,) in db.execute("SELECT pid FROM workers") if _pid_alive(pid)]
+            db.execute("DELETE FROM workers")
+            db.executemany("INSERT INTO workers VALUES (?, 0)", [(pid,) for pid in alive])
+            db.execute("INSERT OR REPLACE INTO workers VALUES (?, ?)", (os.getpid(), time.time()))
+        first = not [pid for pid in alive if pid != os.getpid()]
+        if not first: self.startup_done()
+        return first
+
+    def startup_done(self):
+        if self._startup_lock is None: return
+        fcntl.flock(self._startup_lock, fcntl.LOCK_UN)
+        self._startup_lock.close()
+        self._startup_lock = None
+
+    def detach_worker(self):
+        """Süreç kaydını siler; son worker ise True döner."""
+        with self.transaction() as db:
+            db.execute("DELETE FROM workers WHERE pid = ?", (os.getpid(),))
+            others = [pid for (pid,) in db.execute("SELECT pid FROM workers") if _pid_alive(pid)]
+        return not others
+
+
+def _pid_alive(pid):
+    try: os.kill(pid, 0)
+    except ProcessLookupError: return False
+    except PermissionError: return True
+    return True
+
+
+# --- KOTA ---
+class SharedQuotaManager(QuotaManager):
+    """QuotaManager'ın SQLite tabanlı sürümü; günlük (journal) yerine veritabanı işlemleri kullanılır.
+
+    user_quotas / passwords / settings veritabanına bakan görünümlerdir; okumalar
+    her zaman güncel değeri (diğer süreçlerin yazdıklarını) döndürür.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.db = None
+
+    def load_and_sync_data(self, project_root):
+        backend_dir = os.path.join(project_root, "backend")
+        self.file_path = os.path.join(backend_dir, "users.json")
+        self.db = SharedDatabase(os.path.join(backend_dir, SHARED_DB_NAME))
+        with self.db.transaction() as db:
+            if db.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None:
+                self._import_legacy(db)
+        self.user_quotas = _UserQuotas(self.db)
+        self.passwords = _Passwords(self.db)
+        self.settings = _Settings(self.db)
+
+    def _import_legacy(self, db):
+        """İlk açılışta users.json (+ günlük) varsa veritabanına taşır; yoksa varsayılan admin oluşturur."""
+        quotas, passwords, settings, epochs = {}, {}, dict(DEFAULT_SETTINGS), {}
+        if os.path.exists(self.file_path):
+            try:
+                with open(self.file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                quotas, passwords = data.get('quotas', {}), data.get('passwords', {})
+                settings.update(data.get('settings', {}))
+                epochs = data.get('epochs', {})
+            except Exception as e:
+                print(f"[HATA] Veritabanı okunamadı: {e}")
+        for record in Journal(self.file_path + ".journal").replay():
+            self._apply(record, quotas, passwords, settings, epochs)
+        if 'admin' not in quotas:
+            print("[Sistem] Veritabanı bulunamadı, yeni oluşturuluyor...")
+            quotas['admin'] = {'limit': float('inf'), 'usage': 0}
+            passwords['admin'] = hash_password('admin')
+        else:
+            print(f"[Sistem] {len(quotas)} kullanıcı users.json'dan ortak veritabanına taşındı.")
+        db.executemany("INSERT INTO users VALUES (?, ?, ?, ?)",
+                       [(u, q['limit'], q['usage'], passwords.get(u)) for u, q in quotas.items()])
+        db.executemany("INSERT OR REPLACE INTO settings VALUES (?, ?)",
+                       [(k, json.dumps(v)) for k, v in settings.items()])
+        db.executemany("INSERT OR REPLACE INTO epochs VALUES (?, ?)", list(epochs.items()))
+
+    def save_data(self):
+        """Veritabanı her işlemde kalıcıdır; ayrı snapshot gerekmez."""
+
+    def add_user(self, user_id, password, quota_mb=None):
+        final_quota_mb = DEFAULT_QUOTA_MB if quota_mb is None or quota_mb == "" else float(quota_mb)
+        pw_hash = self._hash_password(password)
+        self.db.execute("INSERT OR REPLACE INTO users VALUES (?, ?, 0, ?)",
+                        (user_id, final_quota_mb * self.MB, pw_hash))
+        return final_quota_mb
+
+    def reserve(self, user_id, delta_bytes):
+        if not math.isfinite(delta_bytes): return False, "HATA: Geçersiz boyut.", None
+        if user_id != "admin" and delta_bytes > 0:
+            # Kontrol ve ekleme tek ifadede: süreçler arası atomik
+            cursor = self.db.execute("UPDATE users SET usage = usage + ? WHERE id = ? AND usage + ? <= quota",
+                                     (delta_bytes, user_id, delta_bytes))
+            if cursor.rowcount: return True, "", QuotaReservation(user_id, delta_bytes)
+        row = self.db.execute("SELECT quota, usage FROM users WHERE id = ?", (user_id,)).fetchone()
+        if row is None: return False, "Kullanıcı bulunamadı.", None
+        if user_id == "admin": return True, "", QuotaReservation(user_id, 0)
+        if delta_bytes > 0:
+            limit, current_usage = row
+            remaining_mb = (limit - current_usage) / self.MB
+            return False, f"HATA: Kota aşıldı! Kalan: {remaining_mb:.2f} MB. (Gerekli: {delta_bytes/self.MB:.2f} MB)", None
+        return True, "", QuotaReservation(user_id, delta_bytes)
+
+    def commit(self, reservation, actual_delta=None, file=None):
+        # Dosya boyutları files tablosunda zaten kalıcıdır; file yalnızca arayüz uyumu için.
+        user_id = reservation.user_id
+        if user_id == "admin": return
+        final = reservation.delta if actual_delta is None else actual_delta
+        change = final - max(reservation.delta, 0)
+        if change == 0: return
+        self.db.execute("UPDATE users SET usage = MAX(0, usage + ?) WHERE id = ?", (change, user_id))
+
+    def release(self, reservation):
+        if reservation.delta > 0:
+            self.db.execute("UPDATE users SET usage = MAX(0, usage - ?) WHERE id = ?",
+                            (reservation.delta, reservation.user_id))
+
+    def reconcile_usage(self, usages):
+        with self.db.transaction() as db:
+            db.executemany("UPDATE users SET usage = ? WHERE id = ?", [(max(0, v), u) for u, v in usages.items()])
+
+    def set_quota(self, target_user_id, new_quota_mb):
+        try:
+            limit_bytes = float(new_quota_mb) * self.MB
+        except ValueError:
+            return False, "HATA: Geçersiz kota değeri."
+        cursor = self.db.execute("UPDATE users SET quota = ? WHERE id = ?", (limit_bytes, target_user_id))
+        if not cursor.rowcount: return False, f"HATA: Kullanıcı {target_user_id} bulunamadı."
+        return True, f"BAŞARILI: {target_user_id} kotası {new_quota_mb} MB yapıldı."
+
+    def delete_user_data(self, user_id):
+        with self.db.transaction() as db:
+            db.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            db.execute("INSERT INTO epochs VALUES (?, 1) ON CONFLICT (id) DO UPDATE SET epoch = epoch + 1",
+                       (user_id,))
+        self._login_cache.pop(user_id, None)
+
+    def token_epoch(self, user_id):
+        # Varlık ve kuşak tek sorguda (her istekte çağrılır)
+        row = self.db.execute("SELECT (SELECT epoch FROM epochs WHERE id = users.id) FROM users WHERE id = ?",
+                              (user_id,)).fetchone()
+        if row is None: return None
+        return row[0] or 0
+
+    def usage_page(self, order='usage', descending=True, limit=50, cursor=None, prefix=None, min_percent=None):
+        """UsageIndex.page'in SQL karşılığı: users tablosundaki indekslerle anahtar-tabanlı sayfalama."""
+        key = _decode_cursor(cursor)
+        expr = ORDER_SQL.get(order)
+        columns = "id, usage, quota" + (f", {expr}" if expr else "")
+        clauses, params = [], []
+        if prefix:
+            clauses.append("id >= ? AND id < ?")
+            params += [prefix, prefix + "\U0010ffff"]
+        if min_percent is not None:
+            clauses.append(f"{PERCENT_SQL} >= ?")
+            params.append(min_percent)
+        op = "<" if descending else ">"
+        if key and expr:
+            clauses.append(f"({expr}, id) {op} (?, ?)")
+            params += key[:2]
+        elif key:
+            clauses.append(f"id {op} ?")
+            params.append(key[0])
+        direction = "DESC" if descending else "ASC"
+        order_by = f"{expr} {direction}, id {direction}" if expr else f"id {direction}"
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # Eşik diğer sıralarda da yüzde indeksinden aralık olarak okunur (yalnızca eşleşenler sıralanır);
+        # planlayıcı aksi halde sıralama indeksini baştan sona tarayıp her satırı süzer.
+        source = "users INDEXED BY users_percent" if min_percent is not None and order != 'percent' and not prefix \
+            else "users"
+        rows = self.db.execute(f"SELECT {columns} FROM {source} {where} ORDER BY {order_by} LIMIT ?",
+                               params + [limit + 1]).fetchall()
+        if len(rows) <= limit: return [row[:3] for row in rows], None
+        last = rows[limit - 1]
+        return [row[:3] for row in rows[:limit]], json.dumps([last[3], last[0]] if expr else [last[0]], separators=(',', ':'))
+
+
+class _UserQuotas(Mapping):
+    """user_id -> {'limit', 'usage'} (salt okunur; değişiklikler QuotaManager metotlarıyla yapılır)."""
+
+    def __init__(self, db): self._db = db
+
+    def __getitem__(self, user_id):
+        row = self._db.execute("SELECT quota, usage FROM users WHERE id = ?", (user_id,)).fetchone()
+        if row is None: raise KeyError(user_id)
+        return {'limit': row[0], 'usage': row[1]}
+
+    def __contains__(self, user_id):
+        return self._db.execute("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone() is not None
+
+    def __iter__(self):
+        return iter([u for (u,) in self._db.execute("SELECT id FROM users ORDER BY rowid")])
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+class _Passwords(MutableMapping):
+    def __init__(self, db): self._db = db
+
+    def __getitem__(self, user_id):
+        row = self._db.execute("SELECT pw FROM users WHERE id = ?", (user_id,)).fetchone()
+        if row is None or row[0] is None: raise KeyError(user_id)
+        return row[0]
+
+    def __setitem__(self, user_id, value):
+        self._db.execute("UPDATE users SET pw = ? WHERE id = ?", (value, user_id))
+
+    def __delitem__(self, user_id):
+        self._db.execute("UPDATE users SET pw = NULL WHERE id = ?", (user_id,))
+
+    def __iter__(self):
+        return iter([u for (u,) in self._db.execute("SELECT id FROM users WHERE pw IS NOT NULL")])
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM users WHERE pw IS NOT NULL").fetchone()[0]
+
+
+class _Settings(MutableMapping):
+    """Sistem ayarları; değerler JSON olarak saklanır."""
+
+    def __init__(self, db): self._db = db
+
+    def __getitem__(self, key):
+        row = self._db.execute("SELECT v FROM settings WHERE k = ?", (key,)).fetchone()
+        if row is None: raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO settings VALUES (?, ?)", (key, json.dumps(value)))
+
+    def __delitem__(self, key):
+        self._db.execute("DELETE FROM settings WHERE k = ?", (key,))
+
+    def __iter__(self):
+        return iter([k for (k,) in self._db.execute("SELECT k FROM settings")])
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM settings").fetchone()[0]
+
+
+class _Revoked(MutableMapping):
+    """SessionManager için iptal edilmiş oturum nonce'ları (nonce -> bitiş zamanı)."""
+
+    def __init__(self, db): self._db = db
+
+    def __getitem__(self, nonce):
+        row = self._db.execute("SELECT expires FROM revoked WHERE nonce = ?", (nonce,)).fetchone()
+        if row is None: raise KeyError(nonce)
+        return row[0]
+
+    def __setitem__(self, nonce, expires):
+        self._db.execute("INSERT OR REPLACE INTO revoked VALUES (?, ?)", (nonce, expires))
+
+    def __delitem__(self, nonce):
+        self._db.execute("DELETE FROM revoked WHERE nonce = ?", (nonce,))
+
+    def __iter__(self):
+        return iter([n for (n,) in self._db.execute("SELECT nonce FROM revoked")])
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM revoked").fetchone()[0]
+
+    def items(self):
+        return list(self._db.execute("SELECT nonce, expires FROM revoked"))
+
+
+class SharedHomeDirs(MutableMapping):
+    """user_id -> '/home/<id>/' (admin hariç); kayıtlı kullanıcılardan türetilir, yazmalar yok sayılır."""
+
+    def __init__(self, db): self._db = db
+
+    def __getitem__(self, user_id):
+        if user_id == "admin" or user_id not in _UserQuotas(self._db): raise KeyError(user_id)
+        return f"/home/{user_id}/"
+
+    def __setitem__(self, user_id, value): pass
+    def __delitem__(self, user_id): pass
+
+    def __iter__(self):
+        return iter([u for (u,) in self._db.execute("SELECT id FROM users WHERE id != 'admin' ORDER BY rowid")])
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM users WHERE id != 'admin'").fetchone()[0]
+
+
+# --- DOSYA İNDEKSİ ---
+class SharedFileIndex:
+    """FileIndex ile aynı arayüz; kayıtlar files tablosunda tutulur.
+
+    Döndürülen metadata sözlükleri kopyadır; boyut değişiklikleri set_size() ile yazılır.
+    """
+
+    def __init__(self, db): self._db = db
+
+    def __contains__(self, path):
+        return self._db.execute("SELECT 1 FROM files WHERE path = ?", (path,)).fetchone() is not None
+
+    def __getitem__(self, path):
+        info = self.get(path)
+        if info is None: raise KeyError(path)
+        return info
+
+    def __setitem__(self, path, info):
+        self._db.execute("INSERT INTO files VALUES (?, ?, ?) ON CONFLICT (path) DO UPDATE "
+                         "SET owner = excluded.owner, size = excluded.size", (path, info['owner'], info['size']))
+
+    def __delitem__(self, path):
+        if not self._db.execute("DELETE FROM files WHERE path = ?", (path,)).rowcount: raise KeyError(path)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def get(self, path, default=None):
+        row = self._db.execute("SELECT owner, size FROM files WHERE path = ?", (path,)).fetchone()
+        return default if row is None else {'owner': row[0], 'size': row[1]}
+
+    def set_size(self, path, size):
+        self._db.execute("UPDATE files SET size = ? WHERE path = ?", (size, path))
+
+    def files_of(self, owner):
+        rows = self._db.execute("SELECT path, size FROM files WHERE owner = ? ORDER BY rowid", (owner,))
+        return {path: {'owner': owner, 'size': size} for path, size in rows}
+
+    def drop_owner(self, owner):
+        with self._db.transaction() as db:
+            rows = db.execute("SELECT path, size FROM files WHERE owner = ? ORDER BY rowid", (owner,)).fetchall()
+            db.execute("DELETE FROM files WHERE owner = ?", (owner,))
+        return {path: {'owner': owner, 'size': size} for path, size in rows}
+
+    def owners(self):
+        return [owner for (owner,) in self._db.execute("SELECT DISTINCT owner FROM files")]
+
+    def items(self):
+        for path, owner, size in self._db.execute("SELECT path, owner, size FROM files ORDER BY owner, rowid"):
+            yield path, {'owner': owner, 'size': size}
+
+    def load(self, entries):
+        with self._db.transaction() as db:
+            db.execute("DELETE FROM files")
+            db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                           [(path, info['owner'], info['size']) for path, info in entries])
+
+
+# --- DENETİM İNDEKSİ ---
+class SharedAuditIndex:
+    """AuditIndex ile aynı arayüz; kayıtlar audit tablosunda, (user, id) ve (action, id) indeksleriyle."""
+
+    def __init__(self, db):
+        self._db = db
+        self.created = db.audit_created
+
+    def add_batch(self, entries):
+        if not entries: return
+        with self._db.transaction() as db:
+            db.executemany("INSERT INTO audit (ts, user, action, details) VALUES (?, ?, ?, ?)",
+                           [(e['ts'], e['user'], e['action'], e['details']) for e in entries])
+
+    def import_log(self, path, batch_size=10000):
+        return AuditIndex.import_log(self, path, batch_size)
+
+    _parse_line = staticmethod(AuditIndex._parse_line)
+
+    def query(self, user_id=None, action=None, since=None, until=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        since, until = parse_time(since), parse_time(until)
+        limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+        clauses, params = [], []
+        for clause, value in (("user = ?", user_id), ("action = ?", action), ("ts >= ?", since),
+                              ("ts <= ?", until), ("id < ?", int(cursor) if cursor else None)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._db.execute(f"SELECT id, ts, user, action, details FROM audit {where} "
+                                f"ORDER BY id DESC LIMIT ?", params + [limit + 1]).fetchall()
+        entries = [AuditIndex._present({'ts': ts, 'user': user, 'action': act, 'details': details})
+                   for _, ts, user, act, details in rows[:limit]]
+        next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return {'entries': entries, 'next_cursor': next_cursor}
+
+    def close(self):
+        pass
+
+
+# --- SÜREÇLER ARASI KİLİTLER ---
+class ProcessLocks:
+    """Kullanıcıları LOCK_SLOTS dilime dağıtan, süreçler arası geçerli yeniden girilebilir kilitler.
+
+    Her dilim bir thread kilidi (süreç içi) ve kilit dosyasındaki bir baytlık
+    fcntl kaydı kilidinden (süreçler arası) oluşur. POSIX kayıt kilitleri süreç
+    başına olduğundan aynı dilimi süreç içinde önce thread kilidi sıralar.
+    """
+
+    def __init__(self, path, slots=LOCK_SLOTS):
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._slots = [_SlotLock(self._fd, i) for i in range(slots)]
+
+    def get(self, user_id):
+        # Python'un hash()'i süreçler arasında farklıdır; sabit bir özet kullanılır.
+        return self._slots[zlib.crc32(user_id.encode('utf-8')) % len(self._slots)]
+
+    def all(self):
+        """Tüm dilimler, her süreçte aynı sırada (kilitlenme olmaz)."""
+        return list(self._slots)
+
+
+class _SlotLock:
+    __slots__ = ('_fd', '_slot', '_lock', '_depth')
+
+    def __init__(self, fd, slot):
+        self._fd, self._slot = fd, slot
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, self._slot)
+            except BaseException:
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self._slot)
+        self._lock.release()
+
+
+def make_quota_manager(backend=STATE_BACKEND):
+    if backend == "sqlite":
+        if fcntl is None: raise RuntimeError("KOTA_STATE=sqlite yalnızca POSIX sistemlerde desteklenir.")
+        return SharedQuotaManager()
+    return QuotaManager()
@@ -0,0 +1,147 @@
+# backend/Snapshots.py
+"""Kullanıcı ev dizinlerinin anlık görüntüleri (snapshot).
+
+Her görüntü backend/snapshots/<kullanıcı>/<görüntü_id>/ dizinidir: dosyalar ve
+dosya başına boyut/mtime ile o anki kota durumunu tutan manifest.json. Dosyalar
+kopyalanmaz; ev dizinindeki dosyaya sabit bağlantı (hardlink) verilir. Ev
+dizininde yerinde yapılan her değişiklik önce bağlantıyı kopardığından
+(Storage.break_link) görüntüdeki dosya değişmez.
+
+Boyutu ve mtime'ı önceki görüntüdekiyle aynı olan dosyalar doğrudan önceki
+görüntüdeki dosyaya bağlanır; sabit bağlantı kurulamayan dosya sistemlerinde
+yalnızca değişen dosyalar kopyalanır. Görüntü maliyeti toplam veriyle değil
+değişen veriyle ölçeklenir.
+"""
+import datetime
+import json
+import os
+import shutil
+
+from Journal import atomic_write_json
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _link_or_copy(source, target):
+    """Sabit bağlantı kurar; dosya sistemi desteklemiyorsa kopyalar. Kopyalanan bayt sayısını döndürür."""
+    try:
+        os.link(source, target)
+        return 0
+    except OSError:
+        shutil.copy2(source, target)
+        return os.path.getsize(target)
+
+
+def _valid_name(name):
+    """Kullanıcı ve görüntü kimlikleri tek bir dizin adı olmalıdır (dizin dışına çıkılamaz)."""
+    return bool(name) and not name.startswith('.') and os.sep not in name and (os.altsep or os.sep) not in name
+
+
+class SnapshotStore:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _user_dir(self, user_id):
+        return os.path.join(self.directory, user_id)
+
+    def path(self, user_id, snapshot_id):
+        return os.path.join(self._user_dir(user_id), snapshot_id)
+
+    def ids(self, user_id):
+        """Tamamlanmış görüntülerin kimlikleri (eskiden yeniye)."""
+        if not _valid_name(user_id): return []
+        try: names = os.listdir(self._user_dir(user_id))
+        except FileNotFoundError: return []
+        return sorted(name for name in names if not name.startswith('.'))
+
+    def load(self, user_id, snapshot_id):
+        """Görüntünün manifestini döndürür; yoksa (ya da kimlik geçersizse) None."""
+        if not (_valid_name(user_id) and _valid_name(snapshot_id)): return None
+        try:
+            with open(os.path.join(self.path(user_id, snapshot_id), MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _new_id(self, user_id):
+        base = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        snapshot_id, n = base, 1
+        while os.path.exists(self.path(user_id, snapshot_id)):
+            n += 1
+            snapshot_id = f"{base}-{n}"
+        return snapshot_id
+
+    def create(self, user_id, home_dir, sizes, quota, meta=None):
+        """home_dir'deki dosyaların görüntüsünü alır ve manifesti döndürür.
+
+        sizes: dosya adı -> ücretlendirilen boyut (dosya indeksinden); quota: {'limit', 'usage'}.
+        Görüntü gizli bir geçici dizinde kurulur ve ancak tamamlanınca yeniden adlandırılır;
+        yarıda kalan görüntüler listelenmez ve bir sonraki görüntüde temizlenir.
+        """
+        user_dir = self._user_dir(user_id)
+        os.makedirs(user_dir, exist_ok=True)
+        for name in os.listdir(user_dir):
+            if name.startswith('.'): shutil.rmtree(os.path.join(user_dir, name), ignore_errors=True)
+
+        previous_id = (self.ids(user_id) or [None])[-1]
+        previous = self.load(user_id, previous_id) if previous_id else None
+        previous_files = previous['files'] if previous else {}
+        snapshot_id = self._new_id(user_id)
+        work_dir = os.path.join(user_dir, f".{snapshot_id}.tmp")
+        os.makedirs(work_dir)
+
+        files = {}
+        stats = {'unchanged': 0, 'changed': 0, 'changed_bytes': 0, 'copied_bytes': 0}
+        try:
+            for name, size in sizes.items():
+                source = os.path.join(home_dir, name)
+                try: st = os.stat(source)
+                except FileNotFoundError: continue
+                old = previous_files.get(name)
+                if old and old['bytes'] == st.st_size and old['mtime'] == st.st_mtime_ns:
+                    # Değişmemiş: önceki (değişmez) görüntüdeki dosya paylaşılır.
+                    source = os.path.join(self.path(user_id, previous_id), name)
+                    stats['unchanged'] += 1
+                else:
+                    stats['changed'] += 1
+                    stats['changed_bytes'] += st.st_size
+                stats['copied_bytes'] += _link_or_copy(source, os.path.join(work_dir, name))
+                files[name] = {'size': size, 'bytes': st.st_size, 'mtime': st.st_mtime_ns}
+            manifest = {'id': snapshot_id, 'user': user_id, 'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                        'previous': previous_id, 'quota': quota, 'files': files, 'stats': stats, **(meta or {})}
+            atomic_write_json(os.path.join(work_dir, MANIFEST_NAME), manifest)
+            os.rename(work_dir, self.path(user_id, snapshot_id))
+        except Exception:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        return manifest
+
+    def restore_files(self, user_id, snapshot_id, home_dir, names):
+        """Görüntüdeki dosyaları ev dizinine bağlar (her dosya atomik olarak yerine geçer)."""
+        snapshot_dir = self.path(user_id, snapshot_id)
+        os.makedirs(home_dir, exist_ok=True)
+        copied = 0
+        for name in names:
+            tmp_path = os.path.join(home_dir, f".{name}.restore")
+            try:
+                copied += _link_or_copy(os.path.join(snapshot_dir, name), tmp_path)
+                os.replace(tmp_path, os.path.join(home_dir, name))
+            except Exception:
+                try: os.remove(tmp_path)
+                except OSError: pass
+                raise
+        return copied
+
+    def unique_bytes(self, user_id, snapshot_id, manifest):
+        """Yalnızca bu görüntüde bulunan (başka hiçbir yere bağlı olmayan) dosyaların boyutu."""
+        total = 0
+        for name in manifest['files']:
+            try: st = os.stat(os.path.join(self.path(user_id, snapshot_id), name))
+            except OSError: continue
+            if st.st_nlink == 1: total += st.st_size
+        return total
+
+    def delete(self, user_id, snapshot_id):
+        if self.load(user_id, snapshot_id) is None: return False
+        shutil.rmtree(self.path(user_id, snapshot_id))
+        return True
@@ -0,0 +1,806 @@
+# backend/Storage.py
+"""Dosya içeriklerinin fiziksel olarak saklanma biçimi (depolama motorları).
+
+FileSystem mantıksal yolları <kullanıcı>_home altındaki fiziksel yollara çevirir;
+o yoldaki baytların nasıl yazılıp okunacağına motor karar verir:
+  "plain" : her dosya kendi fiziksel dosyasıdır (varsayılan, eski davranış).
+  "dedup" : içerik sabit boyutlu parçalara (chunk) bölünür, her parça özetiyle
+            (SHA-256) bir kez saklanır ve referans sayılır; fiziksel yolda yalnızca
+            parça listesi (manifest) durur.
+  "compress": içerik bağımsız çözülebilen sıkıştırılmış çerçeveler (frame) halinde
+            saklanır; her ekleme yeni bir çerçeve ekler.
+
+Yazma metotları (create/append/replace/truncate) saklanan bayt sayısını döndürür
+(append: eklenen, diğerleri: dosyanın yeni boyutu); kota "stored" kipindeyken
+ücretlendirme bu değerle yapılır.
+
+Anlık görüntüler (snapshot) ve geri alma yedekleri (backup) dosyaları sabit
+bağlantı (hardlink) ile paylaşır. Bu yüzden bir dosyayı yerinde değiştiren her
+yol önce break_link() ile bağlantıyı koparır; replace ve compact zaten geçici
+dosya + os.replace ile yeni inode yazar.
+
+Düz motorda eklemeler açık tanıtıcı önbelleğinden (HandleCache.AppendCache) geçer
+ve tamponlanabilir. Dosyayı okuyan, değiştiren ya da silen her motor metodu önce
+o dosyanın tamponunu yazar; dosyalara motor dışından erişenler (anlık görüntü,
+manifest, du) önce flush() çağırır.
+"""
+import hashlib
+import io
+import json
+import lzma
+import os
+import struct
+import shutil
+import threading
+import time
+import uuid
+import zlib
+from bisect import bisect_right
+
+from Journal import Journal, atomic_write_json
+from HandleCache import AppendCache, HANDLE_CACHE_SIZE
+
+STORAGE_ENGINE = os.environ.get("KOTA_STORAGE", "plain")  # "plain" | "dedup" | "compress"
+# create_file'ın diskte yer ayırma biçimi:
+#   "simulate"  : yalnızca açıklama satırı yazılır (eski davranış)
+#   "sparse"    : dosya istenen boyuta truncate edilir (seyrek dosya, blok ayrılmaz)
+#   "fallocate" : os.posix_fallocate ile bloklar gerçekten ayrılır (desteklenmiyorsa sparse)
+PREALLOC_MODE = os.environ.get("KOTA_PREALLOC", "simulate")
+DEDUP_CHUNK_SIZE = 64 * 1024          # Parça boyutu (yeni dosyalar için; manifestte saklanır)
+DEDUP_MAGIC = b"KOTA-DEDUP 1\n"       # Manifest dosyalarının ilk satırı
+DEDUP_GC_GRACE = 30.0                 # Referansı sıfırlanan parça en erken bu kadar saniye sonra silinir
+DEDUP_COMPACT_EVERY = 10000           # Bu kadar referans kaydından sonra refcounts.json yeniden yazılır
+COMPRESS_CODEC = os.environ.get("KOTA_COMPRESS_CODEC", "zlib")  # "zlib" | "lzma"
+COMPRESS_LEVEL = 6
+FRAME_SIZE = 256 * 1024               # Bir çerçevedeki en fazla ham bayt (okuma belleği bununla sınırlı)
+FRAME_MAGIC = b"KOTA-FRAMES 1\n"      # Sıkıştırılmış dosyaların ilk satırı
+FRAME_HEADER = struct.Struct('>BII')  # codec, ham uzunluk, saklanan uzunluk
+COMPACT_MIN_FRAMES = 8                # Daha az çerçeveli dosyalar birleştirilmez
+
+
+def simulated_content(size_mb):
+    return f"Bu dosya {size_mb} MB (simülasyon).".encode('utf-8')
+
+
+class PlainStorage:
+    """Her mantıksal dosya için tek bir fiziksel dosya."""
+    name = "plain"
+    handles = None  # Ekleme tanıtıcısı önbelleği (AppendCache); diğer motorlarda yok
+
+    def __init__(self, handles=None):
+        self.handles = handles
+
+    def _settle(self, physical_path):
+        """Önbellekteki tamponu yazıp tanıtıcıyı kapatır (dosya değiştirilmeden ya da silinmeden önce)."""
+        if self.handles is not None: self.handles.drop(physical_path)
+
+    def flush(self, physical_dir_path=None):
+        """Dizindeki (verilmezse tüm) ekleme tamponlarını yazar ve tanıtıcıları kapatır."""
+        if self.handles is None: return
+        if physical_dir_path is None: self.handles.drop_all()
+        else: self.handles.drop_dir(physical_dir_path)
+
+    def create(self, physical_path, size_mb, size_bytes):
+        """Dosyayı PREALLOC_MODE'a göre oluşturur; sparse/fallocate sabit zamanlı metadata işlemidir."""
+        self._settle(physical_path)
+        if is_linked(physical_path):
+            os.remove(physical_path)  # Aynı yoldaki eski dosya bir anlık görüntüyle paylaşılıyor; o kopya korunur
+        if PREALLOC_MODE == "simulate":
+            data = simulated_content(size_mb)
+            with open(physical_path, 'wb') as f:
+                f.write(data)
+            return len(data)
+        size_bytes = int(size_bytes)
+        with open(physical_path, 'wb') as f:
+            if PREALLOC_MODE == "fallocate" and size_bytes > 0 and hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, size_bytes)
+                    return size_bytes
+                except OSError:
+                    pass  # Dosya sistemi desteklemiyor: seyrek dosyaya düş
+            f.truncate(size_bytes)
+        return size_bytes
+
+    def append(self, physical_path, data, durable=False):
+        """Veriyi ekler; durable=True ise dönmeden önce diske yazılır (fsync)."""
+        if self.handles is not None:
+            self.handles.append(physical_path, data, durable)
+            return len(data)
+        break_link(physical_path)
+        with open(physical_path, 'ab') as f:
+            start = f.tell()
+            try:
+                f.write(data)
+                f.flush()
+                if durable: os.fsync(f.fileno())
+            except Exception:
+                # Yarım kalan eklemeyi geri al
+                f.truncate(start)
+                raise
+        return len(data)
+
+    def replace(self, physical_path, data):
+        # Yeni içerik geçici dosyaya yazılıp yerine taşınır; hata olursa eski içerik bozulmaz.
+        self._settle(physical_path)
+        tmp_path = _tmp_path(physical_path)
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, physical_path)
+        except Exception:
+            try: os.remove(tmp_path)
+            except OSError: pass
+            raise
+        return len(data)
+
+    def truncate(self, physical_path):
+        self._settle(physical_path)
+        if is_linked(physical_path):
+            # Paylaşılan inode'u boşaltmak anlık görüntüyü de boşaltırdı; yerine boş bir dosya konur.
+            return PlainStorage.replace(self, physical_path, b"")
+        with open(physical_path, 'wb'):
+            pass
+        return 0
+
+    def open_binary(self, physical_path):
+        """Okuma için ikili, seek edilebilir bir dosya nesnesi döndürür."""
+        if self.handles is not None: self.handles.flush(physical_path)
+        return open(physical_path, 'rb')
+
+    def remove(self, physical_path):
+        self._settle(physical_path)
+        os.remove(physical_path)
+
+    def remove_tree(self, physical_dir_path):
+        if self.handles is not None: self.handles.drop_dir(physical_dir_path, discard=True)
+        shutil.rmtree(physical_dir_path)
+
+    def detach(self, physical_path, target_path):
+        """Dosyayı ya da dizini silinmek üzere target_path'e taşır (Reclaimer); tamponlar yazılmaz."""
+        if self.handles is not None:
+            if os.path.isdir(physical_path): self.handles.drop_dir(physical_path, discard=True)
+            else: self.handles.drop(physical_path, discard=True)
+        os.rename(physical_path, target_path)
+
+    def backup(self, physical_path, backup_path):
+        """Dosyanın şu anki halini backup_path'e sabit bağlantıyla saklar (geri alma için).
+
+        Sonraki değişiklikler bağlantıyı kopardığından yedek değişmez; yedek remove() ile silinir.
+        """
+        self._settle(physical_path)
+        try:
+            os.link(physical_path, backup_path)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            shutil.copy2(physical_path, backup_path)
+
+    def restore_backup(self, backup_path, physical_path):
+        """backup() ile saklanan hali dosyanın yerine koyar (atomik)."""
+        self._settle(physical_path)
+        os.replace(backup_path, physical_path)
+
+    def reclaim(self, physical_paths):
+        """Çöp kutusundaki dosyaları siler; serbest kalan (mantıksal) bayt sayısını döndürür."""
+        freed = 0
+        for physical_path in physical_paths:
+            try:
+                freed += os.lstat(physical_path).st_size
+                os.remove(physical_path)
+            except FileNotFoundError:
+                pass
+        return freed
+
+    def sizes(self, physical_path, st=None):
+        """Dosyanın (mantıksal, saklanan) boyutu; st verilirse yeniden stat edilmez."""
+        if self.handles is not None and st is None: self.handles.flush(physical_path)
+        size = (st or os.stat(physical_path)).st_size
+        return size, size
+
+    def compact(self, physical_path):
+        """Küçük parçaları birleştirir; gerek yoksa None, aksi halde yeni saklanan boyutu döndürür."""
+        return None
+
+    def report(self):
+        return None
+
+    def close(self):
+        if self.handles is not None: self.handles.close()
+
+
+class DedupStorage(PlainStorage):
+    """İçerik adresli, tekilleştirilmiş parça deposu.
+
+    Parçalar <kök>/objects/ab/abcdef... altında durur. Referans sayıları
+    refcounts.json (snapshot) + refcounts.json.journal (günlük) ile kalıcıdır.
+    Sırası: yeni parçalar yazılıp referansları kalıcı hale gelir, sonra manifest
+    atomik olarak değiştirilir, en son eski parçaların referansı düşülür. Çökme
+    yalnızca fazla sayılmış (sızan) referans bırakabilir; gc(manifest_paths)
+    sayıları manifestlerden yeniden kurar.
+    Manifest olmayan (motor değiştirilmeden önce yazılmış) dosyalar düz dosya
+    olarak okunur; üzerine yazıldığında manifest biçimine geçer.
+    """
+    name = "dedup"
+
+    def __init__(self, directory, chunk_size=DEDUP_CHUNK_SIZE):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        self.chunk_size = chunk_size
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._refs = {}      # özet -> [referans sayısı, parça boyutu]
+        self._zero = {}      # referansı sıfırlanan özet -> sıfırlandığı an (monotonic)
+        self._last_gc = time.monotonic()
+
+        snapshot_path = os.path.join(directory, "refcounts.json")
+        self._snapshot_path = snapshot_path
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                self._refs = {h: list(v) for h, v in json.load(f).items()}
+        self.journal = Journal(snapshot_path + ".journal")
+        for record in self.journal.replay():
+            self._refs[record['h']] = [record['r'], record['n']]
+        now = time.monotonic()
+        for digest, (count, _) in list(self._refs.items()):
+            if count <= 0: self._zero[digest] = now
+        self.journal.open()
+
+    # --- PARÇALAR ---
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _put(self, chunk, count=1):
+        """Parçayı saklar (yoksa) ve referansını count kadar artırır. Dönüş: (özet, günlük sıra no)."""
+        digest = hashlib.sha256(chunk).hexdigest()
+        with self._lock:
+            entry = self._refs.get(digest)
+            if entry is not None and entry[0] > 0:
+                entry[0] += count
+                return digest, self._log(digest, entry)
+        # Yeni parça: kilit dışında geçici dosyaya yaz, kilit altında yerine koy
+        object_path = self._object_path(digest)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        tmp_path = os.path.join(self.objects_dir, f"tmp-{uuid.uuid4().hex}")
+        with open(tmp_path, 'wb') as f:
+            f.write(chunk)
+        with self._lock:
+            entry = self._refs.get(digest)
+            if entry is not None and (entry[0] > 0 or os.path.exists(object_path)):
+                os.remove(tmp_path)
+                entry[0] += count
+            else:
+                os.replace(tmp_path, object_path)
+                entry = self._refs[digest] = [count, len(chunk)]
+            self._zero.pop(digest, None)
+            return digest, self._log(digest, entry)
+
+    def _release(self, digests):
+        """Referansları düşürür; sıfırlananlar bekleme süresi sonunda gc ile silinir."""
+        seq = 0
+        now = time.monotonic()
+        drops = {}
+        for digest in digests:
+            drops[digest] = drops.get(digest, 0) + 1
+        with self._lock:
+            for digest, count in drops.items():
+                entry = self._refs.get(digest)
+                if entry is None or entry[0] <= 0: continue
+                entry[0] = max(0, entry[0] - count)
+                if entry[0] == 0: self._zero[digest] = now
+                seq = self._log(digest, entry)
+        self._commit(seq)
+        if now - self._last_gc >= DEDUP_GC_GRACE:
+            self.collect(DEDUP_GC_GRACE)
+
+    def _retain(self, digests):
+        """Saklı parçaların referansını artırır (aynı manifestin ikinci kopyası için)."""
+        seq = 0
+        with self._lock:
+            for digest in digests:
+                entry = self._refs[digest]
+                entry[0] += 1
+                self._zero.pop(digest, None)
+                seq = self._log(digest, entry)
+        self._commit(seq)
+
+    def _log(self, digest, entry):
+        return self.journal.append({'h': digest, 'r': entry[0], 'n': entry[1]})
+
+    def _commit(self, seq):
+        if not seq: return
+        self.journal.commit(seq)
+        if self.journal.record_count >= DEDUP_COMPACT_EVERY:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        def write_snapshot():
+            # Günlük kilidi tutulurken depo kilidi alınmaz (_put ters sırayla alır).
+            # Kayıtlar mutlak değer taşıdığından eşzamanlı bir değişiklik sonradan tekrar uygulanabilir.
+            refs = {h: list(v) for h, v in dict(self._refs).items() if v[0] > 0 or h in self._zero}
+            atomic_write_json(self._snapshot_path, refs, separators=(',', ':'))
+        self.journal.checkpoint(write_snapshot)
+
+    def _read_chunk(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return f.read()
+
+    def _store(self, data):
+        """Veriyi parçalara bölüp saklar; hata olursa eklenen referansları geri alır."""
+        digests, seq = [], 0
+        try:
+            for i in range(0, len(data), self.chunk_size):
+                digest, seq = self._put(data[i:i + self.chunk_size])
+                digests.append(digest)
+        except Exception:
+            self._release(digests)
+            raise
+        self._commit(seq)
+        return digests
+
+    def collect(self, grace=0.0):
+        """Referansı en az grace saniyedir sıfır olan parçaları siler. Dönüş: silinen parça sayısı."""
+        now = time.monotonic()
+        removed = 0
+        with self._lock:
+            self._last_gc = now
+            for digest, since in list(self._zero.items()):
+                if now - since < grace: continue
+                entry = self._refs.get(digest)
+                del self._zero[digest]
+                if entry is None or entry[0] > 0: continue
+                try: os.remove(self._object_path(digest))
+                except FileNotFoundError: pass
+                del self._refs[digest]
+                removed += 1
+        return removed
+
+    def gc(self, manifest_paths):
+        """Tam çöp toplama: referansları verilen manifestlerden yeniden sayar, sahipsiz parçaları siler."""
+        counts = {}
+        for path in manifest_paths:
+            manifest = self._read_manifest(path)
+            if manifest is None: continue
+            for digest in manifest['chunks']:
+                counts[digest] = counts.get(digest, 0) + 1
+        removed = 0
+        with self._lock:
+            on_disk = {}
+            for sub in os.listdir(self.objects_dir):
+                sub_dir = os.path.join(self.objects_dir, sub)
+                if sub.startswith("tmp-"):
+                    os.remove(sub_dir)
+                    continue
+                for digest in os.listdir(sub_dir):
+                    on_disk[digest] = os.path.getsize(os.path.join(sub_dir, digest))
+            for digest, size in on_disk.items():
+                if digest not in counts:
+                    os.remove(self._object_path(digest))
+                    removed += 1
+            self._refs = {h: [c, on_disk[h]] for h, c in counts.items() if h in on_disk}
+            self._zero = {}
+        self._checkpoint()
+        return removed
+
+    # --- MANİFESTLER ---
+    def _read_manifest(self, physical_path):
+        """Manifesti okur; dosya manifest değilse (düz dosya) None döner."""
+        with open(physical_path, 'rb') as f:
+            if f.read(len(DEDUP_MAGIC)) != DEDUP_MAGIC: return None
+            return json.loads(f.read())
+
+    def _write_manifest(self, physical_path, size, digests, chunk_size=None):
+        manifest = {'size': size, 'chunk': chunk_size or self.chunk_size, 'chunks': digests}
+        data = DEDUP_MAGIC + json.dumps(manifest, separators=(',', ':')).encode('utf-8')
+        PlainStorage.replace(self, physical_path, data)
+
+    def _set_content(self, physical_path, data, old):
+        digests = self._store(data)
+        try:
+            self._write_manifest(physical_path, len(data), digests)
+        except Exception:
+            self._release(digests)
+            raise
+        if old: self._release(old['chunks'])
+        return len(data)
+
+    # --- MOTOR ARAYÜZÜ ---
+    def create(self, physical_path, size_mb, size_bytes):
+        old = self._existing(physical_path)
+        if PREALLOC_MODE == "simulate":
+            return self._set_content(physical_path, simulated_content(size_mb), old)
+        # Ön ayırma sıfırlardan oluşur: tam boy sıfır parçası bir kez saklanıp tekrar referanslanır.
+        size_bytes = int(size_bytes)
+        full, rest = divmod(size_bytes, self.chunk_size)
+        digests, seq = [], 0
+        try:
+            if full:
+                digest, seq = self._put(bytes(self.chunk_size), count=full)
+                digests += [digest] * full
+            if rest:
+                digest, seq = self._put(bytes(rest))
+                digests.append(digest)
+            self._commit(seq)
+            self._write_manifest(physical_path, size_bytes, digests)
+        except Exception:
+            self._release(digests)
+            raise
+        if old: self._release(old['chunks'])
+        return size_bytes
+
+    def append(self, physical_path, data, durable=False):
+        manifest = self._read_manifest(physical_path)
+        if manifest is None:
+            return PlainStorage.append(self, physical_path, data, durable)
+        chunk_size = manifest.get('chunk', self.chunk_size)
+        digests = list(manifest['chunks'])
+        tail, replaced = b"", None
+        if manifest['size'] % chunk_size and digests:
+            # Yarım son parça yeni veriyle birleştirilip yeniden yazılır
+            replaced = digests.pop()
+            tail = self._read_chunk(replaced)
+        merged = tail + data
+        new, seq = [], 0
+        try:
+            for i in range(0, len(merged), chunk_size):
+                digest, seq = self._put(merged[i:i + chunk_size])
+                new.append(digest)
+            self._commit(seq)
+            self._write_manifest(physical_path, manifest['size'] + len(data), digests + new, chunk_size)
+        except Exception:
+            self._release(new)
+            raise
+        if replaced: self._release([replaced])
+        if durable:
+            for digest in new: _fsync_path(self._object_path(digest))
+            _fsync_path(physical_path)
+        return len(data)
+
+    def replace(self, physical_path, data):
+        return self._set_content(physical_path, data, self._existing(physical_path))
+
+    def truncate(self, physical_path):
+        return self._set_content(physical_path, b"", self._existing(physical_path))
+
+    def _existing(self, physical_path):
+        try: return self._read_manifest(physical_path)
+        except FileNotFoundError: return None
+
+    def open_binary(self, physical_path):
+        manifest = self._read_manifest(physical_path)
+        if manifest is None: return open(physical_path, 'rb')
+        return io.BufferedReader(ChunkReader(self, manifest), buffer_size=manifest.get('chunk', self.chunk_size))
+
+    def remove(self, physical_path):
+        manifest = self._existing(physical_path)
+        os.remove(physical_path)
+        if manifest: self._release(manifest['chunks'])
+
+    def remove_tree(self, physical_dir_path):
+        released = []
+        with os.scandir(physical_dir_path) as it:
+            for entry in it:
+                if not entry.is_file(): continue
+                try: manifest = self._read_manifest(entry.path)
+                except (OSError, ValueError): continue
+                if manifest: released += manifest['chunks']
+        shutil.rmtree(physical_dir_path)
+        self._release(released)
+
+    def backup(self, physical_path, backup_path):
+        # Yedek manifest de parçaları referanslar; silinene kadar parçalar toplanmaz.
+        PlainStorage.backup(self, physical_path, backup_path)
+        try:
+            manifest = self._existing(backup_path)
+            if manifest: self._retain(manifest['chunks'])
+        except Exception:
+            os.remove(backup_path)
+            raise
+
+    def restore_backup(self, backup_path, physical_path):
+        old = self._existing(physical_path)
+        os.replace(backup_path, physical_path)
+        if old: self._release(old['chunks'])
+
+    def reclaim(self, physical_paths):
+        # Partideki tüm parça referansları tek seferde bırakılır (tek günlük commit'i).
+        released, freed = [], 0
+        for physical_path in physical_paths:
+            try:
+                try: manifest = self._read_manifest(physical_path)
+                except ValueError: manifest = None  # Bozuk manifest: referansları zaten sayılamaz
+                freed += manifest['size'] if manifest else os.lstat(physical_path).st_size
+                os.remove(physical_path)
+            except FileNotFoundError:
+                continue
+            if manifest: released += manifest['chunks']
+        if released: self._release(released)
+        return freed
+
+    def sizes(self, physical_path, st=None):
+        # Parçalar kullanıcılar arasında paylaşıldığından saklanan boyut da mantıksal kabul edilir.
+        try: manifest = self._read_manifest(physical_path)
+        except (OSError, ValueError): manifest = None
+        if manifest is None: return PlainStorage.sizes(self, physical_path, st)
+        return manifest['size'], manifest['size']
+
+    def report(self):
+        """Depo istatistikleri: parça sayısı, fiziksel bayt ve referanslanan (tekilleştirilmemiş) bayt."""
+        with self._lock:
+            live = [entry for entry in self._refs.values() if entry[0] > 0]
+            pending = len(self._zero)
+        return {
+            'chunks': len(live),
+            'physical_bytes': sum(size for _, size in live),
+            'referenced_bytes': sum(count * size for count, size in live),
+            'pending_gc': pending,
+        }
+
+    def close(self):
+        self.collect(0)
+        self._checkpoint()
+        self.journal.close()
+
+
+class ChunkReader(io.RawIOBase):
+    """Manifestteki parçaları sırayla birleştirerek okuyan, seek edilebilir akış."""
+
+    def __init__(self, store, manifest):
+        self._store = store
+        self._chunks = manifest['chunks']
+        self._chunk_size = manifest.get('chunk', store.chunk_size)
+        self._size = manifest['size']
+        self._pos = 0
+        self._cached = (None, b"")   # (parça sırası, içerik)
+
+    def readable(self): return True
+    def seekable(self): return True
+    def tell(self): return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR: offset += self._pos
+        elif whence == io.SEEK_END: offset += self._size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, buffer):
+        if self._pos >= self._size: return 0
+        index, offset = divmod(self._pos, self._chunk_size)
+        if self._cached[0] != index:
+            self._cached = (index, self._store._read_chunk(self._chunks[index]))
+        data = self._cached[1][offset:offset + len(buffer)]
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+class CompressedStorage(PlainStorage):
+    """Dosya gövdesini bağımsız çözülebilen sıkıştırılmış çerçeveler halinde saklar.
+
+    Biçim: FRAME_MAGIC, ardından her çerçeve için FRAME_HEADER (codec, ham
+    uzunluk, saklanan uzunluk) ve gövde. Ekleme dosyanın sonuna yeni bir çerçeve
+    yazar (mevcut içerik yeniden sıkıştırılmaz); okuma yalnızca istenen konumun
+    çerçevesini çözer. Sıkıştırma işe yaramazsa çerçeve ham (codec 0) saklanır.
+    Sihirli satırı olmayan (eski, düz) dosyalar düz dosya olarak okunur ve eklenir.
+    """
+    name = "compress"
+    CODECS = {
+        0: (None, None),
+        1: (lambda data: zlib.compress(data, COMPRESS_LEVEL), zlib.decompress),
+        2: (lambda data: lzma.compress(data, preset=COMPRESS_LEVEL), lzma.decompress),
+    }
+    CODEC_IDS = {"zlib": 1, "lzma": 2}
+
+    def __init__(self, codec=COMPRESS_CODEC, frame_size=FRAME_SIZE):
+        self.codec = self.CODEC_IDS[codec]
+        self.frame_size = frame_size
+        self._zero_frame = None   # Ön ayırmada tekrar kullanılan, kodlanmış sıfır çerçevesi
+
+    # --- ÇERÇEVELER ---
+    def _encode(self, data):
+        """Veriyi frame_size'lık çerçevelere bölüp kodlar."""
+        compress = self.CODECS[self.codec][0]
+        out = []
+        for i in range(0, len(data), self.frame_size):
+            piece = data[i:i + self.frame_size]
+            body, codec = compress(piece), self.codec
+            if len(body) >= len(piece): body, codec = piece, 0
+            out.append(FRAME_HEADER.pack(codec, len(piece), len(body)))
+            out.append(body)
+        return b"".join(out)
+
+    def _frames(self, f):
+        """Dosyadaki çerçeveler: (ham başlangıç, ham uzunluk, gövde konumu, codec, saklanan uzunluk)."""
+        frames, raw_offset = [], 0
+        position = f.seek(len(FRAME_MAGIC))
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size: break
+            codec, raw_len, stored_len = FRAME_HEADER.unpack(header)
+            position += FRAME_HEADER.size
+            frames.append((raw_offset, raw_len, position, codec, stored_len))
+            raw_offset += raw_len
+            position = f.seek(position + stored_len)
+        return frames
+
+    def _decode_frame(self, f, frame):
+        _, _, position, codec, stored_len = frame
+        f.seek(position)
+        body = f.read(stored_len)
+        decompress = self.CODECS[codec][1]
+        return body if decompress is None else decompress(body)
+
+    @staticmethod
+    def _is_framed(f):
+        f.seek(0)
+        return f.read(len(FRAME_MAGIC)) == FRAME_MAGIC
+
+    # --- MOTOR ARAYÜZÜ ---
+    def create(self, physical_path, size_mb, size_bytes):
+        if PREALLOC_MODE == "simulate":
+            return self.replace(physical_path, simulated_content(size_mb))
+        # Sıfır çerçevesi bir kez kodlanıp tekrar yazılır; dosya sıkıştırılmış halde çok küçüktür.
+        if self._zero_frame is None:
+            self._zero_frame = self._encode(bytes(self.frame_size))
+        full, rest = divmod(int(size_bytes), self.frame_size)
+        tmp_path = _tmp_path(physical_path)
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(FRAME_MAGIC)
+                for _ in range(full): f.write(self._zero_frame)
+                f.write(self._encode(bytes(rest)))
+                stored = f.tell()
+            os.replace(tmp_path, physical_path)
+        except Exception:
+            try: os.remove(tmp_path)
+            except OSError: pass
+            raise
+        return stored
+
+    def append(self, physical_path, data, durable=False):
+        break_link(physical_path)
+        with open(physical_path, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size and not self._is_framed(f):
+                f.close()
+                return PlainStorage.append(self, physical_path, data, durable)
+            blob = self._encode(data) if size else FRAME_MAGIC + self._encode(data)
+            f.seek(size)
+            try:
+                f.write(blob)
+                f.flush()
+                if durable: os.fsync(f.fileno())
+            except Exception:
+                f.truncate(size)
+                raise
+        return len(blob)
+
+    def replace(self, physical_path, data):
+        return PlainStorage.replace(self, physical_path, FRAME_MAGIC + self._encode(data))
+
+    def truncate(self, physical_path):
+        return PlainStorage.replace(self, physical_path, FRAME_MAGIC)
+
+    def open_binary(self, physical_path):
+        f = open(physical_path, 'rb')
+        if not self._is_framed(f):
+            f.seek(0)
+            return f
+        return io.BufferedReader(FrameReader(self, f), buffer_size=self.frame_size)
+
+    def sizes(self, physical_path, st=None):
+        with open(physical_path, 'rb') as f:
+            stored = os.fstat(f.fileno()).st_size
+            if not self._is_framed(f): return stored, stored
+            return sum(frame[1] for frame in self._frames(f)), stored
+
+    def compact(self, physical_path):
+        """Çok sayıda küçük (ekleme) çerçevesini frame_size'lık çerçevelerde birleştirir.
+
+        Baştaki dolu çerçeveler olduğu gibi kopyalanır; ilk küçük çerçeveden itibaren
+        ham içerik çerçeve çerçeve okunup geçici dosyaya yeniden kodlanır (bellekte en
+        fazla bir çerçeve kadar veri tutulur).
+        """
+        with open(physical_path, 'rb') as f:
+            if not self._is_framed(f): return None
+            frames = self._frames(f)
+            small = sum(1 for frame in frames if frame[1] < self.frame_size)
+            if len(frames) < COMPACT_MIN_FRAMES or small <= 1: return None
+            first = next(i for i, frame in enumerate(frames) if frame[1] < self.frame_size)
+            tmp_path = _tmp_path(physical_path)
+            try:
+                with open(tmp_path, 'wb') as out:
+                    f.seek(0)
+                    prefix = frames[first][2] - FRAME_HEADER.size
+                    while out.tell() < prefix:
+                        out.write(f.read(min(self.frame_size, prefix - out.tell())))
+                    pending = b""
+                    for frame in frames[first:]:
+                        pending += self._decode_frame(f, frame)
+                        if len(pending) >= self.frame_size:
+                            cut = len(pending) - len(pending) % self.frame_size
+                            out.write(self._encode(pending[:cut]))
+                            pending = pending[cut:]
+                    out.write(self._encode(pending))
+                    stored = out.tell()
+                os.replace(tmp_path, physical_path)
+            except Exception:
+                try: os.remove(tmp_path)
+                except OSError: pass
+                raise
+        return stored
+
+
+class FrameReader(io.RawIOBase):
+    """Çerçeveli dosyayı ham içerik olarak okuyan, seek edilebilir akış (bir çerçeve önbellekli)."""
+
+    def __init__(self, storage, f):
+        self._storage = storage
+        self._file = f
+        self._frames = storage._frames(f)
+        self._starts = [frame[0] for frame in self._frames]
+        self._size = sum(frame[1] for frame in self._frames)
+        self._pos = 0
+        self._cached = (None, b"")   # (çerçeve sırası, ham içerik)
+
+    def readable(self): return True
+    def seekable(self): return True
+    def tell(self): return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR: offset += self._pos
+        elif whence == io.SEEK_END: offset += self._size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, buffer):
+        if self._pos >= self._size: return 0
+        index = bisect_right(self._starts, self._pos) - 1
+        if self._cached[0] != index:
+            self._cached = (index, self._storage._decode_frame(self._file, self._frames[index]))
+        offset = self._pos - self._frames[index][0]
+        data = self._cached[1][offset:offset + len(buffer)]
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def make_storage(backend_dir, engine=STORAGE_ENGINE, handle_cache=True):
+    """handle_cache: düz motorda eklemeler açık tanıtıcı önbelleğinden geçsin mi (tek süreçli modda)."""
+    if engine == "dedup":
+        return DedupStorage(os.path.join(backend_dir, "blockstore"))
+    if engine == "compress":
+        return CompressedStorage()
+    cache = handle_cache and HANDLE_CACHE_SIZE > 0
+    return PlainStorage(AppendCache(prepare=break_link) if cache else None)
+
+
+def is_linked(physical_path):
+    """Dosyanın başka bir sabit bağlantısı (ör. anlık görüntüdeki kopyası) var mı?"""
+    try: return os.stat(physical_path).st_nlink > 1
+    except FileNotFoundError: return False
+
+
+def break_link(physical_path):
+    """Dosya paylaşılıyorsa yerinde değiştirilmeden önce özel bir kopyasıyla değiştirilir (copy-on-write)."""
+    if not is_linked(physical_path): return
+    tmp_path = _tmp_path(physical_path)
+    try:
+        shutil.copy2(physical_path, tmp_path)
+        os.replace(tmp_path, physical_path)
+    except Exception:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+
+
+def _fsync_path(path):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def _tmp_path(physical_path):
+    return os.path.join(os.path.dirname(physical_path), "." + os.path.basename(physical_path) + ".tmp")
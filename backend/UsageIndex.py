@@ -0,0 +1,197 @@
+# backend/UsageIndex.py
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+ORDERS = ('name', 'usage', 'limit', 'percent')
+BUCKET_LOAD = 512  # Kova başına hedef eleman sayısı (2 katını aşan kova bölünür)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+
+class SortedKeyList:
+    """Kovalara bölünmüş sıralı liste: arama O(log n), ekleme/silme O(log n + BUCKET_LOAD).
+
+    Tek bir büyük listede insort/remove her değişiklikte n elemanı kaydırır;
+    burada yalnızca ilgili kova değişir. Kova maksimumları ayrı bir listede
+    tutulur, böylece hem kova hem de kova içi konum ikili aramayla bulunur.
+    """
+
+    def __init__(self, keys=(), load=BUCKET_LOAD):
+        self._load = load
+        ordered = sorted(keys)
+        self._lists = [ordered[i:i + load] for i in range(0, len(ordered), load)]
+        self._maxes = [lst[-1] for lst in self._lists]
+
+    def __len__(self):
+        return sum(len(lst) for lst in self._lists)
+
+    def add(self, key):
+        if not self._lists:
+            self._lists.append([key])
+            self._maxes.append(key)
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+            self._lists[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._lists[i], key)
+        lst = self._lists[i]
+        if len(lst) > 2 * self._load:
+            half = lst[self._load:]
+            del lst[self._load:]
+            self._lists.insert(i + 1, half)
+            self._maxes[i] = lst[-1]
+            self._maxes.insert(i + 1, half[-1])
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes): return
+        lst = self._lists[i]
+        j = bisect_left(lst, key)
+        if j == len(lst) or lst[j] != key: return
+        del lst[j]
+        if lst:
+            self._maxes[i] = lst[-1]
+        else:
+            del self._lists[i]
+            del self._maxes[i]
+
+    def after(self, key=None, inclusive=False):
+        """key'den büyük (inclusive ise eşit de) elemanlar, artan sırada; key None ise baştan."""
+        if key is None:
+            i, j = 0, 0
+        else:
+            find = bisect_left if inclusive else bisect_right
+            i = find(self._maxes, key)
+            if i == len(self._maxes): return
+            j = find(self._lists[i], key)
+        for lst in self._lists[i:]:
+            yield from lst[j:]
+            j = 0
+
+    def before(self, key=None):
+        """key'den (hariç) küçük elemanlar, azalan sırada; key None ise sondan."""
+        if not self._lists: return
+        if key is None:
+            i, j = len(self._lists) - 1, len(self._lists[-1])
+        else:
+            i = bisect_left(self._maxes, key)
+            if i == len(self._maxes):
+                i, j = i - 1, len(self._lists[-1])
+            else:
+                j = bisect_left(self._lists[i], key)
+        while i >= 0:
+            lst = self._lists[i]
+            for k in range(j - 1, -1, -1):
+                yield lst[k]
+            i -= 1
+            if i >= 0: j = len(self._lists[i])
+
+
+def percent_of(usage, limit):
+    """Kullanım oranı (yüzde); limitsiz (admin) kullanıcı için 0."""
+    if limit == float('inf'): return 0.0
+    if limit <= 0: return float('inf') if usage > 0 else 0.0
+    return usage / limit * 100
+
+
+class UsageIndex:
+    """Kullanıcıları ada, kullanıma, limite ve doluluk yüzdesine göre sıralı tutan indeks.
+
+    QuotaManager kullanım ya da limit her değiştiğinde update() çağırır; "en çok
+    kullanan 50" veya "%90 üstü" sorguları tam tarama yerine O(log n + k) sürer.
+    Anahtarlar (değer, user_id) demetleridir; sayfalama için imleç son anahtardır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}  # user_id -> (usage, limit)
+        self._lists = {order: SortedKeyList() for order in ORDERS}
+
+    @staticmethod
+    def _key(order, user_id, usage, limit):
+        if order == 'name': return (user_id,)
+        if order == 'usage': return (usage, user_id)
+        if order == 'limit': return (limit, user_id)
+        return (percent_of(usage, limit), user_id)
+
+    def rebuild(self, quotas):
+        """Tüm indeksi {user_id: {'usage', 'limit'}} sözlüğünden tek seferde kurar."""
+        values = {u: (q['usage'], q['limit']) for u, q in quotas.items()}
+        lists = {order: SortedKeyList(self._key(order, u, *v) for u, v in values.items()) for order in ORDERS}
+        with self._lock:
+            self._values, self._lists = values, lists
+
+    def update(self, user_id, usage, limit):
+        with self._lock:
+            old = self._values.get(user_id)
+            if old == (usage, limit): return
+            self._values[user_id] = (usage, limit)
+            if old is None:
+                for order, keys in self._lists.items():
+                    keys.add(self._key(order, user_id, usage, limit))
+                return
+            for order in ORDERS[1:]:  # ad anahtarı değişmez
+                old_key = self._key(order, user_id, *old)
+                new_key = self._key(order, user_id, usage, limit)
+                if old_key != new_key:
+                    self._lists[order].remove(old_key)
+                    self._lists[order].add(new_key)
+
+    def remove(self, user_id):
+        with self._lock:
+            old = self._values.pop(user_id, None)
+            if old is None: return
+            for order, keys in self._lists.items():
+                keys.remove(self._key(order, user_id, *old))
+
+    def page(self, order='usage', descending=True, limit=50, cursor=None, prefix=None, min_percent=None):
+        """Bir sayfa kullanıcı döndürür: ([(user_id, usage, limit), ...], sonraki_imleç ya da None).
+
+        prefix verilirse adı o önekle başlayan kullanıcılar ad indeksinden aralık
+        olarak alınır (ve gerekirse istenen sıraya göre sıralanır). min_percent verilirse
+        eşiği geçen kullanıcılar yüzde indeksinden aralık olarak okunur: yüzde sırasında
+        doğrudan, diğer sıralarda yalnızca bu kullanıcılar sıralanarak (tam tarama olmaz).
+        """
+        cursor = tuple(cursor) if cursor else None
+        with self._lock:
+            if prefix and order == 'name' and not descending:
+                # Ad sırasında önek aralığı doğrudan indeksten okunur
+                source = self._lists['name'].after(cursor or (prefix,), inclusive=cursor is None)
+            elif prefix or (min_percent is not None and order != 'percent'):
+                if prefix:
+                    user_ids = []
+                    for (user_id,) in self._lists['name'].after((prefix,), inclusive=True):
+                        if not user_id.startswith(prefix): break
+                        user_ids.append(user_id)
+                else:
+                    user_ids = [key[-1] for key in self._lists['percent'].after((min_percent,), inclusive=True)]
+                candidates = sorted((self._key(order, user_id, *self._values[user_id]) for user_id in user_ids),
+                                    reverse=descending)
+                if cursor:
+                    candidates = [k for k in candidates if (k < cursor if descending else k > cursor)]
+                source = iter(candidates)
+            else:
+                keys = self._lists[order]
+                if descending:
+                    source = keys.before(cursor)
+                elif order == 'percent' and min_percent is not None and (cursor is None or cursor < (min_percent,)):
+                    source = keys.after((min_percent,), inclusive=True)  # Eşiğin altı atlanır
+                else:
+                    source = keys.after(cursor)
+
+            rows, last = [], None
+            for key in source:
+                user_id = key[-1]
+                if prefix and not user_id.startswith(prefix): break
+                usage, quota = self._values[user_id]
+                if min_percent is not None and percent_of(usage, quota) < min_percent:
+                    if order == 'percent' and descending: break
+                    continue
+                if len(rows) == limit:
+                    return rows, list(last)
+                rows.append((user_id, usage, quota))
+                last = key
+            return rows, None
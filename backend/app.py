@@ -1,15 +1,90 @@
 # backend/app.py
-from flask import Flask, request, jsonify, send_from_directory
-from FileSystem import FileSystem
-from QuotaManager import QuotaManager
+from flask import Flask, request, jsonify, send_from_directory, Response, g
+from FileSystem import FileSystem, parse_size_mb
+from SharedState import make_quota_manager
+from SessionManager import SessionManager, SESSION_HEADER
+from Metrics import metrics
+from RateLimiter import RateLimiter
 from flask_cors import CORS 
 import os 
+import re
+import math
+import time
 
-qm = QuotaManager()
+# KOTA_STATE=sqlite ile birden çok worker süreci (ör. gunicorn -w 4 app:app) aynı durumu paylaşır.
+qm = make_quota_manager()
 fs = FileSystem(qm)
+sessions = SessionManager(os.path.join(fs.project_root, "backend"),
+                          revoked=fs.shared.revoked if fs.shared else None)
 
 app = Flask(__name__, static_folder='../frontend', static_url_path='') 
-CORS(app) 
+CORS(app, expose_headers=[SESSION_HEADER]) 
+
+if metrics.enabled:
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_latency(response):
+        # Akış yanıtlarında (read_stream) süre, gövde gönderilmeden önceki kısmı kapsar.
+        start = g.pop('request_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.observe('kota_http_request_duration_seconds', time.perf_counter() - start,
+                            (('route', route), ('method', request.method), ('status', str(response.status_code))))
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics_api():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Route -> hız sınırı sınıfı; burada olmayan route'lar (/, /metrics, statik dosyalar) sınırlanmaz.
+ROUTE_CLASSES = {
+    '/read_file': 'read', '/read_stream': 'read', '/read_lines': 'read', '/ls': 'read', '/status': 'read',
+    '/create_file': 'write', '/write_file': 'write', '/overwrite_file': 'write', '/truncate_file': 'write',
+    '/delete_file': 'write', '/execute_file': 'write', '/batch': 'write',
+    '/register': 'admin', '/list_users': 'admin', '/delete_user/<target_user_id>': 'admin', '/du': 'admin',
+    '/storage_report': 'admin', '/reclaim': 'admin', '/charge_mode': 'admin', '/compact': 'admin', '/audit': 'admin', '/set_quota': 'admin',
+    '/snapshot': 'admin', '/snapshots': 'admin', '/restore': 'admin', '/snapshot/<target_user_id>/<snapshot_id>': 'admin',
+    '/login': 'auth', '/logout': 'auth',
+}
+limiter = RateLimiter()
+
+def too_many_requests(wait, op_class):
+    metrics.inc('kota_rate_limited_total', labels=(('class', op_class),))
+    retry = max(1, math.ceil(wait))
+    return (jsonify({'message': f"HATA: Çok fazla istek. {retry} sn sonra tekrar deneyin.", 'success': False}),
+            429, {'Retry-After': str(retry)})
+
+@app.before_request
+def rate_limit():
+    """Jeton kovası boşsa istek, dosya G/Ç'sine ve parola özetine ulaşmadan 429 ile reddedilir."""
+    if not limiter.enabled or request.url_rule is None: return None
+    op_class = ROUTE_CLASSES.get(request.url_rule.rule)
+    if op_class is None: return None
+    ip = request.remote_addr or '-'
+    cost = 1
+    if op_class == 'auth':
+        user_id = None
+        if request.url_rule.rule == '/login':
+            wait = limiter.login_retry_after(str((request.get_json(silent=True) or {}).get('user_id')), ip)
+            if wait: return too_many_requests(wait, 'login')
+    else:
+        user_id = sessions.resolve(request.headers.get(SESSION_HEADER))
+        if op_class == 'write' and request.url_rule.rule == '/batch':
+            ops = (request.get_json(silent=True) or {}).get('ops')
+            cost = max(1, len(ops)) if isinstance(ops, list) else 1
+    wait = limiter.check(op_class, ip, user_id, cost)
+    return too_many_requests(wait, op_class) if wait else None
+
+def session_user():
+    """İstekteki oturum anahtarının sahibini döndürür (geçersizse None)."""
+    claims = sessions.claims(request.headers.get(SESSION_HEADER))
+    if claims is None: return None
+    user_id, epoch = claims
+    # Kuşak uyuşmazsa kullanıcı token alındıktan sonra silinmiş (belki aynı adla yeniden oluşturulmuş)
+    return user_id if qm.token_epoch(user_id) == epoch else None
 
 @app.route('/')
 def serve_index(): return send_from_directory('../frontend', 'index.html')
@@ -17,101 +92,258 @@ def serve_index(): return send_from_directory('../frontend', 'index.html')
 @app.route('/register', methods=['POST'])
 def register():
     # Artık giriş yapmadan register yapılamaz (Admin yapacak)
-    if not fs.current_user: 
+    user_id = session_user()
+    if not user_id: 
         return jsonify({'message': "HATA: Bu işlem için Admin girişi gereklidir.", 'success': False})
 
     data = request.json
     # quota_mb verisini al (yoksa None gider)
     quota_val = data.get('quota_mb')
     
-    response_msg = fs.register_user(data.get('user_id'), data.get('password'), quota_val)
+    response_msg = fs.register_user(user_id, data.get('user_id'), data.get('password'), quota_val)
     return jsonify({'message': response_msg, 'success': 'HATA' not in response_msg})
 
 @app.route('/login', methods=['POST'])
 def login():
-    if fs.current_user: return jsonify({'message': f"HATA: Lütfen logout olun.", 'success': False})
+    if session_user(): return jsonify({'message': f"HATA: Lütfen logout olun.", 'success': False})
     data = request.json
     response_msg = fs.login(data.get('user_id'), data.get('password'))
-    return jsonify({'message': response_msg, 'success': 'Başarıyla' in response_msg})
+    if 'Başarıyla' not in response_msg:
+        limiter.login_failed(str(data.get('user_id')), request.remote_addr or '-')
+        return jsonify({'message': response_msg, 'success': False})
+    limiter.login_succeeded(str(data.get('user_id')), request.remote_addr or '-')
+    token = sessions.create(data.get('user_id'), qm.token_epoch(data.get('user_id')) or 0)
+    return jsonify({'message': response_msg, 'success': True, 'token': token})
 
 @app.route('/create_file', methods=['POST'])
 def create_file_api():
-    if not fs.current_user: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
     data = request.json
-    try: response_msg = fs.create_file(data.get('file_path'), float(data.get('size_mb')))
-    except Exception as e: return jsonify({'message': str(e), 'success': False})
+    try: size_mb = parse_size_mb(data.get('size_mb'))
+    except (TypeError, ValueError) as e: return jsonify({'message': f"HATA: {e}", 'success': False})
+    response_msg = fs.create_file(user_id, data.get('file_path'), size_mb)
     return jsonify({'message': response_msg, 'success': 'BAŞARILI' in response_msg})
 
 @app.route('/write_file', methods=['POST'])
 def write_file_api():
-    if not fs.current_user: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
     data = request.json
-    response_msg = fs.write_to_file(data.get('file_path'), data.get('content'))
+    # durable: true -> yanıt dönmeden önce ekleme diske yazılır (fsync)
+    response_msg = fs.write_to_file(user_id, data.get('file_path'), data.get('content'), bool(data.get('durable')))
     return jsonify({'message': response_msg, 'success': 'BAŞARILI' in response_msg})
 
 @app.route('/read_file', methods=['POST'])
 def read_file_api():
-    if not fs.current_user: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
-    content = fs.read_file(request.json.get('file_path'))
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
+    content = fs.read_file(user_id, request.json.get('file_path'))
+    is_success = not (content.startswith("HATA") or content.startswith("Erişim"))
+    return jsonify({'message': content, 'success': is_success})
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def parse_read_range():
+    """offset/length parametrelerini ya da HTTP Range başlığını (offset, length, ranged) olarak çözer.
+
+    Karşılanamayan aralıkta ('bytes=-0', 'bytes=50-10') offset None olur (416).
+    """
+    match = RANGE_RE.match(request.headers.get('Range', '').split(',')[0].strip())
+    if match and (match.group(1) or match.group(2)):
+        first, last = match.groups()
+        if not first: return (-int(last) or None), None, True  # bytes=-N (son N bayt)
+        if not last: return int(first), None, True             # bytes=N-
+        if int(last) < int(first): return None, None, True
+        return int(first), int(last) - int(first) + 1, True    # bytes=N-M (M dahil)
+    offset = int(request.args.get('offset', 0))
+    length = request.args.get('length')
+    length = int(length) if length not in (None, "") else None
+    return offset, length, offset != 0 or length is not None
+
+@app.route('/read_stream', methods=['GET'])
+def read_stream_api():
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False}), 401
+    try: offset, length, ranged = parse_read_range()
+    except ValueError: return jsonify({'message': "HATA: Geçersiz okuma aralığı.", 'success': False}), 416
+    result = fs.open_read_stream(user_id, request.args.get('file_path'), offset, length)
+    if isinstance(result, str):
+        return jsonify({'message': result, 'success': False}), 403 if result.startswith("Erişim") else 404
+
+    stream, start, end, total = result
+    if stream is None:
+        return (jsonify({'message': "HATA: Geçersiz okuma aralığı.", 'success': False}), 416,
+                {'Content-Range': f"bytes */{total}"})
+    headers = {'Accept-Ranges': 'bytes', 'Content-Length': str(end - start)}
+    if ranged:
+        headers['Content-Range'] = f"bytes {start}-{end - 1}/{total}" if end > start else f"bytes */{total}"
+    return Response(stream, status=206 if ranged else 200, headers=headers,
+                    content_type='text/plain; charset=utf-8', direct_passthrough=True)
+
+@app.route('/read_lines', methods=['POST'])
+def read_lines_api():
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
+    data = request.json
+    try: count = int(data.get('lines') or 10)
+    except ValueError: return jsonify({'message': "HATA: Satır sayısı sayı olmalı.", 'success': False})
+    content = fs.read_lines(user_id, data.get('file_path'), data.get('mode', 'head'), count)
     is_success = not (content.startswith("HATA") or content.startswith("Erişim"))
     return jsonify({'message': content, 'success': is_success})
 
 @app.route('/execute_file', methods=['POST'])
 def execute_file_api():
-    if not fs.current_user: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
-    response_msg = fs.execute_file(request.json.get('file_path'))
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
+    response_msg = fs.execute_file(user_id, request.json.get('file_path'))
     return jsonify({'message': response_msg, 'success': False})
 
 @app.route('/delete_file', methods=['POST'])
 def delete_file_api():
-    if not fs.current_user: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
-    response_msg = fs.delete_file(request.json.get('file_path'))
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
+    response_msg = fs.delete_file(user_id, request.json.get('file_path'))
     return jsonify({'message': response_msg, 'success': 'BAŞARILI' in response_msg})
 
 @app.route('/ls', methods=['GET'])
 def list_files_api():
-    if not fs.current_user: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
-    return jsonify({'message': fs.list_files(), 'success': True})
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
+    return jsonify({'message': fs.list_files(user_id), 'success': True})
 
 @app.route('/status', methods=['GET'])
 def get_status_api():
-    if not fs.current_user: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
-    return jsonify({'message': fs.get_user_status(), 'success': True})
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
+    return jsonify({'message': fs.get_user_status(user_id), 'success': True})
 
 @app.route('/logout', methods=['POST'])
 def logout_api():
-    if not fs.current_user: return jsonify({'message': "HATA: Oturum yok.", 'success': False})
-    return jsonify({'message': fs.logout(), 'success': True})
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Oturum yok.", 'success': False})
+    sessions.revoke(request.headers.get(SESSION_HEADER))
+    return jsonify({'message': fs.logout(user_id), 'success': True})
 
 # --- ADMIN ---
 @app.route('/list_users', methods=['GET'])
 def list_users_api():
-    if fs.current_user != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
-    return jsonify({'message': fs.list_users(), 'success': True})
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    args = request.args
+    result = fs.list_users(user_id, args.get('sort'), args.get('order'), args.get('limit'),
+                           args.get('cursor'), args.get('prefix'), args.get('min_percent'))
+    if isinstance(result, str): return jsonify({'message': result, 'success': False})
+    return jsonify({**result, 'success': True})
 
-@app.route('/delete_user/<user_id>', methods=['DELETE'])
-def delete_user_api(user_id):
-    if fs.current_user != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
-    return jsonify({'message': fs.delete_user(user_id), 'success': True})
+@app.route('/delete_user/<target_user_id>', methods=['DELETE'])
+def delete_user_api(target_user_id):
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    return jsonify({'message': fs.delete_user(user_id, target_user_id), 'success': True})
+
+@app.route('/du', methods=['GET'])
+def disk_usage_api():
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    response_msg = fs.disk_usage_report(user_id, request.args.get('user'))
+    return jsonify({'message': response_msg, 'success': 'HATA' not in response_msg})
+
+@app.route('/storage_report', methods=['GET'])
+def storage_report_api():
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    response_msg = fs.storage_report(user_id, request.args.get('gc') == '1')
+    return jsonify({'message': response_msg, 'success': not response_msg.startswith("HATA")})
+
+@app.route('/reclaim', methods=['GET'])
+def reclaim_api():
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    response_msg = fs.reclaim_report(user_id)
+    return jsonify({'message': response_msg, 'success': not response_msg.startswith("HATA")})
+
+@app.route('/charge_mode', methods=['POST'])
+def charge_mode_api():
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    response_msg = fs.set_charge_mode(user_id, (request.json or {}).get('mode'))
+    return jsonify({'message': response_msg, 'success': 'BAŞARILI' in response_msg})
+
+@app.route('/compact', methods=['POST'])
+def compact_api():
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    response_msg = fs.compact_files(user_id, (request.json or {}).get('user_id'))
+    return jsonify({'message': response_msg, 'success': 'BAŞARILI' in response_msg})
+
+@app.route('/snapshot', methods=['POST'])
+def snapshot_api():
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    response_msg = fs.create_snapshot(user_id, (request.json or {}).get('user_id'))
+    return jsonify({'message': response_msg, 'success': 'BAŞARILI' in response_msg})
+
+@app.route('/snapshots', methods=['GET'])
+def list_snapshots_api():
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    response_msg = fs.list_snapshots(user_id, request.args.get('user'))
+    return jsonify({'message': response_msg, 'success': not response_msg.startswith("HATA")})
+
+@app.route('/restore', methods=['POST'])
+def restore_api():
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    data = request.json or {}
+    response_msg = fs.restore_snapshot(user_id, data.get('user_id'), data.get('snapshot_id'))
+    return jsonify({'message': response_msg, 'success': 'BAŞARILI' in response_msg})
+
+@app.route('/snapshot/<target_user_id>/<snapshot_id>', methods=['DELETE'])
+def delete_snapshot_api(target_user_id, snapshot_id):
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    response_msg = fs.delete_snapshot(user_id, target_user_id, snapshot_id)
+    return jsonify({'message': response_msg, 'success': 'BAŞARILI' in response_msg})
+
+@app.route('/audit', methods=['GET'])
+def audit_api():
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    args = request.args
+    result = fs.query_audit(user_id, args.get('user'), args.get('action'), args.get('since'),
+                            args.get('until'), args.get('limit'), args.get('cursor'))
+    if isinstance(result, str): return jsonify({'message': result, 'success': False})
+    return jsonify({'entries': result['entries'], 'next_cursor': result['next_cursor'], 'success': True})
 
 @app.route('/overwrite_file', methods=['POST'])
 def overwrite_file():
     data = request.json
-    response_msg = fs.overwrite_file(data.get('file_path'), data.get('content'))
+    response_msg = fs.overwrite_file(session_user(), data.get('file_path'), data.get('content'))
     return jsonify({'message': response_msg})
 
 @app.route('/truncate_file', methods=['POST'])
 def truncate_file():
     data = request.json
-    response_msg = fs.truncate_file(data.get('file_path'))
+    response_msg = fs.truncate_file(session_user(), data.get('file_path'))
     return jsonify({'message': response_msg})
 
+@app.route('/batch', methods=['POST'])
+def batch_api():
+    user_id = session_user()
+    if not user_id: return jsonify({'message': "HATA: Giriş yapın.", 'success': False})
+    data = request.json or {}
+    result = fs.run_batch(user_id, data.get('ops'), bool(data.get('atomic_quota')))
+    if isinstance(result, str): return jsonify({'message': result, 'success': False})
+    return jsonify({'results': result, 'success': all(r['success'] for r in result)})
+
 @app.route('/set_quota', methods=['POST'])
 def set_quota_api():
-    if fs.current_user != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
+    user_id = session_user()
+    if user_id != 'admin': return jsonify({'message': "HATA: Admin yetkisi gerekli.", 'success': False})
     data = request.json
-    try: response_msg = fs.set_user_quota(data.get('user_id'), float(data.get('quota_mb')))
+    try: response_msg = fs.set_user_quota(user_id, data.get('user_id'), float(data.get('quota_mb')))
     except ValueError: return jsonify({'message': "HATA: Kota sayı olmalı.", 'success': False})
     return jsonify({'message': response_msg, 'success': 'HATA' not in response_msg})
 
-if __name__ == '__main__': pass
\ No newline at end of file
+if __name__ == '__main__': pass
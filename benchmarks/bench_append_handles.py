@@ -0,0 +1,110 @@
+# benchmarks/bench_append_handles.py
+"""Küçük eklemeler: her eklemede open/close vs açık tanıtıcı önbelleği + ekleme tamponu.
+
+1. Depolama katmanı (PlainStorage.append): saniyedeki ekleme, önbellek kapalı / açık / durable.
+2. FileSystem.write_to_file (kota, indeks ve denetim kaydı dahil): aynı karşılaştırma.
+3. Önbellek sınırından fazla dosyaya dönüşümlü ekleme (LRU tahliyesi).
+Her senaryonun sonunda dosya içerikleri beklenenle karşılaştırılır.
+
+Kullanım:
+    python benchmarks/bench_append_handles.py --appends 20000 --line-bytes 64 --files 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+from HandleCache import AppendCache, HANDLE_CACHE_SIZE  # noqa: E402
+from Storage import PlainStorage, break_link  # noqa: E402
+
+
+def storages():
+    yield "her eklemede open/close", lambda: PlainStorage(None), False
+    yield "tanıtıcı önbelleği", lambda: PlainStorage(AppendCache(prepare=break_link)), False
+    yield "önbellek + durable", lambda: PlainStorage(AppendCache(prepare=break_link)), True
+
+
+def bench_storage(args, line):
+    print(f"[depolama] {args.appends} ekleme x {len(line)} bayt, tek dosya")
+    ok = True
+    for label, make, durable in storages():
+        count = args.appends // 20 if durable else args.appends  # fsync yavaş: daha az ekleme
+        with tempfile.TemporaryDirectory() as root:
+            storage = make()
+            path = os.path.join(root, "log.txt")
+            open(path, 'wb').close()
+            start = time.perf_counter()
+            for _ in range(count): storage.append(path, line, durable)
+            with storage.open_binary(path) as f: data = f.read()
+            elapsed = time.perf_counter() - start
+            storage.close()
+        ok &= data == line * count
+        print(f"  {label:<26} {count / elapsed:>10.0f} ekleme/s")
+    return ok
+
+
+def bench_filesystem(args, content):
+    print(f"[write_to_file] {args.appends} ekleme (kota + indeks + denetim kaydı dahil)")
+    ok = True
+    for label, make, durable in storages():
+        count = args.appends // 20 if durable else args.appends
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "backend"))
+            qm = QuotaManager()
+            qm._hash_password = lambda password: password
+            fs = FileSystem(qm, project_root=root, storage=make())
+            fs.register_user('admin', 'w', 'p', 1024)
+            fs.create_file('w', '/home/w/log.txt', 0)
+            before = fs.read_file('w', '/home/w/log.txt')
+            start = time.perf_counter()
+            for _ in range(count): fs.write_to_file('w', '/home/w/log.txt', content, durable)
+            text = fs.read_file('w', '/home/w/log.txt')
+            elapsed = time.perf_counter() - start
+            ok &= text == before + f"\n{content}" * count
+            ok &= qm.user_quotas['w']['usage'] == len(text.encode('utf-8')) - len(before.encode('utf-8'))
+            fs.close()
+        print(f"  {label:<26} {count / elapsed:>10.0f} ekleme/s")
+    return ok
+
+
+def bench_eviction(args, line):
+    print(f"[LRU] {args.files} dosyaya dönüşümlü ekleme (önbellek {HANDLE_CACHE_SIZE} tanıtıcı)")
+    ok = True
+    for label, make, _ in list(storages())[:2]:
+        with tempfile.TemporaryDirectory() as root:
+            storage = make()
+            paths = [os.path.join(root, f"f{i}") for i in range(args.files)]
+            rounds = max(1, args.appends // args.files)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for path in paths: storage.append(path, line)
+            storage.flush(root)
+            elapsed = time.perf_counter() - start
+            ok &= all(os.path.getsize(path) == len(line) * rounds for path in paths)
+            stats = storage.handles.stats if storage.handles else None
+            storage.close()
+        extra = f" (açılış {stats['opens']}, tahliye {stats['evictions']})" if stats else ""
+        print(f"  {label:<26} {rounds * args.files / elapsed:>10.0f} ekleme/s{extra}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--appends', type=int, default=20000)
+    parser.add_argument('--line-bytes', type=int, default=64)
+    parser.add_argument('--files', type=int, default=500)
+    args = parser.parse_args()
+    content = "x" * args.line_bytes
+    ok = bench_storage(args, f"\n{content}".encode('utf-8'))
+    ok &= bench_filesystem(args, content)
+    ok &= bench_eviction(args, f"\n{content}".encode('utf-8'))
+    print(f"içerik tutarlılığı: {'TAMAM' if ok else 'HATALI'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_append_quota.py
+"""Kota baskısı altında küçük eklemeler (write_to_file) için verim ölçümü.
+
+Her kullanıcının kotası, eklemelerin bir kısmı reddedilecek kadar küçük tutulur.
+Sonunda her kullanıcı için kullanım == indeksteki mantıksal boyut toplamı ve
+kullanım <= limit olduğu doğrulanır.
+
+Kullanım:
+    python benchmarks/bench_append_quota.py --users 8 --appends 5000 --line-bytes 64
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--appends', type=int, default=5000)
+    parser.add_argument('--line-bytes', type=int, default=64)
+    parser.add_argument('--fill', type=float, default=0.5,
+                        help="Kotanın eklemelerin toplamına oranı (1'den küçükse reddedilen eklemeler olur)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        fs = FileSystem(QuotaManager(), project_root=root)
+        quota_mb = args.appends * (args.line_bytes + 1) * args.fill / fs.qm.MB
+        for u in range(args.users):
+            fs.register_user('admin', f"w{u}", 'p', quota_mb)
+            fs.create_file(f"w{u}", f"/home/w{u}/log.txt", 0)
+
+        accepted = [0] * args.users
+        line = "x" * args.line_bytes
+
+        def worker(u):
+            user_id = f"w{u}"
+            for _ in range(args.appends):
+                if fs.write_to_file(user_id, f"/home/{user_id}/log.txt", line).startswith("BAŞARILI"):
+                    accepted[u] += 1
+
+        workers = [threading.Thread(target=worker, args=(u,)) for u in range(args.users)]
+        start = time.perf_counter()
+        for w in workers: w.start()
+        for w in workers: w.join()
+        elapsed = time.perf_counter() - start
+
+        total = args.users * args.appends
+        consistent = True
+        for u in range(args.users):
+            quota = fs.qm.user_quotas[f"w{u}"]
+            indexed = sum(info['size'] for info in fs.files.files_of(f"w{u}").values())
+            physical = os.path.getsize(os.path.join(root, f"w{u}_home", "log.txt"))
+            consistent &= quota['usage'] <= quota['limit'] and quota['usage'] == indexed
+            consistent &= physical == len(f"Bu dosya 0 MB (simülasyon).".encode()) + indexed
+        print(f"{total} ekleme, {sum(accepted)} kabul / {total - sum(accepted)} red: "
+              f"{total / elapsed:.0f} işlem/s ({args.users} thread)")
+        print(f"kota tutarlılığı: {'TAMAM' if consistent else 'HATALI'}")
+        fs.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_audit_index.py
+"""AuditIndex: indeks oluşturma hızı ve sayfalı sorgu gecikmeleri.
+
+Kullanım:
+    python benchmarks/bench_audit_index.py --entries 1000000
+    python benchmarks/bench_audit_index.py --entries 50000000 --dir /büyük/disk/audit_index
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from AuditIndex import AuditIndex  # noqa: E402
+
+ACTIONS = ["LOGIN", "LOGOUT", "READ_FILE", "WRITE_FILE", "CREATE_FILE", "DELETE_FILE",
+           "QUOTA_EXCEEDED", "LOGIN_FAILED", "OVERWRITE_FILE", "TRUNCATE_FILE"]
+
+
+def _timed_query(index, repeat=20, **kwargs):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = index.query(**kwargs)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[-1], result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--dir', default=None, help="İndeks dizini (varsayılan: geçici dizin)")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="audit_index_")
+    index = AuditIndex(directory)
+    rng = random.Random(42)
+    end = time.time()
+    start_ts = end - args.days * 86400
+    step = (end - start_ts) / args.entries
+
+    start = time.perf_counter()
+    batch = []
+    for i in range(args.entries):
+        batch.append({'ts': start_ts + i * step, 'user': f"user{rng.randrange(args.users)}",
+                      'action': rng.choice(ACTIONS), 'details': f"Path: /home/x/f{i}.txt"})
+        if len(batch) == 10000:
+            index.add_batch(batch)
+            batch = []
+    index.add_batch(batch)
+    build = time.perf_counter() - start
+    print(f"{args.entries} kayıt indekslendi: {build:.1f} s ({args.entries / build:.0f} kayıt/s) -> {directory}")
+
+    day_ago = end - 86400
+    week_ago = end - 7 * 86400
+    queries = [
+        ("kullanıcı, son hafta", dict(user_id="user42", since=week_ago)),
+        ("QUOTA_EXCEEDED, bugün", dict(action="QUOTA_EXCEEDED", since=day_ago)),
+        ("kullanıcı + işlem, tüm zaman", dict(user_id="user7", action="LOGIN_FAILED")),
+        ("filtresiz, ilk sayfa", dict()),
+    ]
+    print(f"{'sorgu':<30} {'p50 (ms)':>9} {'maks (ms)':>10} {'sonuç':>6}")
+    for name, kwargs in queries:
+        p50, worst, result = _timed_query(index, limit=50, **kwargs)
+        print(f"{name:<30} {p50:>9.2f} {worst:>10.2f} {len(result['entries']):>6}")
+
+    cursor, pages = None, 0
+    start = time.perf_counter()
+    while pages < 20:
+        result = index.query(user_id="user42", limit=50, cursor=cursor)
+        cursor = result['next_cursor']
+        pages += 1
+        if not cursor: break
+    print(f"kullanıcı geçmişinde {pages} sayfa: {(time.perf_counter() - start) * 1000 / pages:.2f} ms/sayfa")
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
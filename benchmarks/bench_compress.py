@@ -0,0 +1,105 @@
+# benchmarks/bench_compress.py
+"""Metin ağırlıklı dosyalar: plain vs compress (zlib/lzma) disk kullanımı, ekleme, akış okuma ve birleştirme.
+
+Kullanım:
+    python benchmarks/bench_compress.py --users 50 --file-mb 4 --appends 2000
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+import Storage  # noqa: E402
+
+WORDS = ("kota kullanıcı dosya dizin log satır hata başarılı okuma yazma sistem "
+         "admin disk boyut işlem zaman").split()
+
+
+def text(rng, size):
+    out, total = [], 0
+    while total < size:
+        line = " ".join(rng.choice(WORDS) for _ in range(12)) + f" {rng.randrange(10**6)}\n"
+        out.append(line)
+        total += len(line.encode('utf-8'))
+    return "".join(out)
+
+
+def disk_bytes(root, users):
+    total = 0
+    for u in range(users):
+        home = os.path.join(root, f"c{u}_home")
+        for name in os.listdir(home):
+            total += os.stat(os.path.join(home, name)).st_blocks * 512
+    return total
+
+
+def run(engine, codec, args, content):
+    label = engine if engine == "plain" else f"{engine}/{codec}"
+    storage = (Storage.CompressedStorage(codec=codec) if engine == "compress"
+               else Storage.PlainStorage())
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        qm = QuotaManager()
+        # Benchmark'ta KDF maliyeti ölçülmek istenmiyor
+        qm._hash_password = lambda password: password
+        fs = FileSystem(qm, project_root=root, storage=storage)
+        for u in range(args.users):
+            fs.register_user('admin', f"c{u}", 'p', 10 * 1024)
+            fs.create_file(f"c{u}", f"/home/c{u}/doc.txt", 0)
+
+        start = time.perf_counter()
+        for u in range(args.users):
+            fs.overwrite_file(f"c{u}", f"/home/c{u}/doc.txt", content)
+        write_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(args.appends):
+            fs.write_to_file(f"c{i % args.users}", f"/home/c{i % args.users}/doc.txt", f"append {i} " + WORDS[i % len(WORDS)] * 4)
+        append_s = time.perf_counter() - start
+        before = disk_bytes(root, args.users)
+
+        # Akış okuma: belleğe alınan en büyük parça çerçeve boyutuyla sınırlı kalmalı
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        stream = fs.open_read_stream("c0", "/home/c0/doc.txt")
+        read_bytes = sum(len(chunk) for chunk in stream[0]) if isinstance(stream, tuple) else 0
+        read_s = time.perf_counter() - start
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+        start = time.perf_counter()
+        message = fs.compact_files('admin')
+        compact_s = time.perf_counter() - start
+        after = disk_bytes(root, args.users)
+
+        logical = args.users * len(content.encode('utf-8'))
+        print(f"{label:>13}: yazma {args.users / write_s:.0f} dosya/s, ekleme {args.appends / append_s:.0f} işlem/s, "
+              f"akış okuma {read_bytes / 2**20 / read_s:.0f} MB/s (RSS artışı {rss_growth / 1024:.1f} MB)")
+        print(f"{'':>13}  mantıksal {logical / 2**20:.1f} MB, disk {before / 2**20:.1f} MB "
+              f"(oran {logical / before if before else 0:.2f}x); birleştirme {compact_s:.2f} s sonrası "
+              f"{after / 2**20:.1f} MB -> {message}")
+        fs.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--file-mb', type=float, default=4)
+    parser.add_argument('--appends', type=int, default=2000)
+    parser.add_argument('--codecs', default="zlib,lzma")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    content = text(random.Random(args.seed), int(args.file_mb * 2**20))
+    run("plain", None, args, content)
+    for codec in args.codecs.split(','):
+        run("compress", codec.strip(), args, content)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_dedup.py
+"""Aynı içeriği yükleyen çok sayıda kullanıcı: plain vs dedup depolama (disk kullanımı ve süre).
+
+Kullanım:
+    python benchmarks/bench_dedup.py --users 1000 --content-kb 256 --unique 0.1
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+import Storage  # noqa: E402
+
+
+def disk_bytes(root):
+    total = 0
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            try: total += os.stat(os.path.join(dirpath, name)).st_blocks * 512
+            except OSError: pass
+    return total
+
+
+def run(engine, args, contents):
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        qm = QuotaManager()
+        # Benchmark'ta KDF maliyeti ölçülmek istenmiyor
+        qm._hash_password = lambda password: password
+        fs = FileSystem(qm, project_root=root, storage=Storage.make_storage(os.path.join(root, "backend"), engine))
+        for u in range(args.users):
+            fs.register_user('admin', f"d{u}", 'p', 1024)
+            fs.create_file(f"d{u}", f"/home/d{u}/doc.txt", 0)
+
+        start = time.perf_counter()
+        for u in range(args.users):
+            fs.overwrite_file(f"d{u}", f"/home/d{u}/doc.txt", contents[u])
+        write_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for u in range(0, args.users, max(1, args.users // 100)):
+            fs.read_file(f"d{u}", f"/home/d{u}/doc.txt")
+        read_ms = (time.perf_counter() - start) / min(args.users, 100) * 1000
+
+        homes = sum(disk_bytes(os.path.join(root, f"d{u}_home")) for u in range(args.users))
+        store = disk_bytes(os.path.join(root, "backend", "blockstore"))
+        logical = sum(len(c.encode('utf-8')) for c in contents)
+        print(f"{engine:>5}: yazma {args.users / write_s:.0f} dosya/s, okuma {read_ms:.2f} ms/dosya, "
+              f"mantıksal {logical / 2**20:.1f} MB, disk {(homes + store) / 2**20:.1f} MB "
+              f"(ev dizinleri {homes / 2**20:.1f} MB + parça deposu {store / 2**20:.1f} MB)")
+        fs.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--content-kb', type=int, default=256)
+    parser.add_argument('--unique', type=float, default=0.1, help="Farklı içerik yükleyen kullanıcı oranı")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    shared = "".join(rng.choice("abcdefgh \n") for _ in range(args.content_kb * 1024))
+    contents = [shared + str(u) if rng.random() < args.unique else shared for u in range(args.users)]
+    for engine in ("plain", "dedup"):
+        run(engine, args, contents)
+
+
+if __name__ == '__main__':
+    main()
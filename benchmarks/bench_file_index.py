@@ -0,0 +1,60 @@
+# benchmarks/bench_file_index.py
+"""FileSystem.files mikro-benchmark'ı: düz sözlük taraması vs kullanıcı bazlı FileIndex.
+
+Kullanım:
+    python benchmarks/bench_file_index.py --files 1000000 --users 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from FileIndex import FileIndex  # noqa: E402
+
+
+def _timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat): fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    flat, index = {}, FileIndex()
+    for i in range(args.files):
+        owner = f"user{i % args.users}"
+        path = f"/home/{owner}/file{i}.txt"
+        flat[path] = {'owner': owner, 'size': 1024}
+        index[path] = {'owner': owner, 'size': 1024}
+
+    target = "user42"
+    home = f"/home/{target}/"
+    sample = f"/home/{target}/file42.txt"
+
+    ls_flat = _timed(lambda: [p for p in flat if p.startswith(home)], max(1, args.repeat // 10))
+    ls_index = _timed(lambda: list(index.files_of(target)), args.repeat)
+    get_flat = _timed(lambda: flat[sample]['owner'] == target, args.repeat * 1000)
+    get_index = _timed(lambda: index[sample]['owner'] == target, args.repeat * 1000)
+
+    start = time.perf_counter()
+    flat = {p: info for p, info in flat.items() if info['owner'] != target}
+    del_flat = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    index.drop_owner(target)
+    del_index = (time.perf_counter() - start) * 1000
+
+    print(f"{args.files} dosya / {args.users} kullanıcı")
+    print(f"{'işlem':<14} {'düz dict (ms)':>14} {'FileIndex (ms)':>15}")
+    print(f"{'ls':<14} {ls_flat:>14.3f} {ls_index:>15.3f}")
+    print(f"{'sahip kontrolü':<14} {get_flat:>14.5f} {get_index:>15.5f}")
+    print(f"{'delete_user':<14} {del_flat:>14.3f} {del_index:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_journal.py
+"""QuotaManager yazma yolu karşılaştırması: tam users.json yeniden yazımı vs günlük (journal).
+
+Kullanım:
+    python benchmarks/bench_journal.py --users 10000 100000 --ops 2000 --threads 8
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+
+
+def _seed(project_root, user_count):
+    """Verilen sayıda kullanıcı içeren bir users.json oluşturur."""
+    os.makedirs(os.path.join(project_root, "backend"), exist_ok=True)
+    quotas = {'admin': {'limit': float('inf'), 'usage': 0}}
+    passwords = {'admin': '0' * 64}
+    for i in range(user_count):
+        quotas[f"user{i}"] = {'limit': 100 * 1024 * 1024, 'usage': 0}
+        passwords[f"user{i}"] = '0' * 64
+    with open(os.path.join(project_root, "backend", "users.json"), 'w', encoding='utf-8') as f:
+        json.dump({'quotas': quotas, 'passwords': passwords}, f, indent=4)
+
+
+class LegacyQuotaManager(QuotaManager):
+    """Eski davranış: her değişiklikte users.json baştan yazılır."""
+
+    def _log(self, record):
+        return 1
+
+    def _commit(self, seq):
+        data = {'quotas': self.user_quotas, 'passwords': self.passwords}
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+
+
+def _run(manager_cls, user_count, ops, threads):
+    with tempfile.TemporaryDirectory() as root:
+        _seed(root, user_count)
+        qm = manager_cls()
+        qm.load_and_sync_data(root)
+        per_thread = ops // threads
+
+        def worker(t):
+            for i in range(per_thread):
+                qm.check_and_update_usage(f"user{(t * per_thread + i) % user_count}", 1024)
+
+        workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+        start = time.perf_counter()
+        for w in workers: w.start()
+        for w in workers: w.join()
+        elapsed = time.perf_counter() - start
+        if qm.journal: qm.journal.close()
+        return per_thread * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--ops', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--legacy-ops', type=int, default=50,
+                        help="Eski yöntem çok yavaş olduğu için daha az işlemle ölçülür.")
+    args = parser.parse_args()
+
+    print(f"{'kullanıcı':>10} {'eski (create/s)':>16} {'journal (create/s)':>19} {'hızlanma':>9}")
+    for user_count in args.users:
+        legacy = _run(LegacyQuotaManager, user_count, args.legacy_ops, 1)
+        journal = _run(QuotaManager, user_count, args.ops, args.threads)
+        print(f"{user_count:>10} {legacy:>16.1f} {journal:>19.1f} {journal / legacy:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
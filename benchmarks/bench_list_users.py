@@ -0,0 +1,106 @@
+# benchmarks/bench_list_users.py
+"""list_users: tam tarama + sıralama (eski yol) vs sıralı kullanım indeksi (ilk 50, %90 üstü, önek sayfası).
+
+Ayrıca her kota değişikliğinde indeksi güncel tutmanın maliyeti (reserve + commit başına) ölçülür
+ve indeks sonuçları kaba kuvvet sıralamasıyla karşılaştırılır.
+
+Kullanım:
+    python benchmarks/bench_list_users.py --users 100000 --queries 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+from UsageIndex import percent_of  # noqa: E402
+
+
+def full_scan(qm, key, limit, predicate=None):
+    """Eski list_users: tüm kullanıcıları gezip sıralar."""
+    rows = [(u, q['usage'], q['limit']) for u, q in qm.user_quotas.items() if u != 'admin']
+    if predicate: rows = [r for r in rows if predicate(r)]
+    rows.sort(key=key, reverse=True)
+    return rows[:limit]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat): result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def all_pages(fs, **query):
+    users, cursor = [], None
+    while True:
+        page = fs.list_users('admin', cursor=cursor, limit=1000, **query)
+        users += [u['user_id'] for u in page['users']]
+        cursor = page['next_cursor']
+        if not cursor: return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--updates', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        qm = QuotaManager()
+        # Benchmark'ta KDF maliyeti ölçülmek istenmiyor
+        qm._hash_password = lambda password: password
+        fs = FileSystem(qm, project_root=root)
+
+        start = time.perf_counter()
+        with qm.deferred_commits():
+            for i in range(args.users):
+                user_id = f"u{i:06d}"
+                qm.add_user(user_id, 'p', rng.choice((10, 50, 100, 500)))
+                _, _, reservation = qm.reserve(user_id, int(rng.random() * qm.user_quotas[user_id]['limit']))
+                qm.commit(reservation)
+        print(f"[kurulum] {args.users} kullanıcı {time.perf_counter() - start:.1f} s")
+
+        def by_percent(r): return (percent_of(r[1], r[2]), r[0])
+        cases = [
+            ("ilk 50 (kullanım)", lambda: full_scan(qm, lambda r: (r[1], r[0]), 50),
+             lambda: fs.list_users('admin', sort='usage', limit=50)),
+            ("%90 üstü ilk 50", lambda: full_scan(qm, by_percent, 50, lambda r: percent_of(r[1], r[2]) >= 90),
+             lambda: fs.list_users('admin', sort='percent', limit=50, min_percent=90)),
+            ("önek 'u0123' (kullanım)", lambda: full_scan(qm, lambda r: (r[1], r[0]), 50, lambda r: r[0].startswith('u0123')),
+             lambda: fs.list_users('admin', sort='usage', limit=50, prefix='u0123')),
+        ]
+        for label, old, new in cases:
+            old_ms, expected = timed(old, max(1, args.queries // 20))
+            new_ms, page = timed(new, args.queries)
+            same = [r[0] for r in expected] == [u['user_id'] for u in page['users']]
+            print(f"{label:>24}: tam tarama {old_ms:8.2f} ms, indeks {new_ms:6.3f} ms "
+                  f"({old_ms / new_ms:.0f}x) -> {'TAMAM' if same else 'FARKLI!'}")
+
+        # Güncelleme maliyeti: her reserve/commit indeksi de günceller
+        users = [f"u{rng.randrange(args.users):06d}" for _ in range(args.updates)]
+        start = time.perf_counter()
+        with qm.deferred_commits():
+            for user_id in users:
+                _, _, reservation = qm.reserve(user_id, 1)
+                if reservation: qm.commit(reservation)
+        elapsed = time.perf_counter() - start
+        print(f"[güncelleme] {args.updates} reserve+commit: {elapsed / args.updates * 1e6:.1f} µs/işlem")
+
+        # Sayfalama tutarlılığı: tüm sayfalar birleşince tam sıralamayla aynı olmalı
+        paged = all_pages(fs, sort='percent')
+        expected = [r[0] for r in sorted(((u, q['usage'], q['limit']) for u, q in qm.user_quotas.items()),
+                                         key=by_percent, reverse=True)]
+        print(f"[sayfalama] {len(paged)} kullanıcı -> {'TAMAM' if paged == expected else 'FARKLI!'}")
+        fs.close()
+
+
+if __name__ == '__main__':
+    main()
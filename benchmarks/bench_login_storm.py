@@ -0,0 +1,86 @@
+# benchmarks/bench_login_storm.py
+"""Giriş fırtınası sırasında login verimi ve dosya işlemlerinin gecikmesi (p50/p99).
+
+KDF hesabı istek thread'inde (--kdf-workers 0) ya da süreç havuzunda çalıştırılarak
+karşılaştırılır. --cache-ttl 0 doğrulanmış şifre önbelleğini kapatır (her giriş KDF yapar).
+
+Kullanım:
+    python benchmarks/bench_login_storm.py --users 16 --login-threads 8 --seconds 5 --kdf-workers 0
+    python benchmarks/bench_login_storm.py --users 16 --login-threads 8 --seconds 5 --kdf-workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+import QuotaManager as quota_module  # noqa: E402
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+from PasswordHasher import KDF_WORKERS  # noqa: E402
+
+
+def percentile(samples, p):
+    if not samples: return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument('--login-threads', type=int, default=8)
+    parser.add_argument('--file-threads', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--kdf-workers', type=int, default=KDF_WORKERS)
+    parser.add_argument('--cache-ttl', type=float, default=0)
+    args = parser.parse_args()
+
+    quota_module.LOGIN_CACHE_TTL = args.cache_ttl
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        fs = FileSystem(QuotaManager(), project_root=root)
+        fs.qm.kdf.workers = args.kdf_workers
+        for u in range(args.users):
+            fs.register_user('admin', f"u{u}", f"pw{u}", 10)
+        fs.create_file('admin', "/home/admin/log.txt", 0)
+
+        stop = threading.Event()
+        logins = [0] * args.login_threads
+        latencies = [[] for _ in range(args.file_threads)]
+
+        def login_worker(t):
+            i = t
+            while not stop.is_set():
+                u = i % args.users
+                if fs.login(f"u{u}", f"pw{u}").startswith(f"[u{u}]"):
+                    logins[t] += 1
+                i += args.login_threads
+
+        def file_worker(t):
+            while not stop.is_set():
+                start = time.perf_counter()
+                fs.write_to_file('admin', "/home/admin/log.txt", "x")
+                fs.list_files('admin')
+                latencies[t].append((time.perf_counter() - start) * 1000)
+                time.sleep(0.001)
+
+        threads = [threading.Thread(target=login_worker, args=(t,)) for t in range(args.login_threads)]
+        threads += [threading.Thread(target=file_worker, args=(t,)) for t in range(args.file_threads)]
+        for t in threads: t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads: t.join()
+
+        samples = [ms for per_thread in latencies for ms in per_thread]
+        print(f"KDF süreçleri: {args.kdf_workers or 'yok (istek thread)'}, önbellek: {args.cache_ttl:g} s")
+        print(f"login: {sum(logins) / args.seconds:.1f} giriş/s ({args.login_threads} thread)")
+        print(f"dosya işlemi: {len(samples)} örnek, p50 {percentile(samples, 50):.2f} ms, "
+              f"p99 {percentile(samples, 99):.2f} ms")
+        fs.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/bench_metrics_overhead.py
+"""Ölçüm (metrics) açıkken ve kapalıyken küçük eklemelerin (write_to_file) maliyeti.
+
+Kullanım:
+    python benchmarks/bench_metrics_overhead.py --appends 20000 --threads 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+from Metrics import metrics  # noqa: E402
+
+
+def run(fs, threads, appends):
+    def worker(u):
+        for _ in range(appends):
+            fs.write_to_file(f"m{u}", f"/home/m{u}/log.txt", "x" * 32)
+    workers = [threading.Thread(target=worker, args=(u,)) for u in range(threads)]
+    start = time.perf_counter()
+    for w in workers: w.start()
+    for w in workers: w.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--appends', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        fs = FileSystem(QuotaManager(), project_root=root)
+        for u in range(args.threads):
+            fs.register_user('admin', f"m{u}", 'p', 1024)
+            fs.create_file(f"m{u}", f"/home/m{u}/log.txt", 0)
+
+        total = args.threads * args.appends
+        for enabled in (False, True, False, True):
+            metrics.enabled = enabled
+            elapsed = run(fs, args.threads, args.appends)
+            print(f"metrics {'açık ' if enabled else 'kapalı'}: {total / elapsed:.0f} ekleme/s "
+                  f"({elapsed / total * 1e6:.1f} µs/işlem)")
+        start = time.perf_counter()
+        metrics.render()
+        print(f"/metrics çıktısı: {(time.perf_counter() - start) * 1000:.2f} ms")
+        fs.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_rate_limit.py
+"""Hız sınırlaması: kova kontrol maliyeti, 429 ile erken ret süresi, boşta kova temizliği ve kaba kuvvet girişi.
+
+1. RateLimiter.check() çağrısı başına süre (kabul ve ret yolları).
+2. Kaçak bir istemcinin /write_file döngüsü: kabul edilen istek vs 429 alan isteğin süresi.
+3. Çok sayıda farklı IP (sahte saat ile dakikalar boyunca): bellekteki kova sayısı sınırlı kalmalı.
+4. Yanlış parolayla art arda /login: kaç deneme parola kontrolüne ulaştı (LOGIN_FAILED yazdı).
+
+Kullanım:
+    python benchmarks/bench_rate_limit.py --clients 200000 --requests 2000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+sys.path.insert(0, BACKEND)
+from RateLimiter import RateLimiter  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+
+
+def bench_check(count):
+    limiter = RateLimiter(limits={'read': (1e9, 1e9)}, enabled=True)
+    start = time.perf_counter()
+    for i in range(count): limiter.check('read', '10.0.0.1', f"u{i % 100}")
+    accept = (time.perf_counter() - start) / count * 1e6
+    limiter = RateLimiter(limits={'read': (1e-9, 1)}, enabled=True)
+    start = time.perf_counter()
+    for i in range(count): limiter.check('read', '10.0.0.1', 'u')
+    reject = (time.perf_counter() - start) / count * 1e6
+    print(f"[kontrol] kabul {accept:.2f} µs, ret {reject:.2f} µs")
+
+
+def bench_eviction(clients):
+    clock = FakeClock()
+    limiter = RateLimiter(limits={'read': (50, 200)}, ip_factor=1, enabled=True, clock=clock)
+    peak = 0
+    for i in range(clients):
+        clock.now = i * 0.001   # saniyede 1000 yeni istemci, her biri tek istek
+        limiter.check('read', f"ip{i}", f"user{i}")
+        peak = max(peak, limiter.size())
+    print(f"[bellek] {clients} farklı istemci, {clock.now:.0f} sn: en fazla {peak} kova, "
+          f"son durumda {limiter.size()}")
+
+
+def bench_app(requests):
+    root = tempfile.mkdtemp()
+    os.makedirs(os.path.join(root, "backend"))
+    os.environ.update(KOTA_PROJECT_ROOT=root, KOTA_RATE_WRITE="100/200", KOTA_RATE_AUTH="5/10")
+    import app
+    app.qm._hash_password = lambda password: password
+    client = app.app.test_client()
+    app.fs.register_user('admin', 'runaway', 'p', 1000)
+    app.fs.create_file('runaway', '/home/runaway/log.txt', 0)
+    headers = {'X-Session-Token': app.sessions.create('runaway')}
+
+    timings = {200: [], 429: []}
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.post('/write_file', json={'file_path': '/home/runaway/log.txt', 'content': 'x' * 64},
+                               headers=headers)
+        timings.setdefault(response.status_code, []).append(time.perf_counter() - start)
+    for status, values in sorted(timings.items()):
+        if values:
+            print(f"[kaçak istemci] {status}: {len(values)} istek, ortalama {sum(values) / len(values) * 1e6:.0f} µs")
+
+    hashed, rejected = 0, 0
+    for _ in range(requests):
+        response = client.post('/login', json={'user_id': 'runaway', 'password': 'yanlış'})
+        if response.status_code == 429: rejected += 1
+        else: hashed += 1
+    print(f"[kaba kuvvet] {requests} yanlış parola: {hashed} deneme parola kontrolüne ulaştı "
+          f"(LOGIN_FAILED yazıldı), {rejected} tanesi 429 ile erken reddedildi")
+    app.fs.close()
+    shutil.rmtree(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--checks', type=int, default=200000)
+    parser.add_argument('--clients', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    bench_check(args.checks)
+    bench_eviction(args.clients)
+    bench_app(args.requests)
+
+
+if __name__ == '__main__':
+    main()
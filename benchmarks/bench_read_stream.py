@@ -0,0 +1,86 @@
+# benchmarks/bench_read_stream.py
+"""Büyük dosya okuma: /read_file (tüm dosya JSON içinde) vs /read_stream (parça parça).
+
+Her yöntem ayrı bir alt süreçte çalıştırılır; tepe bellek (ru_maxrss) ve ilk
+bayta kadar geçen süre (TTFB) ölçülür.
+
+Kullanım:
+    python benchmarks/bench_read_stream.py --size-mb 100
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+
+def _prepare(root, size_mb):
+    sys.path.insert(0, BACKEND)
+    from QuotaManager import QuotaManager
+    from FileSystem import FileSystem
+    os.makedirs(os.path.join(root, "backend"), exist_ok=True)
+    fs = FileSystem(QuotaManager(), project_root=root)
+    fs.register_user('admin', 'reader', 'p', size_mb * 2)
+    fs.create_file('reader', '/home/reader/big.txt', 0)
+    with open(fs._get_physical_path('reader', '/home/reader/big.txt'), 'w', encoding='utf-8') as f:
+        line = "x" * 99 + "\n"
+        for _ in range(size_mb * 1024 * 1024 // len(line)):
+            f.write(line)
+    fs.close()
+
+
+def _measure(root, mode):
+    """Alt süreçte çalışır: uygulamayı yükler, tek bir okuma yapar, sonucu JSON basar."""
+    os.environ['KOTA_PROJECT_ROOT'] = root
+    sys.path.insert(0, BACKEND)
+    import app as app_module
+    client = app_module.app.test_client()
+    headers = {'X-Session-Token': app_module.sessions.create('reader')}
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if mode == "read_file":
+        response = client.post('/read_file', json={'file_path': '/home/reader/big.txt'}, headers=headers)
+        first_byte = time.perf_counter()
+        body_len = len(response.get_data())
+    else:
+        response = client.get('/read_stream?file_path=/home/reader/big.txt', headers=headers, buffered=False)
+        chunks = iter(response.response)
+        body_len = len(next(chunks))
+        first_byte = time.perf_counter()
+        for chunk in chunks: body_len += len(chunk)
+        response.close()
+    total = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'mode': mode, 'ttfb_ms': (first_byte - start) * 1000, 'total_ms': total * 1000,
+                      'peak_rss_mb': peak / 1024, 'delta_rss_mb': (peak - baseline) / 1024, 'bytes': body_len}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=100)
+    parser.add_argument('--measure', nargs=2, metavar=('ROOT', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        _measure(*args.measure)
+        return
+
+    with tempfile.TemporaryDirectory() as root:
+        _prepare(root, args.size_mb)
+        print(f"{args.size_mb} MB dosya")
+        print(f"{'yöntem':<12} {'TTFB (ms)':>10} {'toplam (ms)':>12} {'tepe RSS (MB)':>14} {'artış (MB)':>11}")
+        for mode in ("read_file", "read_stream"):
+            out = subprocess.run([sys.executable, __file__, '--measure', root, mode],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:<12} {result['ttfb_ms']:>10.1f} {result['total_ms']:>12.1f} "
+                  f"{result['peak_rss_mb']:>14.1f} {result['delta_rss_mb']:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_reclaim.py
+"""delete_user: istek içinde senkron silme (rmtree) vs çöp kutusuna taşıma + arka plan geri kazanımı.
+
+Ölçülenler:
+1. delete_user isteğinin süresi (--files dosyalı bir kullanıcı).
+2. Silme sürerken başka bir kullanıcının write_to_file gecikmesi (ortalama / p99 / en kötü).
+3. Arka plan geri kazanımının toplam süresi ve çöp kutusunun boşaldığının doğrulanması.
+
+Kullanım:
+    python benchmarks/bench_reclaim.py --files 50000 --file-kb 4 --files-per-sec 0
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+
+
+def populate(fs, user_id, files, payload):
+    fs.register_user('admin', user_id, 'p', 100 * 1024)
+    home = fs._get_physical_dir_path(user_id)
+    # Dosyalar doğrudan yazılır, indeks ve kota açılış taramasıyla değil buradan kurulur (hızlı hazırlık).
+    for i in range(files):
+        with open(os.path.join(home, f"f{i}.txt"), 'wb') as f: f.write(payload)
+        fs.files[f"/home/{user_id}/f{i}.txt"] = {'owner': user_id, 'size': len(payload)}
+    fs.qm.reconcile_usage({user_id: files * len(payload)})
+
+
+def writer(fs, stop, latencies):
+    """Silme sürerken diğer kullanıcının eklemeleri (sunucuya gelen normal trafik)."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        fs.write_to_file('w', '/home/w/log.txt', "satır")
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.001)
+
+
+def run(args, deferred):
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        qm = QuotaManager()
+        qm._hash_password = lambda password: password
+        fs = FileSystem(qm, project_root=root)
+        fs.reclaimer.files_per_sec = args.files_per_sec
+        if not deferred:
+            # Önceki davranış: dizin istek içinde silinir.
+            fs._discard = lambda path, kind, *rest: fs.storage.remove_tree(path) or False
+        populate(fs, 'big', args.files, b"x" * (args.file_kb * 1024))
+        fs.register_user('admin', 'w', 'p', 100 * 1024)
+        fs.create_file('w', '/home/w/log.txt', 0)
+
+        latencies, stop = [], threading.Event()
+        thread = threading.Thread(target=writer, args=(fs, stop, latencies))
+        thread.start()
+        time.sleep(0.2)
+        start = time.perf_counter()
+        message = fs.delete_user('admin', 'big')
+        request = time.perf_counter() - start
+        while fs.reclaimer.entries(): time.sleep(0.01)
+        total = time.perf_counter() - start
+        time.sleep(0.2)
+        stop.set()
+        thread.join()
+        trash = os.path.join(root, "backend", "trash")
+        ok = (message.startswith("BAŞARILI") and 'big' not in qm.user_quotas and not os.listdir(trash)
+              and not os.path.exists(fs._get_physical_dir_path('big')))
+        fs.close()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+    label = "çöp kutusu + arka plan" if deferred else "senkron rmtree"
+    print(f"  {label:<24} istek {request * 1000:>9.1f} ms, tamamı {total:>6.2f} s | diğer kullanıcının "
+          f"yazma gecikmesi: ort {sum(latencies) / max(1, len(latencies)) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, "
+          f"en kötü {latencies[-1] * 1000 if latencies else 0:.1f} ms")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=50000)
+    parser.add_argument('--file-kb', type=int, default=4)
+    parser.add_argument('--files-per-sec', type=float, default=0, help="Geri kazanım hız sınırı (0 = sınırsız)")
+    args = parser.parse_args()
+    print(f"[delete_user] {args.files} dosya x {args.file_kb} KB")
+    ok = run(args, deferred=False)
+    ok &= run(args, deferred=True)
+    print(f"tutarlılık: {'TAMAM' if ok else 'HATALI'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
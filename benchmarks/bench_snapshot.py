@@ -0,0 +1,113 @@
+# benchmarks/bench_snapshot.py
+"""Anlık görüntü: tam kopya (copytree) vs sabit bağlantılı görüntü; artımlı görüntü, COW ekleme ve geri yükleme.
+
+Ölçülenler:
+1. Tüm ev dizinlerinin tam kopyası: süre ve ek disk.
+2. İlk anlık görüntü ve --change oranında dosya değiştikten sonraki artımlı görüntü: süre ve ek disk.
+3. Görüntü sonrası ilk ekleme (bağlantı koparma + kopya) vs sonraki eklemeler.
+4. Geri yükleme süresi ve görüntünün değişmediğinin doğrulanması.
+
+Kullanım:
+    python benchmarks/bench_snapshot.py --users 20 --files 50 --file-kb 256 --change 0.05
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+
+
+def disk_bytes(*dirs):
+    """Dizinlerdeki benzersiz inode'ların ayrılmış blokları (sabit bağlantılar bir kez sayılır)."""
+    seen, total = set(), 0
+    for top in dirs:
+        for dirpath, _, names in os.walk(top):
+            for name in names:
+                st = os.lstat(os.path.join(dirpath, name))
+                if (st.st_dev, st.st_ino) in seen: continue
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_blocks * 512
+    return total
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--file-kb', type=int, default=256)
+    parser.add_argument('--change', type=float, default=0.05, help="Artımlı görüntüden önce değişen dosya oranı")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    MB = 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        qm = QuotaManager()
+        # Benchmark'ta KDF maliyeti ölçülmek istenmiyor
+        qm._hash_password = lambda password: password
+        fs = FileSystem(qm, project_root=root)
+        users = [f"s{u}" for u in range(args.users)]
+        block = "x" * 1023
+        for user_id in users:
+            fs.register_user('admin', user_id, 'p', 10 * 1024)
+            for i in range(args.files):
+                path = f"/home/{user_id}/f{i}.txt"
+                fs.create_file(user_id, path, 0)
+                fs.overwrite_file(user_id, path, "\n".join(block for _ in range(args.file_kb)))
+        homes = [fs._get_physical_dir_path(u) for u in users]
+        data = disk_bytes(*homes)
+        print(f"[veri] {args.users} kullanıcı x {args.files} dosya = {data / MB:.1f} MB")
+
+        copy_root = os.path.join(root, "full_copy")
+        elapsed, _ = timed(lambda: [shutil.copytree(h, os.path.join(copy_root, os.path.basename(h))) for h in homes])
+        print(f"[tam kopya] {elapsed:.3f} s, ek disk {disk_bytes(copy_root) / MB:.1f} MB")
+        shutil.rmtree(copy_root)
+
+        snap_dir = fs.snapshots.directory
+        elapsed, message = timed(lambda: fs.create_snapshot('admin'))
+        print(f"[ilk görüntü] {elapsed:.3f} s, ek disk {(disk_bytes(snap_dir, *homes) - data) / MB:.2f} MB "
+              f"-> {message.splitlines()[-1]}")
+
+        # Dosyaların bir kısmını değiştir: ilk ekleme bağlantıyı koparır (dosya kopyalanır)
+        changed = rng.sample([(u, i) for u in users for i in range(args.files)],
+                             max(1, int(args.users * args.files * args.change)))
+        before = disk_bytes(snap_dir, *homes)
+        first, _ = timed(lambda: [fs.write_to_file(u, f"/home/{u}/f{i}.txt", "ek satır") for u, i in changed])
+        cow = disk_bytes(snap_dir, *homes) - before
+        second, _ = timed(lambda: [fs.write_to_file(u, f"/home/{u}/f{i}.txt", "ek satır") for u, i in changed])
+        print(f"[ekleme] görüntü sonrası ilk ekleme {first / len(changed) * 1000:.2f} ms/dosya (kopyalama), "
+              f"sonrakiler {second / len(changed) * 1000:.3f} ms/dosya; kopyalanan {cow / MB:.2f} MB")
+
+        before = disk_bytes(snap_dir, *homes)
+        elapsed, message = timed(lambda: fs.create_snapshot('admin'))
+        print(f"[artımlı görüntü] {len(changed)} değişen dosya: {elapsed:.3f} s, "
+              f"ek disk {(disk_bytes(snap_dir, *homes) - before) / MB:.2f} MB -> {message.splitlines()[-1]}")
+
+        user_id = users[0]
+        first_id = fs.snapshots.ids(user_id)[0]
+        original = fs.snapshots.load(user_id, first_id)['quota']['usage']
+        fs.overwrite_file(user_id, f"/home/{user_id}/f0.txt", "bozuldu")
+        fs.truncate_file(user_id, f"/home/{user_id}/f1.txt")
+        elapsed, message = timed(lambda: fs.restore_snapshot('admin', user_id, first_id))
+        ok = (qm.user_quotas[user_id]['usage'] == original
+              and fs.read_file(user_id, f"/home/{user_id}/f0.txt").startswith(block))
+        print(f"[geri yükleme] {elapsed * 1000:.1f} ms -> {'TAMAM' if ok else 'TUTARSIZ!'} ({message})")
+        fs.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_startup.py
+"""FileSystem açılış süresi: soğuk (manifest yok) vs sıcak (temiz kapanış manifesti).
+
+Kullanım:
+    python benchmarks/bench_startup.py --homes 10000 --files-per-home 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+
+
+def _seed(root, homes, files_per_home):
+    os.makedirs(os.path.join(root, "backend"))
+    quotas = {'admin': {'limit': float('inf'), 'usage': 0}}
+    passwords = {'admin': '0' * 64}
+    for i in range(homes):
+        user_id = f"user{i}"
+        quotas[user_id] = {'limit': 100 * 1024 * 1024, 'usage': 0}
+        passwords[user_id] = '0' * 64
+        home = os.path.join(root, f"{user_id}_home")
+        os.makedirs(home)
+        for j in range(files_per_home):
+            with open(os.path.join(home, f"file{j}.txt"), 'w') as f:
+                f.write("x" * (j + 1))
+    with open(os.path.join(root, "backend", "users.json"), 'w', encoding='utf-8') as f:
+        json.dump({'quotas': quotas, 'passwords': passwords}, f)
+
+
+def _start(root):
+    qm = QuotaManager()
+    start = time.perf_counter()
+    fs = FileSystem(qm, project_root=root)
+    elapsed = time.perf_counter() - start
+    return fs, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--homes', type=int, default=10000)
+    parser.add_argument('--files-per-home', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        _seed(root, args.homes, args.files_per_home)
+        fs, cold = _start(root)
+        fs.close()
+        fs, warm = _start(root)
+        fs.close()
+        print(f"{args.homes} ev dizini x {args.files_per_home} dosya")
+        print(f"soğuk açılış: {cold * 1000:.1f} ms")
+        print(f"sıcak açılış: {warm * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
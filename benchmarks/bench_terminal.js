@@ -0,0 +1,229 @@
+// benchmarks/bench_terminal.js
+// Web terminali: eski printOutput (mesaj başına div + innerHTML) vs sanal terminal (frontend/terminal.js).
+// Tarayıcı gerektirmez; küçük bir DOM taklidi (shim) üzerinde çalışır. Yerleşim/boyama maliyeti
+// ölçülmez; ölçülenler JS süresi, en uzun kesintisiz blok (sekmenin donma süresi), canlı DOM
+// düğümü sayısı ve bellek artışıdır.
+//
+// 1. Büyük cat: --lines satırlık (~MB'larca) tek çıktı.
+// 2. Uzun oturum: --session adet kısa mesaj.
+// 3. Kaydırma: rastgele --scrolls konuma kaydırıp çizim süresi.
+// 4. Akış: aynı büyük çıktının 64 KB'lık parçalarla (fetch gövdesi gibi) yazılması.
+// 5. Kaçış: HTML içeren metin düğüm üretmeden, olduğu gibi yazılmalı.
+//
+// Kullanım:
+//     node --expose-gc benchmarks/bench_terminal.js --lines 200000 --session 20000 --scrollback 10000
+const path = require('path');
+const { performance } = require('perf_hooks');
+const { TerminalView } = require(path.join(__dirname, '..', 'frontend', 'terminal.js'));
+
+function parseArgs() {
+    const args = { lines: 200000, lineChars: 60, session: 20000, scrollback: 10000, scrolls: 2000 };
+    const argv = process.argv.slice(2);
+    for (let i = 0; i < argv.length; i += 2) {
+        const key = argv[i].replace(/^--/, '').replace(/-(\w)/g, (_, c) => c.toUpperCase());
+        if (!(key in args)) throw new Error(`Bilinmeyen seçenek: ${argv[i]}`);
+        args[key] = Number(argv[i + 1]);
+    }
+    return args;
+}
+
+// --- DOM taklidi ---
+const LINE_HEIGHT = 18;
+const stats = { nodes: 0, innerHTML: 0 };
+
+class Element {
+    constructor(tag) {
+        this.tagName = tag;
+        this.children = [];
+        this.style = {};
+        this.className = '';
+        this._text = '';
+        this._lines = 0;        // innerHTML ile oluşan satır sayısı (eski yol)
+        this._listeners = {};
+        this._scrollTop = 0;
+        this._flowHeight = 0;
+        this._sized = [];
+        this.clientHeight = 400;
+        stats.nodes++;
+    }
+    appendChild(child) {
+        this.children.push(child);
+        // Yerleşim: spacer yüksekliği canlı okunur, mutlak konumlu viewport akışta yer kaplamaz.
+        if (child.className === 'term-spacer') this._sized.push(child);
+        else if (child.className !== 'term-viewport') this._flowHeight += Math.max(1, child._lines) * LINE_HEIGHT;
+        return child;
+    }
+    removeChild(child) {
+        this.children.splice(this.children.indexOf(child), 1);
+        stats.nodes -= 1 + child._lines;
+        return child;
+    }
+    get textContent() { return this._text; }
+    set textContent(value) { this._text = String(value); }
+    set innerHTML(value) {
+        // Tarayıcı işaretlemeyi ayrıştırır: her <br> ve arasındaki metin ayrı düğümdür.
+        stats.innerHTML++;
+        const parts = value.split('<br>');
+        this._lines = parts.length;
+        this._text = parts.join('\n');
+        stats.nodes += 2 * parts.length - 1;
+    }
+    get scrollHeight() {
+        let height = this._flowHeight;
+        for (const child of this._sized) height += parseFloat(child.style.height || 0);
+        return Math.max(height, this.clientHeight);
+    }
+    get scrollTop() { return this._scrollTop; }
+    set scrollTop(value) { this._scrollTop = Math.max(0, Math.min(value, this.scrollHeight - this.clientHeight)); }
+    addEventListener(type, fn) { (this._listeners[type] = this._listeners[type] || []).push(fn); }
+    dispatch(type) { (this._listeners[type] || []).forEach(fn => fn()); }
+}
+
+const document = { createElement: tag => new Element(tag) };
+
+// requestAnimationFrame yerine: çizimler kuyruğa alınır, "kare" sınırında çalıştırılır.
+let frames = [];
+function flushFrames() {
+    const pending = frames;
+    frames = [];
+    pending.forEach(fn => fn());
+}
+
+// Ana iş parçacığının tarayıcıya dönmeden çalıştığı en uzun süre
+let blockStart = 0, longestBlock = 0;
+function yieldToBrowser() {
+    flushFrames();
+    longestBlock = Math.max(longestBlock, performance.now() - blockStart);
+    return new Promise(resolve => setImmediate(() => { blockStart = performance.now(); resolve(); }));
+}
+
+function heapMB() {
+    if (global.gc) global.gc();
+    return process.memoryUsage().heapUsed / 1024 / 1024;
+}
+
+// --- Eski yol: frontend/script.js'teki önceki printOutput ---
+function legacyPrintOutput(outputDiv, text, isError = false) {
+    const p = document.createElement('div');
+    p.className = isError ? 'error' : 'success';
+    p.innerHTML = text.replace(/\n\n/g, '<br>').replace(/\n/g, '<br>');
+    outputDiv.appendChild(p);
+    outputDiv.scrollTop = outputDiv.scrollHeight;
+}
+
+function newTerminal(capacity) {
+    const container = new Element('div');
+    const view = new TerminalView(container, {
+        document, capacity, schedule: fn => frames.push(fn), yieldToBrowser,
+    });
+    return { container, view };
+}
+
+async function measure(label, fn, inspect = () => null) {
+    // Bellek: sonuç canlıyken ve bırakıldıktan sonraki yığın farkı (tutulan bellek).
+    const nodesBefore = stats.nodes;
+    longestBlock = 0;
+    blockStart = performance.now();
+    const start = performance.now();
+    let keep = await fn();
+    flushFrames();
+    const total = performance.now() - start;
+    longestBlock = Math.max(longestBlock, performance.now() - blockStart);
+    const nodes = stats.nodes - nodesBefore;
+    const result = inspect(keep);
+    const held = heapMB();
+    keep = null;
+    await new Promise(resolve => setImmediate(resolve));   // Son await'in tuttuğu referans da bırakılsın
+    console.log(`  ${label.padEnd(10)} toplam ${total.toFixed(0).padStart(6)} ms, en uzun blok ${longestBlock.toFixed(1).padStart(7)} ms, ` +
+                `canlı düğüm ${String(nodes).padStart(8)}, tutulan bellek ${(held - heapMB()).toFixed(1)} MB`);
+    return result;
+}
+
+function makeText(lines, lineChars) {
+    const out = [];
+    for (let i = 0; i < lines; i++) out.push(String(i).padStart(8, '0') + ' ' + 'x'.repeat(Math.max(0, lineChars - 9)));
+    return out.join('\n');
+}
+
+function fakeBody(text, chunkBytes = 64 * 1024) {
+    const bytes = Buffer.from(text, 'utf-8');
+    let offset = 0;
+    return {
+        getReader: () => ({
+            read: async () => {
+                if (offset >= bytes.length) return { done: true };
+                const value = new Uint8Array(bytes.buffer, bytes.byteOffset + offset, Math.min(chunkBytes, bytes.length - offset));
+                offset += chunkBytes;
+                return { done: false, value };
+            },
+        }),
+    };
+}
+
+async function main() {
+    const args = parseArgs();
+    let ok = true;
+    const text = makeText(args.lines, args.lineChars);
+    console.log(`[büyük cat] ${args.lines} satır, ${(text.length / 1024 / 1024).toFixed(1)} MB`);
+    await measure('eski', () => {
+        const outputDiv = new Element('div');
+        legacyPrintOutput(outputDiv, text);
+        return outputDiv;
+    });
+    const last = await measure('sanal', async () => {
+        const t = newTerminal(args.scrollback);
+        await t.view.print(text);
+        return t;
+    }, t => t.view.line(t.view.length - 1).text);
+    ok = ok && last.startsWith(String(args.lines - 1).padStart(8, '0'));
+
+    console.log(`[uzun oturum] ${args.session} mesaj`);
+    await measure('eski', () => {
+        const outputDiv = new Element('div');
+        for (let i = 0; i < args.session; i++) legacyPrintOutput(outputDiv, `CMD> write /home/u/f.txt ${i}\nBAŞARILI: Dosyaya yazıldı.`);
+        return outputDiv;
+    });
+    const scrolled = await measure('sanal', async () => {
+        const t = newTerminal(args.scrollback);
+        for (let i = 0; i < args.session; i++) {
+            t.view.print(`CMD> write /home/u/f.txt ${i}`, 'command');
+            t.view.print('BAŞARILI: Dosyaya yazıldı.');
+            if (i % 50 === 49) await yieldToBrowser();   // Her 50 komutta bir kare
+        }
+        await t.view.print('');
+        return t;
+    }, ({ container, view }) => {
+        const start = performance.now();
+        for (let i = 0; i < args.scrolls; i++) {
+            container.scrollTop = Math.floor(Math.random() * container.scrollHeight);
+            container.dispatch('scroll');
+            flushFrames();
+        }
+        return { perFrame: (performance.now() - start) / args.scrolls * 1000, rows: view.viewport.children.length,
+                 length: view.length, capacity: view.capacity };
+    });
+    console.log(`[kaydırma] ${args.scrolls} konum: kare başına ${scrolled.perFrame.toFixed(1)} µs, ` +
+                `DOM'daki satır ${scrolled.rows} (tampon ${scrolled.length}/${scrolled.capacity})`);
+    ok = ok && scrolled.rows < 100 && scrolled.length <= args.scrollback;
+
+    console.log(`[akış] aynı cat çıktısı 64 KB parçalarla`);
+    const streamed = await measure('sanal', async () => {
+        const t = newTerminal(args.scrollback);
+        await t.view.printStream(fakeBody(text));
+        return t;
+    }, t => t.view.line(t.view.length - 1).text);
+    ok = ok && streamed === last;
+
+    const before = stats.innerHTML;
+    const markup = '<img src=x onerror="alert(1)"><b>kalın</b>';
+    const t = newTerminal(10);
+    await t.view.print(markup);
+    flushFrames();
+    const escaped = t.view.viewport.children[0].textContent === markup && stats.innerHTML === before;
+    console.log(`[kaçış] HTML içeren metin: ${escaped ? 'TAMAM (düz metin olarak yazıldı)' : 'HATALI!'}`);
+    ok = ok && escaped;
+    console.log(ok ? 'SONUÇ: TAMAM' : 'SONUÇ: TUTARSIZ!');
+    process.exit(ok ? 0 : 1);
+}
+
+main();
@@ -0,0 +1,132 @@
+# benchmarks/load_multiworker.py
+"""Çok süreçli yük testi (KOTA_STATE=sqlite): worker süreçleri ortak kotayı birlikte aşamamalı.
+
+1. N süreç aynı kullanıcı için aynı anda create_file / write_to_file çağırır; sonunda
+   ortak veritabanındaki kullanım <= limit, kullanım == indeksteki boyutların toplamı
+   == diskteki dosyaların boyutu ve başarılı işlem sayısı == indeksteki dosya sayısı olmalıdır.
+2. Her süreç kendi kullanıcısına yazar; 1 süreç ile N süreç arasındaki toplam işlem/s raporlanır.
+
+Kullanım:
+    python benchmarks/load_multiworker.py --workers 4 --attempts 200
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Diskteki boyut kotayla birebir karşılaştırılabilsin diye dosyalar tam boyutta (seyrek) oluşturulur.
+os.environ.setdefault("KOTA_PREALLOC", "sparse")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from FileSystem import FileSystem  # noqa: E402
+from SharedState import SharedQuotaManager, SHARED_DB_NAME  # noqa: E402
+
+HOT_QUOTA_MB = 1
+
+
+def _open(root):
+    qm = SharedQuotaManager()
+    # Benchmark'ta KDF maliyeti ölçülmek istenmiyor
+    qm._hash_password = lambda password: password
+    return FileSystem(qm, project_root=root)
+
+
+def hammer(root, index, barrier, attempts, size_mb, results):
+    """Aynı kullanıcıya oluşturma + ekleme; kabul edilen işlem sayılarını bildirir."""
+    fs = _open(root)
+    created = appended = 0
+    barrier.wait()
+    for i in range(attempts):
+        path = f"/home/hot/w{index}_{i}.txt"
+        if fs.create_file('hot', path, size_mb).startswith("BAŞARILI"):
+            created += 1
+            appended += fs.write_to_file('hot', path, "x" * 100).startswith("BAŞARILI")
+    fs.close()
+    results.put((created, appended))
+
+
+def throughput_worker(root, index, barrier, ops, results):
+    fs = _open(root)
+    user_id = f"load{index}"
+    barrier.wait()
+    start = time.perf_counter()
+    for i in range(ops):
+        path = f"/home/{user_id}/f{i % 10}.txt"
+        if path not in fs.files: fs.create_file(user_id, path, 0.001)
+        fs.write_to_file(user_id, path, "satır")
+        fs.read_file(user_id, path)
+    results.put(time.perf_counter() - start)
+    fs.close()
+
+
+def run_processes(ctx, target, workers, extra):
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=target, args=(extra[0], w, barrier, *extra[1:], results)) for w in range(workers)]
+    for p in procs: p.start()
+    out = [results.get() for _ in procs]
+    for p in procs: p.join()
+    if any(p.exitcode for p in procs): raise SystemExit("Bir worker hata ile sonlandı.")
+    return out
+
+
+def overcommit_check(ctx, root, workers, attempts):
+    size_mb = 10 / 1024  # 10 KB: bayt cinsinden tam sayı
+    results = run_processes(ctx, hammer, workers, (root, attempts, size_mb))
+    created = sum(c for c, _ in results)
+    appended = sum(a for _, a in results)
+
+    # Durum bir sonraki açılışta diskle uzlaştırılacağı için doğrudan veritabanından okunur.
+    db = sqlite3.connect(os.path.join(root, "backend", SHARED_DB_NAME))
+    usage, limit = db.execute("SELECT usage, quota FROM users WHERE id = 'hot'").fetchone()
+    indexed, count = db.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM files WHERE owner = 'hot'").fetchone()
+    db.close()
+    home = os.path.join(root, "hot_home")
+    on_disk = sum(os.path.getsize(os.path.join(home, name)) for name in os.listdir(home))
+    ok = (usage <= limit and abs(usage - indexed) < 1e-6 and abs(on_disk - indexed) < 1e-6
+          and count == created)
+    print(f"[kota] {workers} süreç, deneme={workers * attempts} oluşturma={created} ekleme={appended} "
+          f"kullanım={usage:.0f} limit={limit:.0f} indeks={indexed:.0f} disk={on_disk} -> "
+          f"{'TAMAM' if ok else 'AŞIM/TUTARSIZLIK!'}")
+    return ok
+
+
+def throughput(ctx, root, workers, ops):
+    elapsed = run_processes(ctx, throughput_worker, workers, (root, ops))
+    rate = workers * ops * 2 / max(elapsed)
+    print(f"[verim] {workers} süreç x {ops} döngü: {rate:.0f} işlem/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--attempts', type=int, default=200)
+    parser.add_argument('--ops', type=int, default=500)
+    args = parser.parse_args()
+    ctx = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        fs = _open(root)
+        fs.register_user('admin', 'hot', 'p', HOT_QUOTA_MB)
+        for w in range(args.workers):
+            fs.register_user('admin', f"load{w}", 'p', 1000)
+        fs.close()
+
+        ok = overcommit_check(ctx, root, args.workers, args.attempts)
+        single = throughput(ctx, root, 1, args.ops)
+        multi = throughput(ctx, root, args.workers, args.ops)
+        print(f"[ölçek] {args.workers} süreç / 1 süreç: {multi / single:.2f}x")
+
+        # Yeniden açılış: tarama kullanımı değiştirmemeli
+        fs = _open(root)
+        usage = fs.qm.user_quotas['hot']['usage']
+        fs.close()
+        print(f"[açılış] yeniden taramadan sonra kullanım={usage:.0f}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
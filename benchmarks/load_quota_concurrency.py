@@ -0,0 +1,89 @@
+# benchmarks/load_quota_concurrency.py
+"""Eşzamanlı yük testi: kota hiçbir zaman aşılmamalı, kullanıcılar paralel çalışabilmeli.
+
+1. Aynı kullanıcı için çok sayıda thread aynı anda create_file çağırır; sonunda
+   kullanım <= limit ve kullanım == indeksteki dosya boyutlarının toplamı olmalıdır.
+2. N kullanıcı aynı anda create/write/cat yapar; toplam işlem/s raporlanır.
+
+Kullanım:
+    python benchmarks/load_quota_concurrency.py --threads 16 --users 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+from FileSystem import FileSystem  # noqa: E402
+
+
+def _new_fs(root):
+    fs = FileSystem(QuotaManager(), project_root=root)
+    return fs
+
+
+def overcommit_check(fs, threads, attempts):
+    fs.register_user('admin', 'hot', 'p', 1)  # 1 MB kota
+    size_mb = 0.01
+    barrier = threading.Barrier(threads)
+
+    def worker(t):
+        barrier.wait()
+        for i in range(attempts):
+            fs.create_file('hot', f"/home/hot/t{t}_{i}.txt", size_mb)
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers: w.start()
+    for w in workers: w.join()
+
+    quota = fs.qm.user_quotas['hot']
+    indexed = sum(info['size'] for info in fs.files.files_of('hot').values())
+    ok = quota['usage'] <= quota['limit'] and abs(quota['usage'] - indexed) < 1e-6
+    print(f"[kota] deneme={threads * attempts} başarılı={len(fs.files.files_of('hot'))} "
+          f"kullanım={quota['usage']:.0f} limit={quota['limit']:.0f} indeks={indexed:.0f} -> "
+          f"{'TAMAM' if ok else 'AŞIM!'}")
+    return ok
+
+
+def throughput(fs, users, ops):
+    for u in range(users):
+        fs.register_user('admin', f"load{u}", 'p', 1000)
+
+    def worker(u):
+        user_id = f"load{u}"
+        for i in range(ops):
+            path = f"/home/{user_id}/f{i % 10}.txt"
+            if path not in fs.files: fs.create_file(user_id, path, 0.001)
+            fs.write_to_file(user_id, path, "satır")
+            fs.read_file(user_id, path)
+
+    workers = [threading.Thread(target=worker, args=(u,)) for u in range(users)]
+    start = time.perf_counter()
+    for w in workers: w.start()
+    for w in workers: w.join()
+    elapsed = time.perf_counter() - start
+    print(f"[verim] {users} kullanıcı x {ops} döngü: {users * ops * 2 / elapsed:.0f} işlem/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--attempts', type=int, default=50)
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument('--ops', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "backend"))
+        fs = _new_fs(root)
+        ok = overcommit_check(fs, args.threads, args.attempts)
+        throughput(fs, args.users, args.ops)
+        fs.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
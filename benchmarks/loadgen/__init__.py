@@ -0,0 +1,13 @@
+# benchmarks/loadgen/__init__.py
+"""Kota/dosya API'si için tekrarlanabilir yük üretimi ve ölçüm paketi.
+
+app.py ya süreç içinde (Flask test istemcisi) ya da yerel bir HTTP sunucusu
+üzerinden sürülür. Ayrıntılar için: python -m benchmarks.loadgen --help
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BACKEND_DIR = os.path.join(REPO_ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,86 @@
+# benchmarks/loadgen/__main__.py
+"""Kota/dosya API'si yük testi.
+
+Kullanım (depo kökünden):
+    python -m benchmarks.loadgen --mode inprocess --users 1000 --workload all --output results.json
+    python -m benchmarks.loadgen --mode http --users 100000 --workload login_storm,admin_scale
+    python -m benchmarks.loadgen --mode http --users 1000 --files-per-user 2000 --files-users 8 --workload ls_big_home
+    python -m benchmarks.loadgen --mode http --users 100 --large-users 4 --large-mb 100 --workload large_cat
+
+İş yükleri: login_storm, provisioning, append, large_cat, ls_big_home, admin_scale.
+admin_scale kullanıcıları sildiği için her zaman en son çalıştırılır.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from .clients import HttpClient, InProcessClient
+from .report import build_result, print_result, write_results
+from .seed import seed, user_id
+from .workloads import WORKLOADS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadgen', description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=('inprocess', 'http'), default='inprocess')
+    parser.add_argument('--url', help="Var olan sunucu (http kipinde); verilirse sunucu başlatılmaz ve seed yapılmaz")
+    parser.add_argument('--workload', default='all', help="Virgülle ayrılmış iş yükleri ya da 'all'")
+    parser.add_argument('--users', type=int, default=1000, help="Seed edilecek kullanıcı sayısı")
+    parser.add_argument('--files-per-user', type=int, default=0)
+    parser.add_argument('--files-users', type=int, default=None, help="Dosya yazılacak kullanıcı sayısı (varsayılan: hepsi)")
+    parser.add_argument('--file-bytes', type=int, default=64)
+    parser.add_argument('--large-users', type=int, default=0)
+    parser.add_argument('--large-mb', type=float, default=0)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--ops', type=int, default=200, help="Thread başına işlem sayısı")
+    parser.add_argument('--create-mb', type=float, default=0.001)
+    parser.add_argument('--line-bytes', type=int, default=64)
+    parser.add_argument('--seed', type=int, default=42, help="Rastgele seçimlerin tohumu")
+    parser.add_argument('--output', help="Sonuçların ekleneceği JSON dosyası")
+    parser.add_argument('--rate-limit', action='store_true',
+                        help="Sunucunun hız sınırlamasını açık bırak (varsayılan: KOTA_RATE_LIMIT=0)")
+    args = parser.parse_args()
+
+    names = list(WORKLOADS) if args.workload == 'all' else [w.strip() for w in args.workload.split(',')]
+    unknown = [w for w in names if w not in WORKLOADS]
+    if unknown: parser.error(f"bilinmeyen iş yükü: {', '.join(unknown)}")
+    args.workloads = sorted(names, key=lambda w: w == 'admin_scale')
+    return args
+
+
+def main():
+    args = parse_args()
+    # Tüm yük tek IP'den geldiği için hız sınırı ölçülen yolu 429'a çevirir; istenirse açık bırakılır.
+    if not args.rate_limit: os.environ.setdefault('KOTA_RATE_LIMIT', '0')
+    root = None
+    if args.url is None:
+        root = tempfile.mkdtemp(prefix="kota_bench_")
+        start = time.perf_counter()
+        seed(root, args.users, args.files_per_user, args.files_users, args.file_bytes,
+             args.large_users, args.large_mb)
+        print(f"[seed] {args.users} kullanıcı {time.perf_counter() - start:.1f} s içinde hazırlandı ({root})")
+
+    args.users_list = [user_id(i) for i in range(args.users)]
+    client = HttpClient(root, url=args.url) if args.mode == 'http' else InProcessClient(root)
+    params = {k: v for k, v in vars(args).items() if k not in ('users_list', 'workloads', 'output')}
+    results = []
+    try:
+        for name in args.workloads:
+            ctx = argparse.Namespace(**dict(vars(args), users=args.users_list))
+            start = time.perf_counter()
+            ops = WORKLOADS[name](client, ctx)
+            result = build_result(name, args.mode, params, time.perf_counter() - start, ops)
+            print_result(result)
+            results.append(result)
+    finally:
+        client.close()
+        if root: shutil.rmtree(root, ignore_errors=True)
+    if args.output:
+        write_results(args.output, results)
+        print(f"Sonuçlar: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/loadgen/clients.py
+"""app.py'yi süren istemciler: süreç içi (Flask test istemcisi) ve gerçek HTTP."""
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from . import BACKEND_DIR
+
+SESSION_HEADER = 'X-Session-Token'
+
+
+class Response:
+    __slots__ = ('status', 'body')
+
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    def json(self):
+        try: return json.loads(self.body)
+        except ValueError: return None
+
+    @property
+    def ok(self):
+        """HTTP durumu ve uygulamanın 'success'/'HATA' işaretine göre başarı."""
+        if self.status >= 400: return False
+        data = self.json()
+        if not isinstance(data, dict): return True
+        if data.get('success') is False: return False
+        return not str(data.get('message', '')).startswith(("HATA", "Erişim"))
+
+
+class InProcessClient:
+    """app modülünü bu süreçte yükler; ağ ve sunucu maliyeti olmadan uygulama yolunu ölçer."""
+
+    def __init__(self, root):
+        # app, içe aktarılırken FileSystem'i kurar; kökü ondan önce belirle.
+        os.environ['KOTA_PROJECT_ROOT'] = root
+        import app
+        self._app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self._app.app.test_client()
+        headers = {SESSION_HEADER: token} if token else {}
+        response = client.open(path, method=method, json=body, headers=headers)
+        return Response(response.status_code, response.get_data())
+
+    def close(self):
+        self._app.fs.close()
+
+
+class HttpClient:
+    """Yerel bir Flask sunucusunu alt süreç olarak başlatır ve ona HTTP ile bağlanır.
+
+    url verilirse sunucu başlatılmaz, var olan sunucuya bağlanılır. Her thread
+    kendi bağlantısını kullanır.
+    """
+
+    def __init__(self, root=None, url=None, port=0, startup_timeout=60):
+        self._server = None
+        if url is None:
+            port = port or _free_port()
+            env = dict(os.environ, KOTA_PROJECT_ROOT=root)
+            self._server = subprocess.Popen(
+                [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port), '--with-threads'],
+                cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            url = f"http://127.0.0.1:{port}"
+        host_port = url.split("://", 1)[-1].rstrip('/')
+        self.host, _, port = host_port.partition(':')
+        self.port = int(port or 80)
+        self._local = threading.local()
+        self._wait_ready(startup_timeout)
+
+    def _wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.request('GET', '/status')
+                return
+            except OSError:
+                if self._server is not None and self._server.poll() is not None:
+                    raise RuntimeError("HTTP sunucusu başlatılamadı.")
+                if time.monotonic() > deadline: raise
+                time.sleep(0.2)
+
+    def request(self, method, path, body=None, token=None):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=300)
+        headers = {'Content-Type': 'application/json'}
+        if token: headers[SESSION_HEADER] = token
+        payload = json.dumps(body) if body is not None else None
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, ConnectionError):
+            # Sunucu bağlantıyı kapattıysa bir kez yeniden dene
+            conn.close()
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        if response.will_close: conn.close()
+        return Response(response.status, data)
+
+    def close(self):
+        if self._server is not None:
+            # SIGINT: sunucu atexit ile manifest/günlükleri kapatabilsin
+            self._server.send_signal(signal.SIGINT)
+            try: self._server.wait(timeout=30)
+            except subprocess.TimeoutExpired: self._server.kill()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
@@ -0,0 +1,72 @@
+# benchmarks/loadgen/report.py
+"""Gecikme özetleri ve karşılaştırılabilir JSON sonuç dosyası."""
+import datetime
+import json
+import os
+import platform
+import subprocess
+
+from . import REPO_ROOT
+
+
+def percentile(ordered, p):
+    if not ordered: return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def summarize(samples, errors, elapsed):
+    """samples: saniye cinsinden gecikmeler. Dönüş: işlem türü için özet sözlüğü."""
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        'count': count,
+        'errors': errors,
+        'throughput_ops_s': round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'mean': round(sum(ordered) / count * 1000, 3) if count else 0.0,
+            'p50': round(percentile(ordered, 50) * 1000, 3),
+            'p95': round(percentile(ordered, 95) * 1000, 3),
+            'p99': round(percentile(ordered, 99) * 1000, 3),
+            'max': round(ordered[-1] * 1000, 3) if count else 0.0,
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_result(workload, mode, params, elapsed, ops):
+    return {
+        'workload': workload,
+        'mode': mode,
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'params': params,
+        'elapsed_s': round(elapsed, 3),
+        'ops': ops,
+    }
+
+
+def write_results(path, results):
+    """Sonuçları JSON dizisi olarak yazar; dosya varsa yeni sonuçlar sona eklenir."""
+    existing = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(existing + results, f, indent=2, ensure_ascii=False)
+
+
+def print_result(result):
+    print(f"== {result['workload']} ({result['mode']}, {result['elapsed_s']} s)")
+    for name, s in result['ops'].items():
+        lat = s['latency_ms']
+        print(f"   {name:<12} {s['count']:>7} işlem {s['errors']:>5} hata  {s['throughput_ops_s']:>10.1f} işlem/s  "
+              f"p50 {lat['p50']:.2f}  p95 {lat['p95']:.2f}  p99 {lat['p99']:.2f} ms")
@@ -0,0 +1,50 @@
+# benchmarks/loadgen/seed.py
+"""Sentetik kullanıcı ve dosyalarla proje kökü hazırlar (users.json + <id>_home dizinleri)."""
+import json
+import os
+
+from PasswordHasher import hash_password
+
+MB = 1024 * 1024
+ADMIN_PASSWORD = 'admin'
+USER_PASSWORD = 'bench'
+
+
+def user_id(i):
+    return f"bench{i}"
+
+
+def seed(root, users, files_per_user=0, files_users=None, file_bytes=64, large_users=0, large_mb=0, quota_mb=100):
+    """root altında users.json ve ev dizinlerini oluşturur.
+
+    files_per_user dosya yalnızca ilk files_users kullanıcıya (None ise hepsine) yazılır.
+    Tüm kullanıcılar USER_PASSWORD için üretilmiş aynı hash'i paylaşır (KDF yüz bin
+    kez çalıştırılmaz). İlk large_users kullanıcıya large_mb boyutunda (seyrek)
+    'big.bin' dosyası eklenir.
+    Dönüş: seed edilen kullanıcı kimlikleri.
+    """
+    os.makedirs(os.path.join(root, "backend"), exist_ok=True)
+    shared_hash = hash_password(USER_PASSWORD)
+    quotas = {'admin': {'limit': float('inf'), 'usage': 0}}
+    passwords = {'admin': hash_password(ADMIN_PASSWORD)}
+    payload = b"x" * file_bytes
+    ids = []
+    for i in range(users):
+        uid = user_id(i)
+        home = os.path.join(root, f"{uid}_home")
+        os.makedirs(home, exist_ok=True)
+        usage = 0
+        for j in range(files_per_user if files_users is None or i < files_users else 0):
+            with open(os.path.join(home, f"file{j}.txt"), 'wb') as f:
+                f.write(payload)
+            usage += file_bytes
+        if i < large_users and large_mb > 0:
+            with open(os.path.join(home, "big.bin"), 'wb') as f:
+                f.truncate(int(large_mb * MB))
+            usage += int(large_mb * MB)
+        quotas[uid] = {'limit': max(quota_mb * MB, usage * 2), 'usage': usage}
+        passwords[uid] = shared_hash
+        ids.append(uid)
+    with open(os.path.join(root, "backend", "users.json"), 'w', encoding='utf-8') as f:
+        json.dump({'quotas': quotas, 'passwords': passwords}, f)
+    return ids
@@ -0,0 +1,158 @@
+# benchmarks/loadgen/workloads.py
+"""Adlandırılmış iş yükleri. Her iş yükü ölçülmeyen bir hazırlık (login vb.) ve bir ya da
+daha fazla ölçülen fazdan oluşur; her faz {işlem_adı: özet} döndürür."""
+import random
+import threading
+import time
+from urllib.parse import quote
+
+from .report import summarize
+from .seed import ADMIN_PASSWORD, USER_PASSWORD
+
+
+class Recorder:
+    """Thread başına gecikme listeleri; faz sonunda birleştirilir."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _mine(self):
+        mine = getattr(self._local, 'data', None)
+        if mine is None:
+            mine = self._local.data = {}
+            with self._lock: self._all.append(mine)
+        return mine
+
+    def call(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        response = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        samples, errors = self._mine().setdefault(name, ([], [0]))
+        samples.append(elapsed)
+        if not response.ok: errors[0] += 1
+        return response
+
+    def summary(self, elapsed):
+        merged = {}
+        for data in self._all:
+            for name, (samples, errors) in data.items():
+                m = merged.setdefault(name, ([], [0]))
+                m[0].extend(samples)
+                m[1][0] += errors[0]
+        return {name: summarize(samples, errors[0], elapsed) for name, (samples, errors) in merged.items()}
+
+
+def run_phase(threads, body):
+    """body(t, recorder) fonksiyonunu threads adet thread'de çalıştırır; {işlem: özet} döndürür."""
+    recorder = Recorder()
+    workers = [threading.Thread(target=body, args=(t, recorder)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers: w.start()
+    for w in workers: w.join()
+    return recorder.summary(time.perf_counter() - start)
+
+
+def login(client, user_id, password=USER_PASSWORD):
+    response = client.request('POST', '/login', {'user_id': user_id, 'password': password})
+    data = response.json() or {}
+    if not data.get('token'):
+        raise RuntimeError(f"{user_id} giriş yapamadı: {data.get('message')}")
+    return data['token']
+
+
+def _thread_user(ctx, t, pool=None):
+    pool = pool or ctx.users
+    return pool[t % len(pool)]
+
+
+# --- İŞ YÜKLERİ ---
+def login_storm(client, ctx):
+    """Rastgele kullanıcılarla art arda giriş (KDF + oturum anahtarı üretimi)."""
+    def body(t, rec):
+        rng = random.Random(ctx.seed + t)
+        for _ in range(ctx.ops):
+            rec.call('login', client.request, 'POST', '/login',
+                     {'user_id': rng.choice(ctx.users), 'password': USER_PASSWORD})
+    return run_phase(ctx.threads, body)
+
+
+def provisioning(client, ctx):
+    """Yoğun dosya oluşturma (create_file); her thread kendi kullanıcısına yazar."""
+    tokens = [login(client, _thread_user(ctx, t)) for t in range(ctx.threads)]
+
+    def body(t, rec):
+        user_id = _thread_user(ctx, t)
+        for i in range(ctx.ops):
+            rec.call('create', client.request, 'POST', '/create_file',
+                     {'file_path': f"/home/{user_id}/prov_{t}_{i}.txt", 'size_mb': ctx.create_mb}, tokens[t])
+    return run_phase(ctx.threads, body)
+
+
+def append_loop(client, ctx):
+    """Tek dosyaya küçük eklemeler (write_file)."""
+    tokens, paths = [], []
+    for t in range(ctx.threads):
+        user_id = _thread_user(ctx, t)
+        tokens.append(login(client, user_id))
+        paths.append(f"/home/{user_id}/append_{t}.txt")
+        client.request('POST', '/create_file', {'file_path': paths[t], 'size_mb': 0}, tokens[t])
+    line = "x" * ctx.line_bytes
+
+    def body(t, rec):
+        for _ in range(ctx.ops):
+            rec.call('write', client.request, 'POST', '/write_file',
+                     {'file_path': paths[t], 'content': line}, tokens[t])
+    return run_phase(ctx.threads, body)
+
+
+def large_cat(client, ctx):
+    """Büyük dosyanın akış halinde okunması (/read_stream)."""
+    if ctx.large_users <= 0: raise SystemExit("large_cat için --large-users ve --large-mb gerekli.")
+    readers = ctx.users[:ctx.large_users]
+    tokens = [login(client, _thread_user(ctx, t, readers)) for t in range(ctx.threads)]
+
+    def body(t, rec):
+        path = quote(f"/home/{_thread_user(ctx, t, readers)}/big.bin")
+        for _ in range(ctx.ops):
+            rec.call('cat', client.request, 'GET', f"/read_stream?file_path={path}", None, tokens[t])
+    return run_phase(ctx.threads, body)
+
+
+def ls_big_home(client, ctx):
+    """Çok dosyalı ev dizinlerinin listelenmesi (/ls)."""
+    tokens = [login(client, _thread_user(ctx, t)) for t in range(ctx.threads)]
+
+    def body(t, rec):
+        for _ in range(ctx.ops):
+            rec.call('ls', client.request, 'GET', '/ls', None, tokens[t])
+    return run_phase(ctx.threads, body)
+
+
+def admin_scale(client, ctx):
+    """Yönetici işlemleri: list_users, ardından delete_user (tüm kullanıcılar kayıtlıyken)."""
+    token = login(client, 'admin', ADMIN_PASSWORD)
+
+    def list_body(t, rec):
+        for _ in range(max(1, ctx.ops // 10)):
+            rec.call('list_users', client.request, 'GET', '/list_users', None, token)
+    results = run_phase(ctx.threads, list_body)
+
+    # Her thread farklı kullanıcıları siler
+    victims = ctx.users[:min(len(ctx.users), ctx.threads * ctx.ops)]
+    def delete_body(t, rec):
+        for user_id in victims[t::ctx.threads]:
+            rec.call('delete_user', client.request, 'DELETE', f"/delete_user/{quote(user_id)}", None, token)
+    results.update(run_phase(ctx.threads, delete_body))
+    return results
+
+
+WORKLOADS = {
+    'login_storm': login_storm,
+    'provisioning': provisioning,
+    'append': append_loop,
+    'large_cat': large_cat,
+    'ls_big_home': ls_big_home,
+    'admin_scale': admin_scale,
+}
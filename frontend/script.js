@@ -2,22 +2,115 @@
 const API_URL = 'http://127.0.0.1:5000'; 
 const outputDiv = document.getElementById('output');
 const inputField = document.getElementById('command-input');
+const SESSION_HEADER = 'X-Session-Token';
+// Oturum anahtarı (login cevabındaki token). Sekme kapanana kadar saklanır.
+let sessionToken = sessionStorage.getItem('sessionToken');
 
-function printOutput(text, isError = false) {
-    const p = document.createElement('div');
-    p.className = isError ? 'error' : 'success';
-    p.innerHTML = text.replace(/\n\n/g, '<br>').replace(/\n/g, '<br>'); 
-    outputDiv.appendChild(p);
-    outputDiv.scrollTop = outputDiv.scrollHeight; 
+// Terminal görünümü: sınırlı geri kaydırma tamponu, yalnızca görünen satırlar çizilir.
+// Tampon boyu 'scrollback <satır>' komutuyla değiştirilir ve tarayıcıda saklanır.
+const terminal = new TerminalView(outputDiv, { capacity: Number(localStorage.getItem('scrollbackLines')) || undefined });
+
+// Metin kaçışlı olarak (HTML yorumlanmadan) yazılır; kind: 'success' | 'error' | 'command'
+function printOutput(text, isError = false, kind = null) {
+    return terminal.print(text, kind || (isError ? 'error' : 'success'));
+}
+
+printOutput("Sanal İşletim Sistemi Başlatıldı.\n\nYardım için: 'help'");
+
+function printAuditEntries(data, args) {
+    const lines = data.entries.map(e => `[${e.time}] USER: ${e.user} | ACTION: ${e.action} | ${e.details}`);
+    if (lines.length === 0) lines.push('Kayıt bulunamadı.');
+    if (data.next_cursor) {
+        const nextArgs = args.filter(arg => !arg.startsWith('cursor=')).concat('cursor=' + data.next_cursor);
+        lines.push(`Devamı için: audit ${nextArgs.join(' ')}`);
+    }
+    printOutput(lines.join('\n'), false);
+}
+
+function printUserList(data, args) {
+    const lines = data.users.map(u => `-> Kullanıcı ID: ${u.user_id}, Kota: ${u.limit_mb === null ? 'Sınırsız' : u.limit_mb.toFixed(2) + ' MB'}, ` +
+        `Kullanım: ${u.usage_mb.toFixed(2)} MB` + (u.percent === null ? '' : ` (%${u.percent})`));
+    lines.unshift(`--- Kayıtlı Kullanıcılar ve Kota Durumları (toplam ${data.total_users}) ---`);
+    if (data.users.length === 0) lines.push('Kullanıcı bulunamadı.');
+    if (data.next_cursor) {
+        const nextArgs = args.filter(arg => !arg.startsWith('cursor=')).concat('cursor=' + data.next_cursor);
+        lines.push(`Devamı için: list_users ${nextArgs.join(' ')}`);
+    }
+    printOutput(lines.join('\n'), false);
+}
+
+// Toplu işlem (/batch) için tek satırı işleme çevirir: "write <yol> <metin>" -> {op, file_path, content}
+function parseBatchLine(line) {
+    const parts = line.trim().split(/\s+/);
+    const cmd = parts[0].toLowerCase();
+    const args = parts.slice(1);
+    switch (cmd) {
+        case 'create': return args.length === 2 ? { op: 'create', size_mb: args[0], file_path: args[1] } : null;
+        case 'write':
+        case 'overwrite':
+            return args.length >= 2 ? { op: cmd, file_path: args[0], content: args.slice(1).join(" ") } : null;
+        case 'cat': return args.length === 1 ? { op: 'read', file_path: args[0] } : null;
+        case 'run': return args.length === 1 ? { op: 'execute', file_path: args[0] } : null;
+        case 'truncate':
+        case 'delete':
+            return args.length === 1 ? { op: cmd, file_path: args[0] } : null;
+        case 'ls':
+        case 'status':
+            return { op: cmd };
+        default: return null;
+    }
+}
+
+// Çok satırlı betiği tek /batch isteğiyle gönderir ('#' ile başlayan satırlar yorumdur).
+async function runScript(text, atomicQuota) {
+    const lines = text.split('\n').map(l => l.trim()).filter(l => l && !l.startsWith('#'));
+    if (lines.length === 0) return;
+    const ops = [];
+    for (const line of lines) {
+        const op = parseBatchLine(line);
+        if (!op) {
+            printOutput(`HATA: Betikte geçersiz satır: ${line}`, true);
+            return;
+        }
+        ops.push(op);
+    }
+    printOutput(`SCRIPT> ${ops.length} işlem${atomicQuota ? ' (kota: ya hep ya hiç)' : ''}`, false, 'command');
+    try {
+        const headers = { 'Content-Type': 'application/json' };
+        if (sessionToken) headers[SESSION_HEADER] = sessionToken;
+        const response = await fetch(API_URL + '/batch', {
+            method: 'POST', headers: headers, body: JSON.stringify({ ops: ops, atomic_quota: atomicQuota })
+        });
+        const data = await response.json();
+        if (!data.results) {
+            printOutput(data.message, true);
+            return;
+        }
+        data.results.forEach((result, i) => printOutput(`[${i + 1}] ${lines[i]}\n${result.message}`, !result.success));
+    } catch (error) {
+        printOutput(`Ağ veya Sistem Hatası: API sunucusu çalışmıyor olabilir. (${error.message})`, true);
+    }
 }
 
-printOutput("Sanal İşletim Sistemi Başlatıldı.<br><br>Yardım için: 'help'");
+function toggleScriptEditor(show) {
+    document.getElementById('script-container').style.display = show ? 'block' : 'none';
+    (show ? document.getElementById('script-input') : inputField).focus();
+}
+
+async function submitScript() {
+    const scriptInput = document.getElementById('script-input');
+    const atomicQuota = document.getElementById('script-atomic').checked;
+    const text = scriptInput.value;
+    scriptInput.value = '';
+    toggleScriptEditor(false);
+    await runScript(text, atomicQuota);
+}
 
 async function handleCommand() {
     const commandLine = inputField.value.trim();
     if (!commandLine) return;
     
-    printOutput(`<span class="command">CMD> ${commandLine}</span>`, false); 
+    printOutput(`CMD> ${commandLine}`, false, 'command');
 
     inputField.value = ''; 
 
@@ -29,6 +122,7 @@ async function handleCommand() {
     let method = 'GET';
     let body = null;
     let requiredArgs = 0;
+    let rawText = false;
 
     switch (cmd) {
         case 'register':
@@ -90,9 +184,22 @@ async function handleCommand() {
                 requiredArgs = 1;
             } else { requiredArgs = 1; }
             break;    
+        case 'script':
+            // Çok satırlı betik düzenleyicisini açar; Ctrl+Enter ile tek istekte çalıştırılır.
+            toggleScriptEditor(true);
+            return;
         case 'clear':
-            outputDiv.innerHTML = ''; // Ekranı temizler
+            terminal.clear(); // Ekranı temizler
             break;
+        case 'scrollback':
+            // Kullanım: scrollback [satır]  (geri kaydırma tamponunda tutulacak satır sayısı)
+            if (args.length === 1 && parseInt(args[0], 10) > 0) {
+                const lines = parseInt(args[0], 10);
+                localStorage.setItem('scrollbackLines', lines);
+                terminal.setCapacity(lines);
+            }
+            printOutput(`Geri kaydırma tamponu: ${parseInt(args[0], 10) > 0 ? parseInt(args[0], 10) : terminal.capacity} satır.`);
+            return;
         case 'date':
             const now = new Date();
             printOutput(now.toString());
@@ -108,13 +215,23 @@ async function handleCommand() {
             } else { requiredArgs = 2; } // Hata mesajı için
             break;
         case 'cat': 
+            // İçerik JSON'a sarılmadan, akış halinde (/read_stream) okunur.
             requiredArgs = 1;
             if (args.length === requiredArgs) {
-                endpoint = '/read_file';
-                method = 'POST';
-                body = { file_path: args[0] };
+                endpoint = '/read_stream?file_path=' + encodeURIComponent(args[0]);
+                rawText = true;
             }
             break;
+        case 'head':
+        case 'tail':
+            // Kullanım: head <yol> [satır] / tail <yol> [satır]
+            if (args.length === 1 || args.length === 2) {
+                endpoint = '/read_lines';
+                method = 'POST';
+                body = { file_path: args[0], mode: cmd, lines: args[1] || 10 };
+                requiredArgs = args.length;
+            } else { requiredArgs = 1; }
+            break;
         case 'run': 
             requiredArgs = 1;
             if (args.length === requiredArgs) {
@@ -137,7 +254,69 @@ async function handleCommand() {
         // LOGOUT DÜZELTİLDİ: requiredArgs=0 olduğu için aşağıda onaylanacak
         case 'logout': endpoint = '/logout'; method = 'POST'; break;
         
-        case 'list_users': endpoint = '/list_users'; break;
+        case 'list_users':
+            // Kullanım: list_users [sort=name|usage|limit|percent] [order=asc|desc] [limit=<n>] [prefix=<önek>] [min_percent=<yüzde>] [cursor=<c>]
+            endpoint = '/list_users?' + new URLSearchParams(args.map(arg => arg.split('=', 2))).toString();
+            requiredArgs = args.length;
+            break;
+        case 'du':
+            // Kullanım: du [id]
+            endpoint = '/du' + (args.length ? '?user=' + encodeURIComponent(args[0]) : '');
+            requiredArgs = Math.min(args.length, 1);
+            break;
+        case 'storage':
+            // Kullanım: storage [gc]
+            endpoint = '/storage_report' + (args[0] === 'gc' ? '?gc=1' : '');
+            requiredArgs = Math.min(args.length, 1);
+            break;
+        case 'reclaim':
+            // Kullanım: reclaim  (silinen kullanıcı/dosyaların arka plan silme ilerlemesi)
+            endpoint = '/reclaim';
+            break;
+        case 'charge_mode':
+            // Kullanım: charge_mode <logical|stored>
+            requiredArgs = 1;
+            endpoint = '/charge_mode';
+            method = 'POST';
+            body = { mode: args[0] };
+            break;
+        case 'compact':
+            // Kullanım: compact [id]
+            endpoint = '/compact';
+            method = 'POST';
+            body = args.length ? { user_id: args[0] } : {};
+            requiredArgs = Math.min(args.length, 1);
+            break;
+        case 'snapshot':
+            // Kullanım: snapshot [id]  (id verilmezse tüm kullanıcılar)
+            endpoint = '/snapshot';
+            method = 'POST';
+            body = args.length ? { user_id: args[0] } : {};
+            requiredArgs = Math.min(args.length, 1);
+            break;
+        case 'snapshots':
+            // Kullanım: snapshots <id>
+            requiredArgs = 1;
+            endpoint = '/snapshots?user=' + encodeURIComponent(args[0] || '');
+            break;
+        case 'restore':
+            // Kullanım: restore <id> <görüntü>
+            requiredArgs = 2;
+            endpoint = '/restore';
+            method = 'POST';
+            body = { user_id: args[0], snapshot_id: args[1] };
+            break;
+        case 'snapshot_delete':
+            // Kullanım: snapshot_delete <id> <görüntü>
+            requiredArgs = 2;
+            endpoint = '/snapshot/' + encodeURIComponent(args[0] || '') + '/' + encodeURIComponent(args[1] || '');
+            method = 'DELETE';
+            break;
+        case 'audit':
+            // Kullanım: audit [user=<id>] [action=<işlem>] [since=<tarih>] [until=<tarih>] [limit=<n>] [cursor=<c>]
+            endpoint = '/audit?' + new URLSearchParams(args.map(arg => arg.split('=', 2))).toString();
+            requiredArgs = args.length;
+            break;
         case 'delete_user': 
             requiredArgs = 1;
             if (args.length === requiredArgs) {
@@ -155,22 +334,35 @@ async function handleCommand() {
             break;
             
         case 'help':
-            printOutput("<b>Temel Komutlar:</b>\n" +
+            printOutput("Temel Komutlar:\n" +
                         "  register <id> <şifre> [MB] : Yeni kullanıcı oluştur (Sadece Admin).\n" +
                         "  login <id> <şifre>         : Giriş yap.\n" +
                         "  logout                     : Çıkış yap.\n" +
                         "  create <MB> <yol>          : Dosya oluştur (Yazma İzni).\n" +
                         "  write <yol> <metin>        : Dosyaya metin ekle (Yazma İzni).\n" +
                         "  cat <yol>                  : Dosya oku (Okuma İzni).\n" +
+                        "  head/tail <yol> [satır]    : İlk/son satırları oku (Okuma İzni).\n" +
                         "  run <yol>                  : Dosya çalıştır (Çalıştırma İzni - Engelli).\n" +
                         "  overwrite <yol> <metin>: Dosyanın üzerine yaz (Replace)\n" +
                         "  truncate <yol>             : Dosyayı boşalt (Truncate).\n" +
                         "  ls                         : Listele (Okuma İzni).\n" +
-                        "  delete <yol>               : Sil (Yazma İzni).\n\n" +
-                        "<b>Admin Komutları (login admin admin):</b>\n" +
-                        "  list_users                 : Kullanıcıları listele.\n" +
-                        "  delete_user <id>           : Kullanıcıyı sil.\n" +
-                        "  set_quota <id> <MB>        : Kota güncelle.\n", false);
+                        "  delete <yol>               : Sil (Yazma İzni).\n" +
+                        "  script                     : Çok satırlı komut betiği (tek istekte toplu çalıştırma).\n" +
+                        "  scrollback [satır]         : Geri kaydırma tamponunun satır sınırını göster/ayarla.\n\n" +
+                        "Admin Komutları (login admin admin):\n" +
+                        "  list_users [sort=] [order=] [limit=] [prefix=] [min_percent=] : Kullanıcıları sayfalı listele.\n" +
+                        "  delete_user <id>           : Kullanıcıyı sil (disk alanı arka planda geri kazanılır).\n" +
+                        "  reclaim                    : Arka planda silinmeyi bekleyen veri ve ilerleme.\n" +
+                        "  set_quota <id> <MB>        : Kota güncelle.\n" +
+                        "  du [id]                    : Kota / disk bloklarını karşılaştır.\n" +
+                        "  storage [gc]               : Tekilleştirme tasarruf raporu (gc: çöp toplama).\n" +
+                        "  charge_mode <logical|stored>: Kotayı mantıksal ya da saklanan bayta göre hesapla.\n" +
+                        "  compact [id]               : Sıkıştırılmış dosyalardaki küçük çerçeveleri birleştir.\n" +
+                        "  snapshot [id]              : Ev dizini ve kotanın anlık görüntüsünü al.\n" +
+                        "  snapshots <id>             : Kullanıcının anlık görüntülerini listele.\n" +
+                        "  restore <id> <görüntü>     : Kullanıcıyı anlık görüntüye döndür.\n" +
+                        "  snapshot_delete <id> <görüntü>: Anlık görüntüyü sil.\n" +
+                        "  audit [user=] [action=] [since=] [until=] : Denetim kayıtlarını sorgula.\n", false);
             return;
         default:
             printOutput(`Bilinmeyen komut: ${cmd}. Yardım için 'help' yazın.`, true);
@@ -186,13 +378,37 @@ async function handleCommand() {
                 method: method,
                 headers: { 'Content-Type': 'application/json' },
             };
+            if (sessionToken) {
+                options.headers[SESSION_HEADER] = sessionToken;
+            }
             if (body) {
                 options.body = JSON.stringify(body);
             }
             
             const response = await fetch(API_URL + endpoint, options);
+            if (rawText && response.ok) {
+                // Büyük dosyalar geldikçe, parça parça yazılır
+                await terminal.printStream(response.body, 'success', '[Dosya Boş]');
+                return;
+            }
             const data = await response.json();
+
+            if (cmd === 'login' && data.success) {
+                sessionToken = data.token;
+                sessionStorage.setItem('sessionToken', sessionToken);
+            } else if (cmd === 'logout') {
+                sessionToken = null;
+                sessionStorage.removeItem('sessionToken');
+            }
             
+            if (data.entries) {
+                printAuditEntries(data, args);
+                return;
+            }
+            if (data.users) {
+                printUserList(data, args);
+                return;
+            }
             printOutput(data.message, !data.success);
             
         } catch (error) {
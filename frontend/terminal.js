@@ -0,0 +1,225 @@
+// frontend/terminal.js
+// Sanal (virtualized) terminal görünümü.
+// Satırlar sınırlı bir halka tamponunda (ring buffer) tutulur; DOM'da yalnızca görünen
+// satırlar kadar (artı küçük bir pay) satır elemanı bulunur ve kaydırıldıkça yeniden
+// kullanılır. Metin textContent ile yazılır, HTML olarak yorumlanmaz. Büyük çıktılar
+// parça parça işlenir; parçalar arasında tarayıcıya nefes aldırılır.
+
+const DEFAULT_SCROLLBACK_LINES = 10000;  // Tamponda tutulan en fazla satır
+const LINE_HEIGHT = 18;                  // px; style.css'teki .term-row yüksekliğiyle aynı olmalı
+const WRAP_COLUMNS = 200;                // Daha uzun satırlar bu genişlikte bölünür (satır yüksekliği sabit kalsın)
+const APPEND_CHUNK_CHARS = 256 * 1024;   // İlerlemeli eklemede bir adımda işlenen karakter
+const OVERSCAN_ROWS = 10;                // Görünür alanın üstünde/altında fazladan çizilen satır
+
+function nextTick() {
+    return new Promise(resolve => setTimeout(resolve, 0));
+}
+
+// Tarayıcı motorları slice/split sonucunu çoğu zaman kaynak metne referans olarak tutar;
+// çok büyük bir çıktının tamponda kalan birkaç satırı bütün metni bellekte tutmasın diye
+// parça bağımsız bir kopyaya çevrilir.
+function detach(text) {
+    return JSON.parse(JSON.stringify(text));
+}
+
+class TerminalView {
+    constructor(container, options = {}) {
+        this.container = container;
+        this.doc = options.document || document;
+        this.lineHeight = options.lineHeight || LINE_HEIGHT;
+        this.wrap = options.wrapColumns || WRAP_COLUMNS;
+        this.chunkChars = options.chunkChars || APPEND_CHUNK_CHARS;
+        this.schedule = options.schedule || (fn => requestAnimationFrame(fn));
+        this.yieldToBrowser = options.yieldToBrowser || nextTick;
+        this._reset(options.capacity || DEFAULT_SCROLLBACK_LINES);
+        this._rows = [];
+        this._follow = true;        // Kullanıcı en alttaysa yeni çıktıyla birlikte aşağı kayılır
+        this._renderPending = false;
+        this._queue = Promise.resolve();
+
+        this.spacer = this.doc.createElement('div');
+        this.spacer.className = 'term-spacer';
+        this.viewport = this.doc.createElement('div');
+        this.viewport.className = 'term-viewport';
+        container.appendChild(this.spacer);
+        container.appendChild(this.viewport);
+        container.addEventListener('scroll', () => {
+            const c = this.container;
+            this._follow = c.scrollTop + c.clientHeight >= c.scrollHeight - this.lineHeight;
+            this._scheduleRender();
+        });
+    }
+
+    _reset(capacity) {
+        this.capacity = capacity;
+        this._texts = new Array(capacity);
+        this._classes = new Array(capacity);
+        this._start = 0;
+        this._count = 0;
+        this._shifted = 0;  // Son çizimden beri tamponun başından atılan satır
+    }
+
+    get length() {
+        return this._count;
+    }
+
+    line(i) {
+        const k = (this._start + i) % this.capacity;
+        return { text: this._texts[k], kind: this._classes[k] };
+    }
+
+    // --- EKLEME ---
+    _push(text, kind) {
+        let k;
+        if (this._count < this.capacity) {
+            k = (this._start + this._count) % this.capacity;
+            this._count++;
+        } else {
+            k = this._start;
+            this._start = (this._start + 1) % this.capacity;
+            this._shifted++;
+        }
+        this._texts[k] = text;
+        this._classes[k] = kind;
+    }
+
+    _pushText(text, kind) {
+        const lines = text.split('\n');
+        // Tampona sığmayacak baştaki satırlar zaten atılacağı için hiç işlenmez.
+        const from = Math.max(0, lines.length - this.capacity);
+        this._shifted += Math.min(from, this._count);
+        for (let i = from; i < lines.length; i++) {
+            const line = lines[i];
+            if (line.length <= this.wrap) {
+                this._push(line, kind);
+            } else {
+                for (let j = 0; j < line.length; j += this.wrap) this._push(line.slice(j, j + this.wrap), kind);
+            }
+        }
+    }
+
+    async _append(text, kind) {
+        // Tamponu dolduracak kadar satır olmayan baş kısım atlanır (çok büyük çıktılar için).
+        let pos = Math.max(0, text.length - this.capacity * this.wrap);
+        for (;;) {
+            let end = text.length;
+            if (end - pos > this.chunkChars) {
+                const cut = text.lastIndexOf('\n', pos + this.chunkChars);
+                end = cut > pos ? cut : pos + this.chunkChars;
+            }
+            const chunk = text.slice(pos, end);
+            this._pushText(end - pos < text.length ? detach(chunk) : chunk, kind);
+            this._scheduleRender();
+            if (end >= text.length) return;
+            pos = end + (text[end] === '\n' ? 1 : 0);
+            await this.yieldToBrowser();
+        }
+    }
+
+    _enqueue(task) {
+        this._queue = this._queue.then(task).catch(error => console.error(error));
+        return this._queue;
+    }
+
+    print(text, kind = 'success') {
+        // Sıra korunur: büyük bir çıktı işlenirken gelen mesajlar arkasından yazılır.
+        // Sondaki tek satır sonu boş satır olarak çizilmez.
+        return this._enqueue(() => this._append(String(text).replace(/\n$/, ''), kind));
+    }
+
+    printStream(body, kind = 'success', emptyText = null) {
+        // fetch yanıt gövdesini (ReadableStream) geldikçe, satır sınırlarında yazar.
+        return this._enqueue(async () => {
+            const reader = body.getReader();
+            const decoder = new TextDecoder();
+            let carry = '';
+            let total = 0;
+            let sinceYield = 0;
+            for (;;) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                total += value.length;
+                carry += decoder.decode(value, { stream: true });
+                let cut = carry.lastIndexOf('\n');
+                if (cut < 0 && carry.length >= this.chunkChars) cut = carry.length - carry.length % this.wrap;
+                if (cut < 0) continue;
+                await this._append(carry.slice(0, cut), kind);
+                carry = carry.slice(carry[cut] === '\n' ? cut + 1 : cut);
+                // Veri hazır beklerken read() hemen döner; arada tarayıcıya yine de fırsat verilir.
+                sinceYield += cut;
+                if (sinceYield >= this.chunkChars) {
+                    sinceYield = 0;
+                    await this.yieldToBrowser();
+                }
+            }
+            carry += decoder.decode();
+            if (carry) await this._append(carry, kind);
+            else if (!total && emptyText !== null) await this._append(emptyText, kind);
+        });
+    }
+
+    clear() {
+        return this._enqueue(() => {
+            this._reset(this.capacity);
+            this._follow = true;
+            this._scheduleRender();
+        });
+    }
+
+    setCapacity(capacity) {
+        // Son `capacity` satır korunarak tampon yeniden kurulur.
+        return this._enqueue(() => {
+            const keep = Math.min(this._count, capacity);
+            const lines = [];
+            for (let i = this._count - keep; i < this._count; i++) lines.push(this.line(i));
+            this._reset(capacity);
+            lines.forEach(line => this._push(line.text, line.kind));
+            this._scheduleRender();
+        });
+    }
+
+    // --- ÇİZİM ---
+    _scheduleRender() {
+        if (this._renderPending) return;
+        this._renderPending = true;
+        this.schedule(() => {
+            this._renderPending = false;
+            this.render();
+        });
+    }
+
+    render() {
+        const c = this.container;
+        const lh = this.lineHeight;
+        this.spacer.style.height = (this._count * lh) + 'px';
+        if (this._follow) {
+            c.scrollTop = c.scrollHeight;
+        } else if (this._shifted) {
+            // Kullanıcı yukarıdayken baştan satır atıldıysa okuduğu yer kaymasın.
+            c.scrollTop = Math.max(0, c.scrollTop - this._shifted * lh);
+        }
+        this._shifted = 0;
+
+        const first = Math.max(0, Math.floor(c.scrollTop / lh) - OVERSCAN_ROWS);
+        const last = Math.min(this._count, Math.ceil((c.scrollTop + c.clientHeight) / lh) + OVERSCAN_ROWS);
+        const needed = Math.max(0, last - first);
+        while (this._rows.length < needed) {
+            const row = this.doc.createElement('div');
+            this.viewport.appendChild(row);
+            this._rows.push(row);
+        }
+        while (this._rows.length > needed) this.viewport.removeChild(this._rows.pop());
+
+        this.viewport.style.transform = `translateY(${first * lh}px)`;
+        for (let i = 0; i < needed; i++) {
+            const k = (this._start + first + i) % this.capacity;
+            const row = this._rows[i];
+            const text = this._texts[k];
+            const className = 'term-row ' + this._classes[k];
+            if (row.textContent !== text) row.textContent = text;
+            if (row.className !== className) row.className = className;
+        }
+    }
+}
+
+if (typeof module !== 'undefined') module.exports = { TerminalView, DEFAULT_SCROLLBACK_LINES };
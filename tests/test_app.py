@@ -0,0 +1,443 @@
+# tests/test_app.py
+"""HTTP katmanı (Flask test istemcisi): oturum token'ları, aralıklı okuma, kota doğrulaması,
+toplu işlemler, anlık görüntüler ve ertelenmiş silme."""
+import contextlib
+import importlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+HEADER = 'X-Session-Token'
+app = None
+_tmp = None
+CompressedStorage = FRAME_MAGIC = None  # Storage, backend yolu eklendikten sonra içe aktarılır
+
+
+def setUpModule():
+    # app modülü içe aktarılırken durumu yükler; ortam ondan önce hazırlanmalı.
+    global app, _tmp, CompressedStorage, FRAME_MAGIC
+    _tmp = tempfile.TemporaryDirectory()
+    os.makedirs(os.path.join(_tmp.name, 'backend'))
+    os.environ.update(KOTA_PROJECT_ROOT=_tmp.name, KOTA_STATE='journal', KOTA_KDF_WORKERS='0',
+                      KOTA_RATE_LIMIT='0')
+    sys.path.insert(0, BACKEND)
+    app = importlib.import_module('app')
+    app.limiter.enabled = False  # RateLimiter başka bir test modülünce ortam ayarlanmadan içe aktarılmış olabilir
+    from Storage import CompressedStorage, FRAME_MAGIC
+
+
+def tearDownModule():
+    app.fs.close()
+    _tmp.cleanup()
+
+
+class AppTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+        self.admin = self.login('admin', 'admin')
+
+    def login(self, user_id, password):
+        return self.client.post('/login', json={'user_id': user_id, 'password': password}).json.get('token')
+
+    def call(self, method, url, token, **kwargs):
+        return getattr(self.client, method)(url, headers={HEADER: token}, **kwargs)
+
+    def register(self, user_id, password='p', quota_mb=10):
+        response = self.call('post', '/register', self.admin,
+                             json={'user_id': user_id, 'password': password, 'quota_mb': quota_mb})
+        self.assertTrue(response.json['success'], response.json)
+
+
+class SessionTest(AppTestCase):
+    def test_token_of_deleted_user_is_not_revived_by_reregistration(self):
+        self.register('eski')
+        old = self.login('eski', 'p')
+        self.assertTrue(self.call('get', '/status', old).json['success'])
+        self.assertTrue(self.call('delete', '/delete_user/eski', self.admin).json['success'])
+        self.register('eski', password='yeni')
+        self.assertFalse(self.call('get', '/status', old).json['success'])
+        self.assertTrue(self.call('get', '/status', self.login('eski', 'yeni')).json['success'])
+
+    def test_logout_revokes_token(self):
+        self.register('cikan')
+        token = self.login('cikan', 'p')
+        self.assertTrue(self.call('post', '/logout', token).json['success'])
+        self.assertFalse(self.call('get', '/status', token).json['success'])
+
+
+
+class UserRegistryTest(AppTestCase):
+    def test_user_list_is_copied_under_registry_lock(self):
+        guard, test = app.fs._locks_guard, self
+
+        class GuardedDirs(dict):
+            def __iter__(self):
+                test.assertTrue(guard.locked(), "home_dirs kayıt kilidi olmadan tarandı")
+                return super().__iter__()
+
+        self.register('kayit')
+        try:
+            with mock.patch.object(app.fs, 'home_dirs', GuardedDirs(app.fs.home_dirs)):
+                with contextlib.ExitStack() as stack:
+                    app.fs._lock_all_users(stack)
+                self.assertIn("kayit", self.call('get', '/du', self.admin).json['message'])
+                self.assertTrue(app.fs.save_manifest(clean=False))
+                self.assertTrue(self.call('post', '/charge_mode', self.admin, json={'mode': 'stored'}).json['success'])
+                self.assertTrue(self.call('post', '/charge_mode', self.admin, json={'mode': 'logical'}).json['success'])
+        finally:
+            self.call('delete', '/delete_user/kayit', self.admin)
+
+
+class ReadRangeTest(AppTestCase):
+    CONTENT = '0123456789' * 10
+
+    def setUp(self):
+        super().setUp()
+        self.register('okur')
+        self.token = self.login('okur', 'p')
+        self.call('post', '/create_file', self.token, json={'file_path': '/home/okur/r.txt', 'size_mb': 0})
+        self.call('post', '/overwrite_file', self.token, json={'file_path': '/home/okur/r.txt', 'content': self.CONTENT})
+
+    def tearDown(self):
+        self.call('delete', '/delete_user/okur', self.admin)
+
+    def read(self, byte_range):
+        return self.client.get('/read_stream?file_path=/home/okur/r.txt',
+                               headers={HEADER: self.token, 'Range': byte_range})
+
+    def test_valid_ranges(self):
+        for byte_range, start, end in [('bytes=10-19', 10, 19), ('bytes=-5', 95, 99), ('bytes=95-', 95, 99)]:
+            response = self.read(byte_range)
+            self.assertEqual(response.status_code, 206, byte_range)
+            self.assertEqual(response.get_data(as_text=True), self.CONTENT[start:end + 1])
+            self.assertEqual(response.headers['Content-Range'], f"bytes {start}-{end}/100")
+
+    def test_unsatisfiable_ranges(self):
+        for byte_range in ('bytes=-0', 'bytes=50-10', 'bytes=100-'):
+            response = self.read(byte_range)
+            self.assertEqual(response.status_code, 416, byte_range)
+            self.assertEqual(response.headers['Content-Range'], 'bytes */100', byte_range)
+
+
+
+class SizeValidationTest(AppTestCase):
+    MB = 1024 * 1024
+
+    def setUp(self):
+        super().setUp()
+        self.register('boyut', quota_mb=1)
+        self.token = self.login('boyut', 'p')
+        self.call('post', '/create_file', self.token, json={'file_path': '/home/boyut/dolu.bin', 'size_mb': 1})
+
+    def tearDown(self):
+        self.call('delete', '/delete_user/boyut', self.admin)
+
+    def usage(self):
+        return app.qm.user_quotas['boyut']['usage']
+
+    def test_non_finite_and_negative_sizes_are_rejected(self):
+        for size in ('nan', 'NaN', 'inf', '-inf', -5, '-0.5'):
+            with self.subTest(size=size):
+                response = self.call('post', '/create_file', self.token,
+                                     json={'file_path': '/home/boyut/x.bin', 'size_mb': size})
+                self.assertFalse(response.json['success'])
+                self.assertTrue(response.json['message'].startswith("HATA"), response.json)
+                batch = self.call('post', '/batch', self.token,
+                                  json={'ops': [{'op': 'create', 'file_path': '/home/boyut/x.bin', 'size_mb': size}],
+                                        'atomic_quota': True}).json
+                self.assertFalse(batch['success'])
+                self.assertEqual(self.usage(), self.MB)
+                self.assertNotIn('/home/boyut/x.bin', app.fs.files)
+        # Kota hâlâ dolu: NaN kullanımı sıfırlamadı
+        response = self.call('post', '/create_file', self.token, json={'file_path': '/home/boyut/y.bin', 'size_mb': 1})
+        self.assertIn("Kota aşıldı", response.json['message'])
+
+    def test_reserve_rejects_non_finite_delta(self):
+        self.assertFalse(app.qm.reserve('boyut', float('nan'))[0])
+        self.assertFalse(app.qm.reserve('boyut', float('inf'))[0])
+
+    def test_delete_and_truncate_of_negative_legacy_size(self):
+        # Eski sürümlerin indekse yazabildiği negatif boyut: silme/kırpma 500 değil, yer boşaltma olmalı
+        for path, action in (('/home/boyut/eski1.bin', '/delete_file'), ('/home/boyut/eski2.bin', '/truncate_file')):
+            self.call('post', '/create_file', self.token, json={'file_path': path, 'size_mb': 0})
+            app.fs.files.set_size(path, -5 * self.MB)
+            response = self.call('post', action, self.token, json={'file_path': path})
+            self.assertIn("BAŞARILI", response.json['message'])
+            self.assertEqual(self.usage(), self.MB)
+
+
+class CompressedReadStreamTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        # Küçük çerçeveler: okuma birçok çerçeveyi ve çerçeve sınırlarını geçer.
+        self.storage = mock.patch.object(app.fs, 'storage', CompressedStorage(frame_size=1000))
+        self.storage.start()
+        self.register('sikisik')
+        self.token = self.login('sikisik', 'p')
+        self.path = '/home/sikisik/s.txt'
+        self.call('post', '/create_file', self.token, json={'file_path': self.path, 'size_mb': 0})
+
+    def tearDown(self):
+        self.call('delete', '/delete_user/sikisik', self.admin)
+        self.storage.stop()
+
+    def test_read_stream_matches_input(self):
+        rng = random.Random(15)
+        body = "çerçeve ğüşıöç " * 300 + "".join(rng.choice("0123456789abcdef") for _ in range(3000))
+        tails = ["ekleme bir", "".join(rng.choice("xyzğ") for _ in range(2500))]
+        self.call('post', '/overwrite_file', self.token, json={'file_path': self.path, 'content': body})
+        for tail in tails:
+            self.call('post', '/write_file', self.token, json={'file_path': self.path, 'content': tail})
+        expected = (body + "".join("\n" + tail for tail in tails)).encode('utf-8')
+
+        physical = app.fs._get_physical_path('sikisik', self.path)
+        with open(physical, 'rb') as f:
+            self.assertTrue(f.read().startswith(FRAME_MAGIC))
+        self.assertLess(os.path.getsize(physical), len(expected))
+
+        response = self.client.get(f'/read_stream?file_path={self.path}', headers={HEADER: self.token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(), expected)
+        for start, end in ((0, 0), (990, 2010), (len(expected) - 2600, len(expected) - 1)):
+            response = self.client.get(f'/read_stream?file_path={self.path}',
+                                       headers={HEADER: self.token, 'Range': f'bytes={start}-{end}'})
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response.get_data(), expected[start:end + 1])
+
+
+class SnapshotTest(AppTestCase):
+    MB = 1024 * 1024
+    HOME = '/home/anlik/'
+
+    def setUp(self):
+        super().setUp()
+        if app.fs.storage.name == "dedup": self.skipTest("Anlık görüntüler KOTA_STORAGE=dedup ile desteklenmez.")
+        self.register('anlik')
+        self.token = self.login('anlik', 'p')
+        self.call('post', '/create_file', self.token, json={'file_path': self.HOME + 'a.txt', 'size_mb': 0})
+        self.call('post', '/write_file', self.token, json={'file_path': self.HOME + 'a.txt', 'content': 'ilk'})
+        self.call('post', '/create_file', self.token, json={'file_path': self.HOME + 'b.bin', 'size_mb': 2})
+
+    def tearDown(self):
+        for snapshot_id in app.fs.snapshots.ids('anlik'):
+            app.fs.delete_snapshot('admin', 'anlik', snapshot_id)
+        self.call('delete', '/delete_user/anlik', self.admin)
+
+    def snapshot(self):
+        self.assertTrue(self.call('post', '/snapshot', self.admin, json={'user_id': 'anlik'}).json['success'])
+        return app.fs.snapshots.ids('anlik')[-1]
+
+    def physical(self, name, snapshot_id=None):
+        if snapshot_id is None: return os.path.join(app.fs._get_physical_dir_path('anlik'), name)
+        return os.path.join(app.fs.snapshots.path('anlik', snapshot_id), name)
+
+    def content(self, path):
+        with app.fs.storage.open_binary(path) as f:
+            return f.read()
+
+    def test_change_after_snapshot_breaks_link(self):
+        app.fs.storage.flush()  # Tamponlanmış 'ilk' eklemesi diske
+        originals = {name: self.content(self.physical(name)) for name in ('a.txt', 'b.bin')}
+        self.assertTrue(originals['a.txt'].endswith(b"\nilk"))
+        snapshot_id = self.snapshot()
+        for name in originals:
+            self.assertTrue(os.path.samefile(self.physical(name), self.physical(name, snapshot_id)))
+
+        self.call('post', '/write_file', self.token, json={'file_path': self.HOME + 'a.txt', 'content': 'sonra'})
+        self.call('post', '/truncate_file', self.token, json={'file_path': self.HOME + 'b.bin'})
+        self.assertIn('sonra', self.call('post', '/read_file', self.token, json={'file_path': self.HOME + 'a.txt'}).json['message'])
+
+        for name, original in originals.items():
+            self.assertFalse(os.path.samefile(self.physical(name), self.physical(name, snapshot_id)))
+            self.assertEqual(self.content(self.physical(name, snapshot_id)), original)
+            self.assertEqual(os.stat(self.physical(name, snapshot_id)).st_nlink, 1)
+        self.assertEqual(self.content(self.physical('a.txt')), originals['a.txt'] + "\nsonra".encode('utf-8'))
+        self.assertEqual(self.content(self.physical('b.bin')), b"")
+
+    def test_restore_reconciles_quota(self):
+        files = {path: dict(info) for path, info in app.fs.files.files_of('anlik').items()}
+        usage = app.qm.user_quotas['anlik']['usage']
+        self.assertEqual(usage, 2 * self.MB + len("\nilk"))
+        snapshot_id = self.snapshot()
+
+        self.call('post', '/create_file', self.token, json={'file_path': self.HOME + 'c.bin', 'size_mb': 3})
+        self.call('post', '/delete_file', self.token, json={'file_path': self.HOME + 'b.bin'})
+        self.call('post', '/write_file', self.token, json={'file_path': self.HOME + 'a.txt', 'content': 'sonra'})
+        self.assertNotEqual(app.qm.user_quotas['anlik']['usage'], usage)
+
+        response = self.call('post', '/restore', self.admin, json={'user_id': 'anlik', 'snapshot_id': snapshot_id})
+        self.assertTrue(response.json['success'], response.json)
+        self.assertEqual(app.qm.user_quotas['anlik']['usage'], usage)
+        self.assertEqual({path: dict(info) for path, info in app.fs.files.files_of('anlik').items()}, files)
+        self.assertFalse(os.path.exists(self.physical('c.bin')))
+        self.assertTrue(os.path.exists(self.physical('b.bin')))
+        self.assertIn("2.00 MB", self.call('get', '/status', self.token).json['message'])
+
+        # Geri yüklenen ev dizininde yeni yazma yine görüntüye dokunmaz.
+        self.call('post', '/write_file', self.token, json={'file_path': self.HOME + 'a.txt', 'content': 'yine'})
+        self.call('post', '/read_file', self.token, json={'file_path': self.HOME + 'a.txt'})
+        self.assertNotIn(b'yine', self.content(self.physical('a.txt', snapshot_id)))
+
+
+class ReclaimTest(AppTestCase):
+    MB = 1024 * 1024
+    HOME = '/home/cop/'
+
+    def setUp(self):
+        super().setUp()
+        self.wait_reclaimed()  # Önceki testte silinen 'cop' dizini
+        self.register('cop', quota_mb=20)
+        self.token = self.login('cop', 'p')
+
+    def tearDown(self):
+        self.call('delete', '/delete_user/cop', self.admin)
+
+    def create(self, name, size_mb):
+        response = self.call('post', '/create_file', self.token, json={'file_path': self.HOME + name, 'size_mb': size_mb})
+        self.assertTrue(response.json['success'], response.json)
+
+    def pending(self):
+        return [entry for entry in app.fs.reclaimer.entries() if entry['owner'] == 'cop']
+
+    @contextlib.contextmanager
+    def reclaim_paused(self):
+        """Geri kazanım thread'i blok içinde hiçbir dosya silmez."""
+        gate = threading.Event()
+        reclaim = app.fs.storage.reclaim
+        with mock.patch.object(app.fs.storage, 'reclaim', lambda paths: gate.wait(5) and reclaim(paths)):
+            try:
+                yield
+            finally:
+                gate.set()
+            self.wait_reclaimed()
+
+    def wait_reclaimed(self):
+        deadline = time.time() + 5
+        while self.pending() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.pending(), [])
+
+    def test_delete_frees_quota_before_reclaim(self):
+        self.create('buyuk.bin', 9)  # KOTA_RECLAIM_DEFER_MB (8) üstü: çöp kutusuna gider
+        self.assertEqual(app.qm.user_quotas['cop']['usage'], 9 * self.MB)
+        with self.reclaim_paused():
+            response = self.call('post', '/delete_file', self.token, json={'file_path': self.HOME + 'buyuk.bin'})
+            self.assertTrue(response.json['success'], response.json)
+            # Veri henüz silinmedi, ama kota silme anında iade edildi ve hemen kullanılabilir.
+            [entry] = self.pending()
+            self.assertEqual((entry['bytes'], entry['freed_files']), (9 * self.MB, 0))
+            data_path = os.path.join(app.fs.reclaimer.directory, entry['id'])
+            self.assertTrue(os.path.exists(data_path))
+            self.assertEqual(app.qm.user_quotas['cop']['usage'], 0)
+            self.create('dolu.bin', 20)
+        self.assertFalse(os.path.exists(data_path))
+        self.assertEqual(app.qm.user_quotas['cop']['usage'], 20 * self.MB)  # Geri kazanım kotaya dokunmaz
+
+    def test_deleted_home_is_reclaimed(self):
+        for n in range(5):
+            self.create(f'f{n}.bin', 1)
+        with self.reclaim_paused():
+            self.assertIn("arka planda", self.call('delete', '/delete_user/cop', self.admin).json['message'])
+            [entry] = self.pending()
+            self.assertEqual((entry['kind'], entry['files'], entry['bytes']), ('user', 5, 5 * self.MB))
+            data_path = os.path.join(app.fs.reclaimer.directory, entry['id'])
+            self.assertEqual(len(os.listdir(data_path)), 5)
+            self.assertFalse(os.path.exists(app.fs._get_physical_dir_path('cop')))
+            self.assertNotIn('cop', app.qm.user_quotas)
+            self.assertEqual(app.fs.files.files_of('cop'), {})
+
+            # Aynı ad hemen yeniden kaydedilebilir; eski veri yeni kotaya sayılmaz.
+            self.register('cop', quota_mb=20)
+            self.assertEqual(app.qm.user_quotas['cop']['usage'], 0)
+        self.assertFalse(os.path.exists(data_path))
+
+
+class AtomicBatchTest(AppTestCase):
+    MB = 1024 * 1024
+    HOME = '/home/toplu/'
+
+    def setUp(self):
+        super().setUp()
+        self.register('toplu', quota_mb=20)
+        self.token = self.login('toplu', 'p')
+
+    def tearDown(self):
+        self.call('delete', '/delete_user/toplu', self.admin)
+
+    def batch(self, *ops):
+        return self.call('post', '/batch', self.token, json={'ops': list(ops), 'atomic_quota': True}).json
+
+    def state(self):
+        """(indeks, kullanım, fiziksel dizindeki görünür dosyaların içeriği)"""
+        home = app.fs._get_physical_dir_path('toplu')
+        contents = {}
+        for name in sorted(os.listdir(home)):
+            if name.startswith('.'): continue
+            with app.fs.storage.open_binary(os.path.join(home, name)) as f:
+                contents[name] = f.read()
+        files = {path: dict(info) for path, info in app.fs.files.files_of('toplu').items()}
+        return files, app.qm.user_quotas['toplu']['usage'], contents
+
+    def test_batch_over_peak_quota_is_rejected_whole(self):
+        # Son kullanım (15 MB) sığıyor, ama sıradaki en yüksek kullanım (25 MB) sığmıyor.
+        result = self.batch({'op': 'create', 'file_path': self.HOME + 'a.bin', 'size_mb': 10},
+                            {'op': 'create', 'file_path': self.HOME + 'b.bin', 'size_mb': 15},
+                            {'op': 'delete', 'file_path': self.HOME + 'a.bin'})
+        self.assertFalse(result['success'])
+        self.assertIn("Kota aşıldı", result['message'])
+        self.assertEqual(self.state(), ({}, 0, {}))
+
+        result = self.batch({'op': 'create', 'file_path': self.HOME + 'a.bin', 'size_mb': 10},
+                            {'op': 'delete', 'file_path': self.HOME + 'a.bin'},
+                            {'op': 'create', 'file_path': self.HOME + 'b.bin', 'size_mb': 15})
+        self.assertTrue(result['success'], result)
+        self.assertEqual(self.state()[1], 15 * self.MB)
+
+    def test_failure_partway_rolls_back_every_op(self):
+        self.assertTrue(self.batch({'op': 'create', 'file_path': self.HOME + 'not.txt', 'size_mb': 0},
+                                   {'op': 'write', 'file_path': self.HOME + 'not.txt', 'content': 'eski'},
+                                   {'op': 'create', 'file_path': self.HOME + 'buyuk.bin', 'size_mb': 9},
+                                   {'op': 'create', 'file_path': self.HOME + 'bos.txt', 'size_mb': 0},
+                                   {'op': 'write', 'file_path': self.HOME + 'bos.txt', 'content': 'dolu'})['success'])
+        before = self.state()
+
+        # Aynı dosyaya birden çok dokunuş, çöp kutusuna giden büyük silme ve yeni dosya; son işlem başarısız.
+        result = self.batch({'op': 'write', 'file_path': self.HOME + 'not.txt', 'content': 'yeni'},
+                            {'op': 'overwrite', 'file_path': self.HOME + 'not.txt', 'content': 'baştan'},
+                            {'op': 'delete', 'file_path': self.HOME + 'buyuk.bin'},
+                            {'op': 'truncate', 'file_path': self.HOME + 'bos.txt'},
+                            {'op': 'create', 'file_path': self.HOME + 'yeni.bin', 'size_mb': 1},
+                            {'op': 'write', 'file_path': self.HOME + 'yok.txt', 'content': 'x'})
+        self.assertFalse(result['success'])
+        self.assertIn("6. işlem", result['message'])
+        self.assertIn("geri alındı", result['message'])
+        self.assertEqual(self.state(), before)
+        home = app.fs._get_physical_dir_path('toplu')
+        self.assertFalse([name for name in os.listdir(home) if '.undo' in name])  # Yedekler temizlendi
+
+        # Geri alma da kalıcı kayda yazıldı: günlükten yeniden yüklenen kullanım ve dosya boyutları aynı.
+        qm = type(app.qm)()
+        qm.load_and_sync_data(app.fs.project_root)
+        try:
+            self.assertEqual(qm.user_quotas['toplu']['usage'], before[1])
+            self.assertEqual(qm.journaled_files.get(self.HOME + 'buyuk.bin'), 9 * self.MB)
+            self.assertIsNone(qm.journaled_files.get(self.HOME + 'yeni.bin'))
+        finally:
+            qm.journal.close()
+
+    def test_non_atomic_batch_keeps_applied_ops(self):
+        result = self.call('post', '/batch', self.token, json={'ops': [
+            {'op': 'create', 'file_path': self.HOME + 'a.txt', 'size_mb': 0},
+            {'op': 'write', 'file_path': self.HOME + 'yok.txt', 'content': 'x'}]}).json
+        self.assertEqual([r['success'] for r in result['results']], [True, False])
+        self.assertIn(self.HOME + 'a.txt', app.fs.files)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# tests/test_audit_logger.py
+"""Denetim günlüğünün birden çok süreçten yazılırken döndürülmesi."""
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+
+WRITER = """
+import sys
+sys.path.insert(0, {backend!r})
+from AuditLogger import AuditLogger
+from SharedState import ProcessLocks
+lock = ProcessLocks({lock!r}, slots=1).get('system.log')
+logger = AuditLogger({path!r}, durability='none', max_bytes=4096, backup_count=1000, rotate_lock=lock)
+for i in range({count}):
+    logger.log('w{worker}', 'WRITE', 'satır %d' % i)
+    if i % 50 == 0: logger.flush()
+logger.close()
+"""
+
+
+@unittest.skipIf(os.name != 'posix', "süreçler arası kilit yalnızca POSIX")
+class SharedRotationTest(unittest.TestCase):
+    WORKERS, COUNT = 4, 1500
+
+    def test_no_lines_lost_when_workers_rotate_concurrently(self):
+        with tempfile.TemporaryDirectory() as root:
+            path, lock = os.path.join(root, 'system.log'), os.path.join(root, '.kota_audit_lock')
+            procs = [subprocess.Popen([sys.executable, '-c', textwrap.dedent(WRITER).format(
+                backend=BACKEND, lock=lock, path=path, count=self.COUNT, worker=w)]) for w in range(self.WORKERS)]
+            for proc in procs:
+                self.assertEqual(proc.wait(timeout=120), 0)
+
+            lines = []
+            for name in glob.glob(path + '*'):
+                if name.endswith('_lock'): continue
+                with open(name, encoding='utf-8') as f:
+                    lines += f.read().splitlines()
+            self.assertEqual(len(lines), self.WORKERS * self.COUNT)
+            for w in range(self.WORKERS):
+                self.assertEqual(sum(1 for line in lines if f"USER: w{w} " in line), self.COUNT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+# tests/test_crash_restart.py
+"""Süreç close() çağrılmadan öldürüldükten sonra kota kullanımının korunması.
+
+Çökme alt süreçte os._exit ile canlandırılır (atexit ve manifest yazımı çalışmaz).
+Varsayılan KOTA_PREALLOC=simulate kipinde diskteki dosya ~35 baytlık bir yer
+tutucudur; açılış taraması ücreti diskteki boyuttan hesaplarsa kullanım düşer.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+MB = 1024 * 1024
+
+SETUP = """
+import os, sys
+sys.path.insert(0, {backend!r})
+from SharedState import make_quota_manager
+from FileSystem import FileSystem
+qm = make_quota_manager()
+qm._hash_password = lambda password: password
+fs = FileSystem(qm, project_root={root!r})
+"""
+
+
+def run(root, body, state='memory'):
+    """Betiği yeni bir süreçte çalıştırır; stdout'un son satırını döndürür."""
+    script = SETUP.format(backend=BACKEND, root=root) + textwrap.dedent(body)
+    env = dict(os.environ, KOTA_KDF_WORKERS='0', KOTA_PREALLOC='simulate', KOTA_STORAGE='plain', KOTA_STATE=state)
+    result = subprocess.run([sys.executable, '-c', script], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return result.stdout.strip().splitlines()[-1]
+
+
+class CrashRestartTest(unittest.TestCase):
+    state = 'memory'
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        os.makedirs(os.path.join(self.root, 'backend'))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_script(self, body):
+        return run(self.root, body, self.state)
+
+    def usage(self):
+        return float(self.run_script("print(qm.user_quotas['u']['usage'])\nfs.close()"))
+
+    def test_simulated_file_survives_crash(self):
+        self.run_script("""
+            fs.register_user('admin', 'u', 'p', 100)
+            print(fs.create_file('u', '/home/u/big.bin', 60))
+            os._exit(0)
+        """)
+        self.assertEqual(self.usage(), 60 * MB)
+        # Kota hâlâ dolu: ikinci 60 MB'lık dosya reddedilmeli.
+        message = self.run_script("print(fs.create_file('u', '/home/u/second.bin', 60))\nfs.close()")
+        self.assertTrue(message.startswith("HATA: Kota aşıldı"), message)
+
+    def test_appends_and_deletes_after_clean_close_survive_crash(self):
+        self.run_script("""
+            fs.register_user('admin', 'u', 'p', 100)
+            fs.create_file('u', '/home/u/a.bin', 10)
+            fs.create_file('u', '/home/u/b.bin', 20)
+            fs.close()
+            print('ok')
+        """)
+        self.run_script("""
+            fs.write_to_file('u', '/home/u/a.bin', 'x' * 99)
+            fs.delete_file('u', '/home/u/b.bin')
+            fs.create_file('u', '/home/u/c.bin', 5)
+            os._exit(0)
+        """)
+        self.assertEqual(self.usage(), 15 * MB + 100)
+
+    def test_usage_survives_crash_after_journal_checkpoint(self):
+        # Günlük katlandıktan (manifest çalışırken yazıldıktan) sonraki çökme
+        self.run_script("""
+            fs.register_user('admin', 'u', 'p', 100)
+            fs.create_file('u', '/home/u/a.bin', 30)
+            qm.save_data()
+            fs.write_to_file('u', '/home/u/a.bin', 'y' * 9)
+            fs.create_file('u', '/home/u/b.bin', 30)
+            os._exit(0)
+        """)
+        self.assertEqual(self.usage(), 60 * MB + 10)
+
+    def test_usage_survives_crash_before_background_manifest(self):
+        # Günlük iki kez katlanır ama arka plan manifesti hiç yazılamadan süreç çöker.
+        self.run_script("""
+            fs._persist_manifest = lambda discard=False: None
+            fs.register_user('admin', 'u', 'p', 100)
+            fs.create_file('u', '/home/u/a.bin', 30)
+            qm.save_data()
+            fs.write_to_file('u', '/home/u/a.bin', 'y' * 9)
+            fs.create_file('u', '/home/u/b.bin', 30)
+            qm.save_data()
+            os._exit(0)
+        """)
+        self.assertEqual(self.usage(), 60 * MB + 10)
+
+    def test_restored_sizes_survive_crash(self):
+        self.run_script("""
+            fs._persist_manifest = lambda discard=False: None
+            fs.register_user('admin', 'u', 'p', 100)
+            fs.create_file('u', '/home/u/a.bin', 10)
+            fs.create_snapshot('admin', 'u')
+            snapshot_id = fs.snapshots.ids('u')[-1]
+            fs.create_file('u', '/home/u/b.bin', 20)
+            fs.write_to_file('u', '/home/u/a.bin', 'z' * 4)
+            print(fs.restore_snapshot('admin', 'u', snapshot_id))
+            os._exit(0)
+        """)
+        self.assertEqual(self.usage(), 10 * MB)
+
+    def test_checkpoint_does_not_stat_files(self):
+        if self.state == 'sqlite': self.skipTest("ortak durumda günlük yok")
+        calls = self.run_script("""
+            fs.register_user('admin', 'u', 'p', 100)
+            for i in range(20): fs.create_file('u', f'/home/u/f{i}.bin', 1)
+            real_stat, calls, checkpoint = os.stat, [], qm.journal.checkpoint
+            def counted(write_snapshot):
+                def wrapped():
+                    os.stat = lambda *args, **kwargs: calls.append(args) or real_stat(*args, **kwargs)
+                    try: write_snapshot()
+                    finally: os.stat = real_stat
+                checkpoint(wrapped)
+            qm.journal.checkpoint = counted
+            qm.save_data()
+            print(len(calls))
+            fs.close()
+        """)
+        self.assertEqual(calls, '0')
+
+    def test_snapshot_drops_sizes_covered_by_manifest(self):
+        if self.state == 'sqlite': self.skipTest("ortak durumda günlük yok")
+        result = self.run_script("""
+            import json, time
+            fs.register_user('admin', 'u', 'p', 100)
+            fs.create_file('u', '/home/u/a.bin', 1)
+            qm.save_data()
+            with open(qm.file_path) as f: before = len(json.load(f).get('files', {}))
+            for _ in range(500):
+                if not qm.journaled_files and not qm._manifest_files: break
+                time.sleep(0.01)
+            qm.save_data()
+            with open(qm.file_path) as f: after = len(json.load(f).get('files', {}))
+            print(before, after)
+            fs.close()
+        """)
+        self.assertEqual(result, '1 0')
+
+
+@unittest.skipIf(os.name != 'posix', "KOTA_STATE=sqlite yalnızca POSIX")
+class SharedCrashRestartTest(CrashRestartTest):
+    """Aynı senaryolar ortak SQLite durumu ile (KOTA_STATE=sqlite)."""
+    state = 'sqlite'
+
+
+if __name__ == '__main__':
+    unittest.main()
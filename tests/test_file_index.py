@@ -0,0 +1,87 @@
+# tests/test_file_index.py
+"""FileIndex: kullanıcı bazlı shard'lar, sahip değişimi ve silme."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from FileIndex import FileIndex  # noqa: E402
+
+
+class _Untouchable(dict):
+    """Üzerinde gezinilirse testi düşüren shard (başka kullanıcının dosyaları)."""
+
+    def __iter__(self):
+        raise AssertionError("başka kullanıcının shard'ı tarandı")
+
+    def items(self):
+        raise AssertionError("başka kullanıcının shard'ı tarandı")
+
+
+class FileIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = FileIndex()
+
+    def _add(self, owner, count):
+        for n in range(count):
+            self.index[f"/home/{owner}/f{n}"] = {'owner': owner, 'size': n}
+
+    def test_ls_of_large_home_only_visits_own_shard(self):
+        self._add('big', 20000)
+        self._add('other', 5000)
+        self.index._by_owner['other'] = _Untouchable(self.index._by_owner['other'])
+
+        files = self.index.files_of('big')
+        self.assertEqual(len(files), 20000)
+        paths = list(files)
+        self.assertEqual(paths[0], "/home/big/f0")  # Ekleme sırası korunur
+        self.assertEqual(paths[-1], "/home/big/f19999")
+        self.assertEqual(self.index["/home/big/f123"]['size'], 123)
+        self.assertEqual(self.index.files_of('nobody'), {})
+        self.assertEqual(len(self.index), 25000)
+
+    def test_owner_change_moves_entry_between_shards(self):
+        self._add('a', 3)
+        self.index["/home/a/f1"] = {'owner': 'b', 'size': 7}
+
+        self.assertEqual(list(self.index.files_of('a')), ["/home/a/f0", "/home/a/f2"])
+        self.assertEqual(self.index.files_of('b'), {"/home/a/f1": {'owner': 'b', 'size': 7}})
+        self.assertEqual(self.index.get("/home/a/f1")['owner'], 'b')
+        self.assertEqual(len(self.index), 3)
+
+        # Eski sahibin tüm kayıtları silinse de taşınan kayıt kalır.
+        removed = self.index.drop_owner('a')
+        self.assertEqual(sorted(removed), ["/home/a/f0", "/home/a/f2"])
+        self.assertIn("/home/a/f1", self.index)
+        self.assertEqual(len(self.index), 1)
+
+    def test_delete_updates_both_maps(self):
+        self._add('a', 3)
+        self._add('b', 2)
+        del self.index["/home/a/f0"]
+
+        self.assertNotIn("/home/a/f0", self.index)
+        self.assertIsNone(self.index.get("/home/a/f0"))
+        self.assertEqual(list(self.index.files_of('a')), ["/home/a/f1", "/home/a/f2"])
+        with self.assertRaises(KeyError):
+            del self.index["/home/a/f0"]
+
+        self.index.drop_owner('b')
+        self.assertNotIn("/home/b/f0", self.index)
+        self.assertEqual(self.index.files_of('b'), {})
+        self.assertEqual(sorted(path for path, _ in self.index.items()), ["/home/a/f1", "/home/a/f2"])
+        self.assertEqual(len(self.index), 2)
+
+    def test_set_size_and_load(self):
+        self._add('a', 2)
+        self.index.set_size("/home/a/f1", 99)
+        self.assertEqual(self.index.files_of('a')["/home/a/f1"]['size'], 99)
+
+        self.index.load([("/home/c/x", {'owner': 'c', 'size': 1})])
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.owners(), ['c'])
+        self.assertNotIn("/home/a/f1", self.index)
+
+
+if __name__ == '__main__':
+    unittest.main()
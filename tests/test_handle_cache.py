@@ -0,0 +1,89 @@
+# tests/test_handle_cache.py
+"""AppendCache: çıkarılan ya da geçersizleşen tanıtıcılar silme/taşımadan sonra yazmaz."""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from HandleCache import AppendCache  # noqa: E402
+from Storage import PlainStorage, break_link  # noqa: E402
+
+
+class AppendCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        # Arka plan boşaltması testler sırasında çalışmaz; yazmalar yalnızca açık çağrılarla olur.
+        self.cache = AppendCache(prepare=break_link, capacity=1, flush_interval=3600)
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self._tmp.name, name)
+
+    def content(self, name):
+        with open(self.path(name), 'rb') as f:
+            return f.read()
+
+    def test_evicted_handle_is_not_written_after_delete(self):
+        self.cache.append(self.path('a'), b"a1")
+        self.cache.append(self.path('b'), b"b1")  # Kapasite 1: a'nın tamponu yazılıp tanıtıcısı kapanır
+        self.assertEqual(self.cache.stats['evictions'], 1)
+        self.assertEqual(self.content('a'), b"a1")
+
+        os.remove(self.path('a'))
+        self.cache.append(self.path('b'), b"b2")
+        self.cache.drop_all()
+        self.assertFalse(os.path.exists(self.path('a')))
+        self.assertEqual(self.content('b'), b"b1b2")
+
+    def test_storage_delete_and_detach_settle_handles_first(self):
+        storage = PlainStorage(self.cache)
+        storage.append(self.path('a'), b"silinecek")
+        storage.remove(self.path('a'))  # Tampon yazılıp tanıtıcı kapanır, sonra silinir
+        self.assertEqual(len(self.cache), 0)
+
+        storage.append(self.path('b'), b"kalan")
+        self.cache.flush(self.path('b'))
+        storage.append(self.path('b'), b"atilacak")
+        storage.detach(self.path('b'), self.path('trash'))  # Çöp kutusu: tampon yazılmaz
+        self.cache.drop_all()
+        self.assertFalse(os.path.exists(self.path('a')))
+        self.assertFalse(os.path.exists(self.path('b')))
+        self.assertEqual(self.content('trash'), b"kalan")
+
+    def test_handle_invalidated_outside_cache_is_discarded(self):
+        # Önbelleğe haber verilmeden silinen dosya yeniden oluşturulmaz.
+        self.cache.append(self.path('a'), b"a1")
+        os.remove(self.path('a'))
+        self.cache.flush(self.path('a'))
+        self.assertFalse(os.path.exists(self.path('a')))
+        self.assertEqual(len(self.cache), 0)
+
+        # Taşınan dosyaya (ör. çöp kutusu) ve aynı yola konan yeni dosyaya tampon yazılmaz.
+        self.cache.append(self.path('b'), b"b1")
+        self.cache.flush(self.path('b'))
+        self.cache.append(self.path('b'), b"b2")
+        os.rename(self.path('b'), self.path('tasindi'))
+        with open(self.path('b'), 'wb') as f:
+            f.write(b"yeni")
+        with self.assertRaises(FileNotFoundError):
+            self.cache.append(self.path('b'), b"b3", durable=True)
+        self.cache.drop_all()
+        self.assertEqual(self.content('tasindi'), b"b1")
+        self.assertEqual(self.content('b'), b"yeni")
+
+    def test_snapshot_link_is_broken_before_write(self):
+        self.cache.append(self.path('a'), b"eski")
+        self.cache.flush(self.path('a'))
+        os.link(self.path('a'), self.path('kopya'))
+        self.cache.append(self.path('a'), b"+yeni")
+        self.cache.drop_all()
+        self.assertEqual(self.content('kopya'), b"eski")
+        self.assertEqual(self.content('a'), b"eski+yeni")
+
+
+if __name__ == '__main__':
+    unittest.main()
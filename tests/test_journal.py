@@ -0,0 +1,127 @@
+# tests/test_journal.py
+"""Journal: grup commit, yarım kalmış son kaydın kırpılması ve checkpoint."""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from Journal import Journal  # noqa: E402
+
+
+class _GatedFile:
+    """Yazmaları sayar; ilk write() kapı açılana kadar bekler."""
+
+    def __init__(self, f, gate):
+        self._f = f
+        self.gate = gate
+        self.writes = []
+
+    def write(self, data):
+        if not self.writes:
+            self.gate.wait(5)
+        self.writes.append(data)
+        return self._f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'journal.log')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _journal(self):
+        journal = Journal(self.path, fsync=False)
+        journal.replay()
+        journal.open()
+        return journal
+
+    def test_group_commit_batches_waiting_writers(self):
+        journal = self._journal()
+        gate = threading.Event()
+        journal._file = gated = _GatedFile(journal._file, gate)
+
+        # İlk yazan lider olur ve kapıda bekler; diğerleri bu sırada kuyruğa girer.
+        threads = [threading.Thread(target=journal.write, args=({'n': 0},))]
+        threads[0].start()
+        while not journal._flushing:
+            time.sleep(0.001)
+        for n in range(1, 9):
+            threads.append(threading.Thread(target=journal.write, args=({'n': n},)))
+            threads[-1].start()
+        deadline = time.time() + 5
+        while journal._last_seq < 9 and time.time() < deadline:
+            time.sleep(0.001)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(gated.writes), 2)  # Lider + bekleyen 8 kayıt tek seferde
+        self.assertEqual(gated.writes[1].count(b'\n'), 8)
+        self.assertEqual(journal._durable_seq, 9)
+        journal.close()
+        self.assertEqual(sorted(r['n'] for r in Journal(self.path).replay()), list(range(9)))
+
+    def test_replay_truncates_torn_tail(self):
+        journal = self._journal()
+        for n in range(3):
+            journal.write({'n': n})
+        journal.close()
+        good_size = os.path.getsize(self.path)
+        for torn in (b'{"n":3', b'{"n":\n'):  # Yarım satır / bozuk tam satır
+            with open(self.path, 'ab') as f:
+                f.write(torn)
+
+            journal = Journal(self.path, fsync=False)
+            self.assertEqual([r['n'] for r in journal.replay()], [0, 1, 2])
+            self.assertEqual(os.path.getsize(self.path), good_size)
+            self.assertEqual(journal.record_count, 3)
+
+        # Kırpmadan sonra eklenen kayıt sağlam kayıtların ardına gelir.
+        journal.open()
+        journal.write({'n': 3})
+        journal.close()
+        self.assertEqual([r['n'] for r in Journal(self.path).replay()], [0, 1, 2, 3])
+
+    def test_checkpoint_writes_snapshot_and_truncates(self):
+        journal = self._journal()
+        for n in range(3):
+            journal.write({'n': n})
+        pending_seq = journal.append({'n': 3})  # Henüz commit edilmemiş
+        seen = []
+        journal.checkpoint(lambda: seen.append((journal.record_count, len(journal._pending))))
+
+        self.assertEqual(seen, [(4, 1)])  # Snapshot, bekleyen kayıt dahil hepsini kapsar
+        self.assertEqual(os.path.getsize(self.path), 0)
+        self.assertEqual(journal.record_count, 0)
+        journal.commit(pending_seq)  # Snapshot'a katlandı: beklemeden döner
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+        journal.write({'n': 4})
+        journal.close()
+        self.assertEqual([r['n'] for r in Journal(self.path).replay()], [4])
+
+    def test_failed_snapshot_keeps_journal(self):
+        journal = self._journal()
+        journal.write({'n': 0})
+
+        def fail():
+            raise OSError("disk dolu")
+
+        with self.assertRaises(OSError):
+            journal.checkpoint(fail)
+        self.assertFalse(journal._flushing)
+        journal.write({'n': 1})
+        journal.close()
+        self.assertEqual([r['n'] for r in Journal(self.path).replay()], [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_quota_manager.py
+"""QuotaManager kilit davranışı ve oturum kuşakları."""
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+os.environ.setdefault('KOTA_KDF_WORKERS', '0')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from QuotaManager import QuotaManager  # noqa: E402
+
+
+class QuotaManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.qm = QuotaManager()  # Günlük yüklenmez: yalnızca bellek içi durum
+
+    def test_add_user_hashes_outside_lock(self):
+        acquired = []
+
+        def hash_password(password):
+            # Başka bir thread kilidi alabilmeli (yavaş KDF kilidi tutmamalı).
+            thread = threading.Thread(target=lambda: acquired.append(self.qm._lock.acquire(timeout=1)
+                                                                     and self.qm._lock.release() is None))
+            thread.start()
+            thread.join()
+            return 'h:' + password
+
+        self.qm._hash_password = hash_password
+        self.qm.add_user('u', 'p', 10)
+        self.assertEqual(acquired, [True])
+        self.assertEqual(self.qm.passwords['u'], 'h:p')
+
+
+    def test_token_epoch_bumped_on_delete_and_persisted(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, 'backend'))
+            self.qm.load_and_sync_data(root)
+            self.qm._hash_password = lambda password: password
+            self.qm.add_user('u', 'p', 10)
+            self.assertEqual(self.qm.token_epoch('u'), 0)
+            self.qm.delete_user_data('u')
+            self.assertIsNone(self.qm.token_epoch('u'))
+            self.qm.add_user('u', 'p', 10)
+            self.assertEqual(self.qm.token_epoch('u'), 1)
+            self.qm.journal.close()
+
+            # Günlükten (snapshot'a katlanmadan) ve snapshot'tan yeniden yükleme
+            for _ in range(2):
+                qm = QuotaManager()
+                qm.load_and_sync_data(root)
+                self.assertEqual(qm.token_epoch('u'), 1)
+                qm.save_data()
+                qm.journal.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# tests/test_rate_limiter.py
+"""Jeton kovaları (sahte saat ile)."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from RateLimiter import RateLimiter, TokenBuckets  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketsTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.buckets = TokenBuckets(rate=10, burst=100, clock=self.clock)
+
+    def test_cost_above_burst_is_charged_in_full(self):
+        # 1000 işlemlik bir /batch kova dolu olduğu için kabul edilir...
+        self.assertEqual(self.buckets.take('u', 1000), 0)
+        # ...ama 900 jeton borç kalır: borç ödenene kadar (90 sn) yeni istek yok.
+        self.clock.now = 50
+        self.assertGreater(self.buckets.take('u', 1), 0)
+        self.clock.now = 90
+        self.assertGreater(self.buckets.take('u', 1), 0)
+        self.clock.now = 90.2
+        self.assertEqual(self.buckets.take('u', 1), 0)
+
+    def test_large_batches_do_not_exceed_rate(self):
+        # Sürekli kapasiteden büyük partilerle sürdürülebilen hız, kova hızını aşamaz.
+        accepted = 0
+        for second in range(100):
+            self.clock.now = second
+            if not self.buckets.take('u', 500): accepted += 500
+        self.assertLessEqual(accepted, 100 + 10 * 100)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_rejected_user_request_does_not_spend_ip_tokens(self):
+        clock = FakeClock()
+        limiter = RateLimiter({'write': (1, 2)}, ip_factor=2, enabled=True, clock=clock)
+        self.assertEqual(limiter.check('write', 'ip', 'u'), 0)
+        self.assertEqual(limiter.check('write', 'ip', 'u'), 0)
+        # u'nun kovası boş: reddedilen istekler ortak IP kovasından jeton düşmez.
+        for _ in range(10):
+            self.assertGreater(limiter.check('write', 'ip', 'u'), 0)
+        self.assertEqual(limiter.check('write', 'ip', 'v'), 0)
+        self.assertEqual(limiter.check('write', 'ip', 'v'), 0)
+        self.assertGreater(limiter.check('write', 'ip', 'w'), 0)  # IP kovası (4) artık gerçekten boş
+
+
+if __name__ == '__main__':
+    unittest.main()
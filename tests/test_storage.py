@@ -0,0 +1,158 @@
+# tests/test_storage.py
+"""Depolama motorları: tekilleştirilmiş parça deposunun referans sayıları ve sıkıştırılmış çerçeveler."""
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from Storage import CompressedStorage, DedupStorage, FRAME_MAGIC  # noqa: E402
+
+
+def digest(chunk):
+    return hashlib.sha256(chunk).hexdigest()
+
+
+class DedupStorageTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.store = self.open()
+
+    def tearDown(self):
+        self.store.close()
+        self._tmp.cleanup()
+
+    def open(self):
+        return DedupStorage(os.path.join(self.root, 'blockstore'), chunk_size=4)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def read(self, name, store=None):
+        with (store or self.store).open_binary(self.path(name)) as f:
+            return f.read()
+
+    def refs(self, store=None):
+        """Canlı parçaların referans sayıları (özet -> sayı)."""
+        return {h: entry[0] for h, entry in (store or self.store)._refs.items() if entry[0] > 0}
+
+    def objects(self):
+        return sorted(name for _, _, names in os.walk(self.store.objects_dir) for name in names)
+
+    def test_write_overwrite_delete_round_trip(self):
+        self.store.replace(self.path('a'), b"aaaabbbbaaaacc")
+        self.assertEqual(self.read('a'), b"aaaabbbbaaaacc")
+        self.assertEqual(self.refs(), {digest(b"aaaa"): 2, digest(b"bbbb"): 1, digest(b"cc"): 1})
+
+        self.store.append(self.path('a'), b"dd")  # Yarım son parça yeniden yazılır
+        self.assertEqual(self.read('a'), b"aaaabbbbaaaaccdd")
+        self.store.replace(self.path('a'), b"bbbbeeee")
+        self.assertEqual(self.read('a'), b"bbbbeeee")
+        self.assertEqual(self.refs(), {digest(b"bbbb"): 1, digest(b"eeee"): 1})
+        self.store.collect(0)
+        self.assertEqual(self.objects(), sorted([digest(b"bbbb"), digest(b"eeee")]))
+
+        self.store.remove(self.path('a'))
+        self.assertFalse(os.path.exists(self.path('a')))
+        self.assertEqual(self.refs(), {})
+        self.store.collect(0)
+        self.assertEqual(self.objects(), [])
+        self.assertEqual(self.store.report()['chunks'], 0)
+
+    def test_shared_chunk_survives_one_owners_delete(self):
+        self.store.replace(self.path('a'), b"ortakaaaa")
+        self.store.replace(self.path('b'), b"ortakbbbb")
+        self.assertEqual(self.refs()[digest(b"orta")], 2)
+
+        self.store.remove(self.path('a'))
+        self.store.collect(0)
+        self.assertEqual(self.read('b'), b"ortakbbbb")
+        self.assertEqual(self.refs(), {digest(b"orta"): 1, digest(b"kbbb"): 1, digest(b"b"): 1})
+        self.assertNotIn(digest(b"kaaa"), self.objects())
+
+        # Çöp kutusundan toplu silme (reclaim) de yalnızca kendi referanslarını düşer.
+        self.store.replace(self.path('c'), b"ortak")
+        self.assertEqual(self.store.reclaim([self.path('b')]), len(b"ortakbbbb"))
+        self.store.collect(0)
+        self.assertEqual(self.read('c'), b"ortak")
+        self.assertEqual(self.refs(), {digest(b"orta"): 1, digest(b"k"): 1})
+
+    def test_refcounts_survive_restart(self):
+        self.store.replace(self.path('a'), b"aaaabbbbaaaa")
+        self.store.replace(self.path('b'), b"aaaacccc")
+        self.store.replace(self.path('a'), b"aaaadddd")
+        self.store.remove(self.path('b'))
+        expected = self.refs()
+        self.assertEqual(expected, {digest(b"aaaa"): 1, digest(b"dddd"): 1})
+
+        # Çökme: kapatılmadan açılan depo günlükten aynı sayıları kurar.
+        crashed = self.open()
+        try:
+            self.assertEqual(self.refs(crashed), expected)
+            self.assertEqual(self.read('a', crashed), b"aaaadddd")
+        finally:
+            crashed.journal.close()
+
+        # Temiz kapanış: günlük refcounts.json'a katlanır, sayılar aynı kalır.
+        self.store.close()
+        self.store = self.open()
+        self.assertEqual(self.refs(), expected)
+        self.assertEqual(os.path.getsize(self.store.journal.path), 0)
+        self.assertEqual(self.objects(), sorted(expected))
+
+        # Tam çöp toplama da manifestlerden aynı sayıları bulur.
+        self.store.gc([self.path('a')])
+        self.assertEqual(self.refs(), expected)
+
+
+class CompressedStorageTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'f')
+        rng = random.Random(15)
+        self.noise = bytes(rng.getrandbits(8) for _ in range(3000))  # Sıkıştırılamaz: ham çerçeve
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def read(self, store, start=0, length=None):
+        with store.open_binary(self.path) as f:
+            f.seek(start)
+            return f.read() if length is None else f.read(length)
+
+    def test_round_trip_byte_for_byte(self):
+        for codec in ('zlib', 'lzma'):
+            with self.subTest(codec=codec):
+                store = CompressedStorage(codec, frame_size=1000)
+                expected = b"tekrar " * 500 + self.noise
+                store.replace(self.path, expected)
+                for piece in (b"\nbir", self.noise[:1500], b"\n" + b"z" * 2500):
+                    store.append(self.path, piece)
+                    expected += piece
+                self.assertEqual(self.read(store), expected)
+                for start, length in ((0, 1), (999, 2), (3400, 1700), (len(expected) - 5, 100)):
+                    self.assertEqual(self.read(store, start, length), expected[start:start + length])
+                self.assertEqual(store.sizes(self.path)[0], len(expected))
+
+                stored = store.compact(self.path)
+                self.assertIsNotNone(stored)
+                self.assertEqual(os.path.getsize(self.path), stored)
+                self.assertEqual(self.read(store), expected)
+
+    def test_legacy_plain_file_is_read_and_appended_as_is(self):
+        with open(self.path, 'wb') as f:
+            f.write(b"eski duz dosya")
+        store = CompressedStorage()
+        store.append(self.path, b"\nek")
+        self.assertEqual(self.read(store), b"eski duz dosya\nek")
+        store.truncate(self.path)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), FRAME_MAGIC)
+        self.assertEqual(self.read(store), b"")
+
+
+if __name__ == '__main__':
+    unittest.main()
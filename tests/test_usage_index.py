@@ -0,0 +1,109 @@
+# tests/test_usage_index.py
+"""UsageIndex (ve SQL karşılığı) sayfalama: tam taramayla karşılaştırma ve min_percent'in tarama maliyeti."""
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from UsageIndex import UsageIndex, ORDERS, percent_of  # noqa: E402
+from SharedState import SharedQuotaManager  # noqa: E402
+
+
+class CountingDict(dict):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.reads = 0
+
+    def __getitem__(self, key):
+        self.reads += 1
+        return super().__getitem__(key)
+
+
+class UsageIndexTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.quotas = {f"u{i:04d}": {'usage': rng.randrange(0, 100), 'limit': rng.choice([50, 100, 200])}
+                       for i in range(1000)}
+        self.quotas['admin'] = {'usage': 5, 'limit': float('inf')}
+        self.index = UsageIndex()
+        self.index.rebuild(self.quotas)
+
+    def expected(self, order, descending, prefix, min_percent):
+        rows = [(u, q['usage'], q['limit']) for u, q in self.quotas.items()
+                if (not prefix or u.startswith(prefix))
+                and (min_percent is None or percent_of(q['usage'], q['limit']) >= min_percent)]
+        key = {'name': lambda r: (r[0],), 'usage': lambda r: (r[1], r[0]), 'limit': lambda r: (r[2], r[0]),
+               'percent': lambda r: (percent_of(r[1], r[2]), r[0])}[order]
+        return sorted(rows, key=key, reverse=descending)
+
+    def all_pages(self, **kwargs):
+        rows, cursor = [], None
+        while True:
+            page, cursor = self.index.page(limit=37, cursor=cursor, **kwargs)
+            rows += page
+            if cursor is None: return rows
+
+    def test_pages_match_full_scan(self):
+        for order in ORDERS:
+            for descending in (False, True):
+                for prefix in (None, 'u01'):
+                    for min_percent in (None, 0, 90, 150):
+                        with self.subTest(order=order, descending=descending, prefix=prefix, min_percent=min_percent):
+                            self.assertEqual(self.all_pages(order=order, descending=descending, prefix=prefix,
+                                                            min_percent=min_percent),
+                                             self.expected(order, descending, prefix, min_percent))
+
+    def test_min_percent_reads_only_matching_users(self):
+        matching = len(self.expected('usage', True, None, 99))
+        for order in ORDERS:
+            for descending in (False, True):
+                self.index._values = CountingDict(self.index._values)
+                self.index.page(order=order, descending=descending, limit=10, min_percent=99)
+                # Eşiği geçen kullanıcılar (+ azalan yüzde sırasında durmak için okunan bir tane)
+                self.assertLessEqual(self.index._values.reads, 2 * matching + 1, (order, descending))
+
+
+
+@unittest.skipIf(os.name != 'posix', "KOTA_STATE=sqlite yalnızca POSIX")
+class SharedUsagePageTest(UsageIndexTest):
+    """Aynı sorgular SharedQuotaManager.usage_page (SQLite indeksleri) üzerinden."""
+
+    def setUp(self):
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self._tmp.name, 'backend'))
+        self.qm = SharedQuotaManager()
+        self.qm.load_and_sync_data(self._tmp.name)
+        with self.qm.db.transaction() as db:
+            db.execute("DELETE FROM users")
+            db.executemany("INSERT INTO users VALUES (?, ?, ?, NULL)",
+                           [(u, q['limit'], q['usage']) for u, q in self.quotas.items()])
+        self.qm.db.execute("ANALYZE")  # İstatistiklerle planlayıcı sıralama indeksini tercih eder
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def all_pages(self, **kwargs):
+        rows, cursor = [], None
+        while True:
+            page, cursor = self.qm.usage_page(limit=37, cursor=cursor, **kwargs)
+            rows += [tuple(row) for row in page]
+            if cursor is None: return rows
+
+    def test_min_percent_reads_only_matching_users(self):
+        # Sorgu planı sıralama indeksini taramamalı: yüzde indeksinde aralık araması yapılmalı.
+        statements, execute = [], self.qm.db.execute
+        self.qm.db.execute = lambda sql, params=(): statements.append((sql, params)) or execute(sql, params)
+        for order in ('name', 'usage', 'limit'):
+            self.qm.usage_page(order=order, limit=10, min_percent=99)
+        del self.qm.db.execute
+        for sql, params in statements:
+            # Eşik bağlı parametre olarak verilir; planlayıcı seçiciliği bilmeden plan seçer.
+            plan = " ".join(row[3] for row in execute("EXPLAIN QUERY PLAN " + sql, params))
+            self.assertIn("SEARCH users USING INDEX users_percent", plan)
+
+
+if __name__ == '__main__':
+    unittest.main()